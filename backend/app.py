@@ -21,6 +21,7 @@ load_dotenv(dotenv_path=_env_file, override=True)
 from flask import Flask
 from flask_cors import CORS
 from models import db
+from models.db_engine import build_engine_options, configure_write_gate, is_sqlite_uri
 from config import Config
 from controllers.material_controller import material_bp, material_global_bp
 from controllers.reference_file_controller import reference_file_bp
@@ -44,7 +45,7 @@ def set_sqlite_pragma(dbapi_conn, connection_record):
     try:
         cursor.execute("PRAGMA journal_mode=WAL")
         cursor.execute("PRAGMA synchronous=NORMAL")
-        cursor.execute("PRAGMA busy_timeout=30000")  # 30 seconds timeout
+        cursor.execute(f"PRAGMA busy_timeout={Config.SQLITE_BUSY_TIMEOUT_MS}")
     finally:
         cursor.close()
 
@@ -62,7 +63,13 @@ def create_app():
     os.makedirs(instance_dir, exist_ok=True)
     
     db_path = os.path.join(instance_dir, 'database.db')
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    database_uri = os.getenv('DATABASE_URL') or f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(database_uri, Config)
+    configure_write_gate(
+        enabled=is_sqlite_uri(database_uri) and app.config['SQLITE_WRITE_GATE_ENABLED'],
+        timeout_seconds=app.config['SQLITE_BUSY_TIMEOUT_MS'] / 1000,
+    )
     
     # Ensure upload folder exists
     project_root = os.path.dirname(backend_dir)
@@ -362,5 +369,14 @@ if __name__ == '__main__':
         f"Uploads: {app.config['UPLOAD_FOLDER']}"
     )
     
+    # Resume durable tasks interrupted by the previous shutdown.
+    # With the debug reloader only the child process (WERKZEUG_RUN_MAIN) serves requests.
+    if not debug or os.getenv('WERKZEUG_RUN_MAIN') == 'true':
+        from services.task_manager import task_manager
+        try:
+            task_manager.resume_pending_tasks(app)
+        except SQLAlchemyError as e:
+            logging.warning(f"Could not resume pending tasks: {e}")
+
     # Using absolute paths for database, so WSL path issues should not occur
     app.run(host='0.0.0.0', port=port, debug=debug, use_reloader=debug)
@@ -25,21 +25,28 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
-    # SQLite线程安全配置 - 关键修复
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'connect_args': {
-            'check_same_thread': False,  # 允许跨线程使用（仅SQLite）
-            'timeout': 30  # 增加超时时间
-        },
-        'pool_pre_ping': True,  # 连接前检查
-        'pool_recycle': 3600,  # 1小时回收连接
-    }
-    
+    # 连接池配置（SQLALCHEMY_ENGINE_OPTIONS 由 create_app() 按数据库类型生成，见 models/db_engine.py）
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))  # 常驻连接数
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))  # 溢出连接数（后台任务线程较多时可适当调大）
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))  # 获取连接的超时时间（秒）
+    # SQLite 写锁等待时间（毫秒），同时用作进程内写入排队的超时
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '30000'))
+    # 进程内串行化 SQLite 写事务（多个后台线程按先后顺序写入，避免 database is locked）
+    SQLITE_WRITE_GATE_ENABLED = os.getenv('SQLITE_WRITE_GATE_ENABLED', 'true').lower() == 'true'
+
     # 文件存储配置
     UPLOAD_FOLDER = os.path.join(PROJECT_ROOT, 'uploads')
     MAX_CONTENT_LENGTH = 200 * 1024 * 1024  # 200MB max file size
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
     ALLOWED_REFERENCE_FILE_EXTENSIONS = {'pdf', 'docx', 'pptx', 'doc', 'ppt', 'xlsx', 'xls', 'csv', 'txt', 'md'}
+
+    # /files 静态文件缓存与下发
+    # 带版本号的页面图片/预览图（{page_id}_v{n}.png）写入后不再变化，按 immutable 缓存的时长（秒）
+    FILES_CACHE_MAX_AGE = int(os.getenv('FILES_CACHE_MAX_AGE', '31536000'))
+    # 由前置 Web 服务器发送文件内容：USE_X_SENDFILE=true 返回 X-Sendfile（Apache / lighttpd），
+    # FILES_X_ACCEL_REDIRECT_PREFIX 设置为映射到 UPLOAD_FOLDER 的 nginx internal location（如 /protected-uploads）时返回 X-Accel-Redirect
+    USE_X_SENDFILE = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'
+    FILES_X_ACCEL_REDIRECT_PREFIX = os.getenv('FILES_X_ACCEL_REDIRECT_PREFIX', '')
     
     # AI服务配置
     GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY', '')
@@ -74,6 +81,9 @@ class Config:
     # MinerU 文件解析服务配置
     MINERU_TOKEN = os.getenv('MINERU_TOKEN', '')
     MINERU_API_BASE = os.getenv('MINERU_API_BASE', 'https://mineru.net')
+    # 解析结果轮询（所有解析任务共用一个轮询线程）：状态无变化时间隔从最小值逐步拉长到最大值（秒）
+    MINERU_POLL_MIN_INTERVAL = float(os.getenv('MINERU_POLL_MIN_INTERVAL', '1'))
+    MINERU_POLL_MAX_INTERVAL = float(os.getenv('MINERU_POLL_MAX_INTERVAL', '10'))
     
     # 图片识别模型配置
     IMAGE_CAPTION_MODEL = os.getenv('IMAGE_CAPTION_MODEL', 'gemini-3-flash-preview')
@@ -81,7 +91,67 @@ class Config:
     # 并发配置
     MAX_DESCRIPTION_WORKERS = int(os.getenv('MAX_DESCRIPTION_WORKERS', '5'))
     MAX_IMAGE_WORKERS = int(os.getenv('MAX_IMAGE_WORKERS', '8'))
-    
+    IMAGE_ENCODE_WORKERS = int(os.getenv('IMAGE_ENCODE_WORKERS', '2'))  # 批量生成图片时 PNG/缩略图编码的线程数（与网络请求并行）
+    # 图片编码进程池：PNG 原图与预览图在独立进程中编码，避免占用请求线程的 GIL（0 表示在当前线程编码）
+    IMAGE_ENCODE_PROCESSES = int(os.getenv('IMAGE_ENCODE_PROCESSES', '2'))
+    PNG_COMPRESS_LEVEL = int(os.getenv('PNG_COMPRESS_LEVEL', '6'))  # 0-9，越大文件越小、编码越慢
+    IMAGE_PREVIEW_FORMAT = os.getenv('IMAGE_PREVIEW_FORMAT', 'jpeg')  # 预览图格式: jpeg | webp | avif
+    # PDF 拆页/渲染进程池（PPT 翻新：拆分出的页面边拆边交给解析线程；0 表示在当前线程处理）
+    PDF_SPLIT_PROCESSES = int(os.getenv('PDF_SPLIT_PROCESSES', '2'))
+
+    # AI 调用全局限流（按 text / image / caption 分别共享，跨所有任务生效）
+    # *_MAX_CONCURRENCY: 同时在途的请求数上限（<=0 表示不限制）
+    # *_REQUESTS_PER_SECOND: 每秒发起的请求数上限（<=0 表示不限制）
+    AI_TEXT_MAX_CONCURRENCY = int(os.getenv('AI_TEXT_MAX_CONCURRENCY', '10'))
+    AI_TEXT_REQUESTS_PER_SECOND = float(os.getenv('AI_TEXT_REQUESTS_PER_SECOND', '0'))
+    AI_IMAGE_MAX_CONCURRENCY = int(os.getenv('AI_IMAGE_MAX_CONCURRENCY', '8'))
+    AI_IMAGE_REQUESTS_PER_SECOND = float(os.getenv('AI_IMAGE_REQUESTS_PER_SECOND', '0'))
+    AI_CAPTION_MAX_CONCURRENCY = int(os.getenv('AI_CAPTION_MAX_CONCURRENCY', '12'))
+    AI_CAPTION_REQUESTS_PER_SECOND = float(os.getenv('AI_CAPTION_REQUESTS_PER_SECOND', '0'))
+    AI_RATE_LIMIT_MAX_RETRIES = int(os.getenv('AI_RATE_LIMIT_MAX_RETRIES', '3'))  # 遇到 429 时的重试次数
+    AI_RATE_LIMIT_BACKOFF_MAX = float(os.getenv('AI_RATE_LIMIT_BACKOFF_MAX', '60'))  # 429 退避的最长等待（秒）
+
+    # 任务进度推送（SSE）：无事件时发送心跳的间隔（秒）
+    TASK_EVENTS_HEARTBEAT_SECONDS = float(os.getenv('TASK_EVENTS_HEARTBEAT_SECONDS', '15'))
+
+    # 批量任务进度写入：页面结果先在内存中汇总，满足任一条件时合并为一次提交
+    PROGRESS_FLUSH_INTERVAL_MS = int(os.getenv('PROGRESS_FLUSH_INTERVAL_MS', '500'))
+    PROGRESS_FLUSH_MAX_EVENTS = int(os.getenv('PROGRESS_FLUSH_MAX_EVENTS', '8'))
+
+    # 任务队列配置
+    # TASK_QUEUE_MODE: 'inline'（Web 进程内执行任务）| 'external'（仅入队，由独立的 worker.py 进程执行）
+    TASK_QUEUE_MODE = os.getenv('TASK_QUEUE_MODE', 'inline')
+    TASK_WORKERS = int(os.getenv('TASK_WORKERS', '4'))  # 同时执行的后台任务数
+    TASK_RESERVED_INTERACTIVE_WORKERS = int(os.getenv('TASK_RESERVED_INTERACTIVE_WORKERS', '1'))  # 为单页编辑等交互任务预留的槽位
+    TASK_POLL_INTERVAL = float(os.getenv('TASK_POLL_INTERVAL', '2.0'))  # 独立 worker 轮询数据库的间隔（秒）
+    # worker 标识：每个 worker 进程必须唯一且重启后保持不变（重启时只重置本 id 遗留的 PROCESSING 任务）；
+    # 留空则使用 主机名:web / 主机名:worker:进程号（不会冲突，但崩溃遗留的任务不会自动恢复）
+    TASK_WORKER_ID = os.getenv('TASK_WORKER_ID', '')
+
+    # 导出缓存：页面与图片版本未变时直接复用上次导出的 PPTX/PDF/ZIP，仅少数页变化时只替换这些页
+    EXPORT_CACHE_ENABLED = os.getenv('EXPORT_CACHE_ENABLED', 'true').lower() == 'true'
+
+    # 生成图片缓存（按 provider/模型/提示词/参考图/比例/分辨率 内容寻址，默认关闭）
+    IMAGE_CACHE_ENABLED = os.getenv('IMAGE_CACHE_ENABLED', 'false').lower() == 'true'
+    IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', '')  # 留空则使用 uploads/.cache/images
+    IMAGE_CACHE_MAX_MB = int(os.getenv('IMAGE_CACHE_MAX_MB', '2048'))  # 超出后按 LRU 淘汰
+
+    # 文本生成缓存（大纲/描述/修改等相同提示词直接复用上次结果，默认关闭）
+    TEXT_CACHE_ENABLED = os.getenv('TEXT_CACHE_ENABLED', 'false').lower() == 'true'
+    TEXT_CACHE_PATH = os.getenv('TEXT_CACHE_PATH', '')  # 留空则使用 instance/text_cache.db
+    TEXT_CACHE_TTL_HOURS = float(os.getenv('TEXT_CACHE_TTL_HOURS', '168'))  # 过期时间（小时），<=0 表示不过期
+    TEXT_CACHE_MAX_MB = int(os.getenv('TEXT_CACHE_MAX_MB', '256'))  # 超出后按 LRU 淘汰
+
+    # MinerU 解析结果缓存（按输入文件内容哈希复用解析结果，重复导出未改动的幻灯片时跳过版面分析）
+    MINERU_CACHE_ENABLED = os.getenv('MINERU_CACHE_ENABLED', 'true').lower() == 'true'
+    MINERU_CACHE_PATH = os.getenv('MINERU_CACHE_PATH', '')  # 留空则使用 instance/mineru_cache.db
+    MINERU_CACHE_TTL_DAYS = float(os.getenv('MINERU_CACHE_TTL_DAYS', '30'))  # 超过该天数未使用的条目被淘汰，<=0 表示不过期
+    MINERU_CACHE_MAX_MB = int(os.getenv('MINERU_CACHE_MAX_MB', '2048'))  # 结果目录合计超出后按 LRU 淘汰
+
+    # 参考文件检索：所有参考文件合计超过该 token 数时，每个 prompt 只内联与之相关的片段（0 表示始终内联全文）
+    REFERENCE_PROMPT_TOKEN_BUDGET = int(os.getenv('REFERENCE_PROMPT_TOKEN_BUDGET', '12000'))
+    REFERENCE_RETRIEVAL_TOP_K = int(os.getenv('REFERENCE_RETRIEVAL_TOP_K', '16'))  # 单页描述最多内联的片段数
+
     # 图片生成配置
     DEFAULT_ASPECT_RATIO = "16:9"
     DEFAULT_RESOLUTION = "2K"
@@ -132,3 +202,14 @@ def get_config():
     """Get configuration based on environment"""
     env = os.getenv('FLASK_ENV', 'development')
     return config_map.get(env, DevelopmentConfig)
+
+
+def get_setting(key, default=None):
+    """Read a setting from the Flask app config (may be overridden by Settings), falling back to Config"""
+    try:
+        from flask import current_app, has_app_context
+        if has_app_context() and key in current_app.config:
+            return current_app.config[key]
+    except ImportError:
+        pass
+    return getattr(get_config(), key, default)
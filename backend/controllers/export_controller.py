@@ -2,11 +2,8 @@
 Export Controller - handles file export endpoints
 """
 import logging
-import os
 import io
-import shutil
-import time
-import zipfile
+import threading
 
 from flask import Blueprint, request, current_app
 from werkzeug.utils import secure_filename
@@ -15,7 +12,9 @@ from utils import (
     error_response, not_found, bad_request, success_response,
     parse_page_ids_from_query, parse_page_ids_from_body, get_filtered_pages
 )
-from services import ExportService, FileService
+from services import FileService
+from services.export_cache import ExportCache, collect_slides
+from services.task_manager import EXPORT_TASK_TYPES, build_image_export, task_manager
 from services.ai_service_manager import get_ai_service
 
 logger = logging.getLogger(__name__)
@@ -23,83 +22,143 @@ logger = logging.getLogger(__name__)
 export_bp = Blueprint('export', __name__, url_prefix='/api/projects')
 
 
-@export_bp.route('/<project_id>/export/pptx', methods=['GET'])
-def export_pptx(project_id):
-    """
-    GET /api/projects/{project_id}/export/pptx?filename=...&page_ids=id1,id2,id3 - Export PPTX
-    
-    Query params:
-        - filename: optional custom filename
-        - page_ids: optional comma-separated page IDs to export (if not provided, exports all pages)
-    
-    Returns:
-        JSON with download URL, e.g.
-        {
-            "success": true,
-            "data": {
-                "download_url": "/files/{project_id}/exports/xxx.pptx",
-                "download_url_absolute": "http://host:port/files/{project_id}/exports/xxx.pptx"
-            }
-        }
-    """
+# 进程内去重：检查已有任务与创建新任务之间不能被并发请求插入
+_export_enqueue_lock = threading.Lock()
+
+
+def _default_filename(project_id, export_format, requested):
+    """Sanitized filename with the right extension (image exports name their own file)"""
+    if export_format == 'images':
+        return None
+    extension = f'.{export_format}'
+    filename = secure_filename(requested or f'presentation_{project_id}{extension}')
+    if not filename.endswith(extension):
+        filename += extension
+    return filename
+
+
+def _export_sync(project_id, export_format, message):
+    """GET: build the export inside the request and return its download URL"""
     try:
         project = Project.query.get(project_id)
-        
         if not project:
             return not_found('Project')
-        
-        # Get page_ids from query params and fetch filtered pages
+
         selected_page_ids = parse_page_ids_from_query(request)
-        logger.debug(f"[export_pptx] selected_page_ids: {selected_page_ids}")
-        
         pages = get_filtered_pages(project_id, selected_page_ids if selected_page_ids else None)
-        logger.debug(f"[export_pptx] Exporting {len(pages)} pages")
-        
         if not pages:
             return bad_request("No pages found for project")
-        
-        # Get image paths
+
         file_service = FileService(current_app.config['UPLOAD_FOLDER'])
-        
-        image_paths = []
-        for page in pages:
-            if page.generated_image_path:
-                abs_path = file_service.get_absolute_path(page.generated_image_path)
-                image_paths.append(abs_path)
-        
-        if not image_paths:
-            return bad_request("No generated images found for project")
-        
-        # Determine export directory and filename
-        exports_dir = file_service._get_exports_dir(project_id)
+        filename = _default_filename(project_id, export_format, request.args.get('filename'))
+        try:
+            result = build_image_export(
+                project, pages, export_format, filename, file_service,
+                use_cache=current_app.config.get('EXPORT_CACHE_ENABLED', True),
+            )
+        except ValueError as e:
+            return bad_request(str(e))
+
+        download_path = result['download_url']
+        base_url = request.url_root.rstrip("/")
+        return success_response(
+            data={
+                "download_url": download_path,
+                "download_url_absolute": f"{base_url}{download_path}",
+                "cache": result['cache'],
+            },
+            message=message
+        )
 
-        # Get filename from query params or use default
-        filename = secure_filename(request.args.get('filename', f'presentation_{project_id}.pptx'))
-        if not filename.endswith('.pptx'):
-            filename += '.pptx'
+    except Exception as e:
+        return error_response('SERVER_ERROR', str(e), 500)
 
-        output_path = os.path.join(exports_dir, filename)
 
-        # Generate PPTX file on disk
-        ExportService.create_pptx_from_images(image_paths, output_file=output_path, aspect_ratio=project.image_aspect_ratio)
+def _export_async(project_id, export_format):
+    """POST: create (or join an identical in-flight) EXPORT_* task and return its id"""
+    try:
+        project = Project.query.get(project_id)
+        if not project:
+            return not_found('Project')
 
-        # Build download URLs
-        download_path = f"/files/{project_id}/exports/{filename}"
-        base_url = request.url_root.rstrip("/")
-        download_url_absolute = f"{base_url}{download_path}"
+        data = request.get_json(silent=True) or {}
+        selected_page_ids = parse_page_ids_from_body(data)
+        pages = get_filtered_pages(project_id, selected_page_ids if selected_page_ids else None)
+        if not pages:
+            return bad_request("No pages found for project")
+
+        file_service = FileService(current_app.config['UPLOAD_FOLDER'])
+        slides = collect_slides(pages, file_service)
+        if not slides:
+            return bad_request("No generated images found for project")
+
+        filename = _default_filename(project_id, export_format, data.get('filename'))
+        task_type = EXPORT_TASK_TYPES[export_format]
+        export_key = f"{ExportCache.fingerprint(export_format, project.image_aspect_ratio, slides)}:{filename or ''}"
+
+        with _export_enqueue_lock:
+            in_flight = Task.query.filter(
+                Task.project_id == project_id,
+                Task.task_type == task_type,
+                Task.status.in_(['PENDING', 'PROCESSING']),
+            ).all()
+            for existing in in_flight:
+                if (existing.get_payload() or {}).get('export_key') == export_key:
+                    logger.info(f"Joining in-flight export task {existing.id} for project {project_id}")
+                    return success_response(
+                        data={"task_id": existing.id, "status": existing.status, "deduplicated": True},
+                        message="Export task already running"
+                    )
+
+            task = Task(project_id=project_id, task_type=task_type, status='PENDING')
+            task.set_progress({"total": len(slides), "completed": 0, "failed": 0, "percent": 0})
+            db.session.add(task)
+            db.session.commit()
+
+            app = current_app._get_current_object()
+            task_manager.enqueue_task(task, app, {
+                'project_id': project_id,
+                'export_format': export_format,
+                'filename': filename,
+                'page_ids': selected_page_ids if selected_page_ids else None,
+                'export_key': export_key,
+            })
 
         return success_response(
-            data={
-                "download_url": download_path,
-                "download_url_absolute": download_url_absolute,
-            },
-            message="Export PPTX task created"
+            data={"task_id": task.id, "status": 'PENDING', "deduplicated": False},
+            message="Export task created"
         )
-    
+
     except Exception as e:
+        logger.exception("Error creating export task")
         return error_response('SERVER_ERROR', str(e), 500)
 
 
+@export_bp.route('/<project_id>/export/pptx', methods=['GET'])
+def export_pptx(project_id):
+    """
+    GET /api/projects/{project_id}/export/pptx?filename=...&page_ids=id1,id2,id3 - Export PPTX
+    
+    Query params:
+        - filename: optional custom filename
+        - page_ids: optional comma-separated page IDs to export (if not provided, exports all pages)
+    
+    Returns:
+        JSON with download URL, e.g.
+        {
+            "success": true,
+            "data": {
+                "download_url": "/files/{project_id}/exports/xxx.pptx",
+                "download_url_absolute": "http://host:port/files/{project_id}/exports/xxx.pptx",
+                "cache": "hit" | "patched" | "built"
+            }
+        }
+
+    Builds the file inside the request; large decks should use the POST variant.
+    """
+    return _export_sync(project_id, 'pptx', "Export PPTX completed")
+
+
 @export_bp.route('/<project_id>/export/pdf', methods=['GET'])
 def export_pdf(project_id):
     """
@@ -115,63 +174,14 @@ def export_pdf(project_id):
             "success": true,
             "data": {
                 "download_url": "/files/{project_id}/exports/xxx.pdf",
-                "download_url_absolute": "http://host:port/files/{project_id}/exports/xxx.pdf"
+                "download_url_absolute": "http://host:port/files/{project_id}/exports/xxx.pdf",
+                "cache": "hit" | "patched" | "built"
             }
         }
-    """
-    try:
-        project = Project.query.get(project_id)
-        
-        if not project:
-            return not_found('Project')
-        
-        # Get page_ids from query params and fetch filtered pages
-        selected_page_ids = parse_page_ids_from_query(request)
-        pages = get_filtered_pages(project_id, selected_page_ids if selected_page_ids else None)
-        
-        if not pages:
-            return bad_request("No pages found for project")
-        
-        # Get image paths
-        file_service = FileService(current_app.config['UPLOAD_FOLDER'])
-        
-        image_paths = []
-        for page in pages:
-            if page.generated_image_path:
-                abs_path = file_service.get_absolute_path(page.generated_image_path)
-                image_paths.append(abs_path)
-        
-        if not image_paths:
-            return bad_request("No generated images found for project")
-        
-        # Determine export directory and filename
-        exports_dir = file_service._get_exports_dir(project_id)
-
-        # Get filename from query params or use default
-        filename = secure_filename(request.args.get('filename', f'presentation_{project_id}.pdf'))
-        if not filename.endswith('.pdf'):
-            filename += '.pdf'
-
-        output_path = os.path.join(exports_dir, filename)
-
-        # Generate PDF file on disk
-        ExportService.create_pdf_from_images(image_paths, output_file=output_path, aspect_ratio=project.image_aspect_ratio)
-
-        # Build download URLs
-        download_path = f"/files/{project_id}/exports/{filename}"
-        base_url = request.url_root.rstrip("/")
-        download_url_absolute = f"{base_url}{download_path}"
 
-        return success_response(
-            data={
-                "download_url": download_path,
-                "download_url_absolute": download_url_absolute,
-            },
-            message="Export PDF task created"
-        )
-    
-    except Exception as e:
-        return error_response('SERVER_ERROR', str(e), 500)
+    Builds the file inside the request; large decks should use the POST variant.
+    """
+    return _export_sync(project_id, 'pdf', "Export PDF completed")
 
 
 @export_bp.route('/<project_id>/export/images', methods=['GET'])
@@ -180,66 +190,42 @@ def export_images(project_id):
     GET /api/projects/{project_id}/export/images?page_ids=id1,id2,id3 - Export images
 
     Single image: copies to exports dir and returns download URL.
-    Multiple images: creates a ZIP archive and returns download URL.
+    Multiple images: creates a ZIP archive (entries stored, not recompressed) and returns download URL.
     """
-    try:
-        if '..' in project_id or '/' in project_id or '\\' in project_id:
-            return bad_request('Invalid project ID')
-        s_project_id = secure_filename(project_id)
-        if s_project_id != project_id:
-            return bad_request('Invalid project ID')
-
-        project = Project.query.get(s_project_id)
-        if not project:
-            return not_found('Project')
-
-        selected_page_ids = parse_page_ids_from_query(request)
-        pages = get_filtered_pages(s_project_id, selected_page_ids if selected_page_ids else None)
-        if not pages:
-            return bad_request("No pages found for project")
-
-        file_service = FileService(current_app.config['UPLOAD_FOLDER'])
+    if '..' in project_id or '/' in project_id or '\\' in project_id:
+        return bad_request('Invalid project ID')
+    if secure_filename(project_id) != project_id:
+        return bad_request('Invalid project ID')
+    return _export_sync(project_id, 'images', "Export images completed")
 
-        image_items = []
-        for page in pages:
-            if page.generated_image_path:
-                abs_path = file_service.get_absolute_path(page.generated_image_path)
-                if os.path.exists(abs_path):
-                    image_items.append((page, abs_path))
 
-        if not image_items:
-            return bad_request("No generated images found for project")
-
-        exports_dir = file_service._get_exports_dir(s_project_id)
-        timestamp = int(time.time())
-
-        if len(image_items) == 1:
-            page, path = image_items[0]
-            ext = os.path.splitext(path)[1] or '.png'
-            filename = f'slide_{page.id}_{timestamp}{ext}'
-            output_path = os.path.join(exports_dir, filename)
-            shutil.copy2(path, output_path)
-        else:
-            filename = f'slides_{s_project_id}_{timestamp}.zip'
-            output_path = os.path.join(exports_dir, filename)
-            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-                for page, path in image_items:
-                    ext = os.path.splitext(path)[1] or '.png'
-                    zf.write(path, f'slide_{page.order_index + 1:03d}{ext}')
-
-        download_path = f"/files/{s_project_id}/exports/{filename}"
-        base_url = request.url_root.rstrip("/")
-
-        return success_response(
-            data={
-                "download_url": download_path,
-                "download_url_absolute": f"{base_url}{download_path}",
-            },
-            message="Export images completed"
-        )
+@export_bp.route('/<project_id>/export/pptx', methods=['POST'])
+@export_bp.route('/<project_id>/export/pdf', methods=['POST'])
+@export_bp.route('/<project_id>/export/images', methods=['POST'])
+def export_deck_async(project_id):
+    """
+    POST /api/projects/{project_id}/export/{pptx|pdf|images} - 导出（异步）
+    
+    Request body (JSON):
+        {
+            "filename": "optional_custom_name.pptx",  // pptx / pdf only
+            "page_ids": ["id1", "id2"]                // 可选，不提供则导出所有页面
+        }
+    
+    Returns:
+        {
+            "success": true,
+            "data": {"task_id": "uuid-here", "status": "PENDING", "deduplicated": false}
+        }
 
-    except Exception as e:
-        return error_response('SERVER_ERROR', str(e), 500)
+    相同页面/图片版本/文件名的导出正在进行时，直接返回该任务（deduplicated=true）。
+    轮询 /api/projects/{project_id}/tasks/{task_id}（或订阅 .../events）获取进度，
+    完成后 progress 中包含 download_url 与 filename。
+    """
+    export_format = request.path.rstrip('/').rsplit('/', 1)[-1]
+    if secure_filename(project_id) != project_id:
+        return bad_request('Invalid project ID')
+    return _export_async(project_id, export_format)
 
 
 @export_bp.route('/<project_id>/export/editable-pptx', methods=['POST'])
@@ -330,12 +316,6 @@ def export_editable_pptx(project_id):
         
         logger.info(f"Created export task {task.id} for project {project_id} (recursive analysis: depth={max_depth}, workers={max_workers})")
         
-        # Get services
-        from services.file_service import FileService
-        from services.task_manager import task_manager, export_editable_pptx_with_recursive_analysis_task
-        
-        file_service = FileService(current_app.config['UPLOAD_FOLDER'])
-        
         # Get Flask app instance for background task
         app = current_app._get_current_object()
         
@@ -345,19 +325,15 @@ def export_editable_pptx(project_id):
         logger.info(f"Export settings: extractor={export_extractor_method}, inpaint={export_inpaint_method}")
         
         # 使用递归分析任务（不需要 ai_service，使用 ImageEditabilityService）
-        task_manager.submit_task(
-            task.id,
-            export_editable_pptx_with_recursive_analysis_task,
-            project_id=project_id,
-            filename=filename,
-            file_service=file_service,
-            page_ids=selected_page_ids if selected_page_ids else None,
-            max_depth=max_depth,
-            max_workers=max_workers,
-            export_extractor_method=export_extractor_method,
-            export_inpaint_method=export_inpaint_method,
-            app=app
-        )
+        task_manager.enqueue_task(task, app, {
+            'project_id': project_id,
+            'filename': filename,
+            'page_ids': selected_page_ids if selected_page_ids else None,
+            'max_depth': max_depth,
+            'max_workers': max_workers,
+            'export_extractor_method': export_extractor_method,
+            'export_inpaint_method': export_inpaint_method,
+        })
         
         logger.info(f"Submitted recursive export task {task.id} to task manager")
         
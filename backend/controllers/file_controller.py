@@ -1,9 +1,10 @@
 """
 File Controller - handles static file serving
 """
-from flask import Blueprint, send_from_directory, current_app
+from flask import Blueprint, current_app
 from utils import error_response, not_found
-from utils.path_utils import find_file_with_prefix
+from utils.http_cache import is_immutable_file, send_cached_file
+from utils.path_utils import find_extract_file
 import os
 from pathlib import Path
 from werkzeug.utils import secure_filename
@@ -32,17 +33,9 @@ def serve_file(project_id, file_type, filename):
             file_type
         )
         
-        # Check if directory exists
-        if not os.path.exists(file_dir):
-            return not_found('File')
-        
-        # Check if file exists
-        file_path = os.path.join(file_dir, filename)
-        if not os.path.exists(file_path):
-            return not_found('File')
-        
-        # Serve file
-        return send_from_directory(file_dir, filename)
+        # Serve file (versioned page images are immutable, others revalidate via ETag)
+        response = send_cached_file(file_dir, filename, immutable=is_immutable_file(file_type, filename))
+        return response if response is not None else not_found('File')
     
     except Exception as e:
         return error_response('SERVER_ERROR', str(e), 500)
@@ -65,17 +58,9 @@ def serve_user_template(template_id, filename):
             template_id
         )
         
-        # Check if directory exists
-        if not os.path.exists(file_dir):
-            return not_found('File')
-        
-        # Check if file exists
-        file_path = os.path.join(file_dir, filename)
-        if not os.path.exists(file_path):
-            return not_found('File')
-        
         # Serve file
-        return send_from_directory(file_dir, filename)
+        response = send_cached_file(file_dir, filename)
+        return response if response is not None else not_found('File')
     
     except Exception as e:
         return error_response('SERVER_ERROR', str(e), 500)
@@ -97,17 +82,9 @@ def serve_global_material(filename):
             'materials'
         )
         
-        # Check if directory exists
-        if not os.path.exists(file_dir):
-            return not_found('File')
-        
-        # Check if file exists
-        file_path = os.path.join(file_dir, safe_filename)
-        if not os.path.exists(file_path):
-            return not_found('File')
-        
         # Serve file
-        return send_from_directory(file_dir, safe_filename)
+        response = send_cached_file(file_dir, safe_filename)
+        return response if response is not None else not_found('File')
     
     except Exception as e:
         return error_response('SERVER_ERROR', str(e), 500)
@@ -138,8 +115,8 @@ def serve_mineru_file(extract_id, filepath):
             # If we can't resolve the path at all, it's invalid
             return error_response('INVALID_PATH', 'Invalid file path', 403)
 
-        # Try to find file with prefix matching
-        matched_path = find_file_with_prefix(full_path)
+        # Try to find file with prefix matching (via the extract's file name index)
+        matched_path = find_extract_file(Path(root_dir), filepath)
         
         if matched_path is not None:
             # Additional security check for matched path
@@ -154,7 +131,8 @@ def serve_mineru_file(extract_id, filepath):
             except Exception:
                 return error_response('INVALID_PATH', 'Invalid file path', 403)
             
-            return send_from_directory(str(matched_path.parent), matched_path.name)
+            response = send_cached_file(str(matched_path.parent), matched_path.name)
+            return response if response is not None else not_found('File')
 
         return not_found('File')
     except Exception as e:
@@ -1,19 +1,18 @@
 """
 Material Controller - handles standalone material image generation
 """
-from flask import Blueprint, request, current_app, send_file
+from flask import Blueprint, Response, request, current_app
 from models import db, Project, Material, Task
 from utils import success_response, error_response, not_found, bad_request
+from utils.zip_stream import iter_zip
 from services import FileService
-from services.ai_service_manager import get_ai_service
-from services.task_manager import task_manager, generate_material_image_task
+from services.task_manager import task_manager
 from pathlib import Path
 from werkzeug.utils import secure_filename
 from typing import Optional
 import tempfile
 import shutil
 import time
-import zipfile
 import io
 import base64
 import logging
@@ -279,10 +278,6 @@ def generate_material_image(project_id):
             if not project:
                 return not_found('Project')
 
-        # Initialize services
-        ai_service = get_ai_service()
-        file_service = FileService(current_app.config['UPLOAD_FOLDER'])
-
         # 创建临时目录保存参考图片（后台任务会清理）
         temp_dir = Path(tempfile.mkdtemp(dir=current_app.config['UPLOAD_FOLDER']))
         temp_dir_str = str(temp_dir)
@@ -325,21 +320,16 @@ def generate_material_image(project_id):
             # Get app instance for background task
             app = current_app._get_current_object()
 
-            # Submit background task
-            task_manager.submit_task(
-                task.id,
-                generate_material_image_task,
-                task_project_id,  # 传递给任务函数，它会处理'global'的情况
-                prompt,
-                ai_service,
-                file_service,
-                ref_path_str,
-                additional_ref_images if additional_ref_images else None,
-                aspect_ratio or (project.image_aspect_ratio if project else None) or current_app.config.get('DEFAULT_ASPECT_RATIO', '16:9'),
-                current_app.config['DEFAULT_RESOLUTION'],
-                temp_dir_str,
-                app
-            )
+            # Persist and submit background task (interactive lane)
+            task_manager.enqueue_task(task, app, {
+                'project_id': task_project_id,  # 传递给任务函数，它会处理'global'的情况
+                'prompt': prompt,
+                'ref_image_path': ref_path_str,
+                'additional_ref_images': additional_ref_images if additional_ref_images else None,
+                'aspect_ratio': aspect_ratio or (project.image_aspect_ratio if project else None) or current_app.config.get('DEFAULT_ASPECT_RATIO', '16:9'),
+                'resolution': current_app.config['DEFAULT_RESOLUTION'],
+                'temp_dir': temp_dir_str,
+            })
 
             # Return task_id immediately (不再清理temp_dir，由后台任务清理)
             return success_response({
@@ -539,25 +529,19 @@ def download_materials_zip():
     if not rows:
         return not_found('Materials')
 
-    tmp = tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024)
-    try:
-        fs = FileService(current_app.config['UPLOAD_FOLDER'])
-
-        with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for row in rows:
-                abs_path = Path(fs.get_absolute_path(row.relative_path))
-                if not abs_path.is_file():
-                    current_app.logger.warning("Skipping missing file for material %s", row.id)
-                    continue
-                zf.write(str(abs_path), row.filename)
-
-        tmp.seek(0)
-        fname = f"materials_{int(time.time())}.zip"
-
-        return send_file(tmp, mimetype='application/zip',
-                         as_attachment=True, download_name=fname)
-    except Exception:
-        tmp.close()
-        current_app.logger.exception("Failed to build materials zip")
-        return error_response('SERVER_ERROR', 'Failed to create zip archive', 500)
+    fs = FileService(current_app.config['UPLOAD_FOLDER'])
+    entries = []
+    for row in rows:
+        abs_path = Path(fs.get_absolute_path(row.relative_path))
+        if not abs_path.is_file():
+            current_app.logger.warning("Skipping missing file for material %s", row.id)
+            continue
+        entries.append((row.filename, str(abs_path)))
+
+    # 边读文件边发送：首字节时间与素材数量无关，也不占用临时文件
+    fname = f"materials_{int(time.time())}.zip"
+    response = Response(iter_zip(entries), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename="{fname}"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
@@ -7,7 +7,7 @@ from models import db, Project, Page, PageImageVersion, Task
 from utils import success_response, error_response, not_found, bad_request
 from services import FileService, ProjectContext
 from services.ai_service_manager import get_ai_service
-from services.task_manager import task_manager, generate_single_page_image_task, edit_page_image_task
+from services.task_manager import task_manager
 from datetime import datetime
 from pathlib import Path
 from werkzeug.utils import secure_filename
@@ -297,7 +297,9 @@ def generate_page_description(project_id, page_id):
             page_data,
             page.order_index + 1,
             language=language,
-            detail_level=detail_level
+            detail_level=detail_level,
+            # 显式重新生成时跳过文本缓存，否则会拿到与上次完全相同的描述
+            use_cache=not force_regenerate and data.get('use_cache', True)
         )
 
         # Save description (generate_page_description returns dict with text + optional extra_fields)
@@ -469,22 +471,17 @@ def generate_page_image(project_id, page_id):
         # Get app instance for background task
         app = current_app._get_current_object()
         
-        # Submit background task
-        task_manager.submit_task(
-            task.id,
-            generate_single_page_image_task,
-            project_id,
-            page_id,
-            ai_service,
-            file_service,
-            outline,
-            use_template,
-            project.image_aspect_ratio,
-            current_app.config['DEFAULT_RESOLUTION'],
-            app,
-            combined_requirements if combined_requirements.strip() else None,
-            language
-        )
+        # Persist and submit background task (interactive lane)
+        task_manager.enqueue_task(task, app, {
+            'project_id': project_id,
+            'page_id': page_id,
+            'outline': outline,
+            'use_template': use_template,
+            'aspect_ratio': project.image_aspect_ratio,
+            'resolution': current_app.config['DEFAULT_RESOLUTION'],
+            'extra_requirements': combined_requirements if combined_requirements.strip() else None,
+            'language': language,
+        })
         
         # Return task_id immediately
         return success_response({
@@ -532,9 +529,6 @@ def edit_page_image(project_id, page_id):
         if not project:
             return not_found('Project')
         
-        # Initialize services
-        ai_service = get_ai_service()
-        
         file_service = FileService(current_app.config['UPLOAD_FOLDER'])
         
         # Parse request data (support both JSON and multipart/form-data)
@@ -642,22 +636,17 @@ def edit_page_image(project_id, page_id):
         # Get app instance for background task
         app = current_app._get_current_object()
         
-        # Submit background task
-        task_manager.submit_task(
-            task.id,
-            edit_page_image_task,
-            project_id,
-            page_id,
-            data['edit_instruction'],
-            ai_service,
-            file_service,
-            project.image_aspect_ratio,
-            current_app.config['DEFAULT_RESOLUTION'],
-            original_description,
-            additional_ref_images if additional_ref_images else None,
-            str(temp_dir) if temp_dir else None,
-            app
-        )
+        # Persist and submit background task (interactive lane)
+        task_manager.enqueue_task(task, app, {
+            'project_id': project_id,
+            'page_id': page_id,
+            'edit_instruction': data['edit_instruction'],
+            'aspect_ratio': project.image_aspect_ratio,
+            'resolution': current_app.config['DEFAULT_RESOLUTION'],
+            'original_description': original_description,
+            'additional_ref_images': additional_ref_images if additional_ref_images else None,
+            'temp_dir': str(temp_dir) if temp_dir else None,
+        })
         
         # Return task_id immediately
         return success_response({
@@ -683,7 +672,7 @@ def get_page_image_versions(project_id, page_id):
         if not page or page.project_id != project_id:
             return not_found('Page')
         
-        versions = PageImageVersion.query.filter_by(page_id=page_id)\
+        versions = PageImageVersion.query.filter_by(page_id=page_id, is_reserved=False)\
             .order_by(PageImageVersion.version_number.desc()).all()
         
         return success_response({
@@ -708,11 +697,11 @@ def set_current_image_version(project_id, page_id, version_id):
         
         version = PageImageVersion.query.get(version_id)
         
-        if not version or version.page_id != page_id:
+        if not version or version.page_id != page_id or version.is_reserved:
             return not_found('Image Version')
         
         # Mark all versions as not current
-        PageImageVersion.query.filter_by(page_id=page_id).update({'is_current': False})
+        PageImageVersion.query.filter_by(page_id=page_id, is_current=True).update({'is_current': False})
 
         # Set this version as current
         version.is_current = True
@@ -720,8 +709,8 @@ def set_current_image_version(project_id, page_id, version_id):
 
         # 更新 cached_image_path，指向该版本的缓存图（如果存在）
         file_service = FileService(current_app.config['UPLOAD_FOLDER'])
-        cached_relative_path = file_service.get_cached_image_path(project_id, page_id, version.version_number)
-        if file_service.file_exists(cached_relative_path):
+        cached_relative_path = file_service.find_cached_image_path(project_id, page_id, version.version_number)
+        if cached_relative_path:
             page.cached_image_path = cached_relative_path
         else:
             # 缓存文件不存在，设置为 None，to_dict() 会回退到原图
@@ -1,30 +1,31 @@
 """
 Project Controller - handles project-related endpoints
 """
+import base64
+import binascii
 import json
 import logging
 import os
+import queue
 import subprocess
 import traceback
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
-from sqlalchemy import desc
+from sqlalchemy import and_, desc, func, or_, select
 from utils.validators import normalize_aspect_ratio
 from sqlalchemy.orm import joinedload
 from werkzeug.exceptions import BadRequest
 from werkzeug.utils import secure_filename
 
-from models import db, Project, Page, Task, ReferenceFile
+from models import db, Project, Page, Task
 from services import ProjectContext, FileService
 from services.ai_service_manager import get_ai_service
-from services.task_manager import (
-    task_manager,
-    generate_descriptions_task,
-    generate_images_task,
-    process_ppt_renovation_task
-)
+from services.project_cache import get_project_response
+from services.reference_index import load_project_reference_files
+from services.task_manager import task_manager
 from utils import (
     success_response, error_response, not_found, bad_request,
     parse_page_ids_from_body, get_filtered_pages
@@ -43,22 +44,11 @@ def _get_project_reference_files_content(project_id: str) -> list:
         project_id: Project ID
         
     Returns:
-        List of dicts with 'filename' and 'content' keys
+        List of dicts with 'filename' and 'token_count' keys; 'content' is
+        only present when all files fit the prompt token budget (see
+        services/reference_index.py load_project_reference_files)
     """
-    reference_files = ReferenceFile.query.filter_by(
-        project_id=project_id,
-        parse_status='completed'
-    ).all()
-    
-    files_content = []
-    for ref_file in reference_files:
-        if ref_file.markdown_content:
-            files_content.append({
-                'filename': ref_file.filename,
-                'content': ref_file.markdown_content
-            })
-    
-    return files_content
+    return load_project_reference_files(project_id)
 
 
 def _reconstruct_outline_from_pages(pages: list) -> list:
@@ -161,6 +151,9 @@ def list_projects():
     Query params:
     - limit: number of projects to return (default: 50, max: 100)
     - offset: offset for pagination (default: 0)
+    - view: 'full' (default, projects with all pages) | 'summary' (see _list_project_summaries)
+    - cursor: summary view only, next_cursor of the previous page (keyset pagination on updated_at)
+    - include_total: summary view only, also return the total project count
     """
     try:
         # Parameter validation
@@ -171,6 +164,14 @@ def list_projects():
         limit = min(max(1, limit), 100)  # Between 1-100
         offset = max(0, offset)  # Non-negative
 
+        if request.args.get('view') == 'summary':
+            cursor = request.args.get('cursor') or None
+            include_total = request.args.get('include_total', 'false').lower() in ('1', 'true')
+            try:
+                return success_response(_list_project_summaries(limit, offset, cursor, include_total))
+            except ValueError:
+                return bad_request('Invalid cursor')
+
         # Get total count for pagination
         total = Project.query.count()
 
@@ -193,6 +194,113 @@ def list_projects():
         return error_response('SERVER_ERROR', str(e), 500)
 
 
+def _isoformat_utc(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.isoformat() + 'Z' if not value.tzinfo else value.isoformat()
+
+
+def _encode_project_cursor(updated_at, project_id: str) -> str:
+    raw = json.dumps([updated_at.isoformat(), project_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_project_cursor(cursor: str):
+    """Raises ValueError for malformed cursors"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        updated_at, project_id = json.loads(raw)
+        return datetime.fromisoformat(updated_at), str(project_id)
+    except (binascii.Error, TypeError, UnicodeDecodeError) as e:
+        raise ValueError(str(e))
+
+
+def _outline_title(outline_content: Optional[str]) -> Optional[str]:
+    """Title from a page's outline_content JSON (None if missing or unparsable)"""
+    if not outline_content:
+        return None
+    try:
+        outline = json.loads(outline_content)
+    except ValueError:
+        return None
+    title = outline.get('title') if isinstance(outline, dict) else None
+    return title if isinstance(title, str) else None
+
+
+def _list_project_summaries(limit: int, offset: int, cursor, include_total: bool) -> dict:
+    """
+    历史列表的轻量视图：只查询需要的列，页数 / 封面由 SQL 子查询得出，不加载页面。
+    标题只取第一页的 outline_content，在 Python 中解析（不依赖 SQLite 的 JSON 函数，PostgreSQL 同样可用）。
+
+    分页按 (updated_at, id) 倒序的 keyset 进行（cursor），耗时不随项目总数增长；
+    未提供 cursor 时按 offset 定位（用于跳页）。
+    """
+    # 先选出本页的项目 id（走 updated_at 排序 + LIMIT），再只为这些项目计算页面统计
+    id_query = select(Project.id, Project.updated_at)
+    if cursor:
+        cursor_updated_at, cursor_id = _decode_project_cursor(cursor)
+        id_query = id_query.where(or_(
+            Project.updated_at < cursor_updated_at,
+            and_(Project.updated_at == cursor_updated_at, Project.id < cursor_id),
+        ))
+    else:
+        id_query = id_query.offset(offset)
+    page_ids = id_query.order_by(desc(Project.updated_at), desc(Project.id)).limit(limit + 1).subquery()
+
+    def page_scalar(column, *conditions, order_by=None):
+        query = select(column).where(Page.project_id == Project.id, *conditions)
+        if order_by is not None:
+            query = query.order_by(order_by).limit(1)
+        return query.correlate(Project).scalar_subquery()
+
+    display_path = func.coalesce(Page.cached_image_path, Page.generated_image_path)
+    rows = db.session.execute(
+        select(
+            Project.id, Project.idea_prompt, Project.creation_type, Project.image_aspect_ratio,
+            Project.status, Project.created_at, Project.updated_at,
+            page_scalar(func.count(Page.id)).label('page_count'),
+            page_scalar(func.count(Page.generated_image_path)).label('image_count'),
+            page_scalar(func.count(Page.description_content)).label('description_count'),
+            page_scalar(Page.outline_content, order_by=Page.order_index).label('first_outline'),
+            page_scalar(display_path, display_path.isnot(None), order_by=Page.order_index).label('cover_path'),
+            page_scalar(Page.updated_at, display_path.isnot(None), order_by=Page.order_index).label('cover_updated_at'),
+        )
+        .join(page_ids, page_ids.c.id == Project.id)
+        .order_by(desc(Project.updated_at), desc(Project.id))
+    ).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    projects = [{
+        'project_id': row.id,
+        'idea_prompt': row.idea_prompt,
+        'creation_type': row.creation_type,
+        'image_aspect_ratio': row.image_aspect_ratio,
+        'status': row.status,
+        'created_at': _isoformat_utc(row.created_at),
+        'updated_at': _isoformat_utc(row.updated_at),
+        'title': _outline_title(row.first_outline),
+        'page_count': row.page_count,
+        'has_images': row.image_count > 0,
+        'has_descriptions': row.description_count > 0,
+        'cover_image_url': f'/files/{row.id}/pages/{Path(row.cover_path).name}' if row.cover_path else None,
+        'cover_updated_at': _isoformat_utc(row.cover_updated_at),
+    } for row in rows]
+
+    data = {
+        'projects': projects,
+        'limit': limit,
+        'next_cursor': _encode_project_cursor(rows[-1].updated_at, rows[-1].id) if has_more else None,
+    }
+    if not cursor:
+        data['offset'] = offset
+    if include_total:
+        data['total'] = db.session.query(func.count(Project.id)).scalar()
+    return data
+
+
 @project_bp.route('', methods=['POST'])
 def create_project():
     """
@@ -267,18 +375,20 @@ def create_project():
 def get_project(project_id):
     """
     GET /api/projects/{project_id} - Get project details
+
+    The serialized payload is cached until the project or one of its pages
+    changes; If-None-Match with the returned ETag gets 304 Not Modified.
     """
     try:
-        # Use eager loading to load project and related pages
-        project = Project.query\
-            .options(joinedload(Project.pages))\
-            .filter(Project.id == project_id)\
-            .first()
-        
-        if not project:
+        cached = get_project_response(project_id)
+        if cached is None:
             return not_found('Project')
         
-        return success_response(project.to_dict(include_pages=True))
+        body, etag = cached
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
     
     except Exception as e:
         logger.error(f"get_project failed: {str(e)}", exc_info=True)
@@ -415,7 +525,8 @@ def generate_outline(project_id):
     Request body (optional):
     {
         "idea_prompt": "...",  # for idea type
-        "language": "zh"  # output language: zh, en, ja, auto
+        "language": "zh",  # output language: zh, en, ja, auto
+        "use_cache": true  # false to bypass the text generation cache
     }
     """
     try:
@@ -436,7 +547,7 @@ def generate_outline(project_id):
         if reference_files_content:
             logger.info(f"Found {len(reference_files_content)} reference files for project {project_id}")
             for rf in reference_files_content:
-                logger.info(f"  - {rf['filename']}: {len(rf['content'])} characters")
+                logger.info(f"  - {rf['filename']}: ~{rf['token_count']} tokens")
         else:
             logger.info(f"No reference files found for project {project_id}")
         
@@ -467,7 +578,8 @@ def generate_outline(project_id):
             
             # Create project context and generate outline from idea
             project_context = ProjectContext(project, reference_files_content)
-            outline = ai_service.generate_outline(project_context, language=language)
+            outline = ai_service.generate_outline(project_context, language=language,
+                                                  use_cache=data.get('use_cache', True))
         
         # Flatten outline to pages and smart merge with existing
         pages_data = ai_service.flatten_outline(outline)
@@ -609,9 +721,10 @@ def generate_outline_stream(project_id):
     )
 
 
-def _sse_event(event: str, data: dict) -> str:
+def _sse_event(event: str, data: dict, event_id=None) -> str:
     """Format a single SSE event."""
-    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
 
 @project_bp.route('/<project_id>/generate/from-description', methods=['POST'])
@@ -739,7 +852,8 @@ def generate_descriptions(project_id):
     Request body:
     {
         "max_workers": 5,
-        "language": "zh"  # output language: zh, en, ja, auto
+        "language": "zh",  # output language: zh, en, ja, auto
+        "use_cache": true  # false to bypass the text generation cache
     }
     """
     try:
@@ -768,6 +882,7 @@ def generate_descriptions(project_id):
         max_workers = data.get('max_workers', current_app.config.get('MAX_DESCRIPTION_WORKERS', 5))
         language = data.get('language', current_app.config.get('OUTPUT_LANGUAGE', 'zh'))
         detail_level = data.get('detail_level', 'default')
+        use_cache = data.get('use_cache', True)
         
         # Create task
         task = Task(
@@ -784,29 +899,18 @@ def generate_descriptions(project_id):
         db.session.add(task)
         db.session.commit()
         
-        # Get singleton AI service instance
-        ai_service = get_ai_service()
-        
-        # Get reference files content and create project context
-        reference_files_content = _get_project_reference_files_content(project_id)
-        project_context = ProjectContext(project, reference_files_content)
-        
         # Get app instance for background task
         app = current_app._get_current_object()
         
-        # Submit background task
-        task_manager.submit_task(
-            task.id,
-            generate_descriptions_task,
-            project_id,
-            ai_service,
-            project_context,
-            outline,
-            max_workers,
-            app,
-            language,
-            detail_level
-        )
+        # Persist and submit background task (AI service and project context are rebuilt by the worker)
+        task_manager.enqueue_task(task, app, {
+            'project_id': project_id,
+            'outline': outline,
+            'max_workers': max_workers,
+            'language': language,
+            'detail_level': detail_level,
+            'use_cache': use_cache,
+        })
         
         # Update project status
         project.status = 'GENERATING_DESCRIPTIONS'
@@ -1034,9 +1138,6 @@ def generate_images(project_id):
         db.session.add(task)
         db.session.commit()
         
-        # Get singleton AI service instance
-        ai_service = get_ai_service()
-        
         # 合并额外要求和风格描述
         combined_requirements = project.extra_requirements or ""
         if project.template_style:
@@ -1052,23 +1153,18 @@ def generate_images(project_id):
         # Get app instance for background task
         app = current_app._get_current_object()
 
-        # Submit background task
-        task_manager.submit_task(
-            task.id,
-            generate_images_task,
-            project_id,
-            ai_service,
-            file_service,
-            outline,
-            use_template,
-            max_workers,
-            project.image_aspect_ratio,
-            current_app.config['DEFAULT_RESOLUTION'],
-            app,
-            combined_requirements if combined_requirements.strip() else None,
-            language,
-            selected_page_ids if selected_page_ids else None
-        )
+        # Persist and submit background task
+        task_manager.enqueue_task(task, app, {
+            'project_id': project_id,
+            'outline': outline,
+            'use_template': use_template,
+            'max_workers': max_workers,
+            'aspect_ratio': project.image_aspect_ratio,
+            'resolution': current_app.config['DEFAULT_RESOLUTION'],
+            'extra_requirements': combined_requirements if combined_requirements.strip() else None,
+            'language': language,
+            'page_ids': selected_page_ids if selected_page_ids else None,
+        })
         
         # Update project status
         project.status = 'GENERATING_IMAGES'
@@ -1104,6 +1200,84 @@ def get_task_status(project_id, task_id):
         return error_response('SERVER_ERROR', str(e), 500)
 
 
+@project_bp.route('/<project_id>/tasks/<task_id>/events', methods=['GET'])
+def stream_task_events(project_id, task_id):
+    """
+    GET /api/projects/{project_id}/tasks/{task_id}/events - Stream task progress (SSE)
+
+    Pushes a ``progress`` event with the task dict whenever the task changes and a
+    final ``done`` event once it is COMPLETED or FAILED, then closes. A comment
+    line is sent as heartbeat when idle. Reconnecting clients resume via the
+    ``Last-Event-ID`` header (or ``?last_event_id=``).
+    """
+    from services.task_events import task_event_hub, TERMINAL_STATUSES
+
+    task = Task.query.get(task_id)
+    if not task or task.project_id != project_id:
+        return not_found('Task')
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id not in (None, '') else None
+    except ValueError:
+        last_event_id = None
+
+    heartbeat = current_app.config.get('TASK_EVENTS_HEARTBEAT_SECONDS', 15)
+    # 独立 worker 模式下任务在其他进程中更新，心跳时回退为读取一次数据库
+    poll_db_on_idle = current_app.config.get('TASK_QUEUE_MODE', 'inline') == 'external'
+
+    def read_task():
+        try:
+            fresh = Task.query.get(task_id)
+            return fresh.to_dict() if fresh else None
+        finally:
+            # 长连接不应持有数据库会话
+            db.session.close()
+
+    # 先订阅再读快照，避免两者之间的更新丢失（重复事件对客户端无害）；
+    # 快照必须在订阅之后重新读取，上面校验用的 task 可能已经过时
+    subscriber, backlog, complete = task_event_hub.subscribe(task_id, last_event_id)
+    snapshot_id = task_event_hub.last_event_id(task_id)
+    db.session.close()
+    snapshot = None if complete else read_task()
+
+    def sse_generate():
+        try:
+            last_sent = None
+            events = list(backlog)
+            if snapshot is not None:
+                events.append((snapshot_id, snapshot))
+            while True:
+                for event_id, data in events:
+                    last_sent = data
+                    finished = data.get('status') in TERMINAL_STATUSES
+                    yield _sse_event('done' if finished else 'progress', data, event_id)
+                    if finished:
+                        return
+                try:
+                    events = [subscriber.get(timeout=heartbeat)]
+                except queue.Empty:
+                    events = []
+                    if poll_db_on_idle:
+                        data = read_task()
+                        if data and data != last_sent:
+                            events = [(task_event_hub.last_event_id(task_id), data)]
+                    if not events:
+                        yield ": heartbeat\n\n"
+        finally:
+            task_event_hub.unsubscribe(task_id, subscriber)
+
+    return Response(
+        stream_with_context(sse_generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache, no-transform',
+            'X-Accel-Buffering': 'no',
+            'Connection': 'keep-alive',
+        },
+    )
+
+
 @project_bp.route('/<project_id>/refine/outline', methods=['POST'])
 def refine_outline(project_id):
     """
@@ -1150,7 +1324,7 @@ def refine_outline(project_id):
         if reference_files_content:
             logger.info(f"Found {len(reference_files_content)} reference files for refine_outline")
             for rf in reference_files_content:
-                logger.info(f"  - {rf['filename']}: {len(rf['content'])} characters")
+                logger.info(f"  - {rf['filename']}: ~{rf['token_count']} tokens")
         else:
             logger.info(f"No reference files found for project {project_id}")
         
@@ -1167,7 +1341,8 @@ def refine_outline(project_id):
             user_requirement=user_requirement,
             project_context=project_context,
             previous_requirements=previous_requirements,
-            language=language
+            language=language,
+            use_cache=data.get('use_cache', True)
         )
         
         # Flatten outline to pages and smart merge with existing
@@ -1262,7 +1437,7 @@ def refine_descriptions(project_id):
         if reference_files_content:
             logger.info(f"Found {len(reference_files_content)} reference files for refine_descriptions")
             for rf in reference_files_content:
-                logger.info(f"  - {rf['filename']}: {len(rf['content'])} characters")
+                logger.info(f"  - {rf['filename']}: ~{rf['token_count']} tokens")
         else:
             logger.info(f"No reference files found for project {project_id}")
         
@@ -1280,7 +1455,8 @@ def refine_descriptions(project_id):
             project_context=project_context,
             outline=outline,
             previous_requirements=previous_requirements,
-            language=language
+            language=language,
+            use_cache=data.get('use_cache', True)
         )
         
         # 验证返回的描述数量
@@ -1408,24 +1584,16 @@ def create_ppt_renovation_project():
         pdf_page_width = None
         pdf_page_height = None
         try:
-            import fitz  # PyMuPDF
-            doc = fitz.open(pdf_path)
+            from services.pdf_service import get_pdf_info, iter_render_pdf
             # Extract page dimensions from the first page before rendering
-            if len(doc) > 0:
-                rect = doc[0].rect
-                pdf_page_width = rect.width
-                pdf_page_height = rect.height
-            for i, fitz_page in enumerate(doc):
-                try:
-                    mat = fitz.Matrix(2, 2)
-                    pix = fitz_page.get_pixmap(matrix=mat)
-                    img_path = str(pages_dir / f"page_{i + 1}_original.png")
-                    pix.save(img_path)
-                    page_image_paths.append(img_path)
-                except Exception as e:
-                    logger.error(f"Failed to render page {i + 1} with PyMuPDF: {e}")
-                    page_image_paths.append(None)
-            doc.close()
+            page_total, first_page_size = get_pdf_info(pdf_path)
+            if first_page_size:
+                pdf_page_width, pdf_page_height = first_page_size
+            # 144 DPI（2x 缩放）；页数较多时在进程池中并行渲染
+            page_image_paths = [None] * page_total
+            for i, img_path in iter_render_pdf(pdf_path, str(pages_dir), dpi=144,
+                                               name_pattern="page_{n}_original.png"):
+                page_image_paths[i] = img_path
         except ImportError:
             # Fallback: use pdf2image
             try:
@@ -1510,37 +1678,16 @@ def create_ppt_renovation_project():
         db.session.add(task)
         db.session.commit()
 
-        # Get services
-        ai_service = get_ai_service()
-        from services.file_parser_service import FileParserService
-        file_parser_service = FileParserService(
-            mineru_token=current_app.config['MINERU_TOKEN'],
-            mineru_api_base=current_app.config['MINERU_API_BASE'],
-            google_api_key=current_app.config.get('GOOGLE_API_KEY', ''),
-            google_api_base=current_app.config.get('GOOGLE_API_BASE', ''),
-            openai_api_key=current_app.config.get('OPENAI_API_KEY', ''),
-            openai_api_base=current_app.config.get('OPENAI_API_BASE', ''),
-            image_caption_model=current_app.config['IMAGE_CAPTION_MODEL'],
-            provider_format=current_app.config.get('AI_PROVIDER_FORMAT', 'gemini'),
-            lazyllm_image_caption_source=current_app.config.get('IMAGE_CAPTION_MODEL_SOURCE', 'doubao'),
-        )
-
         language = request.form.get('language', current_app.config.get('OUTPUT_LANGUAGE', 'zh'))
         app = current_app._get_current_object()
 
-        # Submit async task
-        task_manager.submit_task(
-            task.id,
-            process_ppt_renovation_task,
-            project_id,
-            ai_service,
-            file_service,
-            file_parser_service,
-            keep_layout,
-            5,  # max_workers
-            app,
-            language
-        )
+        # Persist and submit async task (services are rebuilt from app config by the worker)
+        task_manager.enqueue_task(task, app, {
+            'project_id': project_id,
+            'keep_layout': keep_layout,
+            'max_workers': 5,
+            'language': language,
+        })
 
         project.status = 'PROCESSING'
         db.session.commit()
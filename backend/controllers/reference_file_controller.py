@@ -16,6 +16,7 @@ import threading
 from models import db, ReferenceFile, Project
 from utils.response import success_response, error_response, bad_request, not_found
 from services.file_parser_service import FileParserService
+from services.reference_index import index_reference_file
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +83,14 @@ def _parse_file_async(file_id: str, file_path: str, filename: str, app):
             else:
                 reference_file.parse_status = 'completed'
                 reference_file.markdown_content = markdown_content
+                try:
+                    with db.session.begin_nested():
+                        chunk_count = index_reference_file(reference_file)
+                    logger.info(f"Built digest and retrieval index for {filename}: "
+                                f"~{reference_file.token_count} tokens, {chunk_count} chunks")
+                except Exception as index_error:
+                    # 摘要/索引失败不影响解析结果，使用时会按需补建
+                    logger.warning(f"Failed to build retrieval index for {filename}: {index_error}")
                 if failed_image_count > 0:
                     logger.warning(f"File parsing completed: {filename}, but {failed_image_count} images failed to generate captions")
                 else:
@@ -18,7 +18,7 @@ from services.file_parser_service import FileParserService
 from services.ai_providers.ocr.baidu_accurate_ocr_provider import create_baidu_accurate_ocr_provider
 from services.ai_providers.image.baidu_inpainting_provider import create_baidu_inpainting_provider
 from services.ai_providers import LAZYLLM_VENDORS
-from services.task_manager import task_manager
+from services.task_manager import task_manager, PRIORITY_INTERACTIVE
 
 logger = logging.getLogger(__name__)
 ALLOWED_PROVIDER_FORMATS = {"openai", "gemini", "lazyllm"} | LAZYLLM_VENDORS
@@ -432,6 +432,35 @@ def get_active_config():
     })
 
 
+@settings_bp.route("/provider-stats", methods=["GET"], strict_slashes=False)
+def get_provider_stats():
+    """
+    GET /api/settings/provider-stats - Live counters of the shared AI provider limiters
+    (in-flight / queued / throttled calls), the background task queue, the
+    generation caches (null when disabled) and the database pool / SQLite write gate.
+    """
+    from services.ai_providers.rate_limiter import get_rate_limiter_stats
+    from services.image_cache import get_image_cache
+    from services.mineru_cache import get_mineru_cache
+    from services.mineru_poller import get_mineru_poller
+    from services.text_cache import get_text_cache
+    from services.task_events import task_event_hub
+    from models.db_engine import get_db_stats
+    image_cache = get_image_cache()
+    text_cache = get_text_cache()
+    mineru_cache = get_mineru_cache()
+    return success_response({
+        "rate_limiters": get_rate_limiter_stats(),
+        "task_queue": task_manager.get_stats(),
+        "task_events": task_event_hub.get_stats(),
+        "image_cache": image_cache.get_stats() if image_cache else None,
+        "text_cache": text_cache.get_stats() if text_cache else None,
+        "mineru_cache": mineru_cache.get_stats() if mineru_cache else None,
+        "mineru_poller": get_mineru_poller().get_stats(),
+        "database": get_db_stats(db.engine),
+    })
+
+
 @settings_bp.route("/verify", methods=["POST"], strict_slashes=False)
 def verify_api_key():
     """
@@ -1059,7 +1088,8 @@ def run_settings_test(test_name: str):
             _run_test_async,
             test_name,
             test_settings,
-            current_app._get_current_object()
+            current_app._get_current_object(),
+            priority=PRIORITY_INTERACTIVE
         )
 
         logger.info(f"Started test task {task_id} for {test_name}")
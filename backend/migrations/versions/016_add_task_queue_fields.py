@@ -0,0 +1,29 @@
+"""add priority, payload and worker_id to tasks table
+
+Revision ID: 016_add_task_queue_fields
+Revises: 9ad736fec43d
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '016_add_task_queue_fields'
+down_revision = '9ad736fec43d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('tasks', sa.Column('priority', sa.Integer(), nullable=True, server_default='50'))
+    op.add_column('tasks', sa.Column('payload', sa.Text(), nullable=True))
+    op.add_column('tasks', sa.Column('worker_id', sa.String(100), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('worker_id')
+        batch_op.drop_column('payload')
+        batch_op.drop_column('priority')
@@ -0,0 +1,36 @@
+"""add composite indexes for hot page / version / material / task / project queries
+
+Revision ID: 017_add_hot_query_indexes
+Revises: 016_add_task_queue_fields
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '017_add_hot_query_indexes'
+down_revision = '016_add_task_queue_fields'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_pages_project_id_order_index', 'pages', ['project_id', 'order_index']),
+    ('ix_page_image_versions_page_id_version_number', 'page_image_versions', ['page_id', 'version_number']),
+    ('ix_page_image_versions_page_id_is_current', 'page_image_versions', ['page_id', 'is_current']),
+    ('ix_materials_project_id_created_at', 'materials', ['project_id', 'created_at']),
+    ('ix_tasks_project_id_status', 'tasks', ['project_id', 'status']),
+    ('ix_tasks_status_priority_created_at', 'tasks', ['status', 'priority', 'created_at']),
+    ('ix_projects_updated_at_id', 'projects', ['updated_at', 'id']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
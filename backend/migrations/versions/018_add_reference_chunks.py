@@ -0,0 +1,43 @@
+"""add reference_chunks table for retrieval over parsed reference files
+
+Revision ID: 018_add_reference_chunks
+Revises: 017_add_hot_query_indexes
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '018_add_reference_chunks'
+down_revision = '017_add_hot_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if 'reference_chunks' in inspector.get_table_names():
+        return
+
+    op.create_table('reference_chunks',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('reference_file_id', sa.String(length=36), nullable=False),
+    sa.Column('chunk_index', sa.Integer(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('token_count', sa.Integer(), nullable=False),
+    sa.Column('term_count', sa.Integer(), nullable=False),
+    sa.Column('terms', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['reference_file_id'], ['reference_files.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_reference_chunks_file_id_chunk_index', 'reference_chunks',
+                    ['reference_file_id', 'chunk_index'], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_reference_chunks_file_id_chunk_index', table_name='reference_chunks')
+    op.drop_table('reference_chunks')
@@ -0,0 +1,34 @@
+"""add parse-time digest columns to reference_files
+
+Revision ID: 019_add_reference_file_digest
+Revises: 018_add_reference_chunks
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '019_add_reference_file_digest'
+down_revision = '018_add_reference_chunks'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 已有文件的摘要在首次使用时补建（services/reference_index.py）
+    op.add_column('reference_files', sa.Column('content_hash', sa.String(64), nullable=True))
+    op.add_column('reference_files', sa.Column('token_count', sa.Integer(), nullable=True))
+    op.add_column('reference_files', sa.Column('clean_content', sa.Text(), nullable=True))
+    op.add_column('reference_files', sa.Column('clean_token_count', sa.Integer(), nullable=True))
+    op.add_column('reference_files', sa.Column('headings', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('reference_files') as batch_op:
+        batch_op.drop_column('headings')
+        batch_op.drop_column('clean_token_count')
+        batch_op.drop_column('clean_content')
+        batch_op.drop_column('token_count')
+        batch_op.drop_column('content_hash')
@@ -0,0 +1,42 @@
+"""add editable_image_analyses table for reusing editable-PPTX analysis
+
+Revision ID: 020_add_editable_image_analyses
+Revises: 019_add_reference_file_digest
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = '020_add_editable_image_analyses'
+down_revision = '019_add_reference_file_digest'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if 'editable_image_analyses' in inspector.get_table_names():
+        return
+
+    op.create_table('editable_image_analyses',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('page_image_version_id', sa.String(length=36), nullable=False),
+    sa.Column('settings_key', sa.String(length=64), nullable=False),
+    sa.Column('image_token', sa.String(length=100), nullable=False),
+    sa.Column('tree', sa.Text(), nullable=False),
+    sa.Column('text_styles', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['page_image_version_id'], ['page_image_versions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('page_image_version_id', 'settings_key', name='uq_editable_image_analyses_version_settings')
+    )
+
+
+def downgrade():
+    op.drop_table('editable_image_analyses')
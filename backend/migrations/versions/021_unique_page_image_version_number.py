@@ -0,0 +1,53 @@
+"""make (page_id, version_number) of page_image_versions unique
+
+Revision ID: 021_unique_page_image_version_number
+Revises: 020_add_editable_image_analyses
+Create Date: 2026-10-18
+
+Concurrent generation / regeneration of the same page could record the same
+version number twice. Duplicates that already exist are renumbered after the
+page's highest version (oldest row keeps its number) before the index is made
+unique.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '021_unique_page_image_version_number'
+down_revision = '020_add_editable_image_analyses'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_page_image_versions_page_id_version_number'
+
+
+def upgrade():
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        'SELECT id, page_id, version_number FROM page_image_versions '
+        'ORDER BY page_id, version_number, created_at, id'
+    )).fetchall()
+
+    max_versions = {}
+    for _, page_id, version_number in rows:
+        max_versions[page_id] = max(max_versions.get(page_id, 0), version_number)
+
+    seen = set()
+    for version_id, page_id, version_number in rows:
+        if (page_id, version_number) not in seen:
+            seen.add((page_id, version_number))
+            continue
+        max_versions[page_id] += 1
+        bind.execute(
+            sa.text('UPDATE page_image_versions SET version_number = :version_number WHERE id = :id'),
+            {'version_number': max_versions[page_id], 'id': version_id}
+        )
+
+    op.drop_index(INDEX_NAME, table_name='page_image_versions')
+    op.create_index(INDEX_NAME, 'page_image_versions', ['page_id', 'version_number'], unique=True)
+
+
+def downgrade():
+    op.drop_index(INDEX_NAME, table_name='page_image_versions')
+    op.create_index(INDEX_NAME, 'page_image_versions', ['page_id', 'version_number'], unique=False)
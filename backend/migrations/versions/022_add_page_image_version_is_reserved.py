@@ -0,0 +1,29 @@
+"""add is_reserved to page_image_versions
+
+Revision ID: 022_add_page_image_version_is_reserved
+Revises: 021_unique_page_image_version_number
+Create Date: 2026-10-18
+
+A version number is reserved (row committed) before its image file is
+written; reserved rows are hidden from version listings until the image is
+recorded, and rows left behind by a crash are removed on restart.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '022_add_page_image_version_is_reserved'
+down_revision = '021_unique_page_image_version_number'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('page_image_versions') as batch_op:
+        batch_op.add_column(sa.Column('is_reserved', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade():
+    with op.batch_alter_table('page_image_versions') as batch_op:
+        batch_op.drop_column('is_reserved')
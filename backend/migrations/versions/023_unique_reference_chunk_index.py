@@ -0,0 +1,35 @@
+"""make (reference_file_id, chunk_index) of reference_chunks unique
+
+Revision ID: 023_unique_reference_chunk_index
+Revises: 022_add_page_image_version_is_reserved
+Create Date: 2026-10-18
+
+Two requests backfilling the index of the same older reference file could
+both insert its chunks. Duplicates that already exist are removed (the
+oldest row of each chunk is kept) before the index is made unique.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '023_unique_reference_chunk_index'
+down_revision = '022_add_page_image_version_is_reserved'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_reference_chunks_file_id_chunk_index'
+
+
+def upgrade():
+    op.get_bind().execute(sa.text(
+        'DELETE FROM reference_chunks WHERE id NOT IN ('
+        'SELECT MIN(id) FROM reference_chunks GROUP BY reference_file_id, chunk_index)'
+    ))
+    op.drop_index(INDEX_NAME, table_name='reference_chunks')
+    op.create_index(INDEX_NAME, 'reference_chunks', ['reference_file_id', 'chunk_index'], unique=True)
+
+
+def downgrade():
+    op.drop_index(INDEX_NAME, table_name='reference_chunks')
+    op.create_index(INDEX_NAME, 'reference_chunks', ['reference_file_id', 'chunk_index'], unique=False)
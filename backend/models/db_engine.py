@@ -0,0 +1,200 @@
+"""
+Database engine configuration and SQLite write serialization
+
+SQLite allows a single writer at a time. Background tasks run many worker
+threads (image generation, editable export, reference file parsing), each
+with its own ``app.app_context()`` session that commits independently, so
+concurrent commits used to spin in SQLite's busy handler and occasionally
+fail with "database is locked".
+
+- ``build_engine_options`` sizes the connection pool and sets dialect
+  specific options; non-SQLite ``DATABASE_URL``s (e.g. PostgreSQL) get a
+  plain pooled configuration and no write gate. Queries must therefore stay
+  dialect-neutral (no SQLite-only functions such as ``json_extract``); the
+  driver for another database is not a default dependency.
+- ``SQLiteWriteGate`` is an in-process FIFO queue of writers: a session
+  takes the gate at its first write (flush or bulk INSERT/UPDATE/DELETE)
+  and hands it to the next waiting session when its transaction ends.
+  This is the same window in which SQLite holds its RESERVED lock, so
+  writers queue up in order instead of polling the busy handler. If the
+  gate cannot be taken within the busy timeout (e.g. a writer waits on
+  another thread that also needs to write), the session proceeds and
+  SQLite's own locking applies as before. Other processes (worker.py) are
+  still coordinated by SQLite's busy_timeout.
+- Wait times, timeouts and "database is locked" errors are counted and
+  exposed through ``get_db_stats`` (GET /api/settings/provider-stats).
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# 等待超过该时长时记录日志（毫秒）
+SLOW_WAIT_LOG_MS = 1000
+
+
+def is_sqlite_uri(uri: str) -> bool:
+    return uri.startswith('sqlite')
+
+
+def build_engine_options(uri: str, config) -> Dict[str, Any]:
+    """SQLAlchemy engine options for ``uri`` from the DB_* / SQLITE_* settings"""
+    options = {
+        'pool_size': config.DB_POOL_SIZE,
+        'max_overflow': config.DB_MAX_OVERFLOW,
+        'pool_timeout': config.DB_POOL_TIMEOUT,
+        'pool_recycle': 3600,  # 1小时回收连接，释放文件句柄 / 服务端空闲连接
+    }
+    if is_sqlite_uri(uri):
+        options['connect_args'] = {
+            'check_same_thread': False,  # 允许跨线程使用连接
+            'timeout': config.SQLITE_BUSY_TIMEOUT_MS / 1000,  # 数据库锁定超时（秒）
+        }
+    else:
+        options['pool_pre_ping'] = True  # 网络数据库：使用前检查连接是否仍然有效
+    return options
+
+
+class SQLiteWriteGate:
+    """Re-entrant FIFO lock that lets one thread write to SQLite at a time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._owner = None
+        self._depth = 0
+        self._waiters: deque = deque()
+        self._stats = {
+            'acquired': 0,
+            'contended': 0,
+            'timeouts': 0,
+            'wait_ms_total': 0.0,
+            'wait_ms_max': 0.0,
+            'locked_errors': 0,
+        }
+
+    def acquire(self, timeout: float) -> bool:
+        me = threading.get_ident()
+        with self._lock:
+            if self._owner == me:
+                self._depth += 1
+                return True
+            if self._owner is None and not self._waiters:
+                self._owner, self._depth = me, 1
+                self._stats['acquired'] += 1
+                return True
+            waiter = threading.Event()
+            self._waiters.append((me, waiter))
+            self._stats['contended'] += 1
+
+        start = time.monotonic()
+        granted = waiter.wait(timeout)
+        waited_ms = (time.monotonic() - start) * 1000
+        with self._lock:
+            if not granted and not waiter.is_set():
+                self._waiters.remove((me, waiter))
+                self._stats['timeouts'] += 1
+                logger.warning(f"SQLite write gate not acquired after {waited_ms:.0f}ms, proceeding without it")
+                return False
+            self._stats['acquired'] += 1
+            self._stats['wait_ms_total'] += waited_ms
+            self._stats['wait_ms_max'] = max(self._stats['wait_ms_max'], waited_ms)
+        if waited_ms >= SLOW_WAIT_LOG_MS:
+            logger.info(f"Waited {waited_ms:.0f}ms for the SQLite write gate")
+        return True
+
+    def release(self):
+        with self._lock:
+            if self._owner != threading.get_ident():
+                return
+            self._depth -= 1
+            if self._depth > 0:
+                return
+            if self._waiters:
+                # 直接交给队首的等待者，保证先到先写
+                self._owner, waiter = self._waiters.popleft()
+                self._depth = 1
+                waiter.set()
+            else:
+                self._owner = None
+
+    def record_locked_error(self):
+        with self._lock:
+            self._stats['locked_errors'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['waiting'] = len(self._waiters)
+            stats['held'] = self._owner is not None
+        stats['wait_ms_total'] = round(stats['wait_ms_total'], 1)
+        stats['wait_ms_max'] = round(stats['wait_ms_max'], 1)
+        stats['wait_ms_avg'] = round(stats['wait_ms_total'] / stats['contended'], 1) if stats['contended'] else 0.0
+        return stats
+
+
+write_gate = SQLiteWriteGate()
+
+# 由 create_app() 根据配置设置
+_gate_settings = {'enabled': False, 'timeout': 30.0}
+
+
+def configure_write_gate(enabled: bool, timeout_seconds: float):
+    _gate_settings['enabled'] = enabled
+    _gate_settings['timeout'] = timeout_seconds
+
+
+def get_db_stats(engine) -> Dict[str, Any]:
+    """Connection pool status and SQLite write gate counters"""
+    return {
+        'dialect': engine.dialect.name,
+        'pool': engine.pool.status(),
+        'write_gate': write_gate.get_stats() if _gate_settings['enabled'] else None,
+    }
+
+
+# ---------------------------------------------------------------------------
+# SQLAlchemy hooks
+# ---------------------------------------------------------------------------
+
+_HELD_KEY = 'sqlite_write_gate_held'
+
+
+def _acquire_for(session):
+    if not _gate_settings['enabled'] or session.info.get(_HELD_KEY):
+        return
+    if session.get_bind().dialect.name != 'sqlite':
+        return
+    # 超时仍标记为已处理，避免同一事务中的后续 flush 再次排队
+    session.info[_HELD_KEY] = write_gate.acquire(_gate_settings['timeout'])
+
+
+@event.listens_for(Session, 'before_flush')
+def _gate_before_flush(session, flush_context, instances):
+    _acquire_for(session)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _gate_bulk_writes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _acquire_for(orm_execute_state.session)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _release_gate(session, transaction):
+    if transaction.parent is not None or _HELD_KEY not in session.info:
+        return
+    if session.info.pop(_HELD_KEY):
+        write_gate.release()
+
+
+@event.listens_for(Engine, 'handle_error')
+def _count_locked_errors(context):
+    if 'database is locked' in str(context.original_exception):
+        write_gate.record_locked_error()
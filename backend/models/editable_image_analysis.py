@@ -0,0 +1,49 @@
+"""
+Editable Image Analysis model - persisted editable-PPTX analysis of a page image version
+"""
+import json
+import uuid
+from datetime import datetime
+from . import db
+
+
+class EditableImageAnalysis(db.Model):
+    """
+    Editable Image Analysis model - the EditableImage tree and text styles of
+    one PageImageVersion, for one set of analysis settings.
+
+    Written by editable-PPTX exports (services/editable_analysis_cache.py) so
+    a re-export only analyses slides whose image changed.
+    """
+    __tablename__ = 'editable_image_analyses'
+    __table_args__ = (
+        # 每个图片版本 + 分析设置只保存一份结果
+        db.UniqueConstraint('page_image_version_id', 'settings_key',
+                            name='uq_editable_image_analyses_version_settings'),
+    )
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    page_image_version_id = db.Column(
+        db.String(36), db.ForeignKey('page_image_versions.id', ondelete='CASCADE'), nullable=False
+    )
+    settings_key = db.Column(db.String(64), nullable=False)  # extractor / inpaint method + max depth
+    image_token = db.Column(db.String(100), nullable=False)  # size:mtime of the analysed image file
+    tree = db.Column(db.Text, nullable=False)  # JSON: EditableImage.to_dict()
+    text_styles = db.Column(db.Text, nullable=True)  # JSON object: element_id -> TextStyleResult.to_dict()
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    page_image_version = db.relationship(
+        'PageImageVersion',
+        backref=db.backref('editable_analyses', cascade='all, delete-orphan'),
+    )
+
+    def get_tree(self) -> dict:
+        return json.loads(self.tree) if self.tree else {}
+
+    def get_text_styles(self) -> dict:
+        return json.loads(self.text_styles) if self.text_styles else {}
+
+    def __repr__(self):
+        return f'<EditableImageAnalysis {self.page_image_version_id} {self.settings_key[:8]}>'
@@ -13,6 +13,10 @@ class Page(db.Model):
     Page model - represents a single PPT page/slide
     """
     __tablename__ = 'pages'
+    __table_args__ = (
+        # 按项目取页面并按顺序排列（get_filtered_pages / 项目详情 / 导出）
+        db.Index('ix_pages_project_id_order_index', 'project_id', 'order_index'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     project_id = db.Column(db.String(36), db.ForeignKey('projects.id'), nullable=False)
@@ -86,7 +90,7 @@ class Page(db.Model):
         }
 
         if include_versions:
-            data['image_versions'] = [v.to_dict() for v in self.image_versions.all()]
+            data['image_versions'] = [v.to_dict() for v in self.image_versions.filter_by(is_reserved=False)]
 
         return data
     
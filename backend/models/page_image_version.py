@@ -11,12 +11,20 @@ class PageImageVersion(db.Model):
     Page Image Version model - represents a historical version of a page's generated image
     """
     __tablename__ = 'page_image_versions'
+    __table_args__ = (
+        # MAX(version_number) / 版本列表按版本号排序；唯一约束保证并发预留的版本号不重复
+        db.Index('ix_page_image_versions_page_id_version_number', 'page_id', 'version_number', unique=True),
+        # 当前版本查询与 is_current 切换
+        db.Index('ix_page_image_versions_page_id_is_current', 'page_id', 'is_current'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     page_id = db.Column(db.String(36), db.ForeignKey('pages.id'), nullable=False, index=True)
     image_path = db.Column(db.String(500), nullable=False)
     version_number = db.Column(db.Integer, nullable=False)  # 版本号，从1开始递增
     is_current = db.Column(db.Boolean, nullable=False, default=False)  # 是否为当前使用的版本
+    # 已预留版本号、图片尚未写完（不出现在版本列表中，崩溃遗留的由 resume_pending_tasks 清理）
+    is_reserved = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
     # Relationships
@@ -11,6 +11,10 @@ class Project(db.Model):
     Project model - represents a PPT project
     """
     __tablename__ = 'projects'
+    __table_args__ = (
+        # 历史列表按 (updated_at, id) 倒序分页
+        db.Index('ix_projects_updated_at_id', 'updated_at', 'id'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     idea_prompt = db.Column(db.Text, nullable=True)
@@ -0,0 +1,40 @@
+"""
+Reference Chunk model - retrieval chunks of parsed reference files
+"""
+import json
+from . import db
+
+
+class ReferenceChunk(db.Model):
+    """
+    Reference Chunk model - one retrieval unit of a reference file's markdown.
+
+    Built when parsing completes (services/reference_index.py); term
+    frequencies are stored so the BM25 index can be loaded without
+    re-tokenizing the markdown.
+    """
+    __tablename__ = 'reference_chunks'
+    __table_args__ = (
+        # 按文件顺序加载某个参考文件的所有片段；唯一约束防止并发补建写入重复片段
+        db.Index('ix_reference_chunks_file_id_chunk_index', 'reference_file_id', 'chunk_index', unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    reference_file_id = db.Column(db.String(36), db.ForeignKey('reference_files.id', ondelete='CASCADE'), nullable=False)
+    chunk_index = db.Column(db.Integer, nullable=False)  # Position of the chunk in the document
+    content = db.Column(db.Text, nullable=False)
+    token_count = db.Column(db.Integer, nullable=False)  # Estimated prompt tokens of content
+    term_count = db.Column(db.Integer, nullable=False)  # Number of index terms (BM25 document length)
+    terms = db.Column(db.Text, nullable=False)  # JSON object: term -> frequency
+
+    # Relationships
+    reference_file = db.relationship(
+        'ReferenceFile',
+        backref=db.backref('chunks', cascade='all, delete-orphan', order_by='ReferenceChunk.chunk_index'),
+    )
+
+    def get_terms(self) -> dict:
+        return json.loads(self.terms) if self.terms else {}
+
+    def __repr__(self):
+        return f'<ReferenceChunk {self.reference_file_id}#{self.chunk_index}>'
@@ -1,6 +1,7 @@
 """
 Reference File model - stores uploaded reference files and their parsed content
 """
+import json
 import uuid
 from datetime import datetime
 from . import db
@@ -22,6 +23,12 @@ class ReferenceFile(db.Model):
     markdown_content = db.Column(db.Text, nullable=True)  # Parsed markdown with enhanced image descriptions
     error_message = db.Column(db.Text, nullable=True)  # Error message if parsing failed
     mineru_batch_id = db.Column(db.String(100), nullable=True)  # Mineru service batch ID
+    # Parse-time digest (services/reference_index.py): prompt builders use these instead of re-processing markdown
+    content_hash = db.Column(db.String(64), nullable=True)  # sha256 of markdown_content
+    token_count = db.Column(db.Integer, nullable=True)  # Estimated prompt tokens of markdown_content
+    clean_content = db.Column(db.Text, nullable=True)  # markdown_content with image links replaced by their alt text
+    clean_token_count = db.Column(db.Integer, nullable=True)
+    headings = db.Column(db.Text, nullable=True)  # JSON list of [level, title]
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -57,6 +64,9 @@ class ReferenceFile(db.Model):
         
         return result
     
+    def get_headings(self) -> list:
+        return json.loads(self.headings) if self.headings else []
+
     def count_failed_image_captions(self) -> int:
         """
         Count images in markdown that don't have alt text (failed to generate captions)
@@ -12,11 +12,20 @@ class Task(db.Model):
     Task model - tracks asynchronous generation tasks
     """
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # 按项目 + 状态查询任务（进行中的导出去重等）
+        db.Index('ix_tasks_project_id_status', 'project_id', 'status'),
+        # 任务队列：按优先级、创建时间认领 PENDING 任务
+        db.Index('ix_tasks_status_priority_created_at', 'status', 'priority', 'created_at'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     project_id = db.Column(db.String(36), db.ForeignKey('projects.id'), nullable=False)
     task_type = db.Column(db.String(50), nullable=False)  # GENERATE_DESCRIPTIONS|GENERATE_IMAGES
     status = db.Column(db.String(50), nullable=False, default='PENDING')
+    priority = db.Column(db.Integer, nullable=True, default=50)  # 调度优先级，数值越小越先执行
+    payload = db.Column(db.Text, nullable=True)  # JSON string: 可持久化的任务参数（用于重启恢复/独立 worker）
+    worker_id = db.Column(db.String(100), nullable=True)  # 认领该任务的 worker 标识
     progress = db.Column(db.Text, nullable=True)  # JSON string: {"total": 10, "completed": 5, "failed": 0}
     error_message = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -50,6 +59,22 @@ class Task(db.Model):
             prog['failed'] = failed
         self.set_progress(prog)
     
+    def get_payload(self):
+        """Parse payload from JSON string"""
+        if self.payload:
+            try:
+                return json.loads(self.payload)
+            except json.JSONDecodeError:
+                return None
+        return None
+    
+    def set_payload(self, data):
+        """Set payload as JSON string"""
+        if data is not None:
+            self.payload = json.dumps(data, ensure_ascii=False)
+        else:
+            self.payload = None
+    
     def to_dict(self):
         """Convert to dictionary"""
         return {
@@ -0,0 +1,294 @@
+"""
+Provider-level concurrency and rate limiting
+
+Every generation task opens its own thread pool (images: 8, descriptions: 5,
+captions: 12, editable export: max_workers * 2 ...), so several concurrent
+tasks can put far more requests on one API key than the upstream allows.
+This module puts one shared limiter in front of each provider kind
+(text / image / caption) regardless of how many tasks are running:
+
+- token bucket: at most ``requests_per_second`` call starts (burst = ``burst``)
+- semaphore: at most ``max_concurrent`` calls in flight
+- adaptive backoff: a 429 / RESOURCE_EXHAUSTED response pauses the whole
+  limiter with exponential backoff and retries the call
+
+Usage:
+    from services.ai_providers.rate_limiter import get_rate_limiter, RateLimitedTextProvider
+
+    provider = RateLimitedTextProvider(get_text_provider(model), get_rate_limiter('text'))
+"""
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Generator, List, Optional
+
+from PIL import Image
+
+from .text.base import TextProvider
+from .image.base import ImageProvider
+
+logger = logging.getLogger(__name__)
+
+# 识别上游限流错误的关键字（不同 SDK 的异常类型各不相同，统一按状态码/消息判断）
+_RATE_LIMIT_MARKERS = ('429', 'resource_exhausted', 'rate limit', 'ratelimit', 'too many requests')
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Check whether an exception raised by a provider SDK is a throttling response"""
+    for attr in ('status_code', 'code', 'status'):
+        value = getattr(error, attr, None)
+        if value == 429 or (isinstance(value, str) and value.upper() in ('429', 'RESOURCE_EXHAUSTED')):
+            return True
+    response = getattr(error, 'response', None)
+    if response is not None and getattr(response, 'status_code', None) == 429:
+        return True
+    message = f"{type(error).__name__} {error}".lower()
+    return any(marker in message for marker in _RATE_LIMIT_MARKERS)
+
+
+class ProviderRateLimiter:
+    """Token bucket + concurrency semaphore shared by all callers of one provider kind"""
+
+    def __init__(self, name: str, max_concurrent: int = 8, requests_per_second: float = 0,
+                 burst: int = None, max_retries: int = 3, backoff_base: float = 1.0,
+                 backoff_max: float = 60.0):
+        """
+        Args:
+            name: Limiter name (text / image / caption)
+            max_concurrent: Maximum calls in flight (<= 0 means unlimited)
+            requests_per_second: Sustained start rate (<= 0 means unlimited)
+            burst: Token bucket capacity, defaults to max(1, ceil(requests_per_second))
+            max_retries: Retries for a call that hit a rate limit error
+            backoff_base: First backoff delay in seconds after a 429
+            backoff_max: Upper bound of the backoff delay in seconds
+        """
+        self.name = name
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._cond = threading.Condition()
+        self.configure(max_concurrent, requests_per_second, burst)
+
+        self._in_flight = 0
+        self._queued = 0
+        self._blocked_until = 0.0
+        self._consecutive_throttles = 0
+        self._stats = {
+            'calls': 0,
+            'errors': 0,
+            'throttled': 0,
+            'retries': 0,
+            'wait_seconds': 0.0,
+        }
+
+    def configure(self, max_concurrent: int = None, requests_per_second: float = None, burst: int = None):
+        """Update limits at runtime (e.g. after settings change)"""
+        with self._cond:
+            if max_concurrent is not None:
+                self.max_concurrent = max_concurrent
+            if requests_per_second is not None:
+                self.requests_per_second = requests_per_second
+            if burst is None:
+                burst = max(1, int(self.requests_per_second + 0.999)) if self.requests_per_second > 0 else 1
+            self.burst = max(1, burst)
+            self._tokens = float(self.burst)
+            self._last_refill = time.monotonic()
+            self._cond.notify_all()
+
+    def _refill(self, now: float):
+        """Add tokens for the time elapsed since last refill (caller holds the lock)"""
+        if self.requests_per_second <= 0:
+            return
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(float(self.burst), self._tokens + elapsed * self.requests_per_second)
+            self._last_refill = now
+
+    def acquire(self):
+        """Block until a concurrency slot and a rate token are available"""
+        start = time.monotonic()
+        with self._cond:
+            self._queued += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = 0.0
+                    if now < self._blocked_until:
+                        wait = self._blocked_until - now
+                    elif 0 < self.max_concurrent <= self._in_flight:
+                        wait = None  # 等待其他调用释放槽位
+                    elif self.requests_per_second > 0 and self._tokens < 1:
+                        wait = (1 - self._tokens) / self.requests_per_second
+                    else:
+                        if self.requests_per_second > 0:
+                            self._tokens -= 1
+                        self._in_flight += 1
+                        break
+                    self._cond.wait(wait)
+            finally:
+                self._queued -= 1
+            self._stats['wait_seconds'] += time.monotonic() - start
+
+    def release(self):
+        """Return the concurrency slot"""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _record_success(self):
+        with self._cond:
+            self._stats['calls'] += 1
+            self._consecutive_throttles = 0
+
+    def _record_throttle(self) -> float:
+        """Pause the limiter after a 429 and return the backoff delay"""
+        with self._cond:
+            self._stats['throttled'] += 1
+            self._consecutive_throttles += 1
+            delay = min(self.backoff_max, self.backoff_base * (2 ** (self._consecutive_throttles - 1)))
+            delay *= 1 + random.uniform(0, 0.25)  # jitter，避免排队的调用同时重试
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            self._cond.notify_all()
+            return delay
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run ``func`` under the limiter, retrying with backoff on rate limit errors"""
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if is_rate_limit_error(e) and attempt < self.max_retries:
+                    attempt += 1
+                    delay = self._record_throttle()
+                    with self._cond:
+                        self._stats['retries'] += 1
+                    logger.warning(f"[{self.name}] rate limited, backing off {delay:.1f}s "
+                                   f"(retry {attempt}/{self.max_retries}): {e}")
+                    continue
+                with self._cond:
+                    self._stats['errors'] += 1
+                    if is_rate_limit_error(e):
+                        self._stats['throttled'] += 1
+                raise
+            finally:
+                self.release()
+            self._record_success()
+            return result
+
+    def stream(self, func: Callable, *args, **kwargs) -> Generator:
+        """Run a generator function under the limiter, holding the slot until it is exhausted"""
+        self.acquire()
+        try:
+            yield from func(*args, **kwargs)
+        except Exception as e:
+            with self._cond:
+                self._stats['errors'] += 1
+            if is_rate_limit_error(e):
+                self._record_throttle()
+            raise
+        else:
+            self._record_success()
+        finally:
+            self.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Live counters for monitoring"""
+        with self._cond:
+            now = time.monotonic()
+            return {
+                'name': self.name,
+                'max_concurrent': self.max_concurrent,
+                'requests_per_second': self.requests_per_second,
+                'in_flight': self._in_flight,
+                'queued': self._queued,
+                'backoff_remaining': round(max(0.0, self._blocked_until - now), 2),
+                **{k: round(v, 2) if isinstance(v, float) else v for k, v in self._stats.items()},
+            }
+
+
+class _RateLimitedProxy:
+    """Forward attribute access to the wrapped provider, limiting generate* calls"""
+
+    def __init__(self, provider, limiter: ProviderRateLimiter):
+        self._provider = provider
+        self._limiter = limiter
+
+    @property
+    def wrapped_provider(self):
+        return self._provider
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        attr = getattr(self._provider, name)
+        if callable(attr) and name.startswith(('generate', 'edit')):
+            def limited(*args, **kwargs):
+                return self._limiter.call(attr, *args, **kwargs)
+            return limited
+        return attr
+
+
+class RateLimitedTextProvider(_RateLimitedProxy, TextProvider):
+    """TextProvider wrapper that routes every call through a shared limiter"""
+
+    def generate_text(self, prompt: str, thinking_budget: int = 1000) -> str:
+        return self._limiter.call(self._provider.generate_text, prompt, thinking_budget=thinking_budget)
+
+    def generate_text_stream(self, prompt: str, thinking_budget: int = 0) -> Generator[str, None, None]:
+        return self._limiter.stream(self._provider.generate_text_stream, prompt, thinking_budget=thinking_budget)
+
+
+class RateLimitedImageProvider(_RateLimitedProxy, ImageProvider):
+    """ImageProvider wrapper that routes every call through a shared limiter"""
+
+    def generate_image(self, prompt: str, ref_images: Optional[List[Image.Image]] = None,
+                       aspect_ratio: str = "16:9", resolution: str = "2K",
+                       enable_thinking: bool = False, thinking_budget: int = 0) -> Optional[Image.Image]:
+        return self._limiter.call(
+            self._provider.generate_image, prompt, ref_images=ref_images,
+            aspect_ratio=aspect_ratio, resolution=resolution,
+            enable_thinking=enable_thinking, thinking_budget=thinking_budget
+        )
+
+
+# name -> limiter，进程内全局共享（不随 provider 缓存清理而重置）
+_limiters: Dict[str, ProviderRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _limits_from_config(name: str) -> Dict[str, Any]:
+    """Read AI_<NAME>_MAX_CONCURRENCY / AI_<NAME>_REQUESTS_PER_SECOND from app config or Config"""
+    from config import get_setting
+
+    def _get(key, default):
+        value = get_setting(key, default)
+        return default if value is None else value
+
+    prefix = f'AI_{name.upper()}'
+    return {
+        'max_concurrent': int(_get(f'{prefix}_MAX_CONCURRENCY', 8)),
+        'requests_per_second': float(_get(f'{prefix}_REQUESTS_PER_SECOND', 0)),
+        'max_retries': int(_get('AI_RATE_LIMIT_MAX_RETRIES', 3)),
+        'backoff_max': float(_get('AI_RATE_LIMIT_BACKOFF_MAX', 60)),
+    }
+
+
+def get_rate_limiter(name: str) -> ProviderRateLimiter:
+    """Get (or create) the shared limiter for a provider kind: text / image / caption"""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = ProviderRateLimiter(name, **_limits_from_config(name))
+            _limiters[name] = limiter
+        return limiter
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Live counters of all limiters (in-flight, queued, throttled ...)"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.get_stats() for limiter in limiters}
@@ -31,6 +31,9 @@ from .prompts import (
     get_description_to_outline_prompt_markdown,
 )
 from .ai_providers import get_text_provider, get_image_provider, get_caption_provider, TextProvider, ImageProvider
+from .image_cache import ImageCache, get_image_cache, hash_file, hash_image
+from .text_cache import TextCache, get_text_cache
+from .reference_index import get_reference_retriever
 from config import get_config
 
 logger = logging.getLogger(__name__)
@@ -64,6 +67,8 @@ class ProjectContext:
             self.description_requirements = project_or_dict.get('description_requirements')
 
         self.reference_files_content = reference_files_content or []
+        # 参考文件总量超出 token 预算时，各 prompt 只内联与其相关的片段（见 services/reference_index.py）
+        self.reference_retriever = get_reference_retriever(self.reference_files_content)
 
     def to_dict(self) -> Dict:
         """转换为字典，方便传递"""
@@ -204,13 +209,15 @@ class AIService:
         retry=retry_if_exception_type((json.JSONDecodeError, ValueError)),
         reraise=True
     )
-    def generate_json(self, prompt: str, thinking_budget: int = 1000) -> Union[Dict, List]:
+    def generate_json(self, prompt: str, thinking_budget: int = 1000,
+                      use_cache: bool = True) -> Union[Dict, List]:
         """
         生成并解析JSON，如果解析失败则重新生成
         
         Args:
             prompt: 生成提示词
             thinking_budget: 思考预算（会根据 enable_text_reasoning 配置自动调整）
+            use_cache: 是否使用文本生成缓存（需 TEXT_CACHE_ENABLED=true，False 时强制重新生成）
             
         Returns:
             解析后的JSON对象（字典或列表）
@@ -220,16 +227,39 @@ class AIService:
         """
         # 调用AI生成文本（根据 enable_text_reasoning 配置调整 thinking_budget）
         actual_budget = self._get_text_thinking_budget()
-        response_text = self.text_provider.generate_text(prompt, thinking_budget=actual_budget)
+        cache, cache_key, response_text = self._lookup_text_cache(prompt, actual_budget, use_cache)
+        if response_text is None:
+            response_text = self.text_provider.generate_text(prompt, thinking_budget=actual_budget)
         
         # 清理响应文本：移除markdown代码块标记和多余空白
         cleaned_text = response_text.strip().strip("```json").strip("```").strip()
         
         try:
-            return json.loads(cleaned_text)
+            result = json.loads(cleaned_text)
         except json.JSONDecodeError as e:
             logger.warning(f"JSON解析失败，将重新生成。原始文本: {cleaned_text[:200]}... 错误: {str(e)}")
             raise
+        # 只缓存能成功解析的响应
+        if cache:
+            cache.put(cache_key, response_text)
+        return result
+
+    def _lookup_text_cache(self, prompt: str, thinking_budget: int, use_cache: bool):
+        """
+        查询文本生成缓存
+
+        Returns:
+            (cache, cache_key, cached_response)；缓存未启用或被跳过时 cache 为 None，未命中时 cached_response 为 None
+        """
+        cache = get_text_cache() if use_cache else None
+        if not cache:
+            return None, None, None
+        provider = getattr(self.text_provider, 'wrapped_provider', self.text_provider)
+        cache_key = TextCache.make_key(type(provider).__name__, self.text_model, prompt, thinking_budget)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Text cache hit: {cache_key[:12]}")
+        return cache, cache_key, cached
     
     @retry(
         stop=stop_after_attempt(3),
@@ -321,19 +351,21 @@ class AIService:
             logger.error(f"Failed to download image from {url}: {str(e)}")
             return None
     
-    def generate_outline(self, project_context: ProjectContext, language: str = None) -> List[Dict]:
+    def generate_outline(self, project_context: ProjectContext, language: str = None,
+                         use_cache: bool = True) -> List[Dict]:
         """
         Generate PPT outline from idea prompt
         Based on demo.py gen_outline()
         
         Args:
             project_context: 项目上下文对象，包含所有原始信息
+            use_cache: False 时跳过文本生成缓存，强制重新生成
             
         Returns:
             List of outline items (may contain parts with pages or direct pages)
         """
         outline_prompt = get_outline_generation_prompt(project_context, language)
-        outline = self.generate_json(outline_prompt, thinking_budget=1000)
+        outline = self.generate_json(outline_prompt, thinking_budget=1000, use_cache=use_cache)
         return outline
 
     @staticmethod
@@ -549,7 +581,7 @@ class AIService:
 
     def generate_page_description(self, project_context: ProjectContext, outline: List[Dict],
                                  page_outline: Dict, page_index: int, language='zh',
-                                 detail_level: str = 'default') -> Dict:
+                                 detail_level: str = 'default', use_cache: bool = True) -> Dict:
         """
         Generate description for a single page
         Based on demo.py gen_desc() logic
@@ -560,6 +592,7 @@ class AIService:
             page_outline: Outline for this specific page
             page_index: Page number (1-indexed)
             detail_level: Description detail level (concise/default/detailed)
+            use_cache: False 时跳过文本生成缓存，强制重新生成
 
         Returns:
             Dict with 'text' and optional 'extra_fields'
@@ -580,7 +613,11 @@ class AIService:
 
         # 根据 enable_text_reasoning 配置调整 thinking_budget
         actual_budget = self._get_text_thinking_budget()
-        response_text = self.text_provider.generate_text(desc_prompt, thinking_budget=actual_budget)
+        cache, cache_key, response_text = self._lookup_text_cache(desc_prompt, actual_budget, use_cache)
+        if response_text is None:
+            response_text = self.text_provider.generate_text(desc_prompt, thinking_budget=actual_budget)
+            if cache and response_text:
+                cache.put(cache_key, response_text)
 
         text = dedent(response_text)
         description_text, extra_fields = self._parse_extra_fields(text, extra_field_names)
@@ -786,7 +823,8 @@ class AIService:
     
     def generate_image(self, prompt: str, ref_image_path: Optional[str] = None, 
                       aspect_ratio: str = "16:9", resolution: str = "2K",
-                      additional_ref_images: Optional[List[Union[str, Image.Image]]] = None) -> Optional[Image.Image]:
+                      additional_ref_images: Optional[List[Union[str, Image.Image]]] = None,
+                      use_cache: bool = False, cache_stats=None) -> Optional[Image.Image]:
         """
         Generate image using configured image provider
         Based on gemini_genai.py gen_image()
@@ -797,6 +835,8 @@ class AIService:
             aspect_ratio: Image aspect ratio
             resolution: Image resolution (note: OpenAI format only supports 1K)
             additional_ref_images: 额外的参考图片列表，可以是本地路径、URL 或 PIL Image 对象
+            use_cache: 是否查询/写入生成图片缓存（需 IMAGE_CACHE_ENABLED=true）
+            cache_stats: 可选的 ImageCacheStats，用于统计任务内的命中/未命中次数
         
         Returns:
             PIL Image object or None if failed
@@ -861,12 +901,23 @@ class AIService:
                         else:
                             logger.warning(f"Invalid image reference: {ref_img}, skipping...")
             
+            cache = get_image_cache() if use_cache else None
+            cache_key = None
+            if cache:
+                cache_key = self._image_cache_key(prompt, ref_images, aspect_ratio, resolution)
+                cached = cache.get(cache_key)
+                if cache_stats is not None:
+                    cache_stats.record(cached is not None)
+                if cached is not None:
+                    logger.info(f"Image cache hit: {cache_key[:12]}")
+                    return cached
+
             logger.debug(f"Calling image provider for generation with {len(ref_images)} reference images...")
             logger.debug(f"Enable image reasoning/thinking: {self.enable_image_reasoning}, budget: {self._get_image_thinking_budget()}")
             
             # 使用 image_provider 生成图片
             # 根据 enable_image_reasoning 配置控制图像生成的思考模式
-            return self.image_provider.generate_image(
+            image = self.image_provider.generate_image(
                 prompt=prompt,
                 ref_images=ref_images if ref_images else None,
                 aspect_ratio=aspect_ratio,
@@ -874,12 +925,34 @@ class AIService:
                 enable_thinking=self.enable_image_reasoning,
                 thinking_budget=self._get_image_thinking_budget()
             )
+            if cache and image is not None:
+                cache.put(cache_key, image)
+            return image
             
         except Exception as e:
             error_detail = f"Error generating image: {type(e).__name__}: {str(e)}"
             logger.error(error_detail, exc_info=True)
             raise Exception(error_detail) from e
     
+    def _image_cache_key(self, prompt: str, ref_images: List[Image.Image],
+                         aspect_ratio: str, resolution: str) -> str:
+        """Content-addressed cache key for a generate_image call"""
+        provider = getattr(self.image_provider, 'wrapped_provider', self.image_provider)
+        ref_digests = []
+        for img in ref_images:
+            # 从文件打开的图片直接对文件字节求哈希，避免解码整张图
+            filename = getattr(img, 'filename', None)
+            if filename and os.path.exists(filename):
+                ref_digests.append(hash_file(filename))
+            else:
+                ref_digests.append(hash_image(img))
+        return ImageCache.make_key(
+            type(provider).__name__, self.image_model, prompt, ref_digests,
+            aspect_ratio, resolution,
+            thinking=self.enable_image_reasoning,
+            thinking_budget=self._get_image_thinking_budget(),
+        )
+
     def edit_image(self, prompt: str, current_image_path: str,
                   aspect_ratio: str = "16:9", resolution: str = "2K",
                   original_description: str = None,
@@ -945,7 +1018,7 @@ class AIService:
     def refine_outline(self, current_outline: List[Dict], user_requirement: str,
                       project_context: ProjectContext,
                       previous_requirements: Optional[List[str]] = None,
-                      language='zh') -> List[Dict]:
+                      language='zh', use_cache: bool = True) -> List[Dict]:
         """
         根据用户要求修改已有大纲
         
@@ -954,6 +1027,7 @@ class AIService:
             user_requirement: 用户的新要求
             project_context: 项目上下文对象，包含所有原始信息
             previous_requirements: 之前的修改要求列表（可选）
+            use_cache: False 时跳过文本生成缓存，强制重新生成
         
         Returns:
             修改后的大纲结构
@@ -965,14 +1039,14 @@ class AIService:
             previous_requirements=previous_requirements,
             language=language
         )
-        outline = self.generate_json(refinement_prompt, thinking_budget=1000)
+        outline = self.generate_json(refinement_prompt, thinking_budget=1000, use_cache=use_cache)
         return outline
     
     def refine_descriptions(self, current_descriptions: List[Dict], user_requirement: str,
                            project_context: ProjectContext,
                            outline: List[Dict] = None,
                            previous_requirements: Optional[List[str]] = None,
-                           language='zh') -> List[str]:
+                           language='zh', use_cache: bool = True) -> List[str]:
         """
         根据用户要求修改已有页面描述
         
@@ -982,6 +1056,7 @@ class AIService:
             project_context: 项目上下文对象，包含所有原始信息
             outline: 完整的大纲结构（可选）
             previous_requirements: 之前的修改要求列表（可选）
+            use_cache: False 时跳过文本生成缓存，强制重新生成
         
         Returns:
             修改后的页面描述列表（字符串列表）
@@ -994,7 +1069,7 @@ class AIService:
             previous_requirements=previous_requirements,
             language=language
         )
-        descriptions = self.generate_json(refinement_prompt, thinking_budget=1000)
+        descriptions = self.generate_json(refinement_prompt, thinking_budget=1000, use_cache=use_cache)
 
         # 确保返回的是字符串列表
         if isinstance(descriptions, list):
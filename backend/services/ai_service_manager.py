@@ -9,6 +9,8 @@ Benefits:
 - Reduces initialization overhead
 - Better resource management
 - Thread-safe for Flask multi-threaded environment
+- Every cached provider is wrapped in a shared rate limiter, so concurrent
+  tasks cannot exceed the configured per-provider concurrency / request rate
 
 Usage:
     from services.ai_service_manager import get_ai_service
@@ -24,6 +26,9 @@ from typing import Optional
 from flask import current_app, has_app_context
 from .ai_service import AIService
 from .ai_providers import get_text_provider, get_image_provider, get_caption_provider, TextProvider, ImageProvider
+from .ai_providers.rate_limiter import (
+    RateLimitedTextProvider, RateLimitedImageProvider, get_rate_limiter, get_rate_limiter_stats
+)
 
 logger = logging.getLogger(__name__)
 
@@ -51,7 +56,9 @@ def _get_cached_text_provider(model: str) -> TextProvider:
     with _cache_lock:
         if model not in _text_provider_cache:
             logger.info(f"Creating new TextProvider for model: {model}")
-            _text_provider_cache[model] = get_text_provider(model=model)
+            _text_provider_cache[model] = RateLimitedTextProvider(
+                get_text_provider(model=model), get_rate_limiter('text')
+            )
         else:
             logger.debug(f"Reusing cached TextProvider for model: {model}")
         return _text_provider_cache[model]
@@ -70,7 +77,9 @@ def _get_cached_image_provider(model: str) -> ImageProvider:
     with _cache_lock:
         if model not in _image_provider_cache:
             logger.info(f"Creating new ImageProvider for model: {model}")
-            _image_provider_cache[model] = get_image_provider(model=model)
+            _image_provider_cache[model] = RateLimitedImageProvider(
+                get_image_provider(model=model), get_rate_limiter('image')
+            )
         else:
             logger.debug(f"Reusing cached ImageProvider for model: {model}")
         return _image_provider_cache[model]
@@ -81,7 +90,9 @@ def _get_cached_caption_provider(model: str) -> TextProvider:
     with _cache_lock:
         if model not in _caption_provider_cache:
             logger.info(f"Creating new CaptionProvider for model: {model}")
-            _caption_provider_cache[model] = get_caption_provider(model=model)
+            _caption_provider_cache[model] = RateLimitedTextProvider(
+                get_caption_provider(model=model), get_rate_limiter('caption')
+            )
         return _caption_provider_cache[model]
 
 
@@ -184,5 +195,6 @@ def get_provider_cache_info() -> dict:
             "text_providers": list(_text_provider_cache.keys()),
             "image_providers": list(_image_provider_cache.keys()),
             "caption_providers": list(_caption_provider_cache.keys()),
-            "total_cached": len(_text_provider_cache) + len(_image_provider_cache) + len(_caption_provider_cache)
+            "total_cached": len(_text_provider_cache) + len(_image_provider_cache) + len(_caption_provider_cache),
+            "rate_limiters": get_rate_limiter_stats()
         }
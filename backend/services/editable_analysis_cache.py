@@ -0,0 +1,128 @@
+"""
+Editable Analysis Cache - reuse editable-PPTX analysis per page image version
+
+Every editable-PPTX export runs layout analysis, background inpainting and
+text style extraction for every slide. The resulting ``EditableImage`` tree
+(with the paths of its clean backgrounds and element crops) and the
+``TextStyleResult`` of each text element are stored per ``PageImageVersion``
+and analysis settings (``EditableImageAnalysis``). The next export reuses
+them, so only slides whose image changed are analysed again.
+
+A stored analysis is used only when:
+
+- it was made with the same extractor / inpaint method and max depth
+- the image file still has the same size and mtime (in-place edits that
+  did not create a version)
+- every file it references (backgrounds, element crops) still exists
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def analysis_settings_key(extractor_method: str, inpaint_method: str, max_depth: int) -> str:
+    digest = hashlib.sha256()
+    for part in (extractor_method or '', inpaint_method or '', str(max_depth)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _image_token(path: str) -> Optional[str]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class EditableAnalysisStore:
+    """Stored analyses of the slides of one export (``image_paths[i]`` belongs to ``pages[i]``)"""
+
+    def __init__(self, pages, image_paths: List[str], settings_key: str):
+        from models import PageImageVersion
+
+        self.image_paths = image_paths
+        self.settings_key = settings_key
+        page_ids = [page.id for page in pages]
+        current_versions = {}
+        if page_ids:
+            rows = PageImageVersion.query.with_entities(PageImageVersion.page_id, PageImageVersion.id).filter(
+                PageImageVersion.page_id.in_(page_ids),
+                PageImageVersion.is_current.is_(True),
+            ).all()
+            current_versions = {page_id: version_id for page_id, version_id in rows}
+        self.version_ids = [current_versions.get(page_id) for page_id in page_ids]
+
+    def load(self) -> Tuple[List, Dict]:
+        """
+        (editable_images, text_styles): the stored EditableImage of each slide
+        (None where it has to be analysed) and the stored styles by element_id.
+        """
+        from models import EditableImageAnalysis
+        from services.image_editability import EditableImage
+        from services.image_editability.text_attribute_extractors import TextStyleResult
+
+        editable_images = [None] * len(self.image_paths)
+        text_styles = {}
+        version_ids = [v for v in self.version_ids if v]
+        if not version_ids:
+            return editable_images, text_styles
+        rows = {
+            row.page_image_version_id: row
+            for row in EditableImageAnalysis.query.filter(
+                EditableImageAnalysis.page_image_version_id.in_(version_ids),
+                EditableImageAnalysis.settings_key == self.settings_key,
+            )
+        }
+        for idx, (version_id, image_path) in enumerate(zip(self.version_ids, self.image_paths)):
+            row = rows.get(version_id)
+            if row is None or row.image_token != _image_token(image_path):
+                continue
+            try:
+                editable_image = EditableImage.from_dict(row.get_tree())
+                missing = [path for path in editable_image.iter_files() if not os.path.exists(path)]
+                if missing:
+                    logger.info(f"Stored analysis of slide {idx + 1} references missing files ({missing[0]}), re-analysing")
+                    continue
+                styles = {
+                    element_id: TextStyleResult.from_dict(style)
+                    for element_id, style in row.get_text_styles().items()
+                }
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Ignoring unreadable stored analysis of slide {idx + 1}: {e}")
+                continue
+            editable_images[idx] = editable_image
+            text_styles.update(styles)
+        logger.info(f"Reusing stored analysis for {sum(1 for img in editable_images if img)}/{len(editable_images)} slides")
+        return editable_images, text_styles
+
+    def save(self, idx: int, editable_image, text_styles: Dict):
+        """Store the analysis of slide ``idx`` (export callback; failures are only logged)"""
+        from models import db, EditableImageAnalysis
+
+        version_id = self.version_ids[idx]
+        token = _image_token(self.image_paths[idx])
+        if not version_id or token is None:
+            return
+        try:
+            tree = json.dumps(editable_image.to_dict(), ensure_ascii=False)
+            styles = json.dumps({element_id: style.to_dict() for element_id, style in text_styles.items()},
+                                ensure_ascii=False)
+            row = EditableImageAnalysis.query.filter_by(
+                page_image_version_id=version_id, settings_key=self.settings_key
+            ).first()
+            if row is None:
+                row = EditableImageAnalysis(page_image_version_id=version_id, settings_key=self.settings_key)
+                db.session.add(row)
+            row.image_token = token
+            row.tree = tree
+            row.text_styles = styles
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Failed to store analysis of slide {idx + 1}: {e}")
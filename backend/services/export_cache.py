@@ -0,0 +1,191 @@
+"""
+Export Cache - reuse exported PPTX / PDF / ZIP artifacts when pages are unchanged
+
+An export is keyed by a fingerprint of (format, aspect ratio, ordered page
+ids, each page's current ``PageImageVersion`` id + image file size/mtime).
+
+- Same fingerprint as the last export: the cached artifact is linked to the
+  requested filename without touching any image.
+- Same pages in the same order but a few images changed: formats with a
+  ``patch`` function (PPTX, PDF) copy the previous artifact and swap only the
+  changed slides' media instead of rebuilding the whole deck.
+- Anything else: full rebuild.
+
+Artifacts and their manifests live in ``<project>/exports/.cache/``; there is
+one artifact per (format, aspect ratio, page list), overwritten on change.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 超过该比例的页面变化时直接整体重建（逐页替换不再划算）
+PATCH_MAX_CHANGED_RATIO = 0.5
+
+_key_locks: Dict[str, threading.Lock] = {}
+_key_locks_guard = threading.Lock()
+
+
+def _lock_for(key: str) -> threading.Lock:
+    with _key_locks_guard:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+@dataclass(frozen=True)
+class ExportSlide:
+    """One exported page: its image on disk and a token identifying that exact image"""
+    page_id: str
+    image_path: str
+    token: str
+
+
+def collect_slides(pages, file_service) -> List[ExportSlide]:
+    """
+    Build the slide list for ``pages`` (in order), skipping pages without an image file.
+
+    The token is the current PageImageVersion id plus the file's size and
+    mtime, so in-place edits that do not create a version still invalidate.
+    """
+    from models import PageImageVersion
+
+    page_ids = [page.id for page in pages]
+    current_versions = {}
+    if page_ids:
+        rows = PageImageVersion.query.with_entities(PageImageVersion.page_id, PageImageVersion.id).filter(
+            PageImageVersion.page_id.in_(page_ids),
+            PageImageVersion.is_current.is_(True),
+        ).all()
+        current_versions = {page_id: version_id for page_id, version_id in rows}
+
+    slides = []
+    for page in pages:
+        if not page.generated_image_path:
+            continue
+        path = file_service.get_absolute_path(page.generated_image_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            logger.warning(f"Image not found and will be skipped for export: {path}")
+            continue
+        token = f"{current_versions.get(page.id, '')}:{stat.st_size}:{stat.st_mtime_ns}"
+        slides.append(ExportSlide(page.id, path, token))
+    return slides
+
+
+@dataclass
+class ExportResult:
+    path: str
+    status: str  # hit | patched | built
+    changed: int = 0
+
+
+class ExportCache:
+    """Fingerprint-keyed cache of export artifacts for one project"""
+
+    def __init__(self, exports_dir):
+        self.cache_dir = Path(exports_dir) / '.cache'
+
+    @staticmethod
+    def fingerprint(fmt: str, aspect_ratio: str, slides: List[ExportSlide]) -> str:
+        digest = hashlib.sha256(f"{fmt}|{aspect_ratio}".encode())
+        for slide in slides:
+            digest.update(f"|{slide.page_id}={slide.token}".encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def layout_key(fmt: str, aspect_ratio: str, slides: List[ExportSlide]) -> str:
+        """Identifies the page list irrespective of image versions"""
+        digest = hashlib.sha256(f"{fmt}|{aspect_ratio}".encode())
+        for slide in slides:
+            digest.update(f"|{slide.page_id}".encode())
+        return digest.hexdigest()[:32]
+
+    def _paths(self, fmt: str, layout_key: str, extension: str) -> Tuple[Path, Path]:
+        return (self.cache_dir / f"{fmt}_{layout_key}.{extension}",
+                self.cache_dir / f"{fmt}_{layout_key}.json")
+
+    @staticmethod
+    def _load_manifest(path: Path) -> Optional[Dict]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_manifest(path: Path, manifest: Dict):
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def publish(artifact: Path, output_path: str):
+        """Expose the artifact under the requested filename (hard link, copy as fallback)"""
+        if os.path.exists(output_path):
+            if os.path.samefile(artifact, output_path):
+                return
+            os.remove(output_path)
+        try:
+            os.link(artifact, output_path)
+        except OSError:
+            shutil.copy2(artifact, output_path)
+
+    def export(self, fmt: str, extension: str, aspect_ratio: str, slides: List[ExportSlide],
+               output_path: str,
+               build: Callable[[List[str], str], None],
+               patch: Optional[Callable[[str, str, Dict[int, str]], None]] = None) -> ExportResult:
+        """
+        Produce ``output_path`` for ``slides``, reusing or patching the cached artifact.
+
+        Args:
+            fmt: Cache namespace (e.g. 'pptx', 'pdf', 'images')
+            extension: Artifact file extension
+            build: build(image_paths, output) writes a complete artifact
+            patch: patch(previous_artifact, output, {index: image_path}) swaps pages
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        key = self.layout_key(fmt, aspect_ratio, slides)
+        fingerprint = self.fingerprint(fmt, aspect_ratio, slides)
+        artifact, manifest_path = self._paths(fmt, key, extension)
+
+        with _lock_for(str(artifact)):
+            manifest = self._load_manifest(manifest_path)
+            if manifest and manifest.get('fingerprint') == fingerprint and artifact.exists():
+                self.publish(artifact, output_path)
+                return ExportResult(str(output_path), 'hit')
+
+            tokens = [slide.token for slide in slides]
+            changed = None
+            if manifest and patch and artifact.exists() and len(manifest.get('tokens', [])) == len(tokens):
+                changed = {i: slides[i].image_path
+                           for i, (old, new) in enumerate(zip(manifest['tokens'], tokens)) if old != new}
+                if len(changed) > len(slides) * PATCH_MAX_CHANGED_RATIO:
+                    changed = None
+
+            tmp_path = artifact.with_name(f"{artifact.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                if changed is not None:
+                    patch(str(artifact), str(tmp_path), changed)
+                    status = 'patched'
+                else:
+                    build([slide.image_path for slide in slides], str(tmp_path))
+                    status = 'built'
+                # 先替换产物、再写 manifest：中途失败时 manifest 与旧产物不一致只会导致一次重建
+                os.replace(tmp_path, artifact)
+            finally:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+            self._write_manifest(manifest_path, {'fingerprint': fingerprint, 'tokens': tokens})
+            self.publish(artifact, output_path)
+
+        logger.info(f"Export {fmt} {status}: {len(slides)} pages"
+                    + (f", {len(changed)} replaced" if changed is not None else ""))
+        return ExportResult(str(output_path), status, len(changed) if changed is not None else len(slides))
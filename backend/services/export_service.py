@@ -232,18 +232,45 @@ class ExportService:
         )
     
     @staticmethod
-    def create_pptx_from_images(image_paths: List[str], output_file: str = None, aspect_ratio: str = '16:9') -> bytes:
+    def create_pptx_from_images(image_paths: List[str], output_file: str = None, aspect_ratio: str = '16:9',
+                                streaming: bool = True, progress_callback=None) -> bytes:
         """
         Create PPTX file from image paths
         Based on demo.py create_pptx_from_images()
-        
+
+        The default streaming mode writes each image straight into the zip
+        package (see services/pptx_writer.py), so peak memory does not grow
+        with the page count. ``streaming=False`` builds the deck with
+        python-pptx in memory.
+
         Args:
             image_paths: List of absolute paths to images
             output_file: Optional output file path (if None, returns bytes)
-        
+            streaming: Use the bounded-memory writer
+            progress_callback: Optional callback(done, total) after each image (streaming mode)
+
         Returns:
             PPTX file as bytes if output_file is None
         """
+        if not streaming:
+            return ExportService._create_pptx_in_memory(image_paths, output_file, aspect_ratio)
+
+        from services.pptx_writer import write_image_pptx
+
+        if output_file:
+            slide_count, deduplicated = write_image_pptx(image_paths, output_file, aspect_ratio, progress_callback)
+            logger.info(f"Streamed PPTX export: {slide_count} slides, {deduplicated} duplicate images shared")
+            return None
+
+        # 先写到临时文件再一次性读回，避免 BytesIO + getvalue() 产生两份拷贝
+        with tempfile.TemporaryFile() as tmp:
+            write_image_pptx(image_paths, tmp, aspect_ratio, progress_callback)
+            tmp.seek(0)
+            return tmp.read()
+
+    @staticmethod
+    def _create_pptx_in_memory(image_paths: List[str], output_file: str = None, aspect_ratio: str = '16:9') -> bytes:
+        """Build the deck with python-pptx (every slide and image stays in memory until save)"""
         # Create presentation
         prs = Presentation()
         
@@ -295,13 +322,21 @@ class ExportService:
             return pptx_bytes.getvalue()
     
     @staticmethod
-    def create_pdf_from_images(image_paths: List[str], output_file: str = None, aspect_ratio: str = '16:9') -> Optional[bytes]:
+    def create_pdf_from_images(image_paths: List[str], output_file: str = None, aspect_ratio: str = '16:9',
+                               streaming: bool = True, progress_callback=None) -> Optional[bytes]:
         """
-        Create PDF file from image paths using img2pdf (low memory usage)
+        Create PDF file from image paths
+
+        The default streaming mode writes pages and metadata to the output file
+        as it goes (see services/pdf_writer.py), so peak memory is bounded by
+        one page. ``streaming=False`` uses img2pdf, which builds the whole
+        document in memory before metadata is added.
 
         Args:
             image_paths: List of absolute paths to images
             output_file: Optional output file path (if None, returns bytes)
+            streaming: Use the bounded-memory writer
+            progress_callback: Optional callback(done, total) after each image (streaming mode)
 
         Returns:
             PDF file as bytes if output_file is None, otherwise None
@@ -317,6 +352,18 @@ class ExportService:
         if not valid_paths:
             raise ValueError("No valid images found for PDF export")
 
+        if streaming:
+            from services.pdf_writer import write_image_pdf
+
+            if output_file:
+                page_count = write_image_pdf(valid_paths, output_file, aspect_ratio, progress_callback)
+                logger.info(f"Streamed PDF export: {page_count} pages")
+                return None
+            with tempfile.TemporaryFile() as tmp:
+                write_image_pdf(valid_paths, tmp, aspect_ratio, progress_callback)
+                tmp.seek(0)
+                return tmp.read()
+
         try:
             logger.info(f"Using img2pdf for PDF export ({len(valid_paths)} pages, low memory mode)")
 
@@ -387,6 +434,45 @@ class ExportService:
             logger.warning(f"Failed to add PDF metadata: {e}")
             return pdf_bytes
 
+    @staticmethod
+    def replace_pdf_pages(source: str, output: str, replacements: Dict[int, str]) -> int:
+        """
+        Copy a PDF to ``output`` with some pages replaced by new full-page images.
+
+        Unchanged pages are copied as-is (their image streams are not re-encoded);
+        the replaced pages keep their original size and the image covers the page
+        the same way StreamingPdfWriter places it (aspect ratio kept, centered, excess cropped).
+
+        Args:
+            source: PDF written by create_pdf_from_images
+            output: Destination path (may not be ``source``)
+            replacements: {0-based page index: new image path}
+
+        Returns:
+            Number of replaced pages
+        """
+        from services.pdf_writer import cover_placement
+
+        doc = fitz.open(source)
+        try:
+            for index, image_path in sorted(replacements.items()):
+                if not 0 <= index < doc.page_count:
+                    raise IndexError(f"Page index {index} out of range ({doc.page_count} pages)")
+                rect = doc[index].rect
+                doc.delete_page(index)
+                page = doc.new_page(pno=index, width=rect.width, height=rect.height)
+                # 与 StreamingPdfWriter 相同的铺满/裁剪方式，替换页与完整构建的页面一致
+                with Image.open(image_path) as image:
+                    image_width, image_height = image.size
+                x, y, draw_w, draw_h = cover_placement(rect.width, rect.height, image_width, image_height)
+                page.insert_image(fitz.Rect(x, y, x + draw_w, y + draw_h), filename=image_path,
+                                  keep_proportion=False)
+            # garbage=3 清理被替换页不再引用的旧图片对象
+            doc.save(output, garbage=3, deflate=True)
+        finally:
+            doc.close()
+        return len(replacements)
+
     @staticmethod
     def create_pdf_from_images_pillow(image_paths: List[str], output_file: str = None, aspect_ratio: str = '16:9') -> Optional[bytes]:
         """
@@ -1155,16 +1241,20 @@ class ExportService:
         progress_callback = None,  # 可选：进度回调函数 (step, message, percent) -> None
         export_extractor_method: str = 'hybrid',  # 组件提取方法: mineru, hybrid
         export_inpaint_method: str = 'hybrid',  # 背景修复方法: generative, baidu, hybrid
-        fail_fast: bool = True  # 是否在遇到错误时立即停止（False则收集警告继续）
+        fail_fast: bool = True,  # 是否在遇到错误时立即停止（False则收集警告继续）
+        text_styles: Dict[str, Any] = None,  # 可选：已提取的文字样式（key为element_id）
+        on_page_analyzed = None  # 可选：页面分析/样式提取完成回调 (page_idx, editable_image, text_styles) -> None
     ) -> Tuple[Optional[bytes], ExportWarnings]:
         """
         使用递归图片可编辑化服务创建可编辑PPTX
         
         这是新的架构方法，使用ImageEditabilityService进行递归版面分析。
         
-        两种使用方式：
+        三种使用方式：
         1. 传入 image_paths：自动分析图片并生成PPTX
         2. 传入 editable_images：直接使用已分析的结果（避免重复分析）
+        3. 同时传入：editable_images 中为 None 的页面才会分析（复用上次导出的结果，
+           见 services/editable_analysis_cache.py）
         
         配置（如 MinerU token）自动从 Flask app.config 获取。
         
@@ -1181,6 +1271,9 @@ class ExportService:
             export_extractor_method: 组件提取方法 ('mineru' 或 'hybrid'，默认 'hybrid')
             export_inpaint_method: 背景修复方法 ('generative', 'baidu', 'hybrid'，默认 'hybrid')
             fail_fast: 是否在遇到错误时立即停止（默认 True）。设为 False 则收集警告继续导出。
+            text_styles: 已提取的文字样式（可选），已有样式的页面不再提取
+            on_page_analyzed: 回调（可选），每个新分析或新提取样式的页面在样式提取后调用一次，
+                参数为 (page_idx, editable_image, 该页的文字样式)，用于持久化分析结果
 
         Returns:
             (pptx_bytes, warnings): 元组，包含 PPTX 字节流和警告信息
@@ -1202,17 +1295,26 @@ class ExportService:
                 except Exception as e:
                     logger.warning(f"进度回调失败: {e}")
         
-        # 如果已提供分析结果，直接使用；否则需要分析
-        if editable_images is not None:
+        # 如果已提供分析结果，直接使用；否则需要分析（为 None 的页面）
+        if editable_images is None:
+            pending = list(range(len(image_paths or [])))
+        else:
+            pending = [idx for idx, img in enumerate(editable_images) if img is None]
+        if editable_images is not None and not pending:
             logger.info(f"使用已提供的 {len(editable_images)} 个分析结果创建PPTX")
             report_progress("准备", f"使用已有分析结果（{len(editable_images)} 页）", 10)
         else:
             if not image_paths:
                 raise ValueError("必须提供 image_paths 或 editable_images 之一")
             
-            total_pages = len(image_paths)
-            logger.info(f"开始使用递归分析方法创建可编辑PPTX，共 {total_pages} 页")
-            report_progress("开始", f"准备分析 {total_pages} 页幻灯片...", 0)
+            results = list(editable_images) if editable_images is not None else [None] * len(image_paths)
+            reused_count = len(image_paths) - len(pending)
+            total_pages = len(pending)
+            logger.info(f"开始使用递归分析方法创建可编辑PPTX，共 {len(image_paths)} 页，需分析 {total_pages} 页")
+            if reused_count:
+                report_progress("开始", f"复用 {reused_count} 页已有分析结果，准备分析 {total_pages} 页幻灯片...", 0)
+            else:
+                report_progress("开始", f"准备分析 {total_pages} 页幻灯片...", 0)
             
             # 1. 创建ImageEditabilityService（配置自动从 Flask config 获取，使用项目导出设置）
             logger.info(f"使用导出设置: extractor={export_extractor_method}, inpaint={export_inpaint_method}")
@@ -1227,15 +1329,13 @@ class ExportService:
             report_progress("版面分析", f"开始分析 {total_pages} 张图片（并发数: {max_workers}）...", 5)
             from concurrent.futures import ThreadPoolExecutor, as_completed
             
-            editable_images = []
             completed_count = 0
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
                 futures = {
-                    executor.submit(editability_service.make_image_editable, img_path): idx
-                    for idx, img_path in enumerate(image_paths)
+                    executor.submit(editability_service.make_image_editable, image_paths[idx]): idx
+                    for idx in pending
                 }
                 
-                results = [None] * len(image_paths)
                 for future in as_completed(futures):
                     idx = futures[future]
                     try:
@@ -1252,37 +1352,60 @@ class ExportService:
         
         # 2.5. 使用混合策略提取所有文本元素的样式（如果提供了提取器）
         # 混合策略：全局识别（粗体/斜体/下划线/对齐）+ 单个裁剪识别（颜色）
-        text_styles_cache = {}
-        if text_attribute_extractor:
+        text_styles_cache = dict(text_styles or {})
+        # 需要提取样式的页面：新分析的页面，以及没有任何已提取样式的页面
+        style_pages = [
+            idx for idx, img in enumerate(editable_images)
+            if idx in pending or (
+                ExportService._collect_text_elements_for_extraction(img.elements)
+                and not any(element_id in text_styles_cache for element_id in img.iter_element_ids())
+            )
+        ] if text_attribute_extractor else []
+        if style_pages:
             report_progress("样式提取", "开始提取文本样式（混合策略）...", 45)
             
             # 统计文本元素数量
             total_text_count = sum(
-                len(ExportService._collect_text_elements_for_extraction(img.elements))
-                for img in editable_images
+                len(ExportService._collect_text_elements_for_extraction(editable_images[idx].elements))
+                for idx in style_pages
             )
             
             if total_text_count > 0:
                 report_progress("样式提取", f"混合策略分析 {total_text_count} 个文本元素...", 50)
-                text_styles_cache, failed_extractions = ExportService._batch_extract_text_styles_hybrid(
-                    editable_images=editable_images,
+                extracted_styles, failed_extractions = ExportService._batch_extract_text_styles_hybrid(
+                    editable_images=[editable_images[idx] for idx in style_pages],
                     text_attribute_extractor=text_attribute_extractor,
                     max_workers=max_workers * 2,
                     fail_fast=fail_fast
                 )
                 
+                text_styles_cache.update(extracted_styles)
+                
                 # 记录样式提取失败的元素（详细）
                 for element_id, reason in failed_extractions:
                     warnings.add_style_extraction_failed(element_id, reason)
                 
                 # 记录汇总信息
-                extracted_count = len(text_styles_cache)
+                extracted_count = len(extracted_styles)
                 failed_count = len(failed_extractions)
                 if failed_count > 0:
                     logger.warning(f"样式提取: {failed_count}/{total_text_count} 个元素失败")
                 
                 report_progress("样式提取", f"✓ 完成 {extracted_count}/{total_text_count} 个文本样式提取（{failed_count} 个失败）", 70)
         
+        # 3. 回调保存新的分析结果
+        if on_page_analyzed:
+            for idx in sorted(set(pending) | set(style_pages)):
+                editable_img = editable_images[idx]
+                page_styles = {
+                    element_id: text_styles_cache[element_id]
+                    for element_id in editable_img.iter_element_ids() if element_id in text_styles_cache
+                }
+                try:
+                    on_page_analyzed(idx, editable_img, page_styles)
+                except Exception as e:
+                    logger.warning(f"分析结果回调失败（第 {idx + 1} 页）: {e}")
+        
         report_progress("构建PPTX", "开始构建可编辑PPTX文件...", 75)
         
         # 4. 创建PPTX构建器
@@ -3,7 +3,6 @@ File Parser Service - handles file parsing using MinerU service and image captio
 """
 import os
 import re
-import time
 import logging
 import zipfile
 import io
@@ -15,6 +14,7 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from PIL import Image
 from markitdown import MarkItDown
 from services.ai_providers.lazyllm_env import ensure_lazyllm_namespace_key, get_lazyllm_api_key
+from services.ai_providers.rate_limiter import get_rate_limiter
 from services.ai_providers.text import strip_think_tags
 
 logger = logging.getLogger(__name__)
@@ -142,13 +142,16 @@ class FileParserService:
         else:
             return bool(self._google_api_key)
     
-    def parse_file(self, file_path: str, filename: str) -> tuple[Optional[str], Optional[str], Optional[str], Optional[str], int]:
+    def parse_file(self, file_path: str, filename: str,
+                   use_cache: bool = True) -> tuple[Optional[str], Optional[str], Optional[str], Optional[str], int]:
         """
         Parse a file using MinerU service and enhance with image captions
         
         Args:
             file_path: Path to the file to parse
             filename: Original filename
+            use_cache: Reuse a previous MinerU result for identical file bytes
+                (services/mineru_cache.py); the batch_id is None on a cache hit
             
         Returns:
             Tuple of (batch_id, markdown_content, extract_id, error_message, failed_image_count)
@@ -172,6 +175,19 @@ class FileParserService:
                 return self._parse_spreadsheet_file(file_path, filename)
             
             # For other file types, use MinerU service
+            cache = cache_key = None
+            if use_cache:
+                from services.mineru_cache import get_mineru_cache
+                cache = get_mineru_cache()
+            if cache is not None:
+                from services.image_cache import hash_file
+                cache_key = cache.make_key(hash_file(file_path), 'document', self.mineru_model_version)
+                cached = cache.get(cache_key)
+                if cached and cached['markdown']:
+                    logger.info(f"File {filename} found in MinerU cache (extract {cached['extract_id']}), skipping upload")
+                    return self._enhance_markdown(None, cached['markdown'], cached['extract_id'],
+                                                  cache, cache_key, cached['captioned_markdown'])
+
             logger.info(f"File {filename} requires MinerU parsing...")
             
             # Step 1: Get upload URL
@@ -197,25 +213,37 @@ class FileParserService:
                 return batch_id, None, None, error, 0
             
             logger.info("File parsed successfully.")
+            if cache is not None and extract_id:
+                cache.put(cache_key, extract_id, markdown=markdown_content)
             
             # Step 4: Enhance markdown with image captions
-            if markdown_content and self._can_generate_captions():
-                logger.info("Step 4/4: Enhancing markdown with image captions...")
-                enhanced_content, failed_count = self._enhance_markdown_with_captions(markdown_content)
-                if failed_count > 0:
-                    logger.warning(f"Markdown enhanced with image captions, but {failed_count} images failed to generate captions.")
-                else:
-                    logger.info("Markdown enhanced with image captions (all images succeeded).")
-                return batch_id, enhanced_content, extract_id, None, failed_count
-            else:
-                logger.info("Skipping image caption enhancement (caption model unavailable).")
-                return batch_id, markdown_content, extract_id, None, 0
+            return self._enhance_markdown(batch_id, markdown_content, extract_id, cache, cache_key)
             
         except Exception as e:
             error_msg = f"Unexpected error during file parsing: {str(e)}"
             logger.error(error_msg, exc_info=True)
             return None, None, None, error_msg, 0
     
+    def _enhance_markdown(self, batch_id, markdown_content, extract_id, cache=None, cache_key=None,
+                          captioned_content=None):
+        """Step 4: add image captions (reusing cached captions when all of them succeeded before)"""
+        if not markdown_content or not self._can_generate_captions():
+            logger.info("Skipping image caption enhancement (caption model unavailable).")
+            return batch_id, markdown_content, extract_id, None, 0
+        if captioned_content:
+            logger.info("Using cached image captions.")
+            return batch_id, captioned_content, extract_id, None, 0
+
+        logger.info("Step 4/4: Enhancing markdown with image captions...")
+        enhanced_content, failed_count = self._enhance_markdown_with_captions(markdown_content)
+        if failed_count > 0:
+            logger.warning(f"Markdown enhanced with image captions, but {failed_count} images failed to generate captions.")
+        else:
+            logger.info("Markdown enhanced with image captions (all images succeeded).")
+            if cache is not None and extract_id:
+                cache.put(cache_key, extract_id, markdown=markdown_content, captioned_markdown=enhanced_content)
+        return batch_id, enhanced_content, extract_id, None, failed_count
+    
     def _parse_text_file(self, file_path: str, filename: str) -> tuple[Optional[str], Optional[str], Optional[str], Optional[str], int]:
         """
         Parse plain text file directly without MinerU
@@ -360,54 +388,34 @@ class FileParserService:
             return error_msg
     
     def _poll_result(self, batch_id: str, max_wait_time: int = 600) -> tuple[Optional[str], Optional[str], Optional[str]]:
-        """Poll for parsing result
+        """Wait for the parsing result (polled by the shared MinerU poller, services/mineru_poller.py)
         
         Returns:
             Tuple of (markdown_content, extract_id, error_message)
         """
+        from services.mineru_poller import MinerUPollError, get_mineru_poller
+
         headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.mineru_token}"
         }
         
         result_url = self.get_result_api_template.format(batch_id)
-        start_time = time.time()
+        future = get_mineru_poller().submit(result_url, headers, max_wait_time)
+        try:
+            extract_result = future.result()
+        except MinerUPollError as e:
+            error_msg = str(e)
+            logger.error(error_msg)
+            return None, None, error_msg
+        except Exception as e:
+            error_msg = f"Failed to query task status: {str(e)}"
+            logger.error(error_msg)
+            return None, None, error_msg
         
-        while True:
-            if time.time() - start_time > max_wait_time:
-                error_msg = f"Parsing timeout after {max_wait_time} seconds"
-                logger.error(error_msg)
-                return None, None, error_msg
-            
-            try:
-                response = requests.get(result_url, headers=headers, timeout=30)
-                response.raise_for_status()
-                task_info = response.json()
-                
-                if task_info.get("code") != 0:
-                    error_msg = f"Failed to query task status: {task_info.get('msg')}"
-                    logger.error(error_msg)
-                    return None, None, error_msg
-                
-                task_status = task_info["data"]["extract_result"][0]["state"]
-                
-                if task_status == "done":
-                    logger.info("File parsing completed!")
-                    full_zip_url = task_info["data"]["extract_result"][0]["full_zip_url"]
-                    # Download and extract markdown
-                    return self._download_markdown(full_zip_url)
-                elif task_status == "failed":
-                    err_msg = task_info["data"]["extract_result"][0].get("err_msg", "Unknown error")
-                    error_msg = f"File parsing failed: {err_msg}"
-                    logger.error(error_msg)
-                    return None, None, error_msg
-                else:
-                    logger.debug(f"Current task status: {task_status}, waiting...")
-                    time.sleep(2)  # Wait 2 seconds before next poll
-                    
-            except requests.exceptions.RequestException as e:
-                logger.warning(f"Network error while polling result: {str(e)}, retrying...")
-                time.sleep(2)
+        logger.info("File parsing completed!")
+        # Download and extract markdown
+        return self._download_markdown(extract_result["full_zip_url"])
     
     def _download_markdown(self, zip_url: str) -> tuple[Optional[str], Optional[str], Optional[str]]:
         """Download and extract markdown from result zip, save images to local server
@@ -446,6 +454,9 @@ class FileParserService:
                 # Extract all files
                 z.extractall(mineru_storage)
                 logger.info(f"Extracted {len(z.namelist())} files from ZIP")
+                # 建立文件名索引，后续图片查找（含前缀匹配）无需扫描目录
+                from utils.path_utils import build_extract_index
+                build_extract_index(mineru_storage)
                 
                 # Find markdown file (usually full.md or similar)
                 for name in z.namelist():
@@ -725,7 +736,9 @@ class FileParserService:
                 return ""
             
             # Generate caption based on provider format
+            # SDK 调用走共享的 'caption' 限流器，与 AIService 的 caption provider 共用并发与速率配额
             prompt = "请用一句简短的中文描述这张图片的主要内容。只返回描述文字，不要其他解释。"
+            limiter = get_rate_limiter('caption')
             
             if self._provider_format == 'openai':
                 # Use OpenAI SDK format
@@ -741,7 +754,8 @@ class FileParserService:
                 image.save(buffered, format="JPEG", quality=95)
                 base64_image = base64.b64encode(buffered.getvalue()).decode('utf-8')
                 
-                response = client.chat.completions.create(
+                response = limiter.call(
+                    client.chat.completions.create,
                     model=self._image_caption_model,
                     messages=[
                         {
@@ -762,7 +776,7 @@ class FileParserService:
                     temp_path = tmp.name
                 try:
                     image.save(temp_path)
-                    caption = client(prompt, lazyllm_files=[temp_path])
+                    caption = limiter.call(client, prompt, lazyllm_files=[temp_path])
                 finally:
                     try:
                         os.remove(temp_path)
@@ -776,7 +790,8 @@ class FileParserService:
                     logger.warning("Gemini client not initialized, skipping caption generation")
                     return ""
 
-                result = client.models.generate_content(
+                result = limiter.call(
+                    client.models.generate_content,
                     model=self._image_caption_model,
                     contents=[image, prompt],
                     config=types.GenerateContentConfig(
@@ -9,6 +9,7 @@ from werkzeug.utils import secure_filename
 from PIL import Image
 from models import Project
 from models import db
+from services.image_encoder import PREVIEW_FORMATS, get_image_encoder
 
 
 def convert_image_to_rgb(image: Image.Image) -> Image.Image:
@@ -157,14 +158,23 @@ class FileService:
 
         filepath = pages_dir / filename
 
-        # Save image - format is determined by file extension or explicitly specified
-        # Some PIL Image objects may not support format parameter, so we use extension
-        image.save(str(filepath))
+        # 编码在进程池中进行（IMAGE_ENCODE_PROCESSES），不占用请求/任务线程的 GIL
+        pil_format = 'JPEG' if ext in ('jpg', 'jpeg') else image_format.upper()
+        get_image_encoder().save(image, str(filepath), pil_format)
 
         # Return relative path
         return filepath.relative_to(self.upload_folder).as_posix()
 
-    def get_cached_image_path(self, project_id: str, page_id: str, version_number: int) -> str:
+    def get_generated_image_path(self, project_id: str, page_id: str, version_number: int,
+                                 image_format: str = 'PNG') -> str:
+        """
+        Relative path that save_generated_image writes for a version number
+        (e.g., "project_id/pages/page_id_v1.png"), known before the file exists
+        """
+        return f"{project_id}/pages/{page_id}_v{version_number}.{image_format.lower()}"
+
+    def get_cached_image_path(self, project_id: str, page_id: str, version_number: int,
+                              extension: str = None) -> str:
         """
         Generate the relative path for a cached thumbnail image.
 
@@ -175,25 +185,40 @@ class FileService:
             project_id: Project ID
             page_id: Page ID
             version_number: Version number
+            extension: Preview extension, defaults to the configured IMAGE_PREVIEW_FORMAT
 
         Returns:
             Relative file path from upload folder (e.g., "project_id/pages/page_id_v1_thumb.jpg")
         """
-        filename = f"{page_id}_v{version_number}_thumb.jpg"
+        extension = extension or get_image_encoder().preview_extension
+        filename = f"{page_id}_v{version_number}_thumb.{extension}"
         return f"{project_id}/pages/{filename}"
 
+    def find_cached_image_path(self, project_id: str, page_id: str, version_number: int) -> Optional[str]:
+        """
+        Find an existing cached thumbnail for a version in any preview format
+        (IMAGE_PREVIEW_FORMAT may have changed since the version was generated)
+        """
+        extensions = [get_image_encoder().preview_extension]
+        extensions += [ext for _, ext, _ in PREVIEW_FORMATS.values() if ext not in extensions]
+        for extension in extensions:
+            relative_path = self.get_cached_image_path(project_id, page_id, version_number, extension)
+            if self.file_exists(relative_path):
+                return relative_path
+        return None
+
     def save_cached_image(self, image: Image.Image, project_id: str,
                          page_id: str, version_number: int,
                          quality: int = 85, max_width: int = 1920) -> str:
         """
-        Save compressed JPG thumbnail for faster frontend loading
+        Save compressed thumbnail (JPEG by default, or IMAGE_PREVIEW_FORMAT) for faster frontend loading
 
         Args:
             image: PIL Image object
             project_id: Project ID
             page_id: Page ID
             version_number: Version number
-            quality: JPEG quality (1-100), default 85
+            quality: Preview quality (1-100), default 85
             max_width: Maximum thumbnail width in pixels (default 1920)
 
         Returns:
@@ -206,14 +231,8 @@ class FileService:
         filename = Path(relative_path).name
         filepath = pages_dir / filename
 
-        # Resize image if too large (for faster loading)
-        image = resize_image_for_thumbnail(image, max_width)
-
-        # Convert to RGB using shared function
-        image = convert_image_to_rgb(image)
-
-        # Save as compressed JPEG
-        image.save(str(filepath), 'JPEG', quality=quality, optimize=True)
+        # Resize (if too large) + convert to RGB + compress, in the encoder process pool
+        get_image_encoder().save_preview(image, str(filepath), quality=quality, max_width=max_width)
 
         # Return relative path
         return relative_path
@@ -271,11 +290,12 @@ class FileService:
             filepath.unlink()
             deleted = True
 
-        # Also delete corresponding cache file (_thumb.jpg)
+        # Also delete corresponding cache file (_thumb.jpg / .webp / .avif)
         # e.g., xxx_v1.png -> xxx_v1_thumb.jpg
-        cache_filepath = filepath.parent / f"{filepath.stem}_thumb.jpg"
-        if cache_filepath.exists() and cache_filepath.is_file():
-            cache_filepath.unlink()
+        for _, extension, _ in PREVIEW_FORMATS.values():
+            cache_filepath = filepath.parent / f"{filepath.stem}_thumb.{extension}"
+            if cache_filepath.exists() and cache_filepath.is_file():
+                cache_filepath.unlink()
 
         return deleted
     
@@ -0,0 +1,207 @@
+"""
+Image Cache - content-addressed on-disk cache for generated slide images
+
+Key = sha256(provider, model, prompt, reference image bytes, aspect_ratio,
+resolution, thinking settings). A hit returns the stored PNG in milliseconds
+instead of calling the image provider again (e.g. re-running "generate all"
+after a partial failure). Entries are evicted LRU once the total size exceeds
+the configured limit.
+
+Opt-in via IMAGE_CACHE_ENABLED=true.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """sha256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_image(image: Image.Image) -> str:
+    """sha256 of decoded pixel data (for images that have no backing file)"""
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.size}".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class ImageCacheStats:
+    """Thread-safe hit/miss counter for one task"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def to_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+class ImageCache:
+    """LRU (by total bytes) content-addressed PNG cache"""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2 * 1024 ** 3):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional[OrderedDict] = None  # key -> size，按最近访问排序
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(provider: str, model: str, prompt: str, ref_digests: Iterable[str],
+                 aspect_ratio: str, resolution: str, **extra: Any) -> str:
+        """Build the cache key from everything that influences the generated image"""
+        digest = hashlib.sha256()
+        parts = [provider or '', model or '', aspect_ratio or '', resolution or '']
+        parts += [f"{k}={extra[k]}" for k in sorted(extra)]
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(prompt.encode('utf-8'))
+        for ref in ref_digests:
+            digest.update(b'\0ref:')
+            digest.update(ref.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path_for(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.png"
+
+    def _load_index(self):
+        """Scan the cache directory once, ordering entries by mtime (caller holds the lock)"""
+        if self._index is not None:
+            return
+        entries = []
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob('*/*.png'):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, path.stem, stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, size) for _mtime, key, size in entries)
+        self._total_bytes = sum(size for _mtime, _key, size in entries)
+
+    def get(self, key: str) -> Optional[Image.Image]:
+        """Return the cached image or None"""
+        path = self._path_for(key)
+        with self._lock:
+            self._load_index()
+        try:
+            image = Image.open(path)
+            image.load()
+        except (FileNotFoundError, OSError):
+            with self._lock:
+                self.misses += 1
+                size = self._index.pop(key, None)
+                if size:
+                    self._total_bytes -= size
+            return None
+
+        with self._lock:
+            self.hits += 1
+            if key in self._index:
+                self._index.move_to_end(key)
+        try:
+            os.utime(path)  # 持久化访问时间，重启后仍按 LRU 顺序淘汰
+        except OSError:
+            pass
+        return image
+
+    def put(self, key: str, image: Image.Image):
+        """Store an image (atomic write) and evict least recently used entries"""
+        path = self._path_for(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    image.save(f, format='PNG', compress_level=1)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            size = path.stat().st_size
+        except Exception as e:
+            logger.warning(f"Failed to write image cache entry {key[:12]}: {e}")
+            return
+
+        with self._lock:
+            self._load_index()
+            old_size = self._index.pop(key, 0)
+            self._index[key] = size
+            self._total_bytes += size - old_size
+            self._evict()
+
+    def _evict(self):
+        """Remove least recently used entries until under max_bytes (caller holds the lock)"""
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                self._path_for(key).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to evict image cache entry {key[:12]}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._load_index()
+            return {
+                'entries': len(self._index),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_image_cache: Optional[ImageCache] = None
+_image_cache_lock = threading.Lock()
+
+
+def get_image_cache() -> Optional[ImageCache]:
+    """Return the process-wide image cache, or None when IMAGE_CACHE_ENABLED is off"""
+    global _image_cache
+    from config import get_setting
+
+    enabled = get_setting('IMAGE_CACHE_ENABLED')
+    if not enabled:
+        return None
+
+    with _image_cache_lock:
+        if _image_cache is None:
+            cache_dir = get_setting('IMAGE_CACHE_DIR') or os.path.join(
+                get_setting('UPLOAD_FOLDER'), '.cache', 'images'
+            )
+            max_bytes = int(get_setting('IMAGE_CACHE_MAX_MB')) * 1024 * 1024
+            _image_cache = ImageCache(cache_dir, max_bytes=max_bytes)
+            logger.info(f"Image cache enabled at {cache_dir} (max {max_bytes // (1024 * 1024)} MB)")
+        return _image_cache
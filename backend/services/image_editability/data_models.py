@@ -38,6 +38,11 @@ class BBox:
             'y1': self.y1
         }
     
+    @classmethod
+    def from_dict(cls, data: Dict[str, float]) -> 'BBox':
+        """从字典创建实例"""
+        return cls(x0=data['x0'], y0=data['y0'], x1=data['x1'], y1=data['y1'])
+    
     def scale(self, scale_x: float, scale_y: float) -> 'BBox':
         """缩放bbox"""
         return BBox(
@@ -90,6 +95,29 @@ class EditableElement:
             'children': [child.to_dict() for child in self.children]
         }
         return result
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EditableElement':
+        """从字典创建实例（to_dict 的逆操作）"""
+        return cls(
+            element_id=data['element_id'],
+            element_type=data['element_type'],
+            bbox=BBox.from_dict(data['bbox']),
+            bbox_global=BBox.from_dict(data['bbox_global']),
+            content=data.get('content'),
+            image_path=data.get('image_path'),
+            children=[cls.from_dict(child) for child in data.get('children', [])],
+            inpainted_background_path=data.get('inpainted_background_path'),
+            metadata=data.get('metadata') or {}
+        )
+    
+    def iter_files(self):
+        """本元素及所有子元素引用的文件路径"""
+        for path in (self.image_path, self.inpainted_background_path):
+            if path:
+                yield path
+        for child in self.children:
+            yield from child.iter_files()
 
 
 @dataclass
@@ -128,4 +156,35 @@ class EditableImage:
             'parent_id': self.parent_id,
             'metadata': self.metadata
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EditableImage':
+        """从字典创建实例（to_dict 的逆操作）"""
+        return cls(
+            image_id=data['image_id'],
+            image_path=data['image_path'],
+            width=data['width'],
+            height=data['height'],
+            elements=[EditableElement.from_dict(elem) for elem in data.get('elements', [])],
+            clean_background=data.get('clean_background'),
+            depth=data.get('depth', 0),
+            parent_id=data.get('parent_id'),
+            metadata=data.get('metadata') or {}
+        )
+    
+    def iter_files(self):
+        """原图、背景图及所有元素引用的文件路径"""
+        yield self.image_path
+        if self.clean_background:
+            yield self.clean_background
+        for elem in self.elements:
+            yield from elem.iter_files()
+    
+    def iter_element_ids(self):
+        """所有元素（含子元素）的 element_id"""
+        stack = list(self.elements)
+        while stack:
+            elem = stack.pop()
+            yield elem.element_id
+            stack.extend(elem.children)
 
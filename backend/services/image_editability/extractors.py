@@ -157,17 +157,18 @@ class MinerUElementExtractor(ElementExtractor):
         img = Image.open(image_path)
         image_size = img.size  # (width, height)
 
-        # 1. 检查缓存
-        cached_dir = self._find_cache(image_path)
+        # 1. 检查缓存（按图片内容哈希）
+        cache_key = self._cache_key(image_path)
+        cached_dir = self._find_cache(cache_key)
         if cached_dir:
-            logger.info(f"{'  ' * depth}使用MinerU缓存")
+            logger.info(f"{'  ' * depth}使用MinerU缓存: {cached_dir}")
             mineru_result_dir = cached_dir
-            parse_error = None
         else:
             # 2. 解析图片
             mineru_result_dir, parse_error = self._parse_image(image_path, depth)
             if not mineru_result_dir:
                 return ExtractionResult(elements=[], error=parse_error)
+            self._store_cache(cache_key, mineru_result_dir)
 
         # 3. 提取元素
         elements = self._extract_from_result(
@@ -184,26 +185,43 @@ class MinerUElementExtractor(ElementExtractor):
 
         return ExtractionResult(elements=elements, context=context)
     
-    def _find_cache(self, image_path: str) -> Optional[str]:
-        """查找缓存的MinerU结果"""
+    def _cache_key(self, image_path: str) -> Optional[str]:
+        """缓存键：图片字节的 sha256 + MinerU 模型版本（缓存关闭时为 None）"""
+        from services.image_cache import hash_file
+        from services.mineru_cache import get_mineru_cache
+
+        cache = get_mineru_cache()
+        if cache is None:
+            return None
         try:
-            import hashlib
-            import time
-            
-            img_path = Path(image_path)
-            if not img_path.exists():
-                return None
-            
-            mineru_files_dir = self._upload_folder / 'mineru_files'
-            if not mineru_files_dir.exists():
-                return None
-            
-            # 简单策略：不使用缓存（更安全）
+            model_version = getattr(self._parser_service, 'mineru_model_version', '')
+            return cache.make_key(hash_file(image_path), 'layout', model_version)
+        except OSError as e:
+            logger.debug(f"计算缓存键失败: {e}")
             return None
-            
-        except Exception as e:
-            logger.debug(f"查找缓存失败: {e}")
+
+    def _find_cache(self, cache_key: Optional[str]) -> Optional[str]:
+        """查找缓存的MinerU结果（目录完整且包含 layout.json 才算命中）"""
+        from services.mineru_cache import get_mineru_cache
+
+        cache = get_mineru_cache()
+        if cache is None or cache_key is None:
             return None
+        entry = cache.get(cache_key, required_files=('layout.json',))
+        return entry['result_dir'] if entry else None
+
+    def _store_cache(self, cache_key: Optional[str], mineru_result_dir: str):
+        """记录解析结果；该目录仅供版面分析使用，淘汰时一并删除"""
+        from services.mineru_cache import get_mineru_cache
+
+        cache = get_mineru_cache()
+        if cache is None or cache_key is None:
+            return
+        result_dir = Path(mineru_result_dir)
+        if result_dir.parent.resolve() != cache.mineru_root.resolve():
+            logger.debug(f"MinerU结果目录不在缓存根目录下，跳过缓存: {result_dir}")
+            return
+        cache.put(cache_key, result_dir.name, owned=True)
     
     def _parse_image(self, image_path: str, depth: int) -> Tuple[Optional[str], Optional[str]]:
         """解析图片，返回MinerU结果目录和错误信息
@@ -223,7 +241,7 @@ class MinerUElementExtractor(ElementExtractor):
             # 调用MinerU解析
             image_id = str(uuid.uuid4())[:8]
             batch_id, markdown_content, extract_id, error_message, failed_image_count = \
-                self._parser_service.parse_file(pdf_path, f"image_{image_id}.pdf")
+                self._parser_service.parse_file(pdf_path, f"image_{image_id}.pdf", use_cache=False)
 
             if error_message or not extract_id:
                 logger.error(f"{'  ' * depth}MinerU解析失败: {error_message}")
@@ -0,0 +1,164 @@
+"""
+Image Encoder - PNG / preview encoding off the request and worker threads
+
+Saving a 2K/4K PNG and building the JPEG preview (resize + RGB convert +
+optimize) holds the GIL for hundreds of milliseconds per image, which stalls
+Flask request threads while a bulk generation is running. The encoder ships
+the raw pixel buffer to a ``ProcessPoolExecutor`` and returns the written
+path; PIL work then happens in other processes.
+
+- IMAGE_ENCODE_PROCESSES: pool size (0 = encode inline in the calling thread)
+- PNG_COMPRESS_LEVEL: zlib level for full-size PNGs (0-9)
+- IMAGE_PREVIEW_FORMAT: jpeg | webp | avif for cached previews (falls back
+  to jpeg if this Pillow build cannot write the format)
+"""
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from PIL import Image, features
+
+logger = logging.getLogger(__name__)
+
+# name -> (PIL format, file extension, feature name used by PIL.features)
+PREVIEW_FORMATS = {
+    'jpeg': ('JPEG', 'jpg', None),
+    'webp': ('WEBP', 'webp', 'webp'),
+    'avif': ('AVIF', 'avif', 'avif'),
+}
+
+_RAW_MODES = ('RGB', 'RGBA', 'L', 'LA')
+
+
+def _encode(buffer: bytes, mode: str, size, path: str, pil_format: str,
+            save_kwargs: Dict[str, Any], max_width: Optional[int], flatten: bool) -> str:
+    """Decode a raw buffer, optionally resize/flatten, and write atomically (runs in a worker process)"""
+    from services.file_service import convert_image_to_rgb, resize_image_for_thumbnail
+
+    image = Image.frombytes(mode, size, buffer)
+    if max_width:
+        image = resize_image_for_thumbnail(image, max_width)
+    if flatten:
+        image = convert_image_to_rgb(image)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        image.save(tmp_path, pil_format, **save_kwargs)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+class ImageEncoder:
+    """Encode PIL images to disk in a process pool"""
+
+    def __init__(self, processes: int = 2, png_compress_level: int = 6,
+                 preview_format: str = 'jpeg', start_method: str = 'spawn'):
+        self.processes = max(0, processes)
+        self.png_compress_level = min(9, max(0, png_compress_level))
+        self.start_method = start_method
+        self.preview_format = self._resolve_preview_format(preview_format)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _resolve_preview_format(name: str) -> str:
+        name = (name or 'jpeg').lower()
+        if name == 'jpg':
+            name = 'jpeg'
+        if name not in PREVIEW_FORMATS:
+            logger.warning(f"Unknown IMAGE_PREVIEW_FORMAT '{name}', using jpeg")
+            return 'jpeg'
+        feature = PREVIEW_FORMATS[name][2]
+        if feature and not features.check(feature):
+            logger.warning(f"Pillow has no {name} support, falling back to jpeg previews")
+            return 'jpeg'
+        return name
+
+    @property
+    def preview_extension(self) -> str:
+        return PREVIEW_FORMATS[self.preview_format][1]
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.processes <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # spawn：Web/任务进程是多线程的，fork 可能继承到被其他线程持有的锁
+                context = multiprocessing.get_context(self.start_method)
+                self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=context)
+            return self._executor
+
+    def _run(self, image: Image.Image, path: str, pil_format: str, save_kwargs: Dict[str, Any],
+             max_width: Optional[int] = None, flatten: bool = False) -> str:
+        """Encode in the pool (or inline when disabled / the pool is broken) and wait for the result"""
+        if image.mode not in _RAW_MODES:
+            # P / CMYK 等模式无法仅凭像素缓冲区还原，先转换
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode == 'PA' else 'RGB')
+        args = (image.tobytes(), image.mode, image.size, path, pil_format, save_kwargs, max_width, flatten)
+
+        executor = self._get_executor()
+        if executor is not None:
+            try:
+                return executor.submit(_encode, *args).result()
+            except (BrokenProcessPool, RuntimeError) as e:
+                # 子进程崩溃或池已关闭：丢弃旧池（下次调用重建），本次改为当前线程编码
+                logger.warning(f"Image encode pool unavailable ({e}), encoding inline")
+                with self._lock:
+                    if self._executor is executor:
+                        self._executor = None
+        return _encode(*args)
+
+    def save_png(self, image: Image.Image, path: str) -> str:
+        """Write a full-size PNG and return ``path``"""
+        return self._run(image, path, 'PNG', {'compress_level': self.png_compress_level})
+
+    def save(self, image: Image.Image, path: str, pil_format: str) -> str:
+        """Write an image in any PIL format (PNG uses the configured compression level)"""
+        if pil_format.upper() == 'PNG':
+            return self.save_png(image, path)
+        return self._run(image, path, pil_format.upper(), {})
+
+    def save_preview(self, image: Image.Image, path: str, quality: int = 85,
+                     max_width: Optional[int] = 1920) -> str:
+        """Resize, flatten to RGB and write a compressed preview in the configured format"""
+        pil_format = PREVIEW_FORMATS[self.preview_format][0]
+        if pil_format == 'JPEG':
+            save_kwargs = {'quality': quality, 'optimize': True}
+        elif pil_format == 'WEBP':
+            save_kwargs = {'quality': quality, 'method': 4}
+        else:
+            save_kwargs = {'quality': quality}
+        return self._run(image, path, pil_format, save_kwargs, max_width=max_width, flatten=True)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+_image_encoder: Optional[ImageEncoder] = None
+_image_encoder_lock = threading.Lock()
+
+
+def get_image_encoder() -> ImageEncoder:
+    """Return the process-wide encoder configured from app config / Config"""
+    global _image_encoder
+    with _image_encoder_lock:
+        if _image_encoder is None:
+            from config import get_setting
+            _image_encoder = ImageEncoder(
+                processes=int(get_setting('IMAGE_ENCODE_PROCESSES')),
+                png_compress_level=int(get_setting('PNG_COMPRESS_LEVEL')),
+                preview_format=get_setting('IMAGE_PREVIEW_FORMAT'),
+            )
+            atexit.register(_image_encoder.shutdown, False)
+        return _image_encoder
@@ -0,0 +1,243 @@
+"""
+MinerU Cache - reuse MinerU parse results for identical input bytes
+
+A MinerU round trip (request upload URL, upload, poll up to 10 minutes,
+download and unpack the result ZIP) is by far the slowest step of both
+reference-file parsing and editable-PPTX export, where every slide image is
+analysed again on each export. Results are keyed by sha256 of the input bytes
+(+ kind + MinerU model version); the manifest maps a key to the ``extract_id``
+of the unpacked result directory under ``uploads/mineru_files`` and the
+parsed markdown.
+
+- integrity: the manifest records the file count and total size of the
+  result directory; an entry whose directory is missing or changed (or lacks
+  a required file such as ``layout.json``) is dropped and counts as a miss
+- age eviction: entries unused for MINERU_CACHE_TTL_DAYS are removed
+- size eviction: least recently used entries are removed once the result
+  directories exceed MINERU_CACHE_MAX_MB
+- only directories the cache owns (slide layout analysis) are deleted on
+  eviction; reference-file results stay on disk because parsed markdown
+  links to their images
+
+The manifest is a small standalone SQLite database (like services/text_cache.py).
+"""
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mineru_cache (
+    key TEXT PRIMARY KEY,
+    extract_id TEXT NOT NULL,
+    markdown TEXT,
+    captioned_markdown TEXT,
+    owned INTEGER NOT NULL DEFAULT 0,
+    file_count INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_mineru_cache_accessed_at ON mineru_cache (accessed_at);
+"""
+
+
+def _dir_fingerprint(path: Path) -> Tuple[int, int]:
+    """(file count, total bytes) of a result directory"""
+    count = total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            count += 1
+            total += os.path.getsize(os.path.join(root, name))
+    return count, total
+
+
+class MinerUCache:
+    """SQLite manifest of MinerU result directories, with age and LRU size eviction"""
+
+    def __init__(self, db_path: str, mineru_root: str, ttl_seconds: float = 30 * 24 * 3600,
+                 max_bytes: int = 2 * 1024 ** 3):
+        self.db_path = db_path
+        self.mineru_root = Path(mineru_root)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(content_hash: str, kind: str, model_version: str = '') -> str:
+        """kind: 'document' (parse_file) or 'layout' (slide image analysis)"""
+        digest = hashlib.sha256()
+        for part in (kind, model_version or ''):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(content_hash.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the connection lazily (caller holds the lock)"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def result_dir(self, extract_id: str) -> Path:
+        return self.mineru_root / extract_id
+
+    def get(self, key: str, required_files: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+        """
+        Return ``{'extract_id', 'result_dir', 'markdown', 'captioned_markdown'}``,
+        or None if missing, expired or failing the integrity check.
+        """
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    'SELECT extract_id, markdown, captioned_markdown, owned, file_count, size, accessed_at '
+                    'FROM mineru_cache WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                extract_id, markdown, captioned, owned, file_count, size, accessed_at = row
+                result_dir = self.result_dir(extract_id)
+                reason = None
+                if self.ttl_seconds > 0 and now - accessed_at > self.ttl_seconds:
+                    reason = 'expired'
+                elif not result_dir.is_dir():
+                    reason = 'result directory missing'
+                elif _dir_fingerprint(result_dir) != (file_count, size):
+                    reason = 'result directory changed'
+                elif any(not (result_dir / name).exists() for name in required_files):
+                    reason = 'required file missing'
+                if reason:
+                    logger.info(f"Dropping MinerU cache entry {extract_id}: {reason}")
+                    self._delete(conn, [(key, extract_id, owned)])
+                    conn.commit()
+                    self.misses += 1
+                    return None
+                conn.execute('UPDATE mineru_cache SET accessed_at = ? WHERE key = ?', (now, key))
+                conn.commit()
+                self.hits += 1
+                return {
+                    'extract_id': extract_id,
+                    'result_dir': str(result_dir),
+                    'markdown': markdown,
+                    'captioned_markdown': captioned,
+                }
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"MinerU cache lookup failed: {e}")
+            return None
+
+    def put(self, key: str, extract_id: str, markdown: Optional[str] = None,
+            captioned_markdown: Optional[str] = None, owned: bool = False):
+        """
+        Record a result directory and evict stale / least recently used entries.
+
+        ``owned``: the directory exists only for this entry and is deleted on eviction.
+        """
+        now = time.time()
+        try:
+            file_count, size = _dir_fingerprint(self.result_dir(extract_id))
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    'INSERT OR REPLACE INTO mineru_cache (key, extract_id, markdown, captioned_markdown, owned, '
+                    'file_count, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (key, extract_id, markdown, captioned_markdown, int(owned), file_count, size, now, now)
+                )
+                self._evict(conn, now)
+                conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"MinerU cache write failed: {e}")
+
+    def _delete(self, conn: sqlite3.Connection, rows):
+        """Remove entries, and the result directories they own (caller holds the lock)"""
+        conn.executemany('DELETE FROM mineru_cache WHERE key = ?', [(key,) for key, _, _ in rows])
+        for _, extract_id, owned in rows:
+            if owned:
+                shutil.rmtree(self.result_dir(extract_id), ignore_errors=True)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop entries unused for ttl_seconds, then LRU entries until under max_bytes (caller holds the lock)"""
+        if self.ttl_seconds > 0:
+            self._delete(conn, conn.execute(
+                'SELECT key, extract_id, owned FROM mineru_cache WHERE accessed_at < ?',
+                (now - self.ttl_seconds,)
+            ).fetchall())
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM mineru_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        doomed = []
+        for key, extract_id, owned, size in conn.execute(
+                'SELECT key, extract_id, owned, size FROM mineru_cache ORDER BY accessed_at'):
+            if freed >= excess:
+                break
+            doomed.append((key, extract_id, owned))
+            freed += size
+        self._delete(conn, doomed)
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            self._delete(conn, conn.execute('SELECT key, extract_id, owned FROM mineru_cache').fetchall())
+            conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            conn = self._connect()
+            entries, total = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM mineru_cache'
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'total_bytes': total,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+_mineru_cache: Optional[MinerUCache] = None
+_mineru_cache_lock = threading.Lock()
+
+
+def get_mineru_cache() -> Optional[MinerUCache]:
+    """Return the process-wide MinerU cache, or None when MINERU_CACHE_ENABLED is off"""
+    global _mineru_cache
+    from config import get_setting, BASE_DIR
+
+    if not get_setting('MINERU_CACHE_ENABLED'):
+        return None
+
+    with _mineru_cache_lock:
+        if _mineru_cache is None:
+            db_path = get_setting('MINERU_CACHE_PATH') or os.path.join(
+                BASE_DIR, 'instance', 'mineru_cache.db'
+            )
+            mineru_root = os.path.join(get_setting('UPLOAD_FOLDER'), 'mineru_files')
+            ttl_days = float(get_setting('MINERU_CACHE_TTL_DAYS'))
+            max_mb = int(get_setting('MINERU_CACHE_MAX_MB'))
+            _mineru_cache = MinerUCache(db_path, mineru_root, ttl_seconds=ttl_days * 24 * 3600,
+                                        max_bytes=max_mb * 1024 * 1024)
+            logger.info(f"MinerU cache enabled at {db_path} (ttl {ttl_days}d, max {max_mb} MB)")
+        return _mineru_cache
@@ -0,0 +1,163 @@
+"""
+MinerU Poller - one asyncio event loop polls every outstanding MinerU batch
+
+A MinerU parse is batch based: ``_get_upload_url`` returns a ``batch_id``,
+the file is uploaded, and the batch result endpoint is polled until its
+state is ``done`` or ``failed``. Previously each parse polled in its own
+``while True`` / ``time.sleep(2)`` loop. An editable export with 8 workers
+and nested recursion therefore had dozens of threads each issuing their own
+HTTP polls.
+
+``MinerUPoller`` runs a single daemon thread with an asyncio loop and a
+shared ``httpx.AsyncClient``. Each submitted batch is one coroutine, not a
+thread. The batch resolves a ``concurrent.futures.Future`` with its
+``extract_result`` entry, or fails it with ``MinerUPollError``.
+
+Adaptive intervals: a batch is polled every ``min_interval`` seconds while
+its state or page progress changes. While nothing changes, the interval
+grows by ``BACKOFF`` up to ``max_interval``. A long queue wait therefore
+costs a few requests rather than one every 2 seconds.
+"""
+import asyncio
+import atexit
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+BACKOFF = 1.5
+
+
+class MinerUPollError(Exception):
+    """The batch failed, timed out or its status could not be queried"""
+
+
+class MinerUPoller:
+    """Shared asyncio poller for MinerU batch results"""
+
+    def __init__(self, min_interval: float = 1.0, max_interval: float = 10.0,
+                 request_timeout: float = 30.0, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.request_timeout = request_timeout
+        self._transport = transport
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._outstanding = 0
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'timeouts': 0, 'polls': 0, 'poll_errors': 0}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the poller thread lazily (caller holds the lock)"""
+        if self._loop is None:
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=loop.run_forever, name='mineru-poller', daemon=True)
+            self._thread.start()
+            self._loop = loop
+        return self._loop
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared client, created on the loop thread"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.request_timeout, transport=self._transport)
+        return self._client
+
+    def submit(self, result_url: str, headers: Dict[str, str], max_wait_time: float = 600) -> Future:
+        """Poll ``result_url`` until the batch finishes; returns a Future of its ``extract_result`` entry"""
+        with self._lock:
+            loop = self._ensure_loop()
+            self._outstanding += 1
+            self._stats['submitted'] += 1
+        return asyncio.run_coroutine_threadsafe(self._watch(result_url, headers, max_wait_time), loop)
+
+    async def _watch(self, result_url: str, headers: Dict[str, str], max_wait_time: float) -> Dict[str, Any]:
+        deadline = time.monotonic() + max_wait_time
+        interval = self.min_interval
+        last_seen = None
+        outcome = 'failed'
+        try:
+            while True:
+                if time.monotonic() > deadline:
+                    outcome = 'timeouts'
+                    raise MinerUPollError(f"Parsing timeout after {max_wait_time} seconds")
+                try:
+                    self._count('polls')
+                    response = await self._get_client().get(result_url, headers=headers)
+                    response.raise_for_status()
+                    task_info = response.json()
+                except (httpx.HTTPError, ValueError) as e:
+                    self._count('poll_errors')
+                    logger.warning(f"Network error while polling result: {str(e)}, retrying...")
+                    await asyncio.sleep(min(interval, max(deadline - time.monotonic(), 0)))
+                    interval = min(interval * BACKOFF, self.max_interval)
+                    continue
+
+                if task_info.get("code") != 0:
+                    raise MinerUPollError(f"Failed to query task status: {task_info.get('msg')}")
+                extract_result = task_info["data"]["extract_result"][0]
+                state = extract_result["state"]
+                if state == "done":
+                    outcome = 'completed'
+                    return extract_result
+                if state == "failed":
+                    raise MinerUPollError(f"File parsing failed: {extract_result.get('err_msg', 'Unknown error')}")
+
+                # 状态或页数进度有变化时保持最短间隔，否则逐步拉长
+                seen = (state, (extract_result.get("extract_progress") or {}).get("extracted_pages"))
+                interval = self.min_interval if seen != last_seen else min(interval * BACKOFF, self.max_interval)
+                last_seen = seen
+                logger.debug(f"Current task status: {state}, next poll in {interval:.1f}s")
+                await asyncio.sleep(min(interval, max(deadline - time.monotonic(), 0)))
+        finally:
+            with self._lock:
+                self._outstanding -= 1
+                self._stats[outcome] += 1
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def shutdown(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result(timeout=5)
+            self._client = None
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout=5)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'outstanding': self._outstanding,
+                'running': self._loop is not None,
+                'min_interval': self.min_interval,
+                'max_interval': self.max_interval,
+                **self._stats,
+            }
+
+
+_mineru_poller: Optional[MinerUPoller] = None
+_mineru_poller_lock = threading.Lock()
+
+
+def get_mineru_poller() -> MinerUPoller:
+    """Return the process-wide poller configured from app config / Config"""
+    global _mineru_poller
+    with _mineru_poller_lock:
+        if _mineru_poller is None:
+            from config import get_setting
+            _mineru_poller = MinerUPoller(
+                min_interval=float(get_setting('MINERU_POLL_MIN_INTERVAL')),
+                max_interval=float(get_setting('MINERU_POLL_MAX_INTERVAL')),
+            )
+            atexit.register(_mineru_poller.shutdown)
+        return _mineru_poller
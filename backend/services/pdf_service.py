@@ -1,13 +1,167 @@
 """
-PDF Service - PDF splitting utilities using PyPDF2
+PDF Service - PDF splitting / rasterization using PyMuPDF
+
+- ``iter_split_pdf`` writes single-page PDFs, ``iter_render_pdf`` renders
+  pages straight to PNG at a target DPI
+- Both yield ``(page_index, path)`` as soon as each page is written, so
+  callers can hand pages to their workers while the rest of the document
+  is still being processed
+- Pages are processed in chunks in a ``ProcessPoolExecutor``
+  (PDF_SPLIT_PROCESSES, 0 = in the calling thread); each chunk opens the
+  source document once, instead of re-reading shared resources per page
+- Single-page PDFs are garbage-collected on save so each file only carries
+  the fonts / images its page uses
 """
+import atexit
 import logging
+import multiprocessing
 import os
-from typing import List
-from PyPDF2 import PdfReader, PdfWriter
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
 
 logger = logging.getLogger(__name__)
 
+# 少于该页数时直接在当前线程处理（进程间传递的开销大于收益）
+MIN_PAGES_FOR_POOL = 8
+# 每个进程任务处理的页数：越小首页越早可用，越大源文件重复打开次数越少
+PAGES_PER_CHUNK = 4
+
+
+def get_pdf_info(pdf_path: str) -> Tuple[int, Optional[Tuple[float, float]]]:
+    """(page count, (width, height) of the first page in points or None)"""
+    with fitz.open(pdf_path) as doc:
+        if doc.page_count == 0:
+            return 0, None
+        rect = doc[0].rect
+        return doc.page_count, (rect.width, rect.height)
+
+
+def _process_pages(pdf_path: str, indices: List[int], output_dir: str,
+                   dpi: Optional[int], name_pattern: str) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    """
+    Split (dpi is None) or render the given pages of one document (runs in a worker process).
+
+    Returns [(index, path or None, error or None)].
+    """
+    results = []
+    with fitz.open(pdf_path) as src:
+        for i in indices:
+            path = os.path.join(output_dir, name_pattern.format(n=i + 1))
+            try:
+                if dpi is None:
+                    with fitz.open() as out:
+                        out.insert_pdf(src, from_page=i, to_page=i)
+                        out.save(path, garbage=3, deflate=True)
+                else:
+                    src[i].get_pixmap(dpi=dpi).save(path)
+                results.append((i, path, None))
+            except Exception as e:
+                results.append((i, None, str(e)))
+    return results
+
+
+class PdfSplitter:
+    """Split / rasterize PDF pages in a process pool"""
+
+    def __init__(self, processes: int = 2, start_method: str = 'spawn'):
+        self.processes = max(0, processes)
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.processes <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # spawn：任务进程是多线程的，fork 可能继承到被其他线程持有的锁
+                context = multiprocessing.get_context(self.start_method)
+                self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=context)
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+    def iter_pages(self, pdf_path: str, output_dir: str, dpi: Optional[int],
+                   name_pattern: str) -> Iterator[Tuple[int, Optional[str], Optional[str]]]:
+        """Yield (index, path, error) in completion order"""
+        os.makedirs(output_dir, exist_ok=True)
+        page_count, _ = get_pdf_info(pdf_path)
+        pending = list(range(page_count))
+
+        executor = self._get_executor() if page_count >= MIN_PAGES_FOR_POOL else None
+        if executor is not None:
+            chunks = [pending[i:i + PAGES_PER_CHUNK] for i in range(0, page_count, PAGES_PER_CHUNK)]
+            done = set()
+            try:
+                futures = [executor.submit(_process_pages, pdf_path, chunk, output_dir, dpi, name_pattern)
+                           for chunk in chunks]
+                for future in as_completed(futures):
+                    for result in future.result():
+                        done.add(result[0])
+                        yield result
+                return
+            except (BrokenProcessPool, RuntimeError) as e:
+                # 子进程崩溃或池已关闭：丢弃旧池，剩余页面改为当前线程处理
+                logger.warning(f"PDF split pool unavailable ({e}), processing remaining pages inline")
+                self._discard_executor(executor)
+                pending = [i for i in pending if i not in done]
+
+        for i in pending:
+            yield from _process_pages(pdf_path, [i], output_dir, dpi, name_pattern)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+_pdf_splitter: Optional[PdfSplitter] = None
+_pdf_splitter_lock = threading.Lock()
+
+
+def get_pdf_splitter() -> PdfSplitter:
+    """Return the process-wide splitter configured from app config / Config"""
+    global _pdf_splitter
+    with _pdf_splitter_lock:
+        if _pdf_splitter is None:
+            from config import get_setting
+            _pdf_splitter = PdfSplitter(
+                processes=int(get_setting('PDF_SPLIT_PROCESSES')),
+            )
+            atexit.register(_pdf_splitter.shutdown, False)
+        return _pdf_splitter
+
+
+def iter_split_pdf(pdf_path: str, output_dir: str) -> Iterator[Tuple[int, str]]:
+    """
+    Split a PDF into single-page PDFs (``page_{n}.pdf``), yielding
+    ``(page_index, path)`` as each page is written (not in page order).
+    """
+    for i, path, error in get_pdf_splitter().iter_pages(pdf_path, output_dir, None, "page_{n}.pdf"):
+        if error:
+            raise ValueError(f"Failed to split page {i + 1} of {pdf_path}: {error}")
+        yield i, path
+
+
+def iter_render_pdf(pdf_path: str, output_dir: str, dpi: int = 144,
+                    name_pattern: str = "page_{n}.png") -> Iterator[Tuple[int, Optional[str]]]:
+    """
+    Render each page to a PNG at ``dpi``, yielding ``(page_index, path)`` as
+    each page is written. Pages that fail to render yield a None path.
+    """
+    for i, path, error in get_pdf_splitter().iter_pages(pdf_path, output_dir, dpi, name_pattern):
+        if error:
+            logger.error(f"Failed to render page {i + 1} of {pdf_path}: {error}")
+        yield i, path
+
 
 def split_pdf_to_pages(pdf_path: str, output_dir: str) -> List[str]:
     """
@@ -20,20 +174,6 @@ def split_pdf_to_pages(pdf_path: str, output_dir: str) -> List[str]:
     Returns:
         List of file paths for each single-page PDF, ordered by page number
     """
-    os.makedirs(output_dir, exist_ok=True)
-
-    reader = PdfReader(pdf_path)
-    page_paths = []
-
-    for i, page in enumerate(reader.pages):
-        writer = PdfWriter()
-        writer.add_page(page)
-
-        page_path = os.path.join(output_dir, f"page_{i + 1}.pdf")
-        with open(page_path, "wb") as f:
-            writer.write(f)
-
-        page_paths.append(page_path)
-
+    page_paths = dict(iter_split_pdf(pdf_path, output_dir))
     logger.info(f"Split PDF into {len(page_paths)} pages: {pdf_path}")
-    return page_paths
+    return [page_paths[i] for i in sorted(page_paths)]
@@ -0,0 +1,374 @@
+"""
+PDF Writer - streaming, bounded-memory writer for image-only PDFs
+
+``img2pdf.convert()`` returns the whole document as one bytes object and
+``_add_pdf_metadata`` re-opens and re-serializes it, so a 50-page 4K deck sits
+in memory about three times before it reaches disk.
+
+``StreamingPdfWriter`` appends one page at a time to the output file:
+
+- 8-bit, non-interlaced RGB/gray PNGs are embedded without decoding: the IDAT
+  chunks are copied straight into a FlateDecode stream with PNG predictors
+  (the same trick img2pdf uses)
+- baseline/progressive RGB and gray JPEGs are copied as DCTDecode streams
+- anything else (alpha, palette, 16-bit, WebP, ...) is decoded, flattened
+  onto white and zlib-compressed incrementally
+
+Stream lengths are written as indirect objects after each stream, so nothing
+has to be buffered to learn its size. Document info, XMP metadata and the
+xref table are written on ``close()`` - no second pass over the file.
+
+Peak memory is bounded by one page (one decoded image in the worst case).
+"""
+import hashlib
+import logging
+import os
+import struct
+import zlib
+from datetime import datetime, timezone
+from textwrap import dedent
+from typing import BinaryIO, Callable, List, Optional, Tuple, Union
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_COPY_CHUNK = 1024 * 1024
+PRODUCER = 'banana-slides'
+
+
+def _pdf_string(text: str) -> bytes:
+    escaped = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return f'({escaped})'.encode('latin-1', errors='replace')
+
+
+def cover_placement(page_width: float, page_height: float,
+                    image_width: float, image_height: float) -> Tuple[float, float, float, float]:
+    """Return (x, y, width, height) that covers the page with the image: aspect ratio kept, centered, excess cropped
+
+    The placement is symmetric, so x/y are valid for both PDF (bottom-up) and
+    PyMuPDF (top-down) coordinates.
+    """
+    scale = max(page_width / image_width, page_height / image_height)
+    draw_w, draw_h = image_width * scale, image_height * scale
+    return (page_width - draw_w) / 2, (page_height - draw_h) / 2, draw_w, draw_h
+
+
+def _pdf_date(moment: datetime) -> str:
+    return moment.strftime("D:%Y%m%d%H%M%SZ")
+
+
+def _scan_png(path: str) -> Optional[Tuple[int, int, int, List[Tuple[int, int]]]]:
+    """
+    Return (width, height, colors, [(offset, length) of IDAT data]) if the PNG
+    can be embedded without decoding, else None.
+    """
+    with open(path, 'rb') as f:
+        if f.read(8) != _PNG_SIGNATURE:
+            return None
+        header = None
+        idat = []
+        while True:
+            raw = f.read(8)
+            if len(raw) < 8:
+                return None
+            length, chunk_type = struct.unpack('>I4s', raw)
+            if chunk_type == b'IHDR':
+                header = struct.unpack('>IIBBBBB', f.read(13))
+                f.seek(4, os.SEEK_CUR)
+                continue
+            if chunk_type == b'IDAT':
+                idat.append((f.tell(), length))
+            elif chunk_type in (b'tRNS', b'PLTE'):
+                return None  # 透明色 / 调色板需要解码
+            elif chunk_type == b'IEND':
+                break
+            f.seek(length + 4, os.SEEK_CUR)
+
+    if not header or not idat:
+        return None
+    width, height, bit_depth, color_type, _, _, interlace = header
+    colors = {0: 1, 2: 3}.get(color_type)
+    if colors is None or bit_depth != 8 or interlace:
+        return None
+    return width, height, colors, idat
+
+
+class StreamingPdfWriter:
+    """
+    Write one full-page image per PDF page straight to ``output``.
+
+    Usage::
+
+        with StreamingPdfWriter(output_path, page_width_pt, page_height_pt) as writer:
+            for path in image_paths:
+                writer.add_image_page(path)
+    """
+
+    def __init__(self, output: Union[str, BinaryIO], page_width: float, page_height: float):
+        self.page_width = float(page_width)
+        self.page_height = float(page_height)
+        self._owns_file = isinstance(output, str)
+        self._file: BinaryIO = open(output, 'wb') if self._owns_file else output
+        self._start = self._file.tell()
+        self._offsets: List[int] = [0]  # 对象 1..n 的偏移（下标 0 占位）
+        self._page_ids: List[int] = []
+        self._closed = False
+        self._id_digest = hashlib.md5()
+
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        # 对象 1 = Catalog，对象 2 = Pages，在 close() 时写出
+        self._catalog_id = self._reserve()
+        self._pages_id = self._reserve()
+
+    @classmethod
+    def for_aspect_ratio(cls, output: Union[str, BinaryIO], aspect_ratio: str = '16:9'):
+        from services.export_service import _get_page_size_inches
+        page_w, page_h = _get_page_size_inches(aspect_ratio)
+        return cls(output, page_w * 72, page_h * 72)
+
+    # -- low level ---------------------------------------------------------
+
+    def _write(self, data: bytes):
+        self._file.write(data)
+
+    def _tell(self) -> int:
+        return self._file.tell() - self._start
+
+    def _reserve(self) -> int:
+        self._offsets.append(None)
+        return len(self._offsets) - 1
+
+    def _begin_object(self, object_id: int = None) -> int:
+        if object_id is None:
+            object_id = self._reserve()
+        self._offsets[object_id] = self._tell()
+        self._write(f'{object_id} 0 obj\n'.encode())
+        return object_id
+
+    def _object(self, body: bytes, object_id: int = None) -> int:
+        object_id = self._begin_object(object_id)
+        self._write(body + b'\nendobj\n')
+        return object_id
+
+    def _stream(self, dictionary: str, chunks) -> int:
+        """Write a stream whose length is only known afterwards (indirect /Length)"""
+        length_id = self._reserve()
+        object_id = self._begin_object()
+        self._write(f'<< {dictionary} /Length {length_id} 0 R >>\nstream\n'.encode())
+        length = 0
+        for chunk in chunks:
+            if chunk:
+                self._write(chunk)
+                length += len(chunk)
+        self._write(b'\nendstream\nendobj\n')
+        self._object(str(length).encode(), length_id)
+        return object_id
+
+    @staticmethod
+    def _copy_ranges(path: str, ranges: List[Tuple[int, int]]):
+        with open(path, 'rb') as f:
+            for offset, length in ranges:
+                f.seek(offset)
+                while length > 0:
+                    chunk = f.read(min(_COPY_CHUNK, length))
+                    if not chunk:
+                        raise IOError(f"Truncated image file: {path}")
+                    length -= len(chunk)
+                    yield chunk
+
+    @staticmethod
+    def _deflate_image(image: Image.Image):
+        """zlib-compress decoded pixels a band of rows at a time"""
+        compressor = zlib.compressobj(6)
+        row_bytes = image.width * len(image.getbands())
+        rows_per_band = max(1, _COPY_CHUNK // max(1, row_bytes))
+        for top in range(0, image.height, rows_per_band):
+            band = image.crop((0, top, image.width, min(image.height, top + rows_per_band)))
+            yield compressor.compress(band.tobytes())
+        yield compressor.flush()
+
+    # -- images ------------------------------------------------------------
+
+    def _add_image_xobject(self, image_path: str) -> Tuple[int, int, int]:
+        """Embed the image and return (object id, width, height)"""
+        png = _scan_png(image_path)
+        if png:
+            width, height, colors, idat = png
+            colorspace = '/DeviceRGB' if colors == 3 else '/DeviceGray'
+            object_id = self._stream(
+                f'/Type /XObject /Subtype /Image /Width {width} /Height {height} '
+                f'/ColorSpace {colorspace} /BitsPerComponent 8 /Filter /FlateDecode '
+                f'/DecodeParms << /Predictor 15 /Colors {colors} /BitsPerComponent 8 /Columns {width} >>',
+                self._copy_ranges(image_path, idat),
+            )
+            return object_id, width, height
+
+        with Image.open(image_path) as image:
+            width, height = image.size
+            if image.format == 'JPEG' and image.mode in ('RGB', 'L'):
+                colorspace = '/DeviceRGB' if image.mode == 'RGB' else '/DeviceGray'
+                object_id = self._stream(
+                    f'/Type /XObject /Subtype /Image /Width {width} /Height {height} '
+                    f'/ColorSpace {colorspace} /BitsPerComponent 8 /Filter /DCTDecode',
+                    self._copy_ranges(image_path, [(0, os.path.getsize(image_path))]),
+                )
+                return object_id, width, height
+
+            from services.file_service import convert_image_to_rgb
+            if image.mode == 'L':
+                decoded = image.copy()
+            else:
+                decoded = convert_image_to_rgb(image)
+                if decoded.mode != 'RGB':
+                    decoded = decoded.convert('RGB')
+        colorspace = '/DeviceRGB' if decoded.mode == 'RGB' else '/DeviceGray'
+        object_id = self._stream(
+            f'/Type /XObject /Subtype /Image /Width {width} /Height {height} '
+            f'/ColorSpace {colorspace} /BitsPerComponent 8 /Filter /FlateDecode',
+            self._deflate_image(decoded),
+        )
+        return object_id, width, height
+
+    def add_image_page(self, image_path: str) -> bool:
+        """Append a page covered by the image (aspect ratio kept, centered, excess cropped)"""
+        if not os.path.exists(image_path):
+            logger.warning(f"Image not found and will be skipped for PDF export: {image_path}")
+            return False
+        try:
+            image_id, width, height = self._add_image_xobject(image_path)
+        except (OSError, SyntaxError, ValueError) as e:
+            # 写入一半的对象不会被任何页面引用，不影响文档有效性
+            logger.warning(f"Unreadable image skipped for PDF export: {image_path} ({e})")
+            return False
+
+        x, y, draw_w, draw_h = cover_placement(self.page_width, self.page_height, width, height)
+        content = f'q\n{draw_w:.4f} 0 0 {draw_h:.4f} {x:.4f} {y:.4f} cm\n/Im0 Do\nQ\n'.encode()
+        content_id = self._object(
+            f'<< /Length {len(content)} >>\nstream\n'.encode() + content + b'\nendstream')
+        page_id = self._object((
+            f'<< /Type /Page /Parent {self._pages_id} 0 R '
+            f'/MediaBox [0 0 {self.page_width:.4f} {self.page_height:.4f}] '
+            f'/Resources << /XObject << /Im0 {image_id} 0 R >> >> '
+            f'/Contents {content_id} 0 R >>'
+        ).encode())
+        self._page_ids.append(page_id)
+        self._id_digest.update(f'{image_path}:{os.path.getsize(image_path)}'.encode())
+        return True
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    # -- document ----------------------------------------------------------
+
+    def _xmp(self, iso_time: str, document_id: str) -> bytes:
+        return dedent(f'''\
+            <?xpacket begin="" id="W5M0MpCehiHzreSzNTczkc9d"?>
+            <x:xmpmeta xmlns:x="adobe:ns:meta/">
+              <rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">
+                <rdf:Description rdf:about="" xmlns:dc="http://purl.org/dc/elements/1.1/">
+                  <dc:creator><rdf:Seq><rdf:li>{PRODUCER}</rdf:li></rdf:Seq></dc:creator>
+                </rdf:Description>
+                <rdf:Description rdf:about="" xmlns:pdf="http://ns.adobe.com/pdf/1.3/">
+                  <pdf:Producer>{PRODUCER}</pdf:Producer>
+                </rdf:Description>
+                <rdf:Description rdf:about="" xmlns:xmp="http://ns.adobe.com/xap/1.0/">
+                  <xmp:CreatorTool>{PRODUCER}</xmp:CreatorTool>
+                  <xmp:CreateDate>{iso_time}</xmp:CreateDate>
+                  <xmp:MetadataDate>{iso_time}</xmp:MetadataDate>
+                </rdf:Description>
+                <rdf:Description rdf:about="" xmlns:xmpMM="http://ns.adobe.com/xap/1.0/mm/">
+                  <xmpMM:DocumentID>uuid:{document_id}</xmpMM:DocumentID>
+                </rdf:Description>
+              </rdf:RDF>
+            </x:xmpmeta>
+            <?xpacket end="w"?>''').encode('utf-8')
+
+    def close(self):
+        """Write the page tree, metadata (Info + XMP), xref and trailer"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if not self._page_ids:
+                raise ValueError("No valid images found for PDF export")
+
+            kids = ' '.join(f'{page_id} 0 R' for page_id in self._page_ids)
+            self._object(f'<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>'.encode(),
+                         self._pages_id)
+
+            now = datetime.now(timezone.utc)
+            document_id = self._id_digest.hexdigest()
+            xmp = self._xmp(now.isoformat(), document_id)
+            metadata_id = self._object(
+                f'<< /Type /Metadata /Subtype /XML /Length {len(xmp)} >>\nstream\n'.encode()
+                + xmp + b'\nendstream')
+            self._object(
+                f'<< /Type /Catalog /Pages {self._pages_id} 0 R /Metadata {metadata_id} 0 R >>'.encode(),
+                self._catalog_id)
+            info_id = self._object(
+                b'<< /Author ' + _pdf_string(PRODUCER) + b' /Producer ' + _pdf_string(PRODUCER)
+                + b' /Creator ' + _pdf_string(PRODUCER)
+                + b' /CreationDate ' + _pdf_string(_pdf_date(now))
+                + b' /ModDate ' + _pdf_string(_pdf_date(now)) + b' >>')
+
+            xref_offset = self._tell()
+            lines = [f'xref\n0 {len(self._offsets)}\n', '0000000000 65535 f \n']
+            # 未写完的对象（图片读取中途失败）记为空闲项，其残留字节不被引用
+            lines.extend('0000000000 65535 f \n' if offset is None else f'{offset:010d} 00000 n \n'
+                         for offset in self._offsets[1:])
+            self._write(''.join(lines).encode())
+            self._write((
+                f'trailer\n<< /Size {len(self._offsets)} /Root {self._catalog_id} 0 R /Info {info_id} 0 R '
+                f'/ID [<{document_id}> <{document_id}>] >>\nstartxref\n{xref_offset}\n%%EOF\n'
+            ).encode())
+        finally:
+            if self._owns_file:
+                self._file.close()
+
+    def abort(self):
+        if not self._closed:
+            self._closed = True
+            if self._owns_file:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_image_pdf(image_paths: List[str], output: Union[str, BinaryIO], aspect_ratio: str = '16:9',
+                    progress_callback: Optional[Callable[[int, int], None]] = None) -> int:
+    """
+    Stream ``image_paths`` into a PDF at ``output`` and return the page count.
+
+    A path is written to ``<path>.tmp`` first and renamed, so readers never
+    see a half-written file. ``progress_callback(done, total)`` is called
+    after each image.
+    """
+    def write(target):
+        with StreamingPdfWriter.for_aspect_ratio(target, aspect_ratio) as writer:
+            for done, image_path in enumerate(image_paths, start=1):
+                writer.add_image_page(image_path)
+                if progress_callback:
+                    progress_callback(done, len(image_paths))
+        return writer.page_count
+
+    if not isinstance(output, str):
+        return write(output)
+
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    try:
+        page_count = write(tmp_path)
+        os.replace(tmp_path, output)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return page_count
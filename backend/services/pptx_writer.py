@@ -0,0 +1,402 @@
+"""
+PPTX Writer - streaming, bounded-memory writer for image-only decks
+
+``python-pptx`` keeps every slide and every media blob in memory until
+``Presentation.save()``; a 60-page 4K deck therefore costs hundreds of MB per
+export (more when the result is also copied into a ``BytesIO``).
+
+``StreamingPptxWriter`` writes the package part by part instead:
+
+- the static parts (theme, master, layouts, docProps) come from a blank
+  ``python-pptx`` template and are copied once
+- each slide's image is streamed from disk straight into the zip
+  (``ZIP_STORED`` - PNG/JPEG are already compressed) and identical files are
+  stored once and shared by sha256
+- ``presentation.xml``, its rels and ``[Content_Types].xml`` are written last,
+  when the slide list is known
+
+Peak memory stays roughly constant regardless of the page count.
+"""
+import io
+import logging
+import os
+import re
+import tempfile
+import zipfile
+from datetime import datetime, timezone
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+from xml.sax.saxutils import quoteattr
+
+from lxml import etree
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Inches
+
+from services.image_cache import hash_file
+
+logger = logging.getLogger(__name__)
+
+_NS_P = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+_NS_R = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_NS_RELS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_NS_CT = 'http://schemas.openxmlformats.org/package/2006/content-types'
+_RT_SLIDE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide'
+_RT_LAYOUT = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideLayout'
+_RT_IMAGE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/image'
+_CT_SLIDE = 'application/vnd.openxmlformats-officedocument.presentationml.slide+xml'
+
+# PIL format -> (media extension, content type); other formats are converted to PNG
+MEDIA_FORMATS = {
+    'PNG': ('png', 'image/png'),
+    'JPEG': ('jpeg', 'image/jpeg'),
+    'GIF': ('gif', 'image/gif'),
+    'BMP': ('bmp', 'image/bmp'),
+    'TIFF': ('tiff', 'image/tiff'),
+}
+
+BLANK_LAYOUT_INDEX = 6
+
+_MEDIA_NAME_RE = re.compile(r'^ppt/media/image(\d+)\.')
+
+_XML_HEADER = "<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+
+_SLIDE_XML = (
+    _XML_HEADER +
+    '<p:sld xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    f'xmlns:p="{_NS_P}" xmlns:r="{_NS_R}"><p:cSld><p:spTree>'
+    '<p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr/>'
+    '<p:pic><p:nvPicPr><p:cNvPr id="2" name="Picture 1" descr={descr}/>'
+    '<p:cNvPicPr><a:picLocks noChangeAspect="1"/></p:cNvPicPr><p:nvPr/></p:nvPicPr>'
+    '<p:blipFill><a:blip r:embed="rId2"/><a:stretch><a:fillRect/></a:stretch></p:blipFill>'
+    '<p:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr></p:pic>'
+    '</p:spTree></p:cSld><p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sld>'
+)
+
+_SLIDE_RELS_XML = (
+    _XML_HEADER +
+    f'<Relationships xmlns="{_NS_RELS}">'
+    f'<Relationship Id="rId1" Type="{_RT_LAYOUT}" Target="../{{layout}}"/>'
+    f'<Relationship Id="rId2" Type="{_RT_IMAGE}" Target="../{{media}}"/>'
+    '</Relationships>'
+)
+
+
+def _detect_format(image_path: str) -> Optional[str]:
+    try:
+        with Image.open(image_path) as img:
+            return img.format
+    except Exception as e:
+        logger.warning(f"Unreadable image skipped for PPTX export: {image_path} ({e})")
+        return None
+
+
+def _write_media(zf: zipfile.ZipFile, image_path: str, pil_format: str, stem: str) -> str:
+    """Stream an image file into ``zf`` as ``<stem>.<ext>`` and return the part name"""
+    if pil_format in MEDIA_FORMATS:
+        partname = f'{stem}.{MEDIA_FORMATS[pil_format][0]}'
+        # ZipFile.write 按块拷贝文件，不会把整张图读入内存
+        zf.write(image_path, partname, compress_type=zipfile.ZIP_STORED)
+        return partname
+
+    # WebP 等 PowerPoint 不支持的格式转为 PNG（经临时文件，仍逐页处理）
+    partname = f'{stem}.png'
+    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
+        tmp_path = tmp.name
+    try:
+        with Image.open(image_path) as img:
+            img.save(tmp_path, 'PNG')
+        zf.write(tmp_path, partname, compress_type=zipfile.ZIP_STORED)
+    finally:
+        os.remove(tmp_path)
+    return partname
+
+
+def build_template(slide_width: int, slide_height: int) -> bytes:
+    """Blank (zero-slide) package with slide size and core properties set"""
+    prs = Presentation()
+    try:
+        core = prs.core_properties
+        now = datetime.now(timezone.utc)
+        core.author = "banana-slides"
+        core.last_modified_by = "banana-slides"
+        core.created = now
+        core.modified = now
+    except Exception as e:
+        logger.warning(f"Failed to set core properties: {e}")
+    prs.slide_width = slide_width
+    prs.slide_height = slide_height
+    prs.slides  # 确保 presentation.xml 中存在 <p:sldIdLst/>
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+class StreamingPptxWriter:
+    """
+    Write an image-per-slide PPTX without holding slides or media in memory.
+
+    Usage::
+
+        with StreamingPptxWriter(output_path, slide_width, slide_height) as writer:
+            for path in image_paths:
+                writer.add_image_slide(path)
+    """
+
+    def __init__(self, output: Union[str, BinaryIO], slide_width: int, slide_height: int):
+        self.slide_width = int(slide_width)
+        self.slide_height = int(slide_height)
+        self._zip = zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED)
+        self._template = zipfile.ZipFile(io.BytesIO(build_template(self.slide_width, self.slide_height)))
+        self._layout_partname = self._resolve_blank_layout()
+        self._media_by_hash: Dict[str, str] = {}
+        self._slides: List[str] = []
+        self._closed = False
+        self.media_bytes = 0
+        self.deduplicated = 0
+
+        for info in self._template.infolist():
+            if info.filename in ('[Content_Types].xml', 'ppt/presentation.xml',
+                                 'ppt/_rels/presentation.xml.rels'):
+                continue
+            self._zip.writestr(info.filename, self._template.read(info.filename))
+
+    @classmethod
+    def for_aspect_ratio(cls, output: Union[str, BinaryIO], aspect_ratio: str = '16:9'):
+        from services.export_service import _get_page_size_inches
+        page_w, page_h = _get_page_size_inches(aspect_ratio)
+        return cls(output, Inches(page_w), Inches(page_h))
+
+    def _resolve_blank_layout(self) -> str:
+        """Part name of the template's blank layout (``ppt/slideLayouts/slideLayoutN.xml``)"""
+        rels = etree.fromstring(self._template.read('ppt/slideMasters/_rels/slideMaster1.xml.rels'))
+        master = etree.fromstring(self._template.read('ppt/slideMasters/slideMaster1.xml'))
+        layout_ids = master.findall(f'.//{{{_NS_P}}}sldLayoutId')
+        targets = {rel.get('Id'): rel.get('Target') for rel in rels}
+        if len(layout_ids) > BLANK_LAYOUT_INDEX:
+            target = targets[layout_ids[BLANK_LAYOUT_INDEX].get(f'{{{_NS_R}}}id')]
+        else:
+            target = targets[layout_ids[-1].get(f'{{{_NS_R}}}id')]
+        return os.path.normpath(os.path.join('ppt/slideMasters', target)).replace(os.sep, '/')
+
+    def _add_media(self, image_path: str, pil_format: str) -> str:
+        """Store the image once per distinct content and return its part name"""
+        digest = hash_file(image_path)
+        partname = self._media_by_hash.get(digest)
+        if partname:
+            self.deduplicated += 1
+            return partname
+
+        partname = _write_media(self._zip, image_path, pil_format, f'ppt/media/image{len(self._media_by_hash) + 1}')
+        self.media_bytes += self._zip.getinfo(partname).file_size
+        self._media_by_hash[digest] = partname
+        return partname
+
+    def add_image_slide(self, image_path: str) -> bool:
+        """Append a slide whose picture fills the whole slide; returns False if the image was skipped"""
+        if not os.path.exists(image_path):
+            logger.warning(f"Image not found: {image_path}")
+            return False
+        pil_format = _detect_format(image_path)
+        if pil_format is None:
+            return False
+
+        media = self._add_media(image_path, pil_format)
+        number = len(self._slides) + 1
+        slide_partname = f'ppt/slides/slide{number}.xml'
+        self._zip.writestr(slide_partname, _SLIDE_XML.format(
+            descr=quoteattr(os.path.basename(image_path)), cx=self.slide_width, cy=self.slide_height))
+        self._zip.writestr(f'ppt/slides/_rels/slide{number}.xml.rels',
+                           _SLIDE_RELS_XML.format(layout=self._layout_partname[len('ppt/'):],
+                                                  media=media[len('ppt/'):]))
+        self._slides.append(slide_partname)
+        return True
+
+    def _write_presentation(self):
+        presentation = etree.fromstring(self._template.read('ppt/presentation.xml'))
+        rels = etree.fromstring(self._template.read('ppt/_rels/presentation.xml.rels'))
+
+        next_rid = 1 + max(int(rel.get('Id')[3:]) for rel in rels if rel.get('Id', '').startswith('rId'))
+        sld_id_lst = presentation.find(f'{{{_NS_P}}}sldIdLst')
+        for offset, slide_partname in enumerate(self._slides):
+            rid = f'rId{next_rid + offset}'
+            etree.SubElement(rels, f'{{{_NS_RELS}}}Relationship', Id=rid, Type=_RT_SLIDE,
+                             Target=slide_partname[len('ppt/'):])
+            etree.SubElement(sld_id_lst, f'{{{_NS_P}}}sldId',
+                             {'id': str(256 + offset), f'{{{_NS_R}}}id': rid})
+
+        self._zip.writestr('ppt/presentation.xml',
+                           etree.tostring(presentation, xml_declaration=True, encoding='UTF-8', standalone=True))
+        self._zip.writestr('ppt/_rels/presentation.xml.rels',
+                           etree.tostring(rels, xml_declaration=True, encoding='UTF-8', standalone=True))
+
+    def _write_content_types(self):
+        types = etree.fromstring(self._template.read('[Content_Types].xml'))
+        defaults = {el.get('Extension') for el in types.findall(f'{{{_NS_CT}}}Default')}
+        for extension, content_type in MEDIA_FORMATS.values():
+            if extension not in defaults:
+                # Default 元素需排在 Override 之前
+                types.insert(0, etree.Element(f'{{{_NS_CT}}}Default', Extension=extension,
+                                              ContentType=content_type))
+        for slide_partname in self._slides:
+            etree.SubElement(types, f'{{{_NS_CT}}}Override', PartName=f'/{slide_partname}',
+                             ContentType=_CT_SLIDE)
+        self._zip.writestr('[Content_Types].xml',
+                           etree.tostring(types, xml_declaration=True, encoding='UTF-8', standalone=True))
+
+    @property
+    def slide_count(self) -> int:
+        return len(self._slides)
+
+    def close(self):
+        """Write the slide list and content types, then finish the zip"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._write_presentation()
+            self._write_content_types()
+        finally:
+            self._zip.close()
+            self._template.close()
+
+    def abort(self):
+        if not self._closed:
+            self._closed = True
+            self._zip.close()
+            self._template.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_image_pptx(image_paths: List[str], output: Union[str, BinaryIO],
+                     aspect_ratio: str = '16:9',
+                     progress_callback: Optional[Callable[[int, int], None]] = None) -> Tuple[int, int]:
+    """
+    Stream ``image_paths`` into a PPTX at ``output``.
+
+    A path is written to ``<path>.tmp`` first and renamed, so readers never
+    see a half-written deck. ``progress_callback(done, total)`` is called
+    after each image.
+
+    Returns:
+        (slide_count, deduplicated_media_count)
+    """
+    def write(target):
+        with StreamingPptxWriter.for_aspect_ratio(target, aspect_ratio) as writer:
+            for done, image_path in enumerate(image_paths, start=1):
+                writer.add_image_slide(image_path)
+                if progress_callback:
+                    progress_callback(done, len(image_paths))
+        return writer.slide_count, writer.deduplicated
+
+    if not isinstance(output, str):
+        return write(output)
+
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    try:
+        result = write(tmp_path)
+        os.replace(tmp_path, output)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return result
+
+
+def _resolve_target(source_partname: str, target: str) -> str:
+    """Resolve a relative rels target against the part that owns the rels"""
+    return os.path.normpath(os.path.join(os.path.dirname(source_partname), target)).replace(os.sep, '/')
+
+
+def _rels_partname(partname: str) -> str:
+    directory, name = os.path.split(partname)
+    return f'{directory}/_rels/{name}.rels'
+
+
+def replace_slide_images(source: str, output: str, replacements: Dict[int, str]) -> int:
+    """
+    Copy an image-only deck to ``output`` with the pictures of some slides swapped.
+
+    Every other part is copied entry by entry (media stays byte-identical and
+    is never re-encoded); only the replaced slides' rels and their new media
+    parts are written fresh. Media no longer referenced by any slide is dropped.
+
+    Args:
+        source: PPTX written by ``StreamingPptxWriter``
+        output: Destination path (may not be ``source``)
+        replacements: {0-based slide index: new image path}
+
+    Returns:
+        Number of slides whose picture was replaced
+    """
+    with zipfile.ZipFile(source) as src:
+        presentation = etree.fromstring(src.read('ppt/presentation.xml'))
+        rels = etree.fromstring(src.read('ppt/_rels/presentation.xml.rels'))
+        targets = {rel.get('Id'): rel.get('Target') for rel in rels}
+        slide_partnames = [
+            _resolve_target('ppt/presentation.xml', targets[sld_id.get(f'{{{_NS_R}}}id')])
+            for sld_id in presentation.iterfind(f'{{{_NS_P}}}sldIdLst/{{{_NS_P}}}sldId')
+        ]
+
+        # 每张幻灯片引用的图片部件（同一图片可能被多页共享）
+        slide_rels: Dict[str, etree._Element] = {}
+        media_refs: Dict[str, int] = {}
+        slide_media: Dict[str, str] = {}
+        for partname in slide_partnames:
+            tree = etree.fromstring(src.read(_rels_partname(partname)))
+            slide_rels[partname] = tree
+            for rel in tree:
+                if rel.get('Type') == _RT_IMAGE:
+                    media = _resolve_target(partname, rel.get('Target'))
+                    slide_media[partname] = media
+                    media_refs[media] = media_refs.get(media, 0) + 1
+
+        pending = {}
+        for index, image_path in replacements.items():
+            if not 0 <= index < len(slide_partnames):
+                raise IndexError(f"Slide index {index} out of range ({len(slide_partnames)} slides)")
+            pil_format = _detect_format(image_path)
+            if pil_format is None:
+                raise ValueError(f"Unreadable replacement image: {image_path}")
+            partname = slide_partnames[index]
+            old_media = slide_media.get(partname)
+            if old_media:
+                media_refs[old_media] -= 1
+            pending[partname] = (image_path, pil_format)
+
+        dropped = {media for media, count in media_refs.items() if count <= 0}
+        rewritten = {_rels_partname(partname) for partname in pending}
+        next_index = 1 + max(
+            [int(m.group(1)) for m in map(_MEDIA_NAME_RE.match, src.namelist()) if m] or [0]
+        )
+
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                if info.filename in dropped or info.filename in rewritten:
+                    continue
+                copied = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                copied.compress_type = info.compress_type
+                copied.external_attr = info.external_attr
+                with src.open(info) as reader, dst.open(copied, 'w') as writer:
+                    while True:
+                        chunk = reader.read(1024 * 1024)
+                        if not chunk:
+                            break
+                        writer.write(chunk)
+
+            for offset, (partname, (image_path, pil_format)) in enumerate(pending.items()):
+                media = _write_media(dst, image_path, pil_format, f'ppt/media/image{next_index + offset}')
+                tree = slide_rels[partname]
+                for rel in tree:
+                    if rel.get('Type') == _RT_IMAGE:
+                        rel.set('Target', os.path.relpath(media, os.path.dirname(partname)).replace(os.sep, '/'))
+                dst.writestr(_rels_partname(partname),
+                             etree.tostring(tree, xml_declaration=True, encoding='UTF-8', standalone=True))
+    return len(pending)
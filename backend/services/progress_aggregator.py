@@ -0,0 +1,175 @@
+"""
+Progress Aggregator - coalesce per-page results of a bulk task into batched commits
+
+Bulk tasks (descriptions / images) used to expire the session, re-query the
+page and the task and commit twice for every finished page, while each
+worker thread committed its own page status on top of that. With several
+projects generating at once these commits serialize on the SQLite write lock.
+
+The aggregator collects finished pages in memory and writes the coalesced
+page updates and the task progress in ONE transaction every
+``flush_interval`` seconds or every ``flush_every`` events, whichever comes
+first. All writes happen on the task's own thread; worker threads only
+compute results.
+
+Usage:
+    aggregator = ProgressAggregator(task_id, total=len(pages))
+    for future in aggregator.as_completed(futures):
+        page_id, result, error = future.result()
+        if error:
+            aggregator.page_failed(page_id)
+        else:
+            aggregator.page_completed(page_id, lambda page: page.set_description_content(result))
+    aggregator.flush()
+"""
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from models import db, Page, Task
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressAggregator:
+    """Buffer page results and task progress, flushing them in batched transactions"""
+
+    def __init__(self, task_id: str, total: int, flush_interval: Optional[float] = None,
+                 flush_every: Optional[int] = None, failed_status: str = 'FAILED'):
+        """
+        Args:
+            task_id: Task whose progress JSON is updated on each flush
+            total: Number of pages in the task
+            flush_interval: Max seconds a finished page may stay unflushed (defaults to PROGRESS_FLUSH_INTERVAL_MS)
+            flush_every: Flush as soon as this many events are pending (defaults to PROGRESS_FLUSH_MAX_EVENTS)
+            failed_status: Page status written for failed pages
+        """
+        from config import get_config
+        config = get_config()
+        if flush_interval is None:
+            flush_interval = config.PROGRESS_FLUSH_INTERVAL_MS / 1000.0
+        if flush_every is None:
+            flush_every = config.PROGRESS_FLUSH_MAX_EVENTS
+
+        self.task_id = task_id
+        self.total = total
+        self.flush_interval = max(0.0, flush_interval)
+        self.flush_every = max(1, flush_every)
+        self.failed_status = failed_status
+
+        self.completed = 0
+        self.failed = 0
+        self._progress_fields: Dict[str, Any] = {}
+        self._fields_dirty = False
+        self._pending: Dict[str, List[Callable[[Page], None]]] = {}
+        self._pending_events = 0
+        self._first_pending_at: Optional[float] = None
+
+        self.events = 0
+        self.commits = 0
+        self.write_seconds = 0.0
+
+    def page_completed(self, page_id: str, apply: Optional[Callable[[Page], None]] = None):
+        """Record a finished page; ``apply`` mutates the Page row during the next flush"""
+        self.completed += 1
+        self._add(page_id, apply)
+
+    def page_failed(self, page_id: str):
+        """Record a failed page (status is set to ``failed_status`` on flush)"""
+        self.failed += 1
+        status = self.failed_status
+
+        def mark_failed(page: Page):
+            page.status = status
+        self._add(page_id, mark_failed)
+
+    def set_progress_fields(self, **fields):
+        """Extra keys merged into the task progress JSON on the next flush"""
+        self._progress_fields.update(fields)
+        self._fields_dirty = True
+
+    def _add(self, page_id: str, apply: Optional[Callable[[Page], None]]):
+        self.events += 1
+        self._pending_events += 1
+        if self._first_pending_at is None:
+            self._first_pending_at = time.monotonic()
+        callbacks = self._pending.setdefault(page_id, [])
+        if apply:
+            callbacks.append(apply)
+
+    def due(self) -> bool:
+        """Whether pending events should be written now"""
+        if not self._pending_events:
+            return False
+        if self._pending_events >= self.flush_every:
+            return True
+        return time.monotonic() - self._first_pending_at >= self.flush_interval
+
+    def maybe_flush(self):
+        if self.due():
+            self.flush()
+
+    def flush(self):
+        """Write pending page updates and the task progress in a single transaction"""
+        if not self._pending_events and not self._fields_dirty:
+            return
+        start = time.monotonic()
+        try:
+            # 其他线程/请求可能修改过这些行，写入前丢弃会话中的旧状态
+            db.session.expire_all()
+            if self._pending:
+                pages = Page.query.filter(Page.id.in_(list(self._pending))).all()
+                for page in pages:
+                    for apply in self._pending[page.id]:
+                        apply(page)
+
+            task = Task.query.get(self.task_id)
+            if task:
+                progress = task.get_progress() or {}
+                progress.update(self._progress_fields)
+                progress['total'] = self.total
+                progress['completed'] = self.completed
+                progress['failed'] = self.failed
+                task.set_progress(progress)
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            self.write_seconds += time.monotonic() - start
+
+        self.commits += 1
+        self._pending.clear()
+        self._pending_events = 0
+        self._first_pending_at = None
+        self._fields_dirty = False
+        logger.debug(f"Task {self.task_id} progress flushed: {self.completed}/{self.total} completed, "
+                     f"{self.failed} failed")
+
+    def as_completed(self, futures: Iterable) -> Iterator:
+        """
+        Like concurrent.futures.as_completed, but wakes up at least every
+        ``flush_interval`` so buffered results are flushed even when no
+        further future finishes for a while.
+        """
+        pending = set(futures)
+        while pending:
+            timeout = None
+            if self._pending_events:
+                timeout = max(0.0, self.flush_interval - (time.monotonic() - self._first_pending_at))
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future
+                self.maybe_flush()
+            if not done:
+                self.maybe_flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Write statistics for the task: events recorded vs. commits issued"""
+        return {
+            'events': self.events,
+            'commits': self.commits,
+            'write_seconds': round(self.write_seconds, 3),
+        }
@@ -0,0 +1,170 @@
+"""
+Project Cache - serialized ``GET /api/projects/<id>`` payloads
+
+The editor polls the project while pages generate. Rebuilding the payload
+means loading every page and ``json.loads``-ing each page's outline and
+description, so the serialized response body is cached per project.
+
+A cached body is valid for a key of:
+
+- an in-process version counter, bumped after every commit that adds,
+  changes or deletes a Project / Page row (SQLAlchemy session hooks, so page
+  updates, ``save_image_with_version``, smart merge etc. need no explicit
+  calls), and
+- a cheap database stamp (project ``updated_at``, page count, newest page
+  ``updated_at``), which also catches writes made by other processes
+  (e.g. ``worker.py`` with TASK_QUEUE_MODE=external).
+
+On a miss, pages whose ``updated_at`` did not change reuse their cached
+``Page.to_dict()``, so one finished page in a 50-page deck re-serializes one
+page. The ETag is a hash of the body, so 304s work across processes.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, joinedload
+
+PROJECT_CACHE_MAX_ENTRIES = 128
+PAGE_CACHE_MAX_ENTRIES = 4096
+
+
+class ProjectResponseCache:
+    """Thread-safe LRU of serialized project payloads and per-page dicts"""
+
+    def __init__(self, max_projects: int = PROJECT_CACHE_MAX_ENTRIES,
+                 max_pages: int = PAGE_CACHE_MAX_ENTRIES):
+        self.max_projects = max_projects
+        self.max_pages = max_pages
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._payloads: "OrderedDict[str, Tuple[tuple, bytes, str]]" = OrderedDict()
+        self._pages: "OrderedDict[str, Tuple[object, dict]]" = OrderedDict()
+
+    def version(self, project_id: str) -> int:
+        with self._lock:
+            return self._versions.get(project_id, 0)
+
+    def bump(self, project_ids: Iterable[str]):
+        with self._lock:
+            for project_id in project_ids:
+                self._versions[project_id] = self._versions.get(project_id, 0) + 1
+                self._payloads.pop(project_id, None)
+
+    def get(self, project_id: str, key: tuple) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._payloads.get(project_id)
+            if entry is None or entry[0] != key:
+                return None
+            self._payloads.move_to_end(project_id)
+            return entry[1], entry[2]
+
+    def put(self, project_id: str, key: tuple, body: bytes) -> str:
+        etag = hashlib.sha1(body).hexdigest()
+        with self._lock:
+            # 构建期间若有提交（版本号已变化），不写入过期的 key
+            if key[0] == self._versions.get(project_id, 0):
+                self._payloads[project_id] = (key, body, etag)
+                self._payloads.move_to_end(project_id)
+                while len(self._payloads) > self.max_projects:
+                    self._payloads.popitem(last=False)
+        return etag
+
+    def page_dict(self, page) -> dict:
+        """``page.to_dict()``, reused while the page's updated_at is unchanged"""
+        with self._lock:
+            entry = self._pages.get(page.id)
+            if entry is not None and entry[0] == page.updated_at:
+                self._pages.move_to_end(page.id)
+                return entry[1]
+        data = page.to_dict()
+        with self._lock:
+            self._pages[page.id] = (page.updated_at, data)
+            self._pages.move_to_end(page.id)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+            self._payloads.clear()
+            self._pages.clear()
+
+
+project_response_cache = ProjectResponseCache()
+
+
+def project_stamp(project_id: str) -> Optional[tuple]:
+    """(project updated_at, page count, newest page updated_at), or None if the project does not exist"""
+    from models import db, Project, Page
+
+    row = db.session.query(
+        Project.updated_at, func.count(Page.id), func.max(Page.updated_at)
+    ).outerjoin(Page, Page.project_id == Project.id).filter(Project.id == project_id).group_by(Project.id).first()
+    return tuple(row) if row is not None else None
+
+
+def get_project_response(project_id: str) -> Optional[Tuple[bytes, str]]:
+    """
+    Serialized ``{"success": true, "data": project.to_dict(include_pages=True)}`` body and its ETag.
+
+    Returns None if the project does not exist.
+    """
+    from models import Project
+
+    # 先读版本号再查询：构建期间的提交会让这次结果不被缓存
+    version = project_response_cache.version(project_id)
+    stamp = project_stamp(project_id)
+    if stamp is None:
+        return None
+    key = (version, stamp)
+    cached = project_response_cache.get(project_id, key)
+    if cached is not None:
+        return cached
+
+    project = Project.query.options(joinedload(Project.pages)).filter(Project.id == project_id).first()
+    if project is None:
+        return None
+    data = project.to_dict()
+    data['pages'] = [project_response_cache.page_dict(page) for page in project.pages]
+    body = current_app.json.dumps({'success': True, 'message': 'Success', 'data': data}).encode('utf-8')
+    return body, project_response_cache.put(project_id, key, body)
+
+
+# ---------------------------------------------------------------------------
+# SQLAlchemy hooks: bump project versions after each successful commit
+# ---------------------------------------------------------------------------
+
+_PENDING_KEY = 'project_cache_dirty_ids'
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_dirty_projects(session, flush_context):
+    from models import Project, Page
+
+    project_ids = set()
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, Project):
+                project_ids.add(obj.id)
+            elif isinstance(obj, Page):
+                project_ids.add(obj.project_id)
+    project_ids.discard(None)
+    if project_ids:
+        session.info.setdefault(_PENDING_KEY, set()).update(project_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_project_versions(session):
+    project_ids = session.info.pop(_PENDING_KEY, None)
+    if project_ids:
+        project_response_cache.bump(project_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_dirty_projects(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -89,6 +89,26 @@ def _build_prompt(prompt_text: str, reference_files_content=None, *, tag: str =
     return final
 
 
+def _reference_files_for(project_context: 'ProjectContext', query: str, *,
+                         whole_document: bool = False, images: bool = True):
+    """
+    Reference files to inline: all of them, or only the chunks relevant to
+    ``query`` when they exceed REFERENCE_PROMPT_TOKEN_BUDGET (see services/reference_index.py).
+
+    Outline-level prompts pass ``images=False``: image links are replaced by
+    their alt text there, since only page descriptions reference images.
+    """
+    retriever = getattr(project_context, 'reference_retriever', None)
+    if retriever is not None:
+        return retriever.select(query, whole_document=whole_document, images=images)
+    if images:
+        return project_context.reference_files_content
+    return [
+        {**f, 'content': f['clean_content'] if f.get('clean_content') is not None else f.get('content', '')}
+        for f in project_context.reference_files_content
+    ]
+
+
 def _get_original_input(project_context: 'ProjectContext') -> str:
     """Extract original user input from project context (shared across prompt builders)."""
     if project_context.creation_type == 'idea' and project_context.idea_prompt:
@@ -221,7 +241,9 @@ The user's request: {idea_prompt}.
 {get_language_instruction(language)}
 """)
 
-    return _build_prompt(prompt, project_context.reference_files_content, tag='get_outline_generation_prompt')
+    reference_files = _reference_files_for(
+        project_context, _get_original_input(project_context), whole_document=True, images=False)
+    return _build_prompt(prompt, reference_files, tag='get_outline_generation_prompt')
 
 
 def get_outline_generation_prompt_markdown(project_context: 'ProjectContext', language: str = None) -> str:
@@ -271,7 +293,9 @@ The user's request: {idea_prompt}.
 {get_language_instruction(language)}
 """)
 
-    return _build_prompt(prompt, project_context.reference_files_content, tag='get_outline_generation_prompt_markdown')
+    reference_files = _reference_files_for(
+        project_context, _get_original_input(project_context), whole_document=True, images=False)
+    return _build_prompt(prompt, reference_files, tag='get_outline_generation_prompt_markdown')
 
 
 def get_outline_parsing_prompt(project_context: 'ProjectContext', language: str = None) -> str:
@@ -305,7 +329,9 @@ Now parse the outline text above into the structured format. Return only the JSO
 {get_language_instruction(language)}
 """)
 
-    return _build_prompt(prompt, project_context.reference_files_content, tag='get_outline_parsing_prompt')
+    reference_files = _reference_files_for(
+        project_context, _get_original_input(project_context), whole_document=True, images=False)
+    return _build_prompt(prompt, reference_files, tag='get_outline_parsing_prompt')
 
 
 def get_outline_parsing_prompt_markdown(project_context: 'ProjectContext', language: str = None) -> str:
@@ -332,7 +358,9 @@ Now parse the outline text above into the Markdown format. Output `<!-- END -->`
 {get_language_instruction(language)}
 """)
 
-    return _build_prompt(prompt, project_context.reference_files_content, tag='get_outline_parsing_prompt_markdown')
+    reference_files = _reference_files_for(
+        project_context, _get_original_input(project_context), whole_document=True, images=False)
+    return _build_prompt(prompt, reference_files, tag='get_outline_parsing_prompt_markdown')
 
 
 def get_description_to_outline_prompt(project_context: 'ProjectContext', language: str = None) -> str:
@@ -367,7 +395,9 @@ Now extract the outline structure from the description text above. Return only t
 {get_language_instruction(language)}
 """)
 
-    return _build_prompt(prompt, project_context.reference_files_content, tag='get_description_to_outline_prompt')
+    reference_files = _reference_files_for(
+        project_context, _get_original_input(project_context), whole_document=True, images=False)
+    return _build_prompt(prompt, reference_files, tag='get_description_to_outline_prompt')
 
 
 def get_description_to_outline_prompt_markdown(project_context: 'ProjectContext', language: str = None) -> str:
@@ -394,7 +424,9 @@ Now extract the outline structure from the description text above. Output `<!--
 {get_language_instruction(language)}
 """)
 
-    return _build_prompt(prompt, project_context.reference_files_content, tag='get_description_to_outline_prompt_markdown')
+    reference_files = _reference_files_for(
+        project_context, _get_original_input(project_context), whole_document=True, images=False)
+    return _build_prompt(prompt, reference_files, tag='get_description_to_outline_prompt_markdown')
 
 
 def get_outline_refinement_prompt(current_outline: List[Dict], user_requirement: str,
@@ -454,7 +486,9 @@ You are a helpful assistant that modifies PPT outlines based on user requirement
 {get_language_instruction(language)}
 """)
 
-    return _build_prompt(prompt, project_context.reference_files_content, tag='get_outline_refinement_prompt')
+    reference_files = _reference_files_for(
+        project_context, f"{user_requirement}\n{outline_text}", whole_document=True, images=False)
+    return _build_prompt(prompt, reference_files, tag='get_outline_refinement_prompt')
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -503,7 +537,9 @@ def get_page_description_prompt(project_context: 'ProjectContext', outline: list
 {get_language_instruction(language)}
 """)
 
-    return _build_prompt(prompt, project_context.reference_files_content, tag='get_page_description_prompt')
+    # 只内联与本页相关的参考片段
+    reference_files = _reference_files_for(project_context, f"{page_outline}\n{part_info}")
+    return _build_prompt(prompt, reference_files, tag='get_page_description_prompt')
 
 
 def get_all_descriptions_stream_prompt(project_context: 'ProjectContext',
@@ -562,7 +598,8 @@ def get_all_descriptions_stream_prompt(project_context: 'ProjectContext',
 {get_language_instruction(language)}
 """)
 
-    return _build_prompt(prompt, project_context.reference_files_content, tag='get_all_descriptions_stream_prompt')
+    reference_files = _reference_files_for(project_context, pages_outline_text, whole_document=True)
+    return _build_prompt(prompt, reference_files, tag='get_all_descriptions_stream_prompt')
 
 
 def get_description_split_prompt(project_context: 'ProjectContext',
@@ -692,7 +729,9 @@ You are a helpful assistant that modifies PPT page descriptions based on user re
 {get_language_instruction(language)}
 """)
 
-    return _build_prompt(prompt, project_context.reference_files_content, tag='get_descriptions_refinement_prompt')
+    reference_files = _reference_files_for(
+        project_context, f"{user_requirement}\n{all_descriptions_text}", whole_document=True)
+    return _build_prompt(prompt, reference_files, tag='get_descriptions_refinement_prompt')
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -0,0 +1,547 @@
+"""
+Reference Index - parse-time digests and BM25 retrieval over reference files
+
+Prompts used to inline the full markdown of every parsed reference file, so
+with a few long PDFs attached each per-page description call carried the
+same megabytes of text. Instead:
+
+- When parsing completes (``index_reference_file``), the file gets a
+  digest: content hash, token counts, the text with image links replaced
+  by their alt text (``AIService.remove_markdown_images``) and the heading
+  list. Its markdown is also split into heading-aware chunks of about
+  ``CHUNK_TOKENS`` tokens, stored with their term frequencies in
+  ``reference_chunks``.
+- ``load_project_reference_files`` reads only the digests of a project's
+  files. The markdown itself is loaded only while all files together fit
+  in REFERENCE_PROMPT_TOKEN_BUDGET; in that case prompts inline everything
+  as before (outline prompts use the image-free text).
+- Otherwise ``get_reference_retriever`` loads the chunk indexes (cached
+  in-process by file id + updated_at). ``ReferenceRetriever.select(query)``
+  scores all chunks with BM25 (numpy, one vector update per query term per
+  file). It returns at most REFERENCE_RETRIEVAL_TOP_K chunks that fit the
+  token budget, regrouped per file in document order, in the same
+  ``{'filename', 'content'}`` shape the prompt builders already use.
+
+Tokenization works without extra dependencies: ASCII words and numbers
+are single terms, and CJK runs are split into character bigrams.
+"""
+import hashlib
+import json
+import logging
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from itertools import zip_longest
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CHUNK_TOKENS = 400
+FILE_INDEX_CACHE_SIZE = 64
+MAX_HEADINGS = 500
+# 大纲级 prompt 中文档结构（标题列表）最多占用的预算比例
+HEADINGS_BUDGET_RATIO = 0.125
+
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_CJK = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af'
+_CJK_RE = re.compile(f'[{_CJK}]')
+_TERM_RE = re.compile(rf'[a-z0-9]+(?:[._-][a-z0-9]+)*|[{_CJK}]+')
+# 图片/链接地址（/files/mineru/<hash>/... 等）不参与检索
+_URL_RE = re.compile(r'\]\([^)]*\)|https?://\S+')
+_HEADING_RE = re.compile(r'^#{1,6}\s+\S')
+_HEADING_LINE_RE = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+
+_STOPWORDS = frozenset({
+    'the', 'and', 'for', 'are', 'was', 'with', 'that', 'this', 'from', 'its', 'into', 'not',
+    'but', 'have', 'has', 'had', 'were', 'been', 'their', 'they', 'which', 'will', 'can',
+})
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt token count: one per CJK character, one per 4 other characters"""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased ASCII words / numbers and CJK character bigrams"""
+    terms = []
+    for match in _TERM_RE.finditer(_URL_RE.sub(']', text.lower())):
+        term = match.group()
+        if _CJK_RE.match(term):
+            if len(term) == 1:
+                terms.append(term)
+            else:
+                terms.extend(term[i:i + 2] for i in range(len(term) - 1))
+        elif (len(term) > 1 or term.isdigit()) and term not in _STOPWORDS:
+            terms.append(term)
+    return terms
+
+
+def _split_oversized(block: str, max_tokens: int) -> List[str]:
+    """Split a block (e.g. a long table or paragraph) by lines, then by characters"""
+    pieces, current, current_tokens = [], [], 0
+    for line in block.split('\n'):
+        line_tokens = estimate_tokens(line)
+        if line_tokens > max_tokens:
+            if current:
+                pieces.append('\n'.join(current))
+                current, current_tokens = [], 0
+            # 超长单行：按字符数粗略切分（CJK 约 1 字 1 token）
+            step = max(1, len(line) * max_tokens // line_tokens)
+            pieces.extend(line[i:i + step] for i in range(0, len(line), step))
+            continue
+        if current and current_tokens + line_tokens > max_tokens:
+            pieces.append('\n'.join(current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        pieces.append('\n'.join(current))
+    return pieces
+
+
+def chunk_markdown(markdown: str, max_tokens: int = CHUNK_TOKENS) -> List[str]:
+    """
+    Split markdown into chunks of at most ~``max_tokens`` tokens.
+
+    Paragraph boundaries are kept, and every heading starts a new chunk.
+    Chunks that continue a section are prefixed with the section heading,
+    so they stay meaningful (and searchable) on their own.
+    """
+    chunks = []
+    heading = ''
+    current: List[str] = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append('\n\n'.join(current))
+        current, current_tokens = [], 0
+
+    for block in re.split(r'\n\s*\n', markdown or ''):
+        block = block.strip()
+        if not block:
+            continue
+        if _HEADING_RE.match(block):
+            flush()
+            heading = block.split('\n', 1)[0]
+        # 续接的片段会带上标题，切分时预留标题的长度
+        limit = max(1, max_tokens - estimate_tokens(heading))
+        pieces = _split_oversized(block, limit) if estimate_tokens(block) > limit else [block]
+        for piece in pieces:
+            piece_tokens = estimate_tokens(piece)
+            if current and current_tokens + piece_tokens > max_tokens and current != [heading]:
+                flush()
+            if not current and heading and not piece.startswith(heading):
+                current.append(heading)
+                current_tokens += estimate_tokens(heading)
+            current.append(piece)
+            current_tokens += piece_tokens
+    flush()
+    return chunks
+
+
+def extract_headings(markdown: str) -> List[List]:
+    """[[level, title], ...] of the markdown headings (outside code blocks)"""
+    headings = []
+    in_fence = False
+    for line in (markdown or '').splitlines():
+        if line.lstrip().startswith('```'):
+            in_fence = not in_fence
+            continue
+        match = None if in_fence else _HEADING_LINE_RE.match(line)
+        if match:
+            headings.append([len(match.group(1)), match.group(2)])
+            if len(headings) >= MAX_HEADINGS:
+                break
+    return headings
+
+
+def format_headings(headings: List[List], max_tokens: int) -> str:
+    """Indented heading list, truncated to ``max_tokens``"""
+    lines = []
+    used = 0
+    top = min((level for level, _ in headings), default=1)
+    for level, title in headings:
+        line = '  ' * (level - top) + f'- {title}'
+        tokens = estimate_tokens(line) + 1
+        if used + tokens > max_tokens:
+            break
+        lines.append(line)
+        used += tokens
+    return '\n'.join(lines)
+
+
+def build_reference_digest(reference_file):
+    """Fill the digest columns of a parsed reference file (the caller commits)"""
+    from services.ai_service import AIService
+
+    markdown = reference_file.markdown_content or ''
+    clean = AIService.remove_markdown_images(markdown) or ''
+    reference_file.content_hash = hashlib.sha256(markdown.encode('utf-8')).hexdigest()
+    reference_file.token_count = estimate_tokens(markdown)
+    reference_file.clean_content = clean
+    reference_file.clean_token_count = estimate_tokens(clean)
+    reference_file.headings = json.dumps(extract_headings(markdown), ensure_ascii=False)
+
+
+def index_reference_file(reference_file) -> int:
+    """
+    Parse-time stage: digest + retrieval chunks of a parsed reference file.
+
+    The caller commits. Returns the number of chunks.
+    """
+    build_reference_digest(reference_file)
+    return build_reference_index(reference_file)
+
+
+def build_reference_index(reference_file) -> int:
+    """
+    (Re)build the chunks of a parsed reference file in the current session.
+
+    The caller commits. Returns the number of chunks.
+    """
+    from models import db, ReferenceChunk
+
+    ReferenceChunk.query.filter_by(reference_file_id=reference_file.id).delete(synchronize_session=False)
+    chunks = chunk_markdown(reference_file.markdown_content or '')
+    for i, text in enumerate(chunks):
+        terms = Counter(tokenize(text))
+        db.session.add(ReferenceChunk(
+            reference_file_id=reference_file.id,
+            chunk_index=i,
+            content=text,
+            token_count=estimate_tokens(text),
+            term_count=sum(terms.values()),
+            terms=json.dumps(terms, ensure_ascii=False),
+        ))
+    return len(chunks)
+
+
+class FileIndex:
+    """In-memory postings of one reference file: term -> (chunk positions, term frequencies)"""
+
+    def __init__(self, filename: str, rows: List[Tuple[str, int, int, Dict[str, int]]],
+                 headings: Optional[List[List]] = None):
+        self.filename = filename
+        self.headings = headings or []
+        self.contents = [row[0] for row in rows]
+        self.token_counts = np.array([row[1] for row in rows], dtype=np.int64)
+        self.lengths = np.array([row[2] for row in rows], dtype=np.float64)
+        postings: Dict[str, Tuple[list, list]] = {}
+        for position, row in enumerate(rows):
+            for term, tf in row[3].items():
+                entry = postings.setdefault(term, ([], []))
+                entry[0].append(position)
+                entry[1].append(tf)
+        self.postings = {
+            term: (np.array(positions, dtype=np.int64), np.array(tfs, dtype=np.float64))
+            for term, (positions, tfs) in postings.items()
+        }
+
+    @property
+    def total_tokens(self) -> int:
+        return int(self.token_counts.sum())
+
+    def __len__(self):
+        return len(self.contents)
+
+
+class ReferenceRetriever:
+    """BM25 over the chunks of several reference files"""
+
+    def __init__(self, files: List[FileIndex], token_budget: int, top_k: int):
+        self.files = files
+        self.token_budget = token_budget
+        self.top_k = top_k
+        self.chunk_count = sum(len(f) for f in files)
+        total_length = sum(float(f.lengths.sum()) for f in files)
+        self.avg_length = total_length / self.chunk_count if self.chunk_count else 1.0
+        self.total_tokens = sum(f.total_tokens for f in files)
+
+    def score(self, query: str) -> List[np.ndarray]:
+        """BM25 score of every chunk, one array per file"""
+        scores = [np.zeros(len(f)) for f in self.files]
+        for term in set(tokenize(query)):
+            df = sum(len(f.postings[term][0]) for f in self.files if term in f.postings)
+            if not df:
+                continue
+            idf = math.log(1 + (self.chunk_count - df + 0.5) / (df + 0.5))
+            for f, file_scores in zip(self.files, scores):
+                if term not in f.postings:
+                    continue
+                positions, tf = f.postings[term]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * f.lengths[positions] / self.avg_length)
+                file_scores[positions] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def _coverage_order(self) -> List[Tuple[int, int]]:
+        """(file, chunk) pairs spread evenly over each document, interleaved across files"""
+        orders = [_spread_order(len(f)) for f in self.files]
+        longest = max(len(order) for order in orders)
+        return [(file_pos, order[k]) for k in range(longest)
+                for file_pos, order in enumerate(orders) if k < len(order)]
+
+    def select(self, query: str, whole_document: bool = False, images: bool = True) -> List[Dict[str, str]]:
+        """
+        Chunks relevant to ``query`` within the token budget, grouped per file in document order.
+
+        By default at most ``top_k`` matching chunks are used (per-page prompts).
+        With ``whole_document`` (outline-level prompts) each file starts with its
+        heading list, and the rest of the budget is filled alternating matching
+        chunks with chunks spread evenly over every file, so the model still
+        sees the overall structure of the documents.
+        ``images=False`` replaces markdown image links by their alt text.
+        """
+        token_budget = self.token_budget
+        outlines: Dict[int, str] = {}
+        if whole_document:
+            per_file = int(token_budget * HEADINGS_BUDGET_RATIO) // len(self.files)
+            for file_pos, f in enumerate(self.files):
+                outline = format_headings(f.headings, per_file)
+                if outline:
+                    outlines[file_pos] = outline
+                    token_budget -= estimate_tokens(outline)
+
+        scores = self.score(query)
+        candidates = sorted(
+            ((file_scores[i], file_pos, int(i))
+             for file_pos, file_scores in enumerate(scores)
+             for i in np.flatnonzero(file_scores > 0)),
+            key=lambda c: -c[0],
+        )
+        ranked = [(file_pos, i) for _, file_pos, i in candidates]
+        top_k = self.top_k
+        if whole_document:
+            # 相关片段与均匀覆盖的片段交替选取，各占约一半预算
+            coverage = self._coverage_order()
+            ranked = [pair for pairs in zip_longest(ranked, coverage) for pair in pairs if pair is not None]
+            top_k = None
+        elif not ranked:
+            # 查询与参考文件没有任何共同词：退回到均匀覆盖各文件
+            ranked = self._coverage_order()
+
+        selected: Dict[int, set] = {}
+        used_tokens = picked = 0
+        for file_pos, i in ranked:
+            if top_k is not None and picked >= top_k:
+                break
+            if i in selected.get(file_pos, ()):
+                continue
+            tokens = int(self.files[file_pos].token_counts[i])
+            if used_tokens + tokens > token_budget:
+                continue
+            selected.setdefault(file_pos, set()).add(i)
+            used_tokens += tokens
+            picked += 1
+
+        logger.debug(f"Reference retrieval selected {picked} chunks, {used_tokens}/{self.total_tokens} tokens")
+        if not images:
+            from services.ai_service import AIService
+        results = []
+        for file_pos, f in enumerate(self.files):
+            if file_pos not in selected and file_pos not in outlines:
+                continue
+            content = '\n\n[...]\n\n'.join(f.contents[i] for i in sorted(selected.get(file_pos, ())))
+            if not images:
+                content = AIService.remove_markdown_images(content) or ''
+            if file_pos in outlines:
+                content = f"文档结构：\n{outlines[file_pos]}\n\n{content}".rstrip()
+            results.append({'filename': f.filename, 'content': content})
+        return results
+
+
+def _spread_order(n: int) -> List[int]:
+    """0, then midpoints of ever smaller intervals: any prefix covers the range evenly"""
+    order = [0] if n else []
+    intervals = [(0, n)]
+    while intervals:
+        next_intervals = []
+        for lo, hi in intervals:
+            mid = (lo + hi) // 2
+            if mid > lo:
+                order.append(mid)
+                next_intervals += [(lo, mid), (mid, hi)]
+        intervals = next_intervals
+    return order
+
+
+_file_index_cache: "OrderedDict[tuple, FileIndex]" = OrderedDict()
+_file_index_cache_lock = threading.Lock()
+
+
+def _load_file_index(file_id: str, filename: str, stamp, headings=None) -> Optional[FileIndex]:
+    key = (file_id, stamp)
+    with _file_index_cache_lock:
+        cached = _file_index_cache.get(key)
+        if cached is not None:
+            _file_index_cache.move_to_end(key)
+            return cached
+
+    from models import db, ReferenceChunk, ReferenceFile
+
+    rows = db.session.query(
+        ReferenceChunk.content, ReferenceChunk.token_count, ReferenceChunk.term_count, ReferenceChunk.terms
+    ).filter(ReferenceChunk.reference_file_id == file_id).order_by(ReferenceChunk.chunk_index).all()
+    if rows:
+        rows = [(content, tokens, length, json.loads(terms)) for content, tokens, length, terms in rows]
+    else:
+        # 早于检索索引解析的文件：补建一次，使用独立会话提交，不影响调用方的事务
+        from sqlalchemy.exc import IntegrityError
+        from sqlalchemy.orm import Session
+        with Session(db.engine) as session:
+            reference_file = session.get(ReferenceFile, file_id)
+            if reference_file is None or not reference_file.markdown_content:
+                return None
+            rows = []
+            for text in chunk_markdown(reference_file.markdown_content):
+                terms = Counter(tokenize(text))
+                rows.append((text, estimate_tokens(text), sum(terms.values()), dict(terms)))
+            session.add_all(
+                ReferenceChunk(reference_file_id=file_id, chunk_index=i, content=text, token_count=tokens,
+                               term_count=length, terms=json.dumps(terms, ensure_ascii=False))
+                for i, (text, tokens, length, terms) in enumerate(rows)
+            )
+            try:
+                session.commit()
+            except IntegrityError:
+                # 另一个请求已经补建了同一文件的片段：改用已提交的行
+                session.rollback()
+                stored = session.query(
+                    ReferenceChunk.content, ReferenceChunk.token_count, ReferenceChunk.term_count,
+                    ReferenceChunk.terms
+                ).filter(ReferenceChunk.reference_file_id == file_id).order_by(ReferenceChunk.chunk_index).all()
+                if stored:
+                    rows = [(content, tokens, length, json.loads(terms)) for content, tokens, length, terms in stored]
+            except Exception as e:
+                session.rollback()
+                logger.warning(f"Could not persist reference index for {file_id}: {e}")
+        if not rows:
+            return None
+
+    index = FileIndex(filename, rows, headings)
+    with _file_index_cache_lock:
+        _file_index_cache[key] = index
+        while len(_file_index_cache) > FILE_INDEX_CACHE_SIZE:
+            _file_index_cache.popitem(last=False)
+    return index
+
+
+def _backfill_digests(file_ids: List[str]):
+    """Digest files parsed before digests existed, in a separate session (the caller's transaction is untouched)"""
+    from sqlalchemy.orm import Session
+    from models import db, ReferenceFile
+
+    with Session(db.engine) as session:
+        for reference_file in session.query(ReferenceFile).filter(ReferenceFile.id.in_(file_ids)):
+            build_reference_digest(reference_file)
+        try:
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning(f"Could not persist reference digests: {e}")
+
+
+def attach_reference_contents(entries: List[Dict]):
+    """Load the full and image-free markdown of digest-only entries (in place)"""
+    from models import db, ReferenceFile
+
+    missing = [f['id'] for f in entries if 'content' not in f]
+    if not missing:
+        return
+    rows = db.session.query(
+        ReferenceFile.id, ReferenceFile.markdown_content, ReferenceFile.clean_content
+    ).filter(ReferenceFile.id.in_(missing)).all()
+    contents = {file_id: (markdown or '', clean) for file_id, markdown, clean in rows}
+    for f in entries:
+        if f['id'] in contents:
+            f['content'], f['clean_content'] = contents[f['id']]
+
+
+def _token_budget() -> int:
+    from flask import current_app, has_app_context
+    from config import Config
+
+    if not has_app_context():
+        return 0
+    return int(current_app.config.get('REFERENCE_PROMPT_TOKEN_BUDGET', Config.REFERENCE_PROMPT_TOKEN_BUDGET))
+
+
+def load_project_reference_files(project_id: str) -> List[Dict]:
+    """
+    Parsed reference files of a project, in upload order.
+
+    Each entry has ``id``, ``filename``, ``updated_at``, ``token_count`` and
+    ``headings``. ``content`` / ``clean_content`` (markdown without image
+    links) are only loaded when all files together fit the prompt token
+    budget; otherwise prompts retrieve chunks and the markdown is never read.
+    """
+    from models import db, ReferenceFile
+
+    query = db.session.query(
+        ReferenceFile.id, ReferenceFile.filename, ReferenceFile.updated_at,
+        ReferenceFile.token_count, ReferenceFile.headings,
+    ).filter(
+        ReferenceFile.project_id == project_id,
+        ReferenceFile.parse_status == 'completed',
+        ReferenceFile.markdown_content.isnot(None),
+    ).order_by(ReferenceFile.created_at)
+    rows = query.all()
+    missing = [row.id for row in rows if row.token_count is None]
+    if missing:
+        _backfill_digests(missing)
+        rows = query.all()
+
+    entries = [
+        {
+            'id': row.id,
+            'filename': row.filename,
+            'updated_at': row.updated_at,
+            'token_count': row.token_count or 0,
+            'headings': json.loads(row.headings) if row.headings else [],
+        }
+        for row in rows if row.token_count
+    ]
+    token_budget = _token_budget()
+    if token_budget <= 0 or sum(f['token_count'] for f in entries) <= token_budget:
+        attach_reference_contents(entries)
+    return entries
+
+
+def get_reference_retriever(reference_files_content: List[Dict]) -> Optional[ReferenceRetriever]:
+    """
+    Retriever for the given ``load_project_reference_files`` entries, or None
+    when retrieval is disabled or everything fits the token budget (the
+    entries then carry their full ``content``).
+    """
+    from flask import current_app
+    from config import Config
+
+    if not reference_files_content or all('content' in f for f in reference_files_content):
+        return None
+    token_budget = _token_budget()
+    top_k = int(current_app.config.get('REFERENCE_RETRIEVAL_TOP_K', Config.REFERENCE_RETRIEVAL_TOP_K))
+
+    try:
+        files = [
+            _load_file_index(f['id'], f.get('filename', 'unknown'), f.get('updated_at'), f.get('headings'))
+            for f in reference_files_content
+        ]
+    except Exception as e:
+        logger.warning(f"Reference index unavailable, inlining full reference files: {e}")
+        attach_reference_contents(reference_files_content)
+        return None
+    files = [f for f in files if f is not None and len(f)]
+    if not files:
+        return None
+    return ReferenceRetriever(files, token_budget, top_k)
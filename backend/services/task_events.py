@@ -0,0 +1,154 @@
+"""
+Task Events - in-process pub/sub hub for task progress
+
+Every commit that changes a Task row (status / progress / error) publishes a
+snapshot of ``task.to_dict()`` to the hub. Clients subscribe through
+``GET /api/projects/<project_id>/tasks/<task_id>/events`` (SSE) instead of
+polling ``GET /tasks/<task_id>``, which costs a SQLite read per poll.
+
+Each task keeps a small ring buffer of recent events with monotonically
+increasing ids, so a reconnecting EventSource that sends ``Last-Event-ID``
+resumes without missing updates. If the buffer no longer covers the
+requested id (or the process restarted), the endpoint falls back to one
+fresh snapshot from the database.
+
+Publishing is hooked into SQLAlchemy session events, so all task functions
+in ``services/task_manager.py`` publish without explicit calls.
+"""
+import logging
+import queue
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ('COMPLETED', 'FAILED')
+
+
+class _Channel:
+    """Event buffer and subscribers of one task"""
+
+    def __init__(self, buffer_size: int):
+        self.last_id = 0
+        self.events: deque = deque(maxlen=buffer_size)  # (event_id, data)
+        self.subscribers: List[queue.Queue] = []
+
+
+class TaskEventHub:
+    """Thread-safe pub/sub of task snapshots keyed by task id"""
+
+    def __init__(self, buffer_size: int = 50, max_channels: int = 1000):
+        self.buffer_size = buffer_size
+        self.max_channels = max_channels
+        self._lock = threading.Lock()
+        self._channels: "OrderedDict[str, _Channel]" = OrderedDict()
+
+    def _channel(self, task_id: str) -> _Channel:
+        """Get or create a channel, dropping the oldest idle ones (caller holds the lock)"""
+        channel = self._channels.get(task_id)
+        if channel is None:
+            channel = _Channel(self.buffer_size)
+            self._channels[task_id] = channel
+            if len(self._channels) > self.max_channels:
+                for stale_id in list(self._channels):
+                    if len(self._channels) <= self.max_channels:
+                        break
+                    if not self._channels[stale_id].subscribers:
+                        del self._channels[stale_id]
+        else:
+            self._channels.move_to_end(task_id)
+        return channel
+
+    def publish(self, task_id: str, data: Dict[str, Any]) -> int:
+        """Publish a snapshot and return its event id"""
+        with self._lock:
+            channel = self._channel(task_id)
+            channel.last_id += 1
+            event_id = channel.last_id
+            channel.events.append((event_id, data))
+            subscribers = list(channel.subscribers)
+        for subscriber in subscribers:
+            subscriber.put((event_id, data))
+        return event_id
+
+    def subscribe(self, task_id: str, last_event_id: Optional[int] = None
+                  ) -> Tuple[queue.Queue, List[Tuple[int, Dict[str, Any]]], bool]:
+        """
+        Register a subscriber.
+
+        Returns:
+            (queue, backlog, complete): ``backlog`` holds buffered events after
+            ``last_event_id``; ``complete`` is False when the buffer cannot
+            prove nothing was missed (caller should send a fresh snapshot).
+        """
+        subscriber: queue.Queue = queue.Queue()
+        with self._lock:
+            channel = self._channel(task_id)
+            channel.subscribers.append(subscriber)
+            if last_event_id is None or last_event_id > channel.last_id:
+                return subscriber, [], False
+            backlog = [(eid, data) for eid, data in channel.events if eid > last_event_id]
+            oldest = channel.events[0][0] if channel.events else channel.last_id + 1
+            complete = last_event_id >= oldest - 1
+            return subscriber, backlog, complete
+
+    def unsubscribe(self, task_id: str, subscriber: queue.Queue):
+        with self._lock:
+            channel = self._channels.get(task_id)
+            if channel and subscriber in channel.subscribers:
+                channel.subscribers.remove(subscriber)
+
+    def last_event_id(self, task_id: str) -> int:
+        with self._lock:
+            channel = self._channels.get(task_id)
+            return channel.last_id if channel else 0
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'channels': len(self._channels),
+                'subscribers': sum(len(c.subscribers) for c in self._channels.values()),
+            }
+
+
+task_event_hub = TaskEventHub()
+
+
+# ---------------------------------------------------------------------------
+# SQLAlchemy hooks: publish Task snapshots after each successful commit
+# ---------------------------------------------------------------------------
+
+_PENDING_KEY = 'task_event_snapshots'
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_task_snapshots(session, flush_context):
+    from models import Task
+
+    tasks = [obj for obj in list(session.new) + list(session.dirty) if isinstance(obj, Task)]
+    if not tasks:
+        return
+    with session.no_autoflush:
+        for task in tasks:
+            try:
+                session.info.setdefault(_PENDING_KEY, {})[task.id] = task.to_dict()
+            except Exception as e:  # 快照失败不能影响业务提交
+                logger.debug(f"Failed to snapshot task {task.id}: {e}")
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_task_snapshots(session):
+    snapshots = session.info.pop(_PENDING_KEY, None)
+    if not snapshots:
+        return
+    for task_id, data in snapshots.items():
+        task_event_hub.publish(task_id, data)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_task_snapshots(session):
+    session.info.pop(_PENDING_KEY, None)
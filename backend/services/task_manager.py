@@ -1,18 +1,26 @@
 """
-Task Manager - handles background tasks using ThreadPoolExecutor
-No need for Celery or Redis, uses in-memory task tracking
+Task Manager - handles background tasks with priority lanes
+No need for Celery or Redis: durable tasks are persisted in the SQLite tasks table
 """
 import logging
 import os
+import socket
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from typing import Callable, List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 from PIL import Image
 from models import db, Task, Page, Material, PageImageVersion
 from utils import get_filtered_pages
 from utils.image_utils import check_image_resolution
+from config import Config
+from services.image_cache import ImageCacheStats, get_image_cache
+from services.progress_aggregator import ProgressAggregator
+import services.task_events  # noqa: F401  注册任务进度推送钩子
 
 
 def _get_image_prompt_field_names() -> set | None:
@@ -39,35 +47,324 @@ def _append_extra_fields(desc_text: str, desc_content: dict) -> str:
             parts.append(f"\n{name}：{value}")
     return ''.join(parts)
 from pathlib import Path
-from services.pdf_service import split_pdf_to_pages
+from services.pdf_service import get_pdf_info, iter_split_pdf
 
 logger = logging.getLogger(__name__)
 
 
+# 调度优先级（数值越小越先执行）
+PRIORITY_INTERACTIVE = 0  # 单页生成/编辑、素材生成等用户正在等待的操作
+PRIORITY_NORMAL = 50
+PRIORITY_BULK = 100  # 整个项目的批量生成、翻新、导出
+
+TASK_PRIORITIES = {
+    'GENERATE_PAGE_IMAGE': PRIORITY_INTERACTIVE,
+    'EDIT_PAGE_IMAGE': PRIORITY_INTERACTIVE,
+    'GENERATE_MATERIAL': PRIORITY_INTERACTIVE,
+    'GENERATE_DESCRIPTIONS': PRIORITY_BULK,
+    'GENERATE_IMAGES': PRIORITY_BULK,
+    'PPT_RENOVATION': PRIORITY_BULK,
+    'EXPORT_EDITABLE_PPTX': PRIORITY_BULK,
+    'EXPORT_PPTX': PRIORITY_NORMAL,
+    'EXPORT_PDF': PRIORITY_NORMAL,
+    'EXPORT_IMAGES': PRIORITY_NORMAL,
+}
+
+# 导出格式 -> 任务类型
+EXPORT_TASK_TYPES = {
+    'pptx': 'EXPORT_PPTX',
+    'pdf': 'EXPORT_PDF',
+    'images': 'EXPORT_IMAGES',
+}
+
+# task_type -> handler(task_id, app, **payload)，用于从持久化的 payload 重建并执行任务
+_TASK_HANDLERS: Dict[str, Callable] = {}
+
+
+def register_task_handler(task_type: str):
+    """Register a durable handler that can run a task from its JSON payload"""
+    def decorator(handler: Callable):
+        _TASK_HANDLERS[task_type] = handler
+        return handler
+    return decorator
+
+
+class _QueuedTask:
+    """An entry waiting in one of the priority lanes"""
+    __slots__ = ('task_id', 'func', 'args', 'kwargs', 'priority', 'group', 'future')
+
+    def __init__(self, task_id, func, args, kwargs, priority, group):
+        self.task_id = task_id
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.group = group
+        self.future = Future()
+
+
 class TaskManager:
-    """Simple task manager using ThreadPoolExecutor"""
+    """
+    Priority-aware task manager
+
+    - Priority lanes: interactive tasks always run before bulk tasks, and
+      ``reserved_interactive_workers`` slots are never taken by bulk tasks so
+      single-page edits do not wait behind a long "generate all".
+    - Per-project fairness: within a lane, queued tasks are taken round-robin
+      by group (project id), so one project cannot starve the others.
+    - Durability: tasks submitted via ``enqueue_task`` store their task type and
+      JSON payload in the ``tasks`` table. They are resumed at startup and can be
+      executed by separate worker processes (``TASK_QUEUE_MODE=external``,
+      see worker.py).
+    """
     
-    def __init__(self, max_workers: int = 4):
-        """Initialize task manager"""
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
-        self.active_tasks = {}  # task_id -> Future
+    def __init__(self, max_workers: int = 4, reserved_interactive_workers: int = 1,
+                 worker_id: str = None):
+        """Initialize task manager (worker threads are started lazily)"""
+        self.max_workers = max(1, max_workers)
+        self.reserved_interactive_workers = max(0, min(reserved_interactive_workers, self.max_workers - 1))
+        self.worker_id = worker_id or f"{socket.gethostname()}:web"
+        self.active_tasks = {}  # task_id -> Future (queued or running)
         self.lock = threading.Lock()
+        self._cond = threading.Condition(self.lock)
+        self._lanes: Dict[int, OrderedDict] = {}  # priority -> OrderedDict(group -> deque[_QueuedTask])
+        self._running_bulk = 0
+        self._threads: List[threading.Thread] = []
+        self._shutdown = False
     
-    def submit_task(self, task_id: str, func: Callable, *args, **kwargs):
-        """Submit a background task"""
-        future = self.executor.submit(func, task_id, *args, **kwargs)
-        
+    def configure(self, max_workers: int = None, reserved_interactive_workers: int = None,
+                  worker_id: str = None):
+        """Adjust pool settings before the first task is submitted"""
         with self.lock:
-            self.active_tasks[task_id] = future
+            if self._threads:
+                logger.warning("TaskManager already started, configuration change ignored")
+                return
+            if max_workers:
+                self.max_workers = max(1, max_workers)
+            if reserved_interactive_workers is not None:
+                self.reserved_interactive_workers = reserved_interactive_workers
+            self.reserved_interactive_workers = max(0, min(self.reserved_interactive_workers, self.max_workers - 1))
+            if worker_id:
+                self.worker_id = worker_id
+    
+    def submit_task(self, task_id: str, func: Callable, *args,
+                    priority: int = PRIORITY_NORMAL, group: str = None, **kwargs):
+        """Submit a background task (in-memory only, not resumed after restart)"""
+        item = _QueuedTask(task_id, func, args, kwargs, priority, group or task_id)
+        
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("TaskManager has been shut down")
+            self.active_tasks[task_id] = item.future
+            lane = self._lanes.setdefault(priority, OrderedDict())
+            lane.setdefault(item.group, deque()).append(item)
+            self._ensure_workers()
+            self._cond.notify()
         
         # Add callback to clean up when done and log exceptions
-        future.add_done_callback(lambda f: self._task_done_callback(task_id, f))
+        item.future.add_done_callback(lambda f: self._task_done_callback(task_id, f))
+        return item.future
+    
+    def enqueue_task(self, task, app, payload: Dict[str, Any], priority: int = None):
+        """
+        Persist a task's payload and schedule it
+
+        The task row must already exist; ``task.task_type`` selects the handler
+        registered with ``register_task_handler``. In ``external`` queue mode the
+        task is only persisted and a worker process picks it up.
+        """
+        if task.task_type not in _TASK_HANDLERS:
+            raise ValueError(f"No durable handler registered for task type {task.task_type}")
+        if priority is None:
+            priority = TASK_PRIORITIES.get(task.task_type, PRIORITY_NORMAL)
+        
+        task.priority = priority
+        task.set_payload(payload)
+        db.session.commit()
+        
+        if app.config.get('TASK_QUEUE_MODE', 'inline') == 'external':
+            logger.info(f"Task {task.id} ({task.task_type}) queued for external workers")
+            return
+        self._dispatch(task.id, task.task_type, payload, priority, task.project_id, app)
+    
+    def resume_pending_tasks(self, app, fail_unresumable: bool = True):
+        """
+        Re-queue tasks left PENDING/PROCESSING by a previous run
+
+        Tasks without a durable payload cannot be rebuilt and are marked FAILED
+        (when ``fail_unresumable``) instead of staying "in progress" forever.
+        In external mode only tasks claimed by this worker id are reset; the
+        web process never dispatches them itself.
+        """
+        external = app.config.get('TASK_QUEUE_MODE', 'inline') == 'external'
+        to_resume = []
+        with app.app_context():
+            stale_tasks = Task.query.filter(
+                Task.status.in_(['PENDING', 'PROCESSING'])
+            ).order_by(Task.created_at).all()
+            for task in stale_tasks:
+                if task.payload is None or task.task_type not in _TASK_HANDLERS:
+                    if not fail_unresumable:
+                        continue
+                    task.status = 'FAILED'
+                    task.error_message = 'Interrupted by server restart'
+                    task.completed_at = datetime.utcnow()
+                    continue
+                if task.status == 'PROCESSING':
+                    if external and task.worker_id != self.worker_id:
+                        continue  # 由其他仍在运行的 worker 负责
+                    task.status = 'PENDING'
+                    task.worker_id = None
+                if not external:
+                    to_resume.append((task.id, task.task_type, task.get_payload() or {},
+                                      task.priority, task.project_id))
+            # 图片版本预留记录：单进程模式下都已无人写入；独立 worker 模式只清理足够旧的
+            discard_stale_image_reservations(
+                datetime.utcnow() - timedelta(seconds=STALE_IMAGE_RESERVATION_SECONDS) if external else None
+            )
+            db.session.commit()
+        
+        for task_id, task_type, payload, priority, project_id in to_resume:
+            self._dispatch(task_id, task_type, payload, priority, project_id, app)
+        if to_resume:
+            logger.info(f"Resumed {len(to_resume)} pending task(s) from database")
+        return len(to_resume)
+    
+    def poll_pending_tasks(self, app) -> int:
+        """Claim PENDING durable tasks from the database up to free capacity (worker mode)"""
+        with self.lock:
+            capacity = self.max_workers - len(self.active_tasks)
+        if capacity <= 0:
+            return 0
+        
+        claimed = []
+        with app.app_context():
+            candidates = Task.query.filter(
+                Task.status == 'PENDING',
+                Task.payload.isnot(None)
+            ).order_by(Task.priority, Task.created_at).limit(capacity * 4).all()
+            for task in candidates:
+                if len(claimed) >= capacity:
+                    break
+                if task.task_type not in _TASK_HANDLERS:
+                    continue
+                if self._claim(task.id):
+                    claimed.append((task.id, task.task_type, task.get_payload() or {},
+                                    task.priority, task.project_id))
+        
+        for task_id, task_type, payload, priority, project_id in claimed:
+            self._dispatch(task_id, task_type, payload, priority, project_id, app, claimed=True)
+        return len(claimed)
+    
+    def _dispatch(self, task_id, task_type, payload, priority, group, app, claimed=False):
+        """Schedule a durable task on the local worker threads"""
+        if priority is None:
+            priority = TASK_PRIORITIES.get(task_type, PRIORITY_NORMAL)
+        self.submit_task(task_id, self._run_durable_task, task_type, payload, app, claimed,
+                         priority=priority, group=group)
+    
+    def _claim(self, task_id: str) -> bool:
+        """Atomically move a task from PENDING to PROCESSING (needs app context)"""
+        rows = Task.query.filter_by(id=task_id, status='PENDING').update(
+            {'status': 'PROCESSING', 'worker_id': self.worker_id},
+            synchronize_session=False
+        )
+        db.session.commit()
+        return rows == 1
+    
+    def _run_durable_task(self, task_id, task_type, payload, app, claimed):
+        """Claim (if needed) and run a durable task through its registered handler"""
+        if not claimed:
+            with app.app_context():
+                if not self._claim(task_id):
+                    logger.info(f"Task {task_id} already claimed or cancelled, skipping")
+                    return
+        handler = _TASK_HANDLERS[task_type]
+        try:
+            handler(task_id, app=app, **payload)
+        except Exception as e:
+            # 处理函数在自身的 try 之外失败（如项目不存在、服务初始化失败）时任务仍是 PROCESSING，
+            # 前端会一直轮询，重启后也会被反复重新排队
+            self._mark_failed(task_id, str(e), app)
+            raise
+    
+    @staticmethod
+    def _mark_failed(task_id: str, error_message: str, app):
+        """Mark a task that is still PENDING/PROCESSING as FAILED"""
+        with app.app_context():
+            try:
+                db.session.rollback()
+                # 通过 ORM 修改，提交后由 task_events 推送给订阅者
+                task = Task.query.get(task_id)
+                if task and task.status in ('PENDING', 'PROCESSING'):
+                    task.status = 'FAILED'
+                    task.error_message = error_message
+                    task.completed_at = datetime.utcnow()
+                    db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logger.error(f"Failed to mark task {task_id} as FAILED", exc_info=True)
+    
+    def _ensure_workers(self):
+        """Start worker threads on first use (caller holds the lock)"""
+        while len(self._threads) < self.max_workers:
+            thread = threading.Thread(
+                target=self._worker_loop,
+                name=f"task-worker-{len(self._threads)}",
+                daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+    
+    def _pop_next(self) -> Optional[_QueuedTask]:
+        """Take the next task: lowest priority value first, round-robin by group (caller holds the lock)"""
+        bulk_limit = self.max_workers - self.reserved_interactive_workers
+        for priority in sorted(self._lanes):
+            if priority > PRIORITY_INTERACTIVE and self._running_bulk >= bulk_limit:
+                continue
+            lane = self._lanes[priority]
+            if not lane:
+                continue
+            group, queue = lane.popitem(last=False)
+            item = queue.popleft()
+            if queue:
+                lane[group] = queue  # 重新放到队尾，轮转到下一个项目
+            return item
+        return None
+    
+    def _worker_loop(self):
+        """Worker thread main loop"""
+        while True:
+            with self._cond:
+                item = self._pop_next()
+                while item is None and not self._shutdown:
+                    self._cond.wait()
+                    item = self._pop_next()
+                if item is None:
+                    return
+                is_bulk = item.priority > PRIORITY_INTERACTIVE
+                if is_bulk:
+                    self._running_bulk += 1
+            
+            try:
+                if item.future.set_running_or_notify_cancel():
+                    try:
+                        result = item.func(item.task_id, *item.args, **item.kwargs)
+                    except BaseException as e:
+                        item.future.set_exception(e)
+                    else:
+                        item.future.set_result(result)
+            finally:
+                with self._cond:
+                    if is_bulk:
+                        self._running_bulk -= 1
+                    self._cond.notify_all()
     
     def _task_done_callback(self, task_id: str, future):
         """Handle task completion and log any exceptions"""
         try:
             # Check if task raised an exception
-            exception = future.exception()
+            exception = None if future.cancelled() else future.exception()
             if exception:
                 logger.error(f"Task {task_id} failed with exception: {exception}", exc_info=exception)
         except Exception as e:
@@ -82,17 +379,44 @@ class TaskManager:
                 del self.active_tasks[task_id]
     
     def is_task_active(self, task_id: str) -> bool:
-        """Check if task is still running"""
+        """Check if task is still queued or running"""
         with self.lock:
             return task_id in self.active_tasks
     
-    def shutdown(self):
-        """Shutdown the executor"""
-        self.executor.shutdown(wait=True)
+    def get_stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth per lane and running tasks"""
+        with self.lock:
+            queued = {
+                priority: sum(len(q) for q in lane.values())
+                for priority, lane in self._lanes.items()
+            }
+            total_queued = sum(queued.values())
+            return {
+                'worker_id': self.worker_id,
+                'max_workers': self.max_workers,
+                'active': len(self.active_tasks),
+                'running': len(self.active_tasks) - total_queued,
+                'running_bulk': self._running_bulk,
+                'queued': queued,
+            }
+    
+    def shutdown(self, wait: bool = True):
+        """Stop accepting tasks and let worker threads drain the queue"""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for thread in threads:
+                thread.join()
 
 
 # Global task manager instance
-task_manager = TaskManager(max_workers=4)
+task_manager = TaskManager(
+    max_workers=Config.TASK_WORKERS,
+    reserved_interactive_workers=Config.TASK_RESERVED_INTERACTIVE_WORKERS,
+    worker_id=Config.TASK_WORKER_ID or None
+)
 
 
 def save_image_with_version(image, project_id: str, page_id: str, file_service,
@@ -112,42 +436,123 @@ def save_image_with_version(image, project_id: str, page_id: str, file_service,
         tuple: (image_path, version_number) - 图片路径和版本号
 
     这个函数会：
-    1. 计算下一个版本号（使用 MAX 查询确保安全）
-    2. 标记所有旧版本为非当前版本
-    3. 保存图片到最终位置
-    4. 生成并保存压缩的缓存图片
-    5. 创建新版本记录
-    6. 如果提供了 page_obj，更新页面状态和图片路径
+    1. 预留下一个版本号（立即提交一条 is_reserved 的版本记录，唯一约束保证不重复）
+    2. 保存图片到最终位置
+    3. 生成并保存压缩的缓存图片
+    4. 将预留的版本记录标记为已完成的当前版本，其余版本标记为非当前
+    5. 如果提供了 page_obj，更新页面状态和图片路径
     """
-    # 使用 MAX 查询确保版本号安全（即使有版本被删除也不会重复）
+    next_version = reserve_image_version(page_id, project_id, file_service, image_format)
+    try:
+        image_path, cached_image_path = save_image_files(
+            image, project_id, page_id, file_service, next_version, image_format
+        )
+    except Exception:
+        release_image_version(page_id, next_version)
+        raise
+    record_image_version(page_id, image_path, cached_image_path, next_version, page_obj=page_obj)
+
+    # 提交事务
+    db.session.commit()
+
+    logger.debug(f"Page {page_id} image saved as version {next_version}: {image_path}, cached: {cached_image_path}")
+
+    return image_path, next_version
+
+
+IMAGE_VERSION_RESERVE_ATTEMPTS = 5
+# 独立 worker 模式下，超过该时长仍未完成的预留记录视为崩溃遗留（其他进程可能仍在写入较新的预留）
+STALE_IMAGE_RESERVATION_SECONDS = 3600
+
+
+def get_next_image_version(page_id: str) -> int:
+    """下一个图片版本号（使用 MAX 查询，即使有版本被删除也不会重复；并发写入需配合 reserve_image_version）"""
     max_version = db.session.query(func.max(PageImageVersion.version_number)).filter_by(page_id=page_id).scalar() or 0
-    next_version = max_version + 1
+    return max_version + 1
 
-    # 批量更新：标记所有旧版本为非当前版本（使用单条 SQL 更高效）
-    PageImageVersion.query.filter_by(page_id=page_id).update({'is_current': False})
 
-    # 保存原图到最终位置（使用版本号）
+def reserve_image_version(page_id: str, project_id: str, file_service, image_format: str = 'PNG') -> int:
+    """
+    预留下一个版本号：写入并立即提交一条 is_reserved 的版本记录，然后才写 {page_id}_v{n} 文件。
+
+    (page_id, version_number) 上有唯一约束，并发的整批生成 / 单页重新生成 / 编辑
+    拿到相同的 MAX+1 时只有一个能提交，其余回滚后重新计算，因此不会覆盖同名图片。
+    预留记录在 record_image_version 之前不出现在版本列表中。
+    """
+    # 先提交调用方已有的修改，冲突重试时的回滚只撤销预留记录本身
+    db.session.commit()
+    for _ in range(IMAGE_VERSION_RESERVE_ATTEMPTS):
+        version_number = get_next_image_version(page_id)
+        db.session.add(PageImageVersion(
+            page_id=page_id,
+            image_path=file_service.get_generated_image_path(project_id, page_id, version_number, image_format),
+            version_number=version_number,
+            is_current=False,
+            is_reserved=True
+        ))
+        try:
+            db.session.commit()
+            return version_number
+        except IntegrityError:
+            db.session.rollback()
+            logger.info(f"Image version {version_number} of page {page_id} taken concurrently, retrying")
+    raise RuntimeError(f"Could not reserve an image version for page {page_id}")
+
+
+def release_image_version(page_id: str, version_number: int):
+    """删除保存失败的预留版本记录（使用独立会话，不影响调用方会话中未提交的修改）"""
+    with Session(db.engine) as session:
+        session.query(PageImageVersion).filter_by(
+            page_id=page_id, version_number=version_number, is_reserved=True
+        ).delete(synchronize_session=False)
+        session.commit()
+
+
+def discard_stale_image_reservations(older_than: Optional[datetime] = None) -> int:
+    """删除崩溃遗留、图片从未写完的预留版本记录（older_than 为 None 时删除全部）"""
+    query = PageImageVersion.query.filter_by(is_reserved=True)
+    if older_than is not None:
+        query = query.filter(PageImageVersion.created_at < older_than)
+    removed = query.delete(synchronize_session=False)
+    if removed:
+        logger.info(f"Discarded {removed} unfinished image version reservation(s)")
+    return removed
+
+
+def save_image_files(image, project_id: str, page_id: str, file_service,
+                     version_number: int, image_format: str = 'PNG') -> tuple[str, str]:
+    """保存原图和压缩缓存图到最终位置（只写文件，不写数据库），返回 (image_path, cached_image_path)"""
     image_path = file_service.save_generated_image(
         image, project_id, page_id,
-        version_number=next_version,
+        version_number=version_number,
         image_format=image_format
     )
 
     # 生成并保存压缩的缓存图片（用于前端快速显示）
     cached_image_path = file_service.save_cached_image(
         image, project_id, page_id,
-        version_number=next_version,
+        version_number=version_number,
         quality=85
     )
+    return image_path, cached_image_path
+
 
-    # 创建新版本记录
-    new_version = PageImageVersion(
-        page_id=page_id,
-        image_path=image_path,
-        version_number=next_version,
-        is_current=True
+def record_image_version(page_id: str, image_path: str, cached_image_path: str,
+                         version_number: int, page_obj=None):
+    """在当前事务中将预留的版本设为当前版本并更新页面（不提交）"""
+    # 批量更新：标记旧的当前版本为非当前版本（单条 SQL，走 (page_id, is_current) 索引）
+    PageImageVersion.query.filter_by(page_id=page_id, is_current=True).update({'is_current': False})
+
+    reserved = PageImageVersion.query.filter_by(page_id=page_id, version_number=version_number).update(
+        {'image_path': image_path, 'is_current': True, 'is_reserved': False}
     )
-    db.session.add(new_version)
+    if not reserved:
+        db.session.add(PageImageVersion(
+            page_id=page_id,
+            image_path=image_path,
+            version_number=version_number,
+            is_current=True
+        ))
 
     # 如果提供了 page_obj，更新页面状态和图片路径
     if page_obj:
@@ -156,19 +561,58 @@ def save_image_with_version(image, project_id: str, page_id: str, file_service,
         page_obj.status = 'COMPLETED'
         page_obj.updated_at = datetime.utcnow()
 
-    # 提交事务
-    db.session.commit()
 
-    logger.debug(f"Page {page_id} image saved as version {next_version}: {image_path}, cached: {cached_image_path}")
+def submit_pipelined(first_executor, second_executor, first_stage: Callable,
+                     second_stage: Callable, *args, **kwargs) -> Future:
+    """
+    Run ``first_stage(*args, **kwargs)`` on ``first_executor`` and feed its result
+    to ``second_stage`` on ``second_executor``.
+
+    The first stage's worker is released as soon as it returns, so a slow second
+    stage (e.g. image encoding) never occupies a slot sized for the first one
+    (e.g. provider concurrency). Returns a Future for the second stage's result.
+    """
+    result = Future()
+
+    def forward(stage_future: Future):
+        try:
+            result.set_result(stage_future.result())
+        except BaseException as e:
+            result.set_exception(e)
+
+    def on_first_done(stage_future: Future):
+        try:
+            value = stage_future.result()
+            second_executor.submit(second_stage, value).add_done_callback(forward)
+        except BaseException as e:
+            result.set_exception(e)
+
+    first_executor.submit(first_stage, *args, **kwargs).add_done_callback(on_first_done)
+    return result
 
-    return image_path, next_version
+
+def _description_applier(desc_content: Dict) -> Callable[[Page], None]:
+    """Page updater for a generated description, applied by ProgressAggregator on flush"""
+    def apply(page: Page):
+        page.set_description_content(desc_content)
+        page.status = 'DESCRIPTION_GENERATED'
+    return apply
+
+
+def _image_version_applier(image_path: str, cached_image_path: str,
+                           version_number: int) -> Callable[[Page], None]:
+    """Page updater for a saved image version, applied by ProgressAggregator on flush"""
+    def apply(page: Page):
+        record_image_version(page.id, image_path, cached_image_path, version_number, page_obj=page)
+    return apply
 
 
 def generate_descriptions_task(task_id: str, project_id: str, ai_service,
                                project_context, outline: List[Dict],
                                max_workers: int = 5, app=None,
                                language: str = None,
-                               detail_level: str = 'default'):
+                               detail_level: str = 'default',
+                               use_cache: bool = True):
     """
     Background task for generating page descriptions
     Based on demo.py gen_desc() with parallel processing
@@ -185,6 +629,7 @@ def generate_descriptions_task(task_id: str, project_id: str, ai_service,
         app: Flask app instance
         language: Output language (zh, en, ja, auto)
         detail_level: Description detail level (concise/default/detailed)
+        use_cache: Whether to reuse cached responses for unchanged page prompts
     """
     if app is None:
         raise ValueError("Flask app instance must be provided")
@@ -224,8 +669,8 @@ def generate_descriptions_task(task_id: str, project_id: str, ai_service,
             db.session.commit()
 
             # Generate descriptions in parallel
-            completed = 0
-            failed = 0
+            # 页面结果先在内存中汇总，按时间/数量批量提交，避免每页两次提交争用 SQLite 写锁
+            aggregator = ProgressAggregator(task_id, total=len(pages))
             
             def generate_single_desc(page_id, page_outline, page_index):
                 """
@@ -242,7 +687,8 @@ def generate_descriptions_task(task_id: str, project_id: str, ai_service,
                         desc_result = ai_service.generate_page_description(
                             project_context, outline, page_outline, page_index,
                             language=language,
-                            detail_level=detail_level
+                            detail_level=detail_level,
+                            use_cache=use_cache
                         )
 
                         # generate_page_description returns dict with text + optional extra_fields
@@ -269,30 +715,18 @@ def generate_descriptions_task(task_id: str, project_id: str, ai_service,
                 ]
                 
                 # Process results as they complete
-                for future in as_completed(futures):
+                for future in aggregator.as_completed(futures):
                     page_id, desc_content, error = future.result()
                     
-                    db.session.expire_all()
-                    
-                    # Update page in database
-                    page = Page.query.get(page_id)
-                    if page:
-                        if error:
-                            page.status = 'FAILED'
-                            failed += 1
-                        else:
-                            page.set_description_content(desc_content)
-                            page.status = 'DESCRIPTION_GENERATED'
-                            completed += 1
-                        
-                        db.session.commit()
-                    
-                    # Update task progress
-                    task = Task.query.get(task_id)
-                    if task:
-                        task.update_progress(completed=completed, failed=failed)
-                        db.session.commit()
-                        logger.info(f"Description Progress: {completed}/{len(pages)} pages completed")
+                    if error:
+                        aggregator.page_failed(page_id)
+                    else:
+                        aggregator.page_completed(page_id, _description_applier(desc_content))
+                    logger.info(f"Description Progress: {aggregator.completed}/{len(pages)} pages completed")
+            
+            aggregator.flush()
+            completed, failed = aggregator.completed, aggregator.failed
+            logger.info(f"Task {task_id} progress writes: {aggregator.get_stats()}")
             
             # Mark task as completed
             task = Task.query.get(task_id)
@@ -361,6 +795,10 @@ def generate_images_task(task_id: str, project_id: str, ai_service, file_service
             # 注意：不在任务开始时获取模板路径，而是在每个子线程中动态获取
             # 这样可以确保即使用户在上传新模板后立即生成，也能使用最新模板
             
+            # Mark all pages as GENERATING before starting（一次提交，而不是每个子线程各自提交）
+            for page in pages:
+                page.status = 'GENERATING'
+
             # Initialize progress
             task.set_progress({
                 "total": len(pages),
@@ -370,9 +808,12 @@ def generate_images_task(task_id: str, project_id: str, ai_service, file_service
             db.session.commit()
             
             # Generate images in parallel
-            completed = 0
-            failed = 0
+            # 子线程只生成图片并写文件，页面/版本/进度由当前线程批量提交
+            aggregator = ProgressAggregator(task_id, total=len(pages))
             resolution_mismatched = 0  # Count of resolution mismatches
+            # 批量生成走内容寻址缓存（IMAGE_CACHE_ENABLED），命中统计写入任务进度
+            image_cache_enabled = get_image_cache() is not None
+            cache_stats = ImageCacheStats()
             
             def generate_single_image(page_id, page_data, page_index):
                 """
@@ -388,11 +829,6 @@ def generate_images_task(task_id: str, project_id: str, ai_service, file_service
                         if not page_obj:
                             raise ValueError(f"Page {page_id} not found")
                         
-                        # Update page status
-                        page_obj.status = 'GENERATING'
-                        db.session.commit()
-                        logger.debug(f"Page {page_id} status updated to GENERATING")
-                        
                         # Get description content
                         desc_content = page_obj.get_description_content()
                         if not desc_content:
@@ -447,77 +883,93 @@ def generate_images_task(task_id: str, project_id: str, ai_service, file_service
                         logger.info(f"🎨 Calling AI service to generate image for page {page_index}/{len(pages)}...")
                         image = ai_service.generate_image(
                             prompt, page_ref_image_path, aspect_ratio, resolution,
-                            additional_ref_images=page_additional_ref_images if page_additional_ref_images else None
+                            additional_ref_images=page_additional_ref_images if page_additional_ref_images else None,
+                            use_cache=image_cache_enabled, cache_stats=cache_stats
                         )
                         logger.info(f"✅ Image generated successfully for page {page_index}")
                         
                         if not image:
                             raise ValueError("Failed to generate image")
                         
+                        return (page_id, image, None, page_index)
+                        
+                    except Exception as e:
+                        import traceback
+                        error_detail = traceback.format_exc()
+                        logger.error(f"Failed to generate image for page {page_id}: {error_detail}")
+                        return (page_id, None, str(e), page_index)
+            
+            def encode_single_image(generated):
+                """
+                Encode stage: resolution check + PNG / thumbnail encoding
+                在独立的小线程池中执行，网络阶段的槽位拿到图片后立即去请求下一页
+                """
+                page_id, image, error, page_index = generated
+                if error:
+                    return (page_id, None, error, None)
+                with app.app_context():
+                    try:
                         # Check resolution for all providers
                         actual_res, is_match = check_image_resolution(image, resolution)
                         if not is_match:
                             logger.warning(f"Resolution mismatch for page {page_index}: requested {resolution}, got {actual_res}")
                         
-                        # 优化：直接在子线程中计算版本号并保存到最终位置
-                        # 每个页面独立，使用数据库事务保证版本号原子性，避免临时文件
-                        image_path, next_version = save_image_with_version(
-                            image, project_id, page_id, file_service, page_obj=page_obj
-                        )
-                        
-                        return (page_id, image_path, None, not is_match)
+                        # 优化：预留版本号后直接保存到最终位置，避免临时文件
+                        # 设为当前版本由 aggregator 在主线程批量写入
+                        next_version = reserve_image_version(page_id, project_id, file_service)
+                        try:
+                            image_path, cached_image_path = save_image_files(
+                                image, project_id, page_id, file_service, next_version
+                            )
+                        except Exception:
+                            release_image_version(page_id, next_version)
+                            raise
                         
+                        return (page_id, (image_path, cached_image_path, next_version), None, not is_match)
+                    
                     except Exception as e:
                         import traceback
                         error_detail = traceback.format_exc()
-                        logger.error(f"Failed to generate image for page {page_id}: {error_detail}")
+                        logger.error(f"Failed to save image for page {page_id}: {error_detail}")
                         return (page_id, None, str(e), None)
             
-            # Use ThreadPoolExecutor for parallel generation
+            # 两级流水线：网络阶段（max_workers，对应 provider 并发）→ 编码阶段（IMAGE_ENCODE_WORKERS）
             # 关键：提前提取 page.id，不要传递 ORM 对象到子线程
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            encode_workers = max(1, app.config.get('IMAGE_ENCODE_WORKERS', Config.IMAGE_ENCODE_WORKERS))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                    ThreadPoolExecutor(max_workers=encode_workers) as encode_executor:
                 futures = [
-                    executor.submit(
-                        generate_single_image, page.id,
-                        pages_data_by_index.get(page.order_index, {}), i
+                    submit_pipelined(
+                        executor, encode_executor,
+                        generate_single_image, encode_single_image,
+                        page.id, pages_data_by_index.get(page.order_index, {}), i
                     )
                     for i, page in enumerate(pages, 1)
                 ]
                 
                 # Process results as they complete
-                for future in as_completed(futures):
-                    page_id, image_path, error, is_mismatched = future.result()
+                for future in aggregator.as_completed(futures):
+                    page_id, saved, error, is_mismatched = future.result()
+                    
+                    if error:
+                        aggregator.page_failed(page_id)
+                    else:
+                        aggregator.page_completed(page_id, _image_version_applier(*saved))
                     
+                    if image_cache_enabled:
+                        aggregator.set_progress_fields(image_cache=cache_stats.to_dict())
+                    # 第一次检测到不匹配时设置警告
                     if is_mismatched:
                         resolution_mismatched += 1
-                    
-                    db.session.expire_all()
-                    
-                    # Update page in database (主要是为了更新失败状态)
-                    page = Page.query.get(page_id)
-                    if page:
-                        if error:
-                            page.status = 'FAILED'
-                            failed += 1
-                            db.session.commit()
-                        else:
-                            # 图片已在子线程中保存并创建版本记录，这里只需要更新计数
-                            completed += 1
-                            # 刷新页面对象以获取最新状态
-                            db.session.refresh(page)
-                    
-                    # Update task progress
-                    task = Task.query.get(task_id)
-                    if task:
-                        progress = task.get_progress()
-                        progress['completed'] = completed
-                        progress['failed'] = failed
-                        # 第一次检测到不匹配时设置警告
-                        if resolution_mismatched > 0 and 'warning_message' not in progress:
-                            progress['warning_message'] = "图片返回分辨率与设置不符，建议使用gemini格式以避免此问题"
-                        task.set_progress(progress)
-                        db.session.commit()
-                        logger.info(f"Image Progress: {completed}/{len(pages)} pages completed")
+                        if resolution_mismatched == 1:
+                            aggregator.set_progress_fields(
+                                warning_message="图片返回分辨率与设置不符，建议使用gemini格式以避免此问题"
+                            )
+                    logger.info(f"Image Progress: {aggregator.completed}/{len(pages)} pages completed")
+            
+            aggregator.flush()
+            completed, failed = aggregator.completed, aggregator.failed
+            logger.info(f"Task {task_id} progress writes: {aggregator.get_stats()}")
             
             # Mark task as completed
             task = Task.query.get(task_id)
@@ -889,7 +1341,7 @@ def process_ppt_renovation_task(task_id: str, project_id: str, ai_service,
     Background task for PPT renovation: parse PDF pages → extract content → fill outline + description
 
     Flow:
-    1. Split PDF → per-page PDFs
+    1. Split PDF → per-page PDFs (each page is handed to step 2 as soon as it is written)
     2. Parallel: parse each page PDF → markdown via fileparser
     3. Parallel: AI extract {title, points, description} from each markdown
     4. If keep_layout: parallel caption model describe layout → append to description
@@ -938,18 +1390,14 @@ def process_ppt_renovation_task(task_id: str, project_id: str, ai_service,
             if not pdf_path:
                 raise ValueError("No PDF file found for renovation project")
 
-            # Step 1: Split PDF into per-page PDFs
-            split_dir = str(project_dir / "split_pages")
-            page_pdfs = split_pdf_to_pages(pdf_path, split_dir)
-            logger.info(f"Split PDF into {len(page_pdfs)} pages")
-
             # Get existing pages
             pages = Page.query.filter_by(project_id=project_id).order_by(Page.order_index).all()
 
             # Ensure page count matches
-            if len(pages) != len(page_pdfs):
-                logger.warning(f"Page count mismatch: {len(pages)} pages vs {len(page_pdfs)} PDFs. Using min.")
-            page_count = min(len(pages), len(page_pdfs))
+            pdf_page_count, _ = get_pdf_info(pdf_path)
+            if len(pages) != pdf_page_count:
+                logger.warning(f"Page count mismatch: {len(pages)} pages vs {pdf_page_count} PDF pages. Using min.")
+            page_count = min(len(pages), pdf_page_count)
             if page_count == 0:
                 raise ValueError("No pages to process")
 
@@ -1055,11 +1503,15 @@ def process_ppt_renovation_task(task_id: str, project_id: str, ai_service,
                                 task_obj.update_progress(completed=completed, failed=failed)
                                 db.session.commit()
 
+            # Step 1 runs alongside the pipeline: each page PDF is handed to a worker as soon as it is split
+            split_dir = str(project_dir / "split_pages")
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
                 futures = [
-                    executor.submit(process_single_page, i, page_pdfs[i])
-                    for i in range(page_count)
+                    executor.submit(process_single_page, i, page_pdf_path)
+                    for i, page_pdf_path in iter_split_pdf(pdf_path, split_dir)
+                    if i < page_count
                 ]
+                logger.info(f"Split PDF into {pdf_page_count} pages")
                 for future in as_completed(futures):
                     future.result()  # propagate any unexpected exceptions
 
@@ -1197,11 +1649,13 @@ def export_editable_pptx_with_recursive_analysis_task(
                 raise ValueError('No pages found for project')
             
             image_paths = []
+            image_pages = []
             for page in pages:
                 if page.generated_image_path:
                     img_path = file_service.get_absolute_path(page.generated_image_path)
                     if os.path.exists(img_path):
                         image_paths.append(img_path)
+                        image_pages.append(page)
             
             if not image_paths:
                 raise ValueError('No generated images found for project')
@@ -1288,8 +1742,19 @@ def export_editable_pptx_with_recursive_analysis_task(
             logger.info(f"Step 3: 创建可编辑PPTX (extractor={export_extractor_method}, inpaint={export_inpaint_method}, fail_fast={fail_fast})...")
             progress_callback("配置", f"提取方法: {export_extractor_method}, 背景修复: {export_inpaint_method}", 6)
 
+            # 复用图片版本未变的页面上次导出时的分析结果
+            from services.editable_analysis_cache import EditableAnalysisStore, analysis_settings_key
+            analysis_store = EditableAnalysisStore(
+                image_pages, image_paths,
+                analysis_settings_key(export_extractor_method, export_inpaint_method, max_depth)
+            )
+            stored_images, stored_styles = analysis_store.load()
+
             _, export_warnings = ExportService.create_editable_pptx_with_recursive_analysis(
                 image_paths=image_paths,
+                editable_images=stored_images,
+                text_styles=stored_styles,
+                on_page_analyzed=analysis_store.save,
                 output_file=output_path,
                 slide_width_pixels=slide_width,
                 slide_height_pixels=slide_height,
@@ -1380,3 +1845,291 @@ def export_editable_pptx_with_recursive_analysis_task(
                 task.error_message = str(e)
                 task.completed_at = datetime.utcnow()
                 db.session.commit()
+
+
+# =====================================
+# Durable task handlers
+# 从持久化的 payload 重建服务依赖并执行任务，用于重启恢复和独立 worker 进程
+# =====================================
+
+def build_image_export(project, pages, export_format: str, filename: Optional[str], file_service,
+                       use_cache: bool = True,
+                       progress_callback: Callable[[int, int], None] = None) -> Dict[str, Any]:
+    """
+    Write a PPTX / PDF / image export of ``pages`` into the project's exports dir
+
+    Shared by the synchronous GET export endpoints and the EXPORT_* tasks.
+    ``filename`` is required for pptx/pdf; image exports name their own file.
+
+    Returns:
+        {"filename", "download_url", "cache", "pages"}
+    """
+    import shutil
+    import time
+    import zipfile
+    from services.export_cache import ExportCache, collect_slides
+    from services.export_service import ExportService
+    from services.pptx_writer import replace_slide_images
+
+    slides = collect_slides(pages, file_service)
+    if not slides:
+        raise ValueError("No generated images found for project")
+
+    exports_dir = str(file_service._get_exports_dir(project.id))
+    aspect_ratio = project.image_aspect_ratio
+    cache_status = None
+
+    if export_format == 'pptx':
+        def build(paths, out):
+            ExportService.create_pptx_from_images(paths, output_file=out, aspect_ratio=aspect_ratio,
+                                                  progress_callback=progress_callback)
+        fmt, extension, patch = 'pptx', 'pptx', replace_slide_images
+    elif export_format == 'pdf':
+        def build(paths, out):
+            ExportService.create_pdf_from_images(paths, output_file=out, aspect_ratio=aspect_ratio,
+                                                 progress_callback=progress_callback)
+        fmt, extension, patch = 'pdf', 'pdf', ExportService.replace_pdf_pages
+    elif export_format == 'images':
+        timestamp = int(time.time())
+        if len(slides) == 1:
+            slide = slides[0]
+            ext = os.path.splitext(slide.image_path)[1] or '.png'
+            filename = f'slide_{slide.page_id}_{timestamp}{ext}'
+            shutil.copy2(slide.image_path, os.path.join(exports_dir, filename))
+            return {"filename": filename, "download_url": f"/files/{project.id}/exports/{filename}",
+                    "cache": None, "pages": 1}
+
+        filename = f'slides_{project.id}_{timestamp}.zip'
+        order_by_page = {page.id: page.order_index for page in pages}
+        arcnames = [
+            f'slide_{order_by_page[slide.page_id] + 1:03d}{os.path.splitext(slide.image_path)[1] or ".png"}'
+            for slide in slides
+        ]
+
+        def build(paths, out):
+            # PNG/JPEG 本身已压缩，ZIP 中直接存储，避免无意义的二次压缩
+            with zipfile.ZipFile(out, 'w', zipfile.ZIP_STORED) as zf:
+                for done, (path, arcname) in enumerate(zip(paths, arcnames), start=1):
+                    zf.write(path, arcname)
+                    if progress_callback:
+                        progress_callback(done, len(paths))
+        fmt, extension, patch = 'images', 'zip', None
+    else:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    output_path = os.path.join(exports_dir, filename)
+    if use_cache:
+        cache_status = ExportCache(exports_dir).export(fmt, extension, aspect_ratio, slides, output_path,
+                                                       build, patch).status
+    else:
+        build([slide.image_path for slide in slides], output_path)
+        cache_status = 'built'
+
+    return {"filename": filename, "download_url": f"/files/{project.id}/exports/{filename}",
+            "cache": cache_status, "pages": len(slides)}
+
+
+def export_image_deck_task(task_id: str, project_id: str, export_format: str, file_service,
+                           filename: str = None, page_ids: list = None, app=None):
+    """
+    Background task for PPTX / PDF / image exports
+
+    Progress is written at most every PROGRESS_FLUSH_INTERVAL_MS; on success the
+    progress carries ``download_url`` and ``filename`` like EXPORT_EDITABLE_PPTX.
+    """
+    import time
+    from models import Project
+
+    if app is None:
+        raise ValueError("Flask app instance must be provided")
+
+    with app.app_context():
+        try:
+            task = Task.query.get(task_id)
+            if not task:
+                return
+            task.status = 'PROCESSING'
+            db.session.commit()
+
+            project = Project.query.get(project_id)
+            if not project:
+                raise ValueError(f"Project {project_id} not found")
+            pages = get_filtered_pages(project_id, page_ids or None)
+            if not pages:
+                raise ValueError("No pages found for project")
+
+            interval = app.config.get('PROGRESS_FLUSH_INTERVAL_MS', Config.PROGRESS_FLUSH_INTERVAL_MS) / 1000.0
+            last_flush = [0.0]
+
+            def report(done: int, total: int):
+                now = time.monotonic()
+                if done < total and now - last_flush[0] < interval:
+                    return
+                last_flush[0] = now
+                task.set_progress({"total": total, "completed": done, "failed": 0,
+                                   "percent": int(done * 100 / max(1, total))})
+                db.session.commit()
+
+            result = build_image_export(
+                project, pages, export_format, filename, file_service,
+                use_cache=app.config.get('EXPORT_CACHE_ENABLED', True),
+                progress_callback=report,
+            )
+
+            task.status = 'COMPLETED'
+            task.completed_at = datetime.utcnow()
+            task.set_progress({
+                "total": result['pages'],
+                "completed": result['pages'],
+                "failed": 0,
+                "percent": 100,
+                "download_url": result['download_url'],
+                "filename": result['filename'],
+                "cache": result['cache'],
+            })
+            db.session.commit()
+            logger.info(f"✅ Task {task_id} COMPLETED - {export_format} export ({result['cache']})")
+
+        except Exception as e:
+            import traceback
+            logger.error(f"Task {task_id} FAILED: {traceback.format_exc()}")
+            db.session.rollback()
+            task = Task.query.get(task_id)
+            if task:
+                task.status = 'FAILED'
+                task.error_message = str(e)
+                task.completed_at = datetime.utcnow()
+                db.session.commit()
+
+
+def _build_file_service(app):
+    from services.file_service import FileService
+    return FileService(app.config['UPLOAD_FOLDER'])
+
+
+@register_task_handler('GENERATE_DESCRIPTIONS')
+def _run_generate_descriptions(task_id: str, app, project_id: str, outline: List[Dict],
+                               max_workers: int = 5, language: str = None,
+                               detail_level: str = 'default', use_cache: bool = True):
+    from models import Project
+    from services.ai_service import ProjectContext
+    from services.ai_service_manager import get_ai_service
+    from controllers.project_controller import _get_project_reference_files_content
+
+    with app.app_context():
+        project = Project.query.get(project_id)
+        if not project:
+            raise ValueError(f"Project {project_id} not found")
+        project_context = ProjectContext(project, _get_project_reference_files_content(project_id))
+        ai_service = get_ai_service()
+
+    generate_descriptions_task(task_id, project_id, ai_service, project_context, outline,
+                               max_workers, app, language, detail_level, use_cache)
+
+
+@register_task_handler('GENERATE_IMAGES')
+def _run_generate_images(task_id: str, app, project_id: str, outline: List[Dict],
+                         use_template: bool = True, max_workers: int = 8,
+                         aspect_ratio: str = "16:9", resolution: str = "2K",
+                         extra_requirements: str = None, language: str = None,
+                         page_ids: list = None):
+    from services.ai_service_manager import get_ai_service
+
+    with app.app_context():
+        ai_service = get_ai_service()
+    generate_images_task(task_id, project_id, ai_service, _build_file_service(app), outline,
+                         use_template, max_workers, aspect_ratio, resolution, app,
+                         extra_requirements, language, page_ids)
+
+
+@register_task_handler('GENERATE_PAGE_IMAGE')
+def _run_generate_page_image(task_id: str, app, project_id: str, page_id: str,
+                             outline: List[Dict], use_template: bool = True,
+                             aspect_ratio: str = "16:9", resolution: str = "2K",
+                             extra_requirements: str = None, language: str = None):
+    from services.ai_service_manager import get_ai_service
+
+    with app.app_context():
+        ai_service = get_ai_service()
+    generate_single_page_image_task(task_id, project_id, page_id, ai_service,
+                                    _build_file_service(app), outline, use_template,
+                                    aspect_ratio, resolution, app, extra_requirements, language)
+
+
+@register_task_handler('EDIT_PAGE_IMAGE')
+def _run_edit_page_image(task_id: str, app, project_id: str, page_id: str,
+                         edit_instruction: str, aspect_ratio: str = "16:9",
+                         resolution: str = "2K", original_description: str = None,
+                         additional_ref_images: List[str] = None, temp_dir: str = None):
+    from services.ai_service_manager import get_ai_service
+
+    with app.app_context():
+        ai_service = get_ai_service()
+    edit_page_image_task(task_id, project_id, page_id, edit_instruction, ai_service,
+                         _build_file_service(app), aspect_ratio, resolution,
+                         original_description, additional_ref_images, temp_dir, app)
+
+
+@register_task_handler('GENERATE_MATERIAL')
+def _run_generate_material(task_id: str, app, project_id: str, prompt: str,
+                           ref_image_path: str = None, additional_ref_images: List[str] = None,
+                           aspect_ratio: str = "16:9", resolution: str = "2K",
+                           temp_dir: str = None):
+    from services.ai_service_manager import get_ai_service
+
+    with app.app_context():
+        ai_service = get_ai_service()
+    generate_material_image_task(task_id, project_id, prompt, ai_service,
+                                 _build_file_service(app), ref_image_path,
+                                 additional_ref_images, aspect_ratio, resolution, temp_dir, app)
+
+
+@register_task_handler('PPT_RENOVATION')
+def _run_ppt_renovation(task_id: str, app, project_id: str, keep_layout: bool = False,
+                        max_workers: int = 5, language: str = 'zh'):
+    from services.ai_service_manager import get_ai_service
+    from services.file_parser_service import FileParserService
+
+    with app.app_context():
+        ai_service = get_ai_service()
+    file_parser_service = FileParserService(
+        mineru_token=app.config['MINERU_TOKEN'],
+        mineru_api_base=app.config['MINERU_API_BASE'],
+        google_api_key=app.config.get('GOOGLE_API_KEY', ''),
+        google_api_base=app.config.get('GOOGLE_API_BASE', ''),
+        openai_api_key=app.config.get('OPENAI_API_KEY', ''),
+        openai_api_base=app.config.get('OPENAI_API_BASE', ''),
+        image_caption_model=app.config['IMAGE_CAPTION_MODEL'],
+        provider_format=app.config.get('AI_PROVIDER_FORMAT', 'gemini'),
+        lazyllm_image_caption_source=app.config.get('IMAGE_CAPTION_MODEL_SOURCE', 'doubao'),
+    )
+    process_ppt_renovation_task(task_id, project_id, ai_service, _build_file_service(app),
+                                file_parser_service, keep_layout, max_workers, app, language)
+
+
+@register_task_handler('EXPORT_EDITABLE_PPTX')
+def _run_export_editable_pptx(task_id: str, app, project_id: str, filename: str,
+                              page_ids: list = None, max_depth: int = 2, max_workers: int = 4,
+                              export_extractor_method: str = 'hybrid',
+                              export_inpaint_method: str = 'hybrid'):
+    export_editable_pptx_with_recursive_analysis_task(
+        task_id,
+        project_id=project_id,
+        filename=filename,
+        file_service=_build_file_service(app),
+        page_ids=page_ids,
+        max_depth=max_depth,
+        max_workers=max_workers,
+        export_extractor_method=export_extractor_method,
+        export_inpaint_method=export_inpaint_method,
+        app=app
+    )
+
+
+@register_task_handler('EXPORT_PPTX')
+@register_task_handler('EXPORT_PDF')
+@register_task_handler('EXPORT_IMAGES')
+def _run_export_image_deck(task_id: str, app, project_id: str, export_format: str,
+                           filename: str = None, page_ids: list = None, export_key: str = None):
+    export_image_deck_task(task_id, project_id, export_format, _build_file_service(app),
+                           filename=filename, page_ids=page_ids, app=app)
@@ -0,0 +1,173 @@
+"""
+Text Cache - persistent prompt -> response cache for text generation
+
+Outline / description / refine calls are often repeated with identical
+prompts (retry after a partial failure, re-running description generation
+for pages whose outline did not change). Responses are stored in a small
+standalone SQLite database keyed by sha256(provider, model, thinking_budget,
+prompt) so a repeat returns immediately instead of calling the provider.
+
+- TTL: entries older than TEXT_CACHE_TTL_HOURS are ignored and purged
+- size eviction: least recently used entries are removed once the stored
+  responses exceed TEXT_CACHE_MAX_MB
+- bypass: callers pass ``use_cache=False`` to force a fresh generation
+
+Opt-in via TEXT_CACHE_ENABLED=true. The cache lives in its own database file
+so lookups never contend with the application database's write lock.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS text_cache (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_text_cache_accessed_at ON text_cache (accessed_at);
+"""
+
+
+class TextCache:
+    """SQLite-backed prompt-response cache with TTL and LRU size eviction"""
+
+    def __init__(self, db_path: str, ttl_seconds: float = 7 * 24 * 3600,
+                 max_bytes: int = 256 * 1024 * 1024):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(provider: str, model: str, prompt: str, thinking_budget: int) -> str:
+        digest = hashlib.sha256()
+        for part in (provider or '', model or '', str(thinking_budget)):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(prompt.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the connection lazily (caller holds the lock)"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response, or None if missing or expired"""
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    'SELECT response, created_at FROM text_cache WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None or (self.ttl_seconds > 0 and now - row[1] > self.ttl_seconds):
+                    self.misses += 1
+                    if row is not None:
+                        conn.execute('DELETE FROM text_cache WHERE key = ?', (key,))
+                        conn.commit()
+                    return None
+                conn.execute('UPDATE text_cache SET accessed_at = ? WHERE key = ?', (now, key))
+                conn.commit()
+                self.hits += 1
+                return row[0]
+        except sqlite3.Error as e:
+            logger.warning(f"Text cache lookup failed: {e}")
+            return None
+
+    def put(self, key: str, response: str):
+        """Store a response and evict expired / least recently used entries"""
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    'INSERT OR REPLACE INTO text_cache (key, response, size, created_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (key, response, size, now, now)
+                )
+                self._evict(conn, now)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Text cache write failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries, then LRU entries until under max_bytes (caller holds the lock)"""
+        if self.ttl_seconds > 0:
+            conn.execute('DELETE FROM text_cache WHERE created_at < ?', (now - self.ttl_seconds,))
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM text_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        doomed = []
+        for key, size in conn.execute('SELECT key, size FROM text_cache ORDER BY accessed_at'):
+            if freed >= excess:
+                break
+            doomed.append((key,))
+            freed += size
+        conn.executemany('DELETE FROM text_cache WHERE key = ?', doomed)
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute('DELETE FROM text_cache')
+            conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            conn = self._connect()
+            entries, total = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM text_cache'
+            ).fetchone()
+            return {
+                'entries': entries,
+                'total_bytes': total,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_text_cache: Optional[TextCache] = None
+_text_cache_lock = threading.Lock()
+
+
+def get_text_cache() -> Optional[TextCache]:
+    """Return the process-wide text cache, or None when TEXT_CACHE_ENABLED is off"""
+    global _text_cache
+    from config import get_setting, BASE_DIR
+
+    if not get_setting('TEXT_CACHE_ENABLED'):
+        return None
+
+    with _text_cache_lock:
+        if _text_cache is None:
+            db_path = get_setting('TEXT_CACHE_PATH') or os.path.join(
+                BASE_DIR, 'instance', 'text_cache.db'
+            )
+            ttl_hours = float(get_setting('TEXT_CACHE_TTL_HOURS'))
+            max_mb = int(get_setting('TEXT_CACHE_MAX_MB'))
+            _text_cache = TextCache(db_path, ttl_seconds=ttl_hours * 3600, max_bytes=max_mb * 1024 * 1024)
+            logger.info(f"Text cache enabled at {db_path} (ttl {ttl_hours}h, max {max_mb} MB)")
+        return _text_cache
@@ -171,3 +171,33 @@ class TestGenerateImageCaption:
             finally:
                 import os
                 os.unlink(tmp_path)
+
+
+@pytest.mark.unit
+class TestMaterialDownload:
+    """Streaming ZIP download tests"""
+
+    def test_download_streams_zip_with_stored_media(self, client):
+        """Images are STORED, text-like files DEFLATEd, and the archive is readable"""
+        import zipfile
+        ids = []
+        for name in ('a.png', 'b.png'):
+            response = client.post('/api/materials/upload', data={'file': (_create_test_image(), name)},
+                                   content_type='multipart/form-data')
+            ids.append(assert_success_response(response, 201)['data']['id'])
+        svg = b'<svg xmlns="http://www.w3.org/2000/svg">' + b'<rect/>' * 200 + b'</svg>'
+        response = client.post('/api/materials/upload', data={'file': (io.BytesIO(svg), 'c.svg')},
+                               content_type='multipart/form-data')
+        ids.append(assert_success_response(response, 201)['data']['id'])
+
+        response = client.post('/api/materials/download', json={'material_ids': ids}, buffered=False)
+        assert response.status_code == 200 and response.mimetype == 'application/zip'
+        assert response.is_streamed and 'Content-Length' not in response.headers
+
+        with zipfile.ZipFile(io.BytesIO(response.get_data())) as zf:
+            assert zf.testzip() is None
+            infos = {info.filename.rsplit('.', 1)[1]: info for info in zf.infolist()}
+            assert infos['png'].compress_type == zipfile.ZIP_STORED
+            assert infos['svg'].compress_type == zipfile.ZIP_DEFLATED
+            assert infos['svg'].compress_size < len(svg)
+            assert zf.read(infos['svg']) == svg
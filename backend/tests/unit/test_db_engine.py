@@ -0,0 +1,83 @@
+"""Unit tests for engine options and the SQLite write gate."""
+import threading
+import time
+from types import SimpleNamespace
+
+from models import db, Project
+from models.db_engine import SQLiteWriteGate, build_engine_options, write_gate
+
+_CONFIG = SimpleNamespace(DB_POOL_SIZE=3, DB_MAX_OVERFLOW=7, DB_POOL_TIMEOUT=10, SQLITE_BUSY_TIMEOUT_MS=5000)
+
+
+def test_engine_options_by_dialect():
+    sqlite_options = build_engine_options('sqlite:////tmp/test.db', _CONFIG)
+    assert sqlite_options['pool_size'] == 3 and sqlite_options['max_overflow'] == 7
+    assert sqlite_options['connect_args'] == {'check_same_thread': False, 'timeout': 5.0}
+
+    postgres_options = build_engine_options('postgresql+psycopg2://u:p@db/banana', _CONFIG)
+    assert 'connect_args' not in postgres_options and postgres_options['pool_pre_ping']
+
+
+def test_gate_is_reentrant_fifo_and_times_out():
+    gate = SQLiteWriteGate()
+    assert gate.acquire(1) and gate.acquire(1)  # 同一线程可重入
+
+    order = []
+
+    def writer(name, delay):
+        time.sleep(delay)
+        if gate.acquire(5):
+            order.append(name)
+            gate.release()
+
+    threads = [threading.Thread(target=writer, args=(name, i * 0.05)) for i, name in enumerate('abc')]
+    for t in threads:
+        t.start()
+    time.sleep(0.3)
+    gate.release()
+    assert order == []  # 仍持有一层
+    gate.release()
+    for t in threads:
+        t.join()
+    assert order == ['a', 'b', 'c']
+
+    gate.acquire(1)
+    timed_out = []
+    t = threading.Thread(target=lambda: timed_out.append(gate.acquire(0.05)))
+    t.start()
+    t.join()
+    assert timed_out == [False]
+    stats = gate.get_stats()
+    assert stats['contended'] == 4 and stats['timeouts'] == 1 and stats['waiting'] == 0
+    assert stats['wait_ms_max'] >= 200
+
+
+def test_concurrent_worker_commits_are_serialized(app, client):
+    before = write_gate.get_stats()
+    errors = []
+
+    def worker(n):
+        try:
+            with app.app_context():
+                for i in range(5):
+                    db.session.add(Project(idea_prompt=f'worker {n}-{i}', status='DRAFT'))
+                    db.session.commit()
+                    Project.query.filter_by(idea_prompt=f'worker {n}-{i}').update({'status': 'COMPLETED'})
+                    db.session.commit()
+        except Exception as e:  # pragma: no cover - 失败时在断言中展示
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert Project.query.filter_by(status='COMPLETED').count() == 40
+    after = write_gate.get_stats()
+    assert after['acquired'] - before['acquired'] >= 80
+    assert after['locked_errors'] == before['locked_errors'] and not after['held']
+
+    stats = client.get('/api/settings/provider-stats').get_json()['data']['database']
+    assert stats['dialect'] == 'sqlite' and stats['write_gate']['acquired'] >= after['acquired']
@@ -0,0 +1,123 @@
+"""Unit tests for persisted editable-PPTX analysis (EditableImage trees per PageImageVersion)."""
+import os
+
+import pytest
+from PIL import Image
+
+import services.image_editability as image_editability
+from models import db, EditableImageAnalysis, Page, PageImageVersion, Project
+from services.editable_analysis_cache import EditableAnalysisStore, analysis_settings_key
+from services.export_service import ExportService
+from services.image_editability import BBox, EditableElement, EditableImage
+from services.image_editability.text_attribute_extractors import TextStyleResult
+
+SETTINGS_KEY = analysis_settings_key('hybrid', 'hybrid', 2)
+
+
+class _CountingStyleExtractor:
+    def __init__(self):
+        self.pages = 0
+
+    def extract_batch_with_full_image(self, full_image, text_elements, **kwargs):
+        self.pages += 1
+        return {elem['element_id']: TextStyleResult(is_bold=True) for elem in text_elements}
+
+    def extract(self, image, text_content=None, **kwargs):
+        return TextStyleResult(font_color_rgb=(200, 0, 0))
+
+
+class _FakeEditabilityService:
+    calls = []
+
+    def __init__(self, config):
+        pass
+
+    def make_image_editable(self, image_path):
+        self.calls.append(image_path)
+        image_id = f'img{len(self.calls)}'
+        background = image_path.replace('.png', f'_{image_id}_bg.png')
+        Image.new('RGB', (160, 90), 'white').save(background)
+        bbox = BBox(10, 10, 150, 40)
+        element = EditableElement(element_id=f'{image_id}_text', element_type='text', bbox=bbox,
+                                  bbox_global=bbox, content='Quarterly results', image_path=image_path)
+        return EditableImage(image_id=image_id, image_path=image_path, width=160, height=90,
+                             elements=[element], clean_background=background)
+
+
+@pytest.fixture
+def slides(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(image_editability, 'ImageEditabilityService', _FakeEditabilityService)
+    monkeypatch.setattr(image_editability.ServiceConfig, 'from_defaults', staticmethod(lambda **kwargs: None))
+    _FakeEditabilityService.calls = []
+
+    project = Project(idea_prompt='Results', status='DRAFT')
+    db.session.add(project)
+    db.session.flush()
+    pages, paths = [], []
+    for i in range(2):
+        path = str(tmp_path / f'slide{i}.png')
+        Image.new('RGB', (160, 90), 'blue').save(path)
+        page = Page(project_id=project.id, order_index=i, generated_image_path=path)
+        db.session.add(page)
+        db.session.flush()
+        db.session.add(PageImageVersion(page_id=page.id, image_path=path, version_number=1, is_current=True))
+        pages.append(page)
+        paths.append(path)
+    db.session.commit()
+    return pages, paths
+
+
+def _export(pages, paths, tmp_path, extractor):
+    store = EditableAnalysisStore(pages, paths, SETTINGS_KEY)
+    stored_images, stored_styles = store.load()
+    ExportService.create_editable_pptx_with_recursive_analysis(
+        image_paths=paths, editable_images=stored_images, text_styles=stored_styles,
+        on_page_analyzed=store.save, output_file=str(tmp_path / 'out.pptx'),
+        slide_width_pixels=160, slide_height_pixels=90, max_workers=2,
+        text_attribute_extractor=extractor,
+    )
+
+
+def test_tree_round_trip():
+    bbox = BBox(1, 2, 3, 4)
+    child = EditableElement(element_id='c', element_type='text', bbox=bbox, bbox_global=bbox, content='x')
+    parent = EditableElement(element_id='p', element_type='image', bbox=bbox, bbox_global=bbox,
+                             image_path='/tmp/p.png', children=[child], inpainted_background_path='/tmp/bg.png')
+    image = EditableImage(image_id='i', image_path='/tmp/i.png', width=10, height=20, elements=[parent],
+                          clean_background='/tmp/clean.png', metadata={'source': 'mineru'})
+    assert EditableImage.from_dict(image.to_dict()) == image
+    assert sorted(image.iter_element_ids()) == ['c', 'p']
+    assert set(image.iter_files()) == {'/tmp/i.png', '/tmp/clean.png', '/tmp/p.png', '/tmp/bg.png'}
+
+
+def test_re_export_only_analyses_changed_slides(slides, tmp_path):
+    pages, paths = slides
+    extractor = _CountingStyleExtractor()
+    _export(pages, paths, tmp_path, extractor)
+    assert len(_FakeEditabilityService.calls) == 2 and extractor.pages == 2
+    assert EditableImageAnalysis.query.count() == 2
+
+    # 未改动：不再分析，也不再提取样式
+    _export(pages, paths, tmp_path, extractor)
+    assert len(_FakeEditabilityService.calls) == 2 and extractor.pages == 2
+
+    # 第二页生成了新版本：只分析第二页
+    new_path = str(tmp_path / 'slide1_v2.png')
+    Image.new('RGB', (160, 90), 'red').save(new_path)
+    PageImageVersion.query.filter_by(page_id=pages[1].id).update({'is_current': False})
+    db.session.add(PageImageVersion(page_id=pages[1].id, image_path=new_path, version_number=2, is_current=True))
+    db.session.commit()
+    _export(pages, [paths[0], new_path], tmp_path, extractor)
+    assert _FakeEditabilityService.calls[2:] == [new_path] and extractor.pages == 3
+
+
+def test_stored_analysis_with_missing_files_is_redone(slides, tmp_path):
+    pages, paths = slides
+    _export(pages, paths, tmp_path, None)
+    analysis = EditableImageAnalysis.query.first()
+    tree = EditableImage.from_dict(analysis.get_tree())
+    os.remove(tree.clean_background)
+
+    stored_images, _ = EditableAnalysisStore(pages, paths, SETTINGS_KEY).load()
+    assert sum(img is None for img in stored_images) == 1
+    assert EditableAnalysisStore(pages, paths, analysis_settings_key('mineru', 'hybrid', 2)).load()[0] == [None, None]
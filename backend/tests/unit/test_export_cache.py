@@ -0,0 +1,102 @@
+"""Test fingerprint-keyed export reuse and per-slide patching."""
+import fitz
+from PIL import Image
+from pptx import Presentation
+
+from services.export_cache import ExportCache, ExportSlide
+from services.export_service import ExportService
+from services.pptx_writer import replace_slide_images
+
+
+def _image(path, color):
+    Image.new('RGB', (320, 180), color).save(path)
+    return str(path)
+
+
+def _slides(tmp_path, colors, tokens):
+    return [ExportSlide(f'page{i}', _image(tmp_path / f'p{i}_{tokens[i]}.png', color), tokens[i])
+            for i, color in enumerate(colors)]
+
+
+def _build_pptx(paths, out):
+    ExportService.create_pptx_from_images(paths, output_file=out)
+
+
+def test_pptx_hit_then_patch(tmp_path):
+    exports = tmp_path / 'exports'
+    exports.mkdir()
+    cache = ExportCache(exports)
+    builds = []
+
+    def build(paths, out):
+        builds.append(paths)
+        _build_pptx(paths, out)
+
+    slides = _slides(tmp_path, ['red', 'green', 'blue'], ['v1', 'v1', 'v1'])
+    first = cache.export('pptx', 'pptx', '16:9', slides, str(exports / 'a.pptx'), build, replace_slide_images)
+    again = cache.export('pptx', 'pptx', '16:9', slides, str(exports / 'b.pptx'), build, replace_slide_images)
+    assert (first.status, again.status) == ('built', 'hit')
+    assert len(builds) == 1
+
+    edited = list(slides)
+    edited[1] = ExportSlide('page1', _image(tmp_path / 'p1_v2.png', 'yellow'), 'v2')
+    patched = cache.export('pptx', 'pptx', '16:9', edited, str(exports / 'a.pptx'), build, replace_slide_images)
+    assert patched.status == 'patched' and patched.changed == 1
+    assert len(builds) == 1
+
+    prs = Presentation(str(exports / 'a.pptx'))
+    assert len(prs.slides) == 3
+    blobs = [slide.shapes[0].image.blob for slide in prs.slides]
+    with open(edited[1].image_path, 'rb') as f:
+        assert blobs[1] == f.read()
+    # 之前发布的文件保持原内容
+    assert Presentation(str(exports / 'b.pptx')).slides[1].shapes[0].image.blob != blobs[1]
+
+    # 页面顺序变化属于不同的导出，需要完整构建
+    reordered = cache.export('pptx', 'pptx', '16:9', edited[::-1], str(exports / 'c.pptx'), build,
+                             replace_slide_images)
+    assert reordered.status == 'built'
+
+
+def test_pdf_page_replacement(tmp_path):
+    paths = [_image(tmp_path / f'{c}.png', c) for c in ('red', 'green', 'blue')]
+    source = tmp_path / 'deck.pdf'
+    ExportService.create_pdf_from_images(paths, output_file=str(source))
+    new_image = _image(tmp_path / 'white.png', 'white')
+
+    output = tmp_path / 'patched.pdf'
+    assert ExportService.replace_pdf_pages(str(source), str(output), {2: new_image}) == 1
+
+    with fitz.open(str(source)) as before, fitz.open(str(output)) as after:
+        assert after.page_count == 3
+        assert after[2].rect == before[2].rect
+        assert after.metadata['author'] == 'banana-slides'
+        pixel = after[2].get_pixmap(clip=fitz.Rect(10, 10, 11, 11)).pixel(0, 0)
+        assert pixel == (255, 255, 255)
+        assert after[0].get_pixmap(clip=fitz.Rect(10, 10, 11, 11)).pixel(0, 0) == (255, 0, 0)
+
+
+def test_pdf_page_replacement_matches_full_build(tmp_path):
+    # 4:3 图片放进 16:9 页面：需按比例铺满并裁剪上下多余部分，而不是拉伸
+    off_ratio = tmp_path / 'square.png'
+    image = Image.new('RGB', (400, 300), 'white')
+    image.paste((0, 0, 255), (0, 0, 400, 60))
+    image.paste((255, 0, 0), (0, 240, 400, 300))
+    image.save(off_ratio)
+
+    paths = [_image(tmp_path / f'{c}.png', c) for c in ('red', 'green')]
+    source = tmp_path / 'deck.pdf'
+    ExportService.create_pdf_from_images(paths, output_file=str(source))
+    patched = tmp_path / 'patched.pdf'
+    ExportService.replace_pdf_pages(str(source), str(patched), {1: str(off_ratio)})
+    fresh = tmp_path / 'fresh.pdf'
+    ExportService.create_pdf_from_images([paths[0], str(off_ratio)], output_file=str(fresh))
+
+    with fitz.open(str(patched)) as after, fitz.open(str(fresh)) as expected:
+        assert after[1].rect == expected[1].rect
+        got = after[1].get_pixmap()
+        want = expected[1].get_pixmap()
+        assert (got.width, got.height) == (want.width, want.height)
+        for x, y in [(10, 5), (got.width // 2, got.height // 2), (10, got.height - 5),
+                     (got.width - 10, got.height // 10)]:
+            assert got.pixel(x, y) == want.pixel(x, y)
@@ -0,0 +1,94 @@
+"""Test background PPTX / PDF / image export jobs."""
+import os
+import time
+import zipfile
+
+from PIL import Image
+
+
+def _add_pages(app, project_id, count):
+    from models import db, Page
+
+    with app.app_context():
+        for i in range(count):
+            relative = f'{project_id}/pages/page_{i}.png'
+            path = os.path.join(app.config['UPLOAD_FOLDER'], relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            Image.new('RGB', (320, 180), (40 * i, 0, 0)).save(path)
+            db.session.add(Page(project_id=project_id, order_index=i, status='COMPLETED',
+                                generated_image_path=relative))
+        db.session.commit()
+
+
+def _wait_for_task(client, project_id, task_id, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        data = client.get(f'/api/projects/{project_id}/tasks/{task_id}').get_json()['data']
+        if data['status'] in ('COMPLETED', 'FAILED'):
+            return data
+        time.sleep(0.05)
+    raise AssertionError(f"task {task_id} did not finish")
+
+
+def test_async_pptx_export_reports_download_url(client, sample_project):
+    project_id = sample_project['project_id']
+    _add_pages(client.application, project_id, 3)
+
+    response = client.post(f'/api/projects/{project_id}/export/pptx', json={'filename': 'deck'})
+    assert response.status_code == 200
+    task_id = response.get_json()['data']['task_id']
+
+    task = _wait_for_task(client, project_id, task_id)
+    assert task['status'] == 'COMPLETED', task
+    progress = task['progress']
+    assert progress['completed'] == progress['total'] == 3
+    assert progress['filename'] == 'deck.pptx'
+    assert progress['download_url'] == f'/files/{project_id}/exports/deck.pptx'
+
+
+def test_identical_in_flight_export_is_joined(client, sample_project):
+    from models import db, Task
+
+    project_id = sample_project['project_id']
+    _add_pages(client.application, project_id, 2)
+
+    # 把已完成的任务改回 PENDING，模拟一个仍在排队的相同导出
+    first = client.post(f'/api/projects/{project_id}/export/pdf', json={})
+    first_id = first.get_json()['data']['task_id']
+    _wait_for_task(client, project_id, first_id)
+    with client.application.app_context():
+        task = Task.query.get(first_id)
+        task.status = 'PENDING'
+        db.session.commit()
+
+    second = client.post(f'/api/projects/{project_id}/export/pdf', json={}).get_json()['data']
+    assert second == {'task_id': first_id, 'status': 'PENDING', 'deduplicated': True}
+
+    other_name = client.post(f'/api/projects/{project_id}/export/pdf', json={'filename': 'other.pdf'})
+    assert other_name.get_json()['data']['task_id'] != first_id
+
+
+def test_images_zip_entries_are_stored(client, sample_project):
+    project_id = sample_project['project_id']
+    _add_pages(client.application, project_id, 2)
+
+    task_id = client.post(f'/api/projects/{project_id}/export/images', json={}).get_json()['data']['task_id']
+    progress = _wait_for_task(client, project_id, task_id)['progress']
+
+    path = os.path.join(client.application.config['UPLOAD_FOLDER'], project_id, 'exports', progress['filename'])
+    with zipfile.ZipFile(path) as zf:
+        assert [info.filename for info in zf.infolist()] == ['slide_001.png', 'slide_002.png']
+        assert all(info.compress_type == zipfile.ZIP_STORED for info in zf.infolist())
+
+
+def test_sync_export_still_returns_download_url(client, sample_project):
+    project_id = sample_project['project_id']
+    _add_pages(client.application, project_id, 2)
+
+    first = client.get(f'/api/projects/{project_id}/export/pdf').get_json()['data']
+    again = client.get(f'/api/projects/{project_id}/export/pdf').get_json()['data']
+    assert first['download_url'] == f'/files/{project_id}/exports/presentation_{project_id}.pdf'
+    assert (first['cache'], again['cache']) == ('built', 'hit')
+
+    empty = client.post('/api/projects/missing/export/pptx', json={})
+    assert empty.status_code == 404
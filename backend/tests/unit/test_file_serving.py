@@ -0,0 +1,60 @@
+"""Unit tests for /files caching headers (ETag, immutable, 304, Range, X-Accel-Redirect)."""
+import os
+
+import pytest
+
+
+@pytest.fixture
+def pages_dir(app):
+    path = os.path.join(app.config['UPLOAD_FOLDER'], 'proj-1', 'pages')
+    os.makedirs(path, exist_ok=True)
+    for name in ('page-1_v2.png', 'page-1_v2_thumb.jpg', 'legacy.png'):
+        with open(os.path.join(path, name), 'wb') as f:
+            f.write(b'0123456789' * 10)
+    return path
+
+
+def test_versioned_page_image_is_immutable(client, pages_dir):
+    for name in ('page-1_v2.png', 'page-1_v2_thumb.jpg'):
+        response = client.get(f'/files/proj-1/pages/{name}')
+        assert response.status_code == 200
+        cache_control = response.headers['Cache-Control']
+        assert 'immutable' in cache_control and 'max-age=31536000' in cache_control
+        assert 'private' in cache_control and 'public' not in cache_control
+        assert response.headers['ETag'].startswith('"') and not response.headers['ETag'].startswith('W/')
+
+
+def test_conditional_and_range_requests(client, pages_dir):
+    response = client.get('/files/proj-1/pages/legacy.png')
+    assert response.status_code == 200
+    assert 'no-cache' in response.headers['Cache-Control']
+    assert 'immutable' not in response.headers['Cache-Control']
+    etag = response.headers['ETag']
+
+    not_modified = client.get('/files/proj-1/pages/legacy.png', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304 and not not_modified.data
+
+    partial = client.get('/files/proj-1/pages/legacy.png', headers={'Range': 'bytes=10-19'})
+    assert partial.status_code == 206 and partial.data == b'0123456789'
+
+
+def test_missing_file_and_traversal_are_404(client, pages_dir):
+    assert client.get('/files/proj-1/pages/missing_v1.png').status_code == 404
+    assert client.get('/files/proj-1/secrets/legacy.png').status_code == 404
+    assert client.get('/files/proj-1/pages/..%2F..%2Fetc%2Fpasswd').status_code == 404
+
+
+def test_x_accel_redirect_offload(app, client, pages_dir):
+    app.config['FILES_X_ACCEL_REDIRECT_PREFIX'] = '/protected-uploads/'
+    try:
+        response = client.get('/files/proj-1/pages/page-1_v2.png')
+        assert response.status_code == 200 and not response.data
+        assert response.headers['X-Accel-Redirect'] == '/protected-uploads/proj-1/pages/page-1_v2.png'
+        assert response.mimetype == 'image/png'
+        assert 'immutable' in response.headers['Cache-Control']
+
+        revalidated = client.get('/files/proj-1/pages/page-1_v2.png',
+                                 headers={'If-None-Match': response.headers['ETag']})
+        assert revalidated.status_code == 304 and 'X-Accel-Redirect' not in revalidated.headers
+    finally:
+        app.config['FILES_X_ACCEL_REDIRECT_PREFIX'] = ''
@@ -0,0 +1,96 @@
+"""Unit tests for the content-addressed generated image cache."""
+from PIL import Image
+
+from services.ai_service import AIService
+from services.ai_providers.image.base import ImageProvider
+from services.ai_providers.text.base import TextProvider
+from services.image_cache import ImageCache, ImageCacheStats
+
+
+class _CountingImageProvider(ImageProvider):
+    def __init__(self):
+        self.calls = 0
+
+    def generate_image(self, prompt, ref_images=None, aspect_ratio="16:9", resolution="2K",
+                       enable_thinking=False, thinking_budget=0):
+        self.calls += 1
+        return Image.new('RGB', (32, 18), (self.calls * 40 % 256, 0, 0))
+
+
+class _NoopTextProvider(TextProvider):
+    def generate_text(self, prompt, thinking_budget=1000):
+        return ''
+
+    def generate_with_image(self, prompt, image_path, thinking_budget=0):
+        return ''
+
+
+def _key(prompt='p', refs=(), aspect_ratio='16:9', resolution='2K'):
+    return ImageCache.make_key('Gemini', 'model', prompt, refs, aspect_ratio, resolution)
+
+
+def test_key_depends_on_every_input():
+    base = _key()
+    assert base == _key()
+    assert base != _key(prompt='q')
+    assert base != _key(refs=('abc',))
+    assert base != _key(aspect_ratio='4:3')
+    assert base != _key(resolution='4K')
+
+
+def test_put_get_roundtrip_and_persistence(tmp_path):
+    cache = ImageCache(str(tmp_path))
+    image = Image.new('RGB', (8, 8), (10, 20, 30))
+    key = _key()
+
+    assert cache.get(key) is None
+    cache.put(key, image)
+    hit = cache.get(key)
+    assert hit is not None and hit.getpixel((0, 0)) == (10, 20, 30)
+
+    # 新实例从磁盘重建索引
+    reopened = ImageCache(str(tmp_path))
+    assert reopened.get_stats()['entries'] == 1
+    assert reopened.get(key) is not None
+
+
+def test_lru_eviction_by_total_size(tmp_path):
+    image = Image.new('RGB', (64, 64), (1, 2, 3))
+    probe = ImageCache(str(tmp_path / 'probe'))
+    probe.put('00', image)
+    entry_size = probe.get_stats()['total_bytes']
+
+    cache = ImageCache(str(tmp_path / 'cache'), max_bytes=entry_size * 2)
+    k1, k2, k3 = _key('a'), _key('b'), _key('c')
+    cache.put(k1, image)
+    cache.put(k2, image)
+    assert cache.get(k1) is not None  # k1 becomes most recently used
+    cache.put(k3, image)
+
+    assert cache.get(k2) is None
+    assert cache.get(k1) is not None
+    assert cache.get(k3) is not None
+    assert cache.get_stats()['total_bytes'] <= entry_size * 2
+
+
+def test_ai_service_generate_image_uses_cache(app, tmp_path):
+    app.config['IMAGE_CACHE_ENABLED'] = True
+    app.config['IMAGE_CACHE_DIR'] = str(tmp_path)
+    import services.image_cache as image_cache_module
+    image_cache_module._image_cache = None
+    try:
+        with app.app_context():
+            provider = _CountingImageProvider()
+            service = AIService(text_provider=_NoopTextProvider(), image_provider=provider,
+                                caption_provider=_NoopTextProvider())
+            stats = ImageCacheStats()
+
+            first = service.generate_image('slide', use_cache=True, cache_stats=stats)
+            second = service.generate_image('slide', use_cache=True, cache_stats=stats)
+            service.generate_image('slide', use_cache=False)
+
+            assert provider.calls == 2
+            assert first.getpixel((0, 0)) == second.getpixel((0, 0))
+            assert stats.to_dict() == {'hits': 1, 'misses': 1}
+    finally:
+        image_cache_module._image_cache = None
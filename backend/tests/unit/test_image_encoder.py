@@ -0,0 +1,48 @@
+"""Unit tests for the process-pool image encoder."""
+from PIL import Image, features
+import pytest
+
+from services.image_encoder import ImageEncoder
+
+
+def _sample(mode='RGBA', size=(400, 200)):
+    image = Image.new(mode, size, (200, 10, 10, 128) if mode == 'RGBA' else (200, 10, 10))
+    return image
+
+
+def test_inline_png_and_jpeg_preview(tmp_path):
+    encoder = ImageEncoder(processes=0, png_compress_level=1)
+    png_path = encoder.save_png(_sample(), str(tmp_path / 'pages' / 'p_v1.png'))
+    preview_path = encoder.save_preview(_sample(), str(tmp_path / 'pages' / 'p_v1_thumb.jpg'), max_width=100)
+
+    with Image.open(png_path) as png:
+        assert png.format == 'PNG' and png.mode == 'RGBA' and png.size == (400, 200)
+    with Image.open(preview_path) as preview:
+        # 透明区域合成到白底，并按 max_width 等比缩放
+        assert preview.format == 'JPEG' and preview.mode == 'RGB' and preview.size == (100, 50)
+    assert not list((tmp_path / 'pages').glob('*.tmp'))
+
+
+@pytest.mark.skipif(not features.check('webp'), reason='Pillow built without WebP')
+def test_webp_preview_extension(tmp_path):
+    encoder = ImageEncoder(processes=0, preview_format='webp')
+    assert encoder.preview_extension == 'webp'
+    path = encoder.save_preview(_sample('RGB'), str(tmp_path / 'p_thumb.webp'))
+    with Image.open(path) as preview:
+        assert preview.format == 'WEBP'
+
+
+def test_unknown_preview_format_falls_back_to_jpeg():
+    assert ImageEncoder(processes=0, preview_format='bmp').preview_format == 'jpeg'
+
+
+def test_process_pool_roundtrip(tmp_path):
+    encoder = ImageEncoder(processes=1)
+    try:
+        palette_image = _sample('RGB').convert('P')
+        path = encoder.save_png(palette_image, str(tmp_path / 'pool.png'))
+        with Image.open(path) as png:
+            assert png.size == (400, 200)
+            assert png.convert('RGB').getpixel((0, 0)) == palette_image.convert('RGB').getpixel((0, 0))
+    finally:
+        encoder.shutdown()
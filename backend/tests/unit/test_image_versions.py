@@ -0,0 +1,102 @@
+"""Unit tests for page image version reservation (unique (page_id, version_number))."""
+from datetime import datetime, timedelta
+
+import pytest
+from PIL import Image
+from sqlalchemy.exc import IntegrityError
+
+import services.task_manager as task_manager
+from models import db, Page, PageImageVersion, Project
+from services.file_service import FileService
+from services.task_manager import (
+    TaskManager, discard_stale_image_reservations, record_image_version, release_image_version,
+    reserve_image_version, save_image_with_version
+)
+
+
+@pytest.fixture
+def page(client, app):
+    project = Project(idea_prompt='Versions', status='DRAFT')
+    db.session.add(project)
+    db.session.flush()
+    page = Page(project_id=project.id, order_index=0)
+    db.session.add(page)
+    db.session.commit()
+    return page
+
+
+def test_duplicate_version_number_is_rejected(page):
+    db.session.add(PageImageVersion(page_id=page.id, image_path='a.png', version_number=1))
+    db.session.add(PageImageVersion(page_id=page.id, image_path='b.png', version_number=1))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+
+def test_racing_reservation_retries_with_next_number(page, app, monkeypatch):
+    file_service = FileService(app.config['UPLOAD_FOLDER'])
+    assert reserve_image_version(page.id, page.project_id, file_service) == 1
+
+    # 另一个线程在 MAX 查询之后抢先提交了同一版本号
+    stale = iter([1])
+    real_next = task_manager.get_next_image_version
+    monkeypatch.setattr(task_manager, 'get_next_image_version', lambda page_id: next(stale, None) or real_next(page_id))
+    assert reserve_image_version(page.id, page.project_id, file_service) == 2
+
+    reserved = PageImageVersion.query.filter_by(page_id=page.id, version_number=2).one()
+    assert reserved.is_reserved and not reserved.is_current
+    assert reserved.image_path == f'{page.project_id}/pages/{page.id}_v2.png'
+
+
+def test_save_marks_the_reserved_row_current(page, app):
+    file_service = FileService(app.config['UPLOAD_FOLDER'])
+    image = Image.new('RGB', (32, 18), 'blue')
+    save_image_with_version(image, page.project_id, page.id, file_service, page_obj=page)
+    image_path, version = save_image_with_version(image, page.project_id, page.id, file_service, page_obj=page)
+
+    versions = PageImageVersion.query.filter_by(page_id=page.id).order_by(PageImageVersion.version_number).all()
+    assert [(v.version_number, v.is_current, v.is_reserved) for v in versions] == [(1, False, False), (2, True, False)]
+    assert version == 2 and page.generated_image_path == image_path == versions[1].image_path
+
+    # 聚合器刷新时只切换预留行，不再插入
+    next_version = reserve_image_version(page.id, page.project_id, file_service)
+    record_image_version(page.id, 'x.png', 'x_thumb.jpg', next_version, page_obj=page)
+    db.session.commit()
+    assert PageImageVersion.query.filter_by(page_id=page.id).count() == 3
+    assert PageImageVersion.query.filter_by(page_id=page.id, is_current=True).one().version_number == 3
+
+
+def test_reservation_is_hidden_until_recorded(page, app, client):
+    file_service = FileService(app.config['UPLOAD_FOLDER'])
+    save_image_with_version(Image.new('RGB', (32, 18), 'blue'), page.project_id, page.id, file_service, page_obj=page)
+    reserved = reserve_image_version(page.id, page.project_id, file_service)
+    reserved_id = PageImageVersion.query.filter_by(page_id=page.id, version_number=reserved).one().id
+
+    url = f'/api/projects/{page.project_id}/pages/{page.id}/image-versions'
+    assert [v['version_number'] for v in client.get(url).get_json()['data']['versions']] == [1]
+    assert client.post(f'{url}/{reserved_id}/set-current').status_code == 404
+
+
+def test_release_keeps_the_callers_pending_changes(page, app):
+    file_service = FileService(app.config['UPLOAD_FOLDER'])
+    page_id = page.id
+    version = reserve_image_version(page_id, page.project_id, file_service)
+    page.status = 'GENERATING'
+    release_image_version(page_id, version)
+    db.session.commit()
+
+    assert PageImageVersion.query.filter_by(page_id=page_id).count() == 0
+    assert db.session.get(Page, page_id).status == 'GENERATING'
+
+
+def test_restart_discards_unfinished_reservations(page, app):
+    file_service = FileService(app.config['UPLOAD_FOLDER'])
+    save_image_with_version(Image.new('RGB', (32, 18), 'blue'), page.project_id, page.id, file_service, page_obj=page)
+    reserve_image_version(page.id, page.project_id, file_service)
+
+    # 独立 worker 模式只清理足够旧的预留
+    assert discard_stale_image_reservations(datetime.utcnow() - timedelta(hours=1)) == 0
+    db.session.commit()
+    TaskManager(max_workers=1).resume_pending_tasks(app)
+    versions = PageImageVersion.query.filter_by(page_id=page.id).all()
+    assert [(v.version_number, v.is_reserved) for v in versions] == [(1, False)]
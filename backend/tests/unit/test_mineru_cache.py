@@ -0,0 +1,102 @@
+"""Unit tests for the MinerU parse-result cache."""
+import time
+
+import pytest
+from PIL import Image
+
+import services.mineru_cache as mineru_cache_module
+from services.file_parser_service import FileParserService
+from services.image_editability.extractors import MinerUElementExtractor
+from services.mineru_cache import MinerUCache
+
+
+def _result_dir(root, extract_id, size=100, layout=True):
+    path = root / extract_id
+    (path / 'images').mkdir(parents=True)
+    (path / 'images' / 'a.jpg').write_bytes(b'x' * size)
+    if layout:
+        (path / 'layout.json').write_text('{"pdf_info": []}')
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    root = tmp_path / 'mineru_files'
+    root.mkdir()
+    cache = MinerUCache(str(tmp_path / 'mineru_cache.db'), str(root))
+    monkeypatch.setattr(mineru_cache_module, '_mineru_cache', cache)
+    return cache
+
+
+def test_hit_miss_and_integrity(cache):
+    path = _result_dir(cache.mineru_root, 'abc')
+    key = MinerUCache.make_key('hash', 'document', 'vlm')
+    assert key != MinerUCache.make_key('hash', 'layout', 'vlm')
+    assert key != MinerUCache.make_key('hash', 'document', 'pipeline')
+
+    assert cache.get(key) is None
+    cache.put(key, 'abc', markdown='# Doc')
+    entry = cache.get(key, required_files=('layout.json',))
+    assert entry['extract_id'] == 'abc' and entry['markdown'] == '# Doc'
+    assert cache.get_stats()['hit_rate'] == 0.5
+
+    # 结果目录被改动：视为未命中并丢弃条目，非缓存所有的目录保留
+    (path / 'images' / 'a.jpg').write_bytes(b'truncated')
+    assert cache.get(key) is None
+    assert cache.get_stats()['entries'] == 0
+    assert path.exists()
+
+
+def test_eviction_by_age_and_size_deletes_owned_dirs(cache):
+    cache.max_bytes = 250
+    owned = _result_dir(cache.mineru_root, 'owned')
+    shared = _result_dir(cache.mineru_root, 'shared')
+    cache.put('owned', 'owned', owned=True)
+    time.sleep(0.01)
+    cache.put('shared', 'shared')
+    time.sleep(0.01)
+    cache.put('third', _result_dir(cache.mineru_root, 'third').name, owned=True)
+
+    assert cache.get('owned') is None and not owned.exists()
+    assert cache.get('shared') is not None
+
+    cache.ttl_seconds = 0.05
+    time.sleep(0.1)
+    assert cache.get('shared') is None and shared.exists()
+    assert cache.get('third') is None
+
+
+def test_reference_parse_skips_mineru_on_hit(cache, tmp_path, monkeypatch):
+    pdf = tmp_path / 'report.pdf'
+    pdf.write_bytes(b'%PDF-1.4 same bytes')
+    _result_dir(cache.mineru_root, 'ref1')
+    parser = FileParserService(mineru_token='t')
+    monkeypatch.setattr(parser, '_can_generate_captions', lambda: False)
+    monkeypatch.setattr(parser, '_get_upload_url', lambda filename: ('batch', 'url', None))
+    monkeypatch.setattr(parser, '_upload_file', lambda path, url: None)
+    polls = []
+    monkeypatch.setattr(parser, '_poll_result',
+                        lambda batch_id: polls.append(batch_id) or ('# Parsed', 'ref1', None))
+
+    assert parser.parse_file(str(pdf), 'report.pdf') == ('batch', '# Parsed', 'ref1', None, 0)
+    assert parser.parse_file(str(pdf), 'copy.pdf') == (None, '# Parsed', 'ref1', None, 0)
+    assert len(polls) == 1
+    parser.parse_file(str(pdf), 'report.pdf', use_cache=False)
+    assert len(polls) == 2
+
+
+def test_unchanged_slide_skips_layout_analysis(cache, tmp_path, monkeypatch):
+    image_path = tmp_path / 'slide.png'
+    Image.new('RGB', (64, 36), 'white').save(image_path)
+    extractor = MinerUElementExtractor(FileParserService(mineru_token='t'), tmp_path)
+    parses = []
+
+    def fake_parse(path, depth):
+        parses.append(path)
+        return str(_result_dir(cache.mineru_root, f'slide{len(parses)}')), None
+
+    monkeypatch.setattr(extractor, '_parse_image', fake_parse)
+    first = extractor.extract(str(image_path))
+    second = extractor.extract(str(image_path))
+    assert len(parses) == 1
+    assert first.context.result_dir == second.context.result_dir
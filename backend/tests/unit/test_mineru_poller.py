@@ -0,0 +1,77 @@
+"""Unit tests for the shared MinerU batch poller."""
+import threading
+from collections import Counter
+
+import httpx
+import pytest
+
+from services.file_parser_service import FileParserService
+from services.mineru_poller import MinerUPoller, MinerUPollError
+
+
+def _result(state, **extra):
+    return {"code": 0, "data": {"extract_result": [{"state": state, **extra}]}}
+
+
+class _FakeMinerU:
+    """Batch ``b<i>`` reports ``running`` for ``polls_until_done[i]`` polls, then ``done``"""
+
+    def __init__(self, polls_until_done):
+        self.polls_until_done = polls_until_done
+        self.polls = Counter()
+        self.threads = set()
+
+    def handler(self, request):
+        self.threads.add(threading.get_ident())
+        batch_id = request.url.path.rsplit('/', 1)[-1]
+        self.polls[batch_id] += 1
+        remaining = self.polls_until_done.get(batch_id, 0) - self.polls[batch_id]
+        if batch_id == 'broken':
+            return httpx.Response(200, json=_result('failed', err_msg='bad pdf'))
+        if remaining >= 0:
+            return httpx.Response(200, json=_result('running'))
+        return httpx.Response(200, json=_result('done', full_zip_url=f'https://cdn/{batch_id}.zip'))
+
+
+@pytest.fixture
+def fake_mineru():
+    server = _FakeMinerU({f'b{i}': i % 4 for i in range(30)})
+    poller = MinerUPoller(min_interval=0.01, max_interval=0.05, transport=httpx.MockTransport(server.handler))
+    yield server, poller
+    poller.shutdown()
+
+
+def test_many_batches_share_one_poller_thread(fake_mineru):
+    server, poller = fake_mineru
+    threads_before = threading.active_count()
+    futures = {f'b{i}': poller.submit(f'https://mineru/api/v4/extract-results/batch/b{i}', {}) for i in range(30)}
+    assert threading.active_count() <= threads_before + 1
+
+    for batch_id, future in futures.items():
+        assert future.result(timeout=10)['full_zip_url'] == f'https://cdn/{batch_id}.zip'
+    assert len(server.threads) == 1
+    stats = poller.get_stats()
+    assert stats['completed'] == 30 and stats['outstanding'] == 0
+
+
+def test_failure_timeout_and_backoff(fake_mineru):
+    server, poller = fake_mineru
+    with pytest.raises(MinerUPollError, match='bad pdf'):
+        poller.submit('https://mineru/batch/broken', {}).result(timeout=5)
+
+    server.polls_until_done['slow'] = 10 ** 6
+    with pytest.raises(MinerUPollError, match='timeout'):
+        poller.submit('https://mineru/batch/slow', {}, max_wait_time=0.5).result(timeout=5)
+    # 状态不变时间隔拉长到 max_interval：0.5 秒内远少于按最小间隔的 50 次
+    assert server.polls['slow'] < 25
+    assert poller.get_stats()['timeouts'] == 1
+
+
+def test_parser_waits_on_shared_poller(fake_mineru, monkeypatch):
+    _, poller = fake_mineru
+    monkeypatch.setattr('services.mineru_poller._mineru_poller', poller)
+    parser = FileParserService(mineru_token='t', mineru_api_base='https://mineru')
+    monkeypatch.setattr(parser, '_download_markdown', lambda url: ('# Parsed', url.rsplit('/', 1)[-1], None))
+
+    assert parser._poll_result('b3') == ('# Parsed', 'b3.zip', None)
+    assert parser._poll_result('broken') == (None, None, 'File parsing failed: bad pdf')
@@ -0,0 +1,59 @@
+"""Unit tests for the indexed MinerU file lookup."""
+import json
+import os
+
+from utils import path_utils
+from utils.path_utils import PREFIX_INDEX_FILENAME, build_extract_index, find_extract_file, find_mineru_file_with_prefix
+
+
+def _touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'x')
+
+
+def _make_extract(tmp_path):
+    root = tmp_path / 'uploads' / 'mineru_files' / 'abc12345'
+    _touch(root / 'full.md')
+    _touch(root / 'images' / 'a1b2c3d4e5f6.jpg')
+    _touch(root / 'images' / 'a1b2c3d4e5f6.png')
+    _touch(root / 'images' / 'A1B2Z9.JPG')
+    _touch(root / 'images' / 'ffff0000.jpg')
+    return root
+
+
+def test_exact_and_prefix_lookup(tmp_path):
+    root = _make_extract(tmp_path)
+    build_extract_index(root)
+
+    assert find_extract_file(root, 'images/a1b2c3d4e5f6.png') == root / 'images' / 'a1b2c3d4e5f6.png'
+    # 前缀 + 扩展名匹配（大小写不敏感），扩展名不同的文件不会被匹配
+    assert find_extract_file(root, 'images/a1b2c.jpg') == root / 'images' / 'a1b2c3d4e5f6.jpg'
+    assert find_extract_file(root, 'images/A1B2z.jpg') == root / 'images' / 'A1B2Z9.JPG'
+    # 前缀少于 5 个字符、目录不存在、越界路径均不匹配
+    assert find_extract_file(root, 'images/a1b2.jpg') is None
+    assert find_extract_file(root, 'other/a1b2c3d4e5f6.jpg') is None
+    assert find_extract_file(root, 'images/../full.md') is None
+
+
+def test_index_is_persisted_and_lookups_do_not_scan(tmp_path, monkeypatch):
+    root = _make_extract(tmp_path)
+    build_extract_index(root)
+    data = json.loads((root / PREFIX_INDEX_FILENAME).read_text(encoding='utf-8'))
+    assert sorted(data['dirs']) == ['', 'images'] and PREFIX_INDEX_FILENAME not in data['dirs']['']
+
+    # 清空进程内缓存后从磁盘上的索引加载；之后的查找均不列目录
+    path_utils._index_cache.clear()
+    monkeypatch.setattr(os, 'listdir', lambda *_: (_ for _ in ()).throw(AssertionError('listdir called')))
+    monkeypatch.setattr(os, 'walk', lambda *_: (_ for _ in ()).throw(AssertionError('walk called')))
+    for _ in range(3):
+        assert find_mineru_file_with_prefix('/files/mineru/abc12345/images/ffff0.jpg',
+                                            project_root=tmp_path) == root / 'images' / 'ffff0000.jpg'
+
+
+def test_legacy_extract_without_index_is_indexed_on_first_use(tmp_path):
+    root = _make_extract(tmp_path)
+    path_utils._index_cache.clear()
+    assert not (root / PREFIX_INDEX_FILENAME).exists()
+    assert find_mineru_file_with_prefix('/files/mineru/abc12345/full.md', project_root=tmp_path) == root / 'full.md'
+    assert (root / PREFIX_INDEX_FILENAME).exists()
+    assert find_mineru_file_with_prefix('/files/mineru/missing00/full.md', project_root=tmp_path) is None
@@ -0,0 +1,44 @@
+"""Unit tests for PyMuPDF-based PDF splitting and rendering."""
+import os
+
+import fitz
+import pytest
+
+from services.pdf_service import PdfSplitter, get_pdf_info
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    path = tmp_path / 'deck.pdf'
+    with fitz.open() as doc:
+        for i in range(10):
+            page = doc.new_page(width=720, height=405)
+            page.insert_text((72, 72), f'Slide {i + 1}')
+        doc.save(str(path))
+    return str(path)
+
+
+@pytest.mark.parametrize('processes', [0, 2])
+def test_split_yields_every_page_once(sample_pdf, tmp_path, processes):
+    splitter = PdfSplitter(processes=processes)
+    try:
+        results = list(splitter.iter_pages(sample_pdf, str(tmp_path / 'split'), None, 'page_{n}.pdf'))
+    finally:
+        splitter.shutdown()
+
+    assert sorted(i for i, _, _ in results) == list(range(10))
+    for i, path, error in results:
+        assert error is None and os.path.basename(path) == f'page_{i + 1}.pdf'
+        with fitz.open(path) as doc:
+            assert doc.page_count == 1
+            assert doc[0].get_text().strip() == f'Slide {i + 1}'
+
+
+def test_render_at_target_dpi(sample_pdf, tmp_path):
+    assert get_pdf_info(sample_pdf) == (10, (720, 405))
+    splitter = PdfSplitter(processes=0)
+    results = list(splitter.iter_pages(sample_pdf, str(tmp_path / 'pages'), 144, 'page_{n}_original.png'))
+
+    assert len(results) == 10
+    pix = fitz.Pixmap(results[0][1])
+    assert (pix.width, pix.height) == (1440, 810)
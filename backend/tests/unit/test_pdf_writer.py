@@ -0,0 +1,53 @@
+"""Test the streaming image-only PDF writer."""
+import io
+import os
+
+import fitz
+from PIL import Image
+
+from services.export_service import ExportService
+from services.pdf_writer import StreamingPdfWriter
+
+
+def _pixel(page, x=100, y=100):
+    return page.get_pixmap(clip=fitz.Rect(x, y, x + 1, y + 1)).pixel(0, 0)
+
+
+def test_png_is_embedded_losslessly(tmp_path):
+    image = Image.frombytes('RGB', (64, 36), os.urandom(64 * 36 * 3))
+    image.save(tmp_path / 'noise.png')
+    output = tmp_path / 'noise.pdf'
+    with StreamingPdfWriter(str(output), 64, 36) as writer:
+        assert writer.add_image_page(str(tmp_path / 'noise.png'))
+
+    with fitz.open(str(output)) as doc:
+        extracted = doc.extract_image(doc[0].get_images()[0][0])
+        assert Image.open(io.BytesIO(extracted['image'])).convert('RGB').tobytes() == image.tobytes()
+    assert fitz.TOOLS.mupdf_warnings() == ''
+
+
+def test_mixed_formats_metadata_and_layout(tmp_path):
+    Image.new('RGB', (320, 180), 'red').save(tmp_path / 'rgb.png')
+    Image.new('RGBA', (320, 180), (0, 0, 255, 0)).save(tmp_path / 'alpha.png')
+    Image.new('RGB', (320, 180), 'red').convert('P').save(tmp_path / 'palette.png')
+    Image.new('L', (320, 180), 128).save(tmp_path / 'gray.png')
+    Image.new('RGB', (320, 180), 'blue').save(tmp_path / 'photo.jpg', quality=95)
+    Image.new('RGB', (320, 180), 'blue').save(tmp_path / 'photo.webp', 'WEBP', lossless=True)
+    Image.new('RGB', (400, 300), 'green').save(tmp_path / 'wide4x3.png')
+    names = ['rgb.png', 'alpha.png', 'palette.png', 'gray.png', 'photo.jpg', 'photo.webp',
+             'missing.png', 'wide4x3.png']
+
+    data = ExportService.create_pdf_from_images([str(tmp_path / n) for n in names])
+
+    with fitz.open(stream=data, filetype='pdf') as doc:
+        assert doc.page_count == 7
+        assert doc.metadata['author'] == 'banana-slides'
+        assert '<xmp:CreatorTool>banana-slides</xmp:CreatorTool>' in doc.get_xml_metadata()
+        assert all(page.rect == fitz.Rect(0, 0, 720, 405) for page in doc)
+        assert _pixel(doc[0]) == (255, 0, 0)
+        assert _pixel(doc[1]) == (255, 255, 255)  # 透明区域合成到白底
+        assert _pixel(doc[2]) == (255, 0, 0)
+        assert _pixel(doc[3]) == (128, 128, 128)
+        assert _pixel(doc[4])[2] > 240
+        # 4:3 图片铺满 16:9 页面（保持比例居中裁切），页面边缘也有内容
+        assert _pixel(doc[6], 1, 1) == (0, 128, 0)
@@ -0,0 +1,49 @@
+"""Test the streaming image-only PPTX writer."""
+import zipfile
+
+from PIL import Image
+from pptx import Presentation
+
+from services.export_service import ExportService
+
+
+def _image(path, color, fmt=None):
+    Image.new('RGB', (320, 180), color).save(path, fmt)
+    return str(path)
+
+
+def test_streamed_deck_opens_in_python_pptx(tmp_path):
+    red = _image(tmp_path / 'red.png', 'red')
+    blue = _image(tmp_path / 'blue.jpg', 'blue')
+    green = _image(tmp_path / 'green.webp', 'green', 'WEBP')
+    output = tmp_path / 'deck.pptx'
+
+    ExportService.create_pptx_from_images(
+        [red, blue, str(tmp_path / 'missing.png'), red, green], output_file=str(output), aspect_ratio='4:3')
+
+    prs = Presentation(str(output))
+    assert len(prs.slides) == 4
+    assert (prs.slide_width, prs.slide_height) == (9144000, 6858000)
+    assert prs.core_properties.author == 'banana-slides'
+    content_types = [slide.shapes[0].image.content_type for slide in prs.slides]
+    assert content_types == ['image/png', 'image/jpeg', 'image/png', 'image/png']
+    for slide in prs.slides:
+        assert slide.slide_layout.name == 'Blank'
+        assert (slide.shapes[0].width, slide.shapes[0].height) == (prs.slide_width, prs.slide_height)
+
+    with zipfile.ZipFile(output) as zf:
+        media = [info for info in zf.infolist() if info.filename.startswith('ppt/media/')]
+        # 重复出现的 red.png 只存一份，且图片不再二次压缩
+        assert len(media) == 3
+        assert all(info.compress_type == zipfile.ZIP_STORED for info in media)
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_streaming_and_in_memory_return_bytes(tmp_path):
+    paths = [_image(tmp_path / 'a.png', 'red')]
+    for streaming in (True, False):
+        data = ExportService.create_pptx_from_images(paths, streaming=streaming)
+        assert data[:2] == b'PK'
+        copy = tmp_path / f'copy_{streaming}.pptx'
+        copy.write_bytes(data)
+        assert len(Presentation(str(copy)).slides) == 1
@@ -0,0 +1,122 @@
+"""Test batched progress writes for bulk generation tasks."""
+import os
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+os.environ.setdefault('TESTING', 'true')
+os.environ.setdefault('GOOGLE_API_KEY', 'mock')
+
+from services.progress_aggregator import ProgressAggregator
+from services.task_manager import generate_descriptions_task
+
+
+@pytest.fixture
+def progress_app():
+    """Minimal Flask app with an isolated database."""
+    from flask import Flask
+    from models import db
+
+    app = Flask(__name__)
+    tmp = tempfile.mkdtemp()
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmp}/test.db'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    yield app
+    import shutil
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _create_project(page_count):
+    from models import db, Project, Page, Task
+
+    project = Project(idea_prompt='test')
+    db.session.add(project)
+    db.session.flush()
+    for i in range(page_count):
+        db.session.add(Page(project_id=project.id, order_index=i, status='DRAFT'))
+    task = Task(project_id=project.id, task_type='GENERATE_DESCRIPTIONS', status='PENDING')
+    db.session.add(task)
+    db.session.commit()
+    return project.id, task.id
+
+
+class _CommitCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(Session, 'after_commit', self._on_commit)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(Session, 'after_commit', self._on_commit)
+
+    def _on_commit(self, session):
+        self.count += 1
+
+
+class _FakeAIService:
+    def flatten_outline(self, outline):
+        return outline
+
+    def generate_page_description(self, project_context, outline, page_outline, page_index, **kwargs):
+        if page_outline.get('fail'):
+            raise RuntimeError('boom')
+        return {'text': f"desc {page_index}"}
+
+
+def test_flush_every_coalesces_events(progress_app):
+    from models import Page, Task
+
+    with progress_app.app_context():
+        project_id, task_id = _create_project(5)
+        page_ids = [p.id for p in Page.query.filter_by(project_id=project_id).all()]
+
+        aggregator = ProgressAggregator(task_id, total=5, flush_interval=60, flush_every=2)
+        with _CommitCounter() as commits:
+            for page_id in page_ids[:4]:
+                aggregator.page_completed(page_id, lambda page: setattr(page, 'status', 'DONE'))
+                aggregator.maybe_flush()
+            aggregator.page_failed(page_ids[4])
+            aggregator.flush()
+
+        assert commits.count == 3
+        assert aggregator.get_stats()['events'] == 5
+        statuses = {p.id: p.status for p in Page.query.filter_by(project_id=project_id).all()}
+        assert [statuses[pid] for pid in page_ids] == ['DONE'] * 4 + ['FAILED']
+        assert Task.query.get(task_id).get_progress() == {'total': 5, 'completed': 4, 'failed': 1}
+
+
+def test_descriptions_task_uses_fewer_commits_than_pages(progress_app, monkeypatch):
+    from models import Page, Task
+
+    ai_service = _FakeAIService()
+    monkeypatch.setattr('services.ai_service_manager.get_ai_service', lambda: ai_service)
+
+    page_count = 12
+    with progress_app.app_context():
+        project_id, task_id = _create_project(page_count)
+
+    outline = [{'title': f"p{i}", 'fail': i == 3} for i in range(page_count)]
+    with _CommitCounter() as commits:
+        generate_descriptions_task(task_id, project_id, ai_service, None, outline,
+                                   max_workers=4, app=progress_app)
+
+    with progress_app.app_context():
+        task = Task.query.get(task_id)
+        assert task.status == 'COMPLETED'
+        assert task.get_progress()['completed'] == page_count - 1
+        assert task.get_progress()['failed'] == 1
+        pages = Page.query.filter_by(project_id=project_id).order_by(Page.order_index).all()
+        assert pages[3].status == 'FAILED'
+        assert all(p.status == 'DESCRIPTION_GENERATED' for i, p in enumerate(pages) if i != 3)
+
+    # 旧实现每页两次提交（页面 + 任务进度），这里应远少于页数
+    assert commits.count < page_count
@@ -0,0 +1,75 @@
+"""Unit tests for the cached GET /api/projects/<id> payload."""
+from models import db, Page
+from services.project_cache import project_response_cache
+
+
+def _add_pages(client, project_id, count):
+    page_ids = []
+    for i in range(count):
+        response = client.post(f'/api/projects/{project_id}/pages', json={
+            'order_index': i, 'outline_content': {'title': f'第 {i} 页', 'points': []},
+        })
+        page_ids.append(response.get_json()['data']['page_id'])
+    return page_ids
+
+
+def test_etag_304_and_invalidation_on_page_update(client, sample_project):
+    project_id = sample_project['project_id']
+    page_ids = _add_pages(client, project_id, 3)
+
+    first = client.get(f'/api/projects/{project_id}')
+    assert first.status_code == 200 and len(first.get_json()['data']['pages']) == 3
+    etag = first.headers['ETag']
+    assert 'no-cache' in first.headers['Cache-Control']
+
+    assert client.get(f'/api/projects/{project_id}', headers={'If-None-Match': etag}).status_code == 304
+
+    client.put(f'/api/projects/{project_id}/pages/{page_ids[1]}/outline',
+               json={'outline_content': {'title': '已修改', 'points': ['a']}})
+    updated = client.get(f'/api/projects/{project_id}', headers={'If-None-Match': etag})
+    assert updated.status_code == 200 and updated.headers['ETag'] != etag
+    assert updated.get_json()['data']['pages'][1]['outline_content']['title'] == '已修改'
+
+
+def test_unchanged_pages_are_not_reserialized(app, client, sample_project, monkeypatch):
+    project_id = sample_project['project_id']
+    page_ids = _add_pages(client, project_id, 3)
+    client.get(f'/api/projects/{project_id}')
+
+    serialized = []
+    original = Page.to_dict
+    monkeypatch.setattr(Page, 'to_dict', lambda self, *a, **kw: serialized.append(self.id) or original(self, *a, **kw))
+
+    # 命中缓存：不序列化任何页面
+    client.get(f'/api/projects/{project_id}')
+    assert serialized == []
+
+    with app.app_context():
+        page = Page.query.get(page_ids[2])
+        page.status = 'COMPLETED'
+        db.session.commit()
+    data = client.get(f'/api/projects/{project_id}').get_json()['data']
+    assert serialized == [page_ids[2]] and data['pages'][2]['status'] == 'COMPLETED'
+
+
+def test_write_from_another_process_is_detected_by_stamp(app, client, sample_project):
+    project_id = sample_project['project_id']
+    page_ids = _add_pages(client, project_id, 1)
+    etag = client.get(f'/api/projects/{project_id}').headers['ETag']
+
+    # 模拟独立 worker 进程的提交：本进程的版本号没有变化
+    with app.app_context():
+        page = Page.query.get(page_ids[0])
+        page.generated_image_path = f'{project_id}/pages/{page.id}_v1.png'
+        versions = dict(project_response_cache._versions)
+        db.session.commit()
+        project_response_cache._versions.clear()
+        project_response_cache._versions.update(versions)
+
+    response = client.get(f'/api/projects/{project_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['data']['pages'][0]['generated_image_url'].endswith('_v1.png')
+
+
+def test_missing_project_is_404(client):
+    assert client.get('/api/projects/does-not-exist').status_code == 404
@@ -0,0 +1,87 @@
+"""Unit tests for the lightweight (summary) project listing."""
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from models import db, Project, Page
+
+
+def _seed(app, count=5):
+    base = datetime(2026, 1, 1)
+    with app.app_context():
+        for i in range(count):
+            project = Project(id=f'proj-{i}', idea_prompt=f'idea {i}', status='DRAFT',
+                              created_at=base, updated_at=base + timedelta(minutes=i // 2))
+            db.session.add(project)
+            for order in range(2):
+                page = Page(project_id=project.id, order_index=order)
+                page.set_outline_content({'title': f'标题 {i}-{order}', 'points': []})
+                if i == 0 and order == 1:
+                    page.generated_image_path = f'{project.id}/pages/p_v1.png'
+                    page.cached_image_path = f'{project.id}/pages/p_v1_thumb.jpg'
+                db.session.add(page)
+        # 非法 JSON 不影响列表
+        db.session.add(Page(project_id='proj-1', order_index=-1, outline_content='{broken'))
+        db.session.commit()
+
+
+def test_summary_fields(app, client):
+    _seed(app)
+    data = client.get('/api/projects?view=summary&include_total=1').get_json()['data']
+    assert data['total'] == 5 and data['next_cursor'] is None
+    by_id = {p['project_id']: p for p in data['projects']}
+
+    first = by_id['proj-0']
+    assert first['title'] == '标题 0-0' and first['page_count'] == 2
+    assert first['has_images'] is True and first['has_descriptions'] is False
+    assert first['cover_image_url'] == '/files/proj-0/pages/p_v1_thumb.jpg'
+    assert 'pages' not in first and first['updated_at'].endswith('Z')
+
+    assert by_id['proj-1']['title'] is None and by_id['proj-1']['page_count'] == 3
+    assert by_id['proj-2']['cover_image_url'] is None and by_id['proj-2']['has_images'] is False
+
+
+
+def test_summary_query_avoids_sqlite_only_functions(app, client):
+    """The title is parsed in Python so the listing also runs on PostgreSQL."""
+    _seed(app, count=2)
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.lower())
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        client.get('/api/projects?view=summary')
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    assert statements and not any('json_' in statement for statement in statements)
+
+
+def test_keyset_pagination_walks_all_projects_in_order(app, client):
+    _seed(app)
+    full = [p['project_id'] for p in client.get('/api/projects?view=summary&limit=100').get_json()['data']['projects']]
+    # updated_at 倒序，相同 updated_at 时按 id 倒序
+    assert full == ['proj-4', 'proj-3', 'proj-2', 'proj-1', 'proj-0']
+
+    seen, cursor = [], None
+    while True:
+        url = '/api/projects?view=summary&limit=2' + (f'&cursor={cursor}' if cursor else '')
+        data = client.get(url).get_json()['data']
+        seen += [p['project_id'] for p in data['projects']]
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+    assert seen == full
+
+    offset_page = client.get('/api/projects?view=summary&limit=2&offset=2').get_json()['data']
+    assert [p['project_id'] for p in offset_page['projects']] == full[2:4]
+    assert client.get('/api/projects?view=summary&cursor=%%%').status_code == 400
+
+
+def test_full_view_unchanged(app, client):
+    _seed(app, count=1)
+    project = client.get('/api/projects').get_json()['data']['projects'][0]
+    assert len(project['pages']) == 2 and project['pages'][0]['outline_content']['title'] == '标题 0-0'
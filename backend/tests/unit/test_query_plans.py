@@ -0,0 +1,68 @@
+"""
+EXPLAIN QUERY PLAN regression tests: hot lookups must stay on their indexes
+(see migration 017_add_hot_query_indexes).
+"""
+import pytest
+from sqlalchemy import desc, func, select, update
+
+from models import db, Material, Page, PageImageVersion, Project, Task
+
+
+def _plan(statement) -> str:
+    sql = str(statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+    rows = db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}')).fetchall()
+    return '\n'.join(row[-1] for row in rows)
+
+
+HOT_QUERIES = {
+    # get_filtered_pages / 项目详情
+    'pages_by_project': (
+        lambda: Page.query.filter_by(project_id='p').order_by(Page.order_index).statement,
+        'ix_pages_project_id_order_index',
+    ),
+    # get_next_image_version
+    'max_image_version': (
+        lambda: select(func.max(PageImageVersion.version_number)).where(PageImageVersion.page_id == 'x'),
+        'ix_page_image_versions_page_id_version_number',
+    ),
+    # record_image_version: 取消旧的当前版本
+    'reset_current_version': (
+        lambda: update(PageImageVersion).where(
+            PageImageVersion.page_id == 'x', PageImageVersion.is_current.is_(True)
+        ).values(is_current=False),
+        'ix_page_image_versions_page_id_is_current',
+    ),
+    # 素材列表
+    'materials_by_project': (
+        lambda: Material.query.filter(Material.project_id == 'p').order_by(Material.created_at.desc()).statement,
+        'ix_materials_project_id_created_at',
+    ),
+    # 导出去重：项目内进行中的任务
+    'tasks_by_project_status': (
+        lambda: Task.query.filter(
+            Task.project_id == 'p', Task.task_type == 'EXPORT_PDF', Task.status.in_(['PENDING', 'PROCESSING'])
+        ).statement,
+        'ix_tasks_project_id_status',
+    ),
+    # 独立 worker 认领任务
+    'task_queue_poll': (
+        lambda: Task.query.filter(Task.status == 'PENDING', Task.payload.isnot(None))
+        .order_by(Task.priority, Task.created_at).limit(16).statement,
+        'ix_tasks_status_priority_created_at',
+    ),
+    # 历史列表 keyset 分页
+    'project_listing': (
+        lambda: select(Project.id, Project.updated_at).order_by(desc(Project.updated_at), desc(Project.id)).limit(21),
+        'ix_projects_updated_at_id',
+    ),
+}
+
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_index(app, name):
+    build, index_name = HOT_QUERIES[name]
+    with app.app_context():
+        plan = _plan(build())
+    assert f'INDEX {index_name}' in plan, plan
+    # 排序必须由索引完成，不能退化为临时 B 树排序
+    assert 'USE TEMP B-TREE' not in plan, plan
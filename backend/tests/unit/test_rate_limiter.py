@@ -0,0 +1,138 @@
+"""Unit tests for the shared provider rate limiter."""
+import threading
+import time
+
+import pytest
+
+from services.ai_providers.rate_limiter import (
+    ProviderRateLimiter, RateLimitedTextProvider, is_rate_limit_error
+)
+from services.ai_providers.text.base import TextProvider
+
+
+class _FakeTextProvider(TextProvider):
+    def __init__(self, delay=0.0, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate_text(self, prompt, thinking_budget=1000):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            fail = self.failures > 0
+            if fail:
+                self.failures -= 1
+        try:
+            if fail:
+                raise RuntimeError("429 RESOURCE_EXHAUSTED: quota exceeded")
+            time.sleep(self.delay)
+            return f"echo:{prompt}"
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def generate_with_image(self, prompt, image_path, thinking_budget=0):
+        return self.generate_text(prompt)
+
+
+def test_concurrency_is_capped_across_threads():
+    """No more than max_concurrent calls should reach the provider at once."""
+    inner = _FakeTextProvider(delay=0.05)
+    provider = RateLimitedTextProvider(inner, ProviderRateLimiter('text', max_concurrent=2))
+
+    threads = [threading.Thread(target=provider.generate_text, args=(f"p{i}",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert inner.calls == 8
+    assert inner.peak == 2
+
+
+def test_requests_per_second_spaces_out_calls():
+    limiter = ProviderRateLimiter('image', max_concurrent=0, requests_per_second=20, burst=1)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.call(lambda: None)
+    # 1 个令牌立即可用，其余 4 次每次需等待 ~50ms
+    assert time.monotonic() - start >= 0.15
+
+
+def test_rate_limit_error_is_retried_with_backoff():
+    inner = _FakeTextProvider(failures=2)
+    limiter = ProviderRateLimiter('text', max_concurrent=4, max_retries=3, backoff_base=0.01)
+    provider = RateLimitedTextProvider(inner, limiter)
+
+    assert provider.generate_text("hello") == "echo:hello"
+    stats = limiter.get_stats()
+    assert stats['throttled'] == 2
+    assert stats['retries'] == 2
+    assert stats['calls'] == 1
+    assert stats['in_flight'] == 0
+
+
+def test_non_rate_limit_errors_are_not_retried():
+    limiter = ProviderRateLimiter('text', max_retries=3, backoff_base=0.01)
+
+    def boom():
+        raise ValueError("bad prompt")
+
+    with pytest.raises(ValueError):
+        limiter.call(boom)
+    assert limiter.get_stats()['retries'] == 0
+    assert limiter.get_stats()['errors'] == 1
+
+
+def test_proxy_limits_extra_generate_methods():
+    inner = _FakeTextProvider()
+    limiter = ProviderRateLimiter('caption', max_concurrent=1)
+    provider = RateLimitedTextProvider(inner, limiter)
+
+    assert hasattr(provider, 'generate_with_image')
+    assert provider.generate_with_image("cap", "/tmp/x.png") == "echo:cap"
+    assert limiter.get_stats()['calls'] == 1
+
+
+def test_is_rate_limit_error_detection():
+    class _HttpError(Exception):
+        status_code = 429
+
+    assert is_rate_limit_error(_HttpError("slow down"))
+    assert is_rate_limit_error(RuntimeError("Too Many Requests"))
+    assert not is_rate_limit_error(RuntimeError("connection reset"))
+
+
+def test_reference_file_captions_share_the_caption_limiter(tmp_path, monkeypatch):
+    """FileParserService builds its own SDK clients; their calls must still go through 'caption'."""
+    import services.file_parser_service as file_parser_service
+    import utils.path_utils as path_utils
+    from PIL import Image
+    from services.file_parser_service import FileParserService
+
+    image_path = tmp_path / 'figure.png'
+    Image.new('RGB', (8, 8), 'red').save(image_path)
+    monkeypatch.setattr(path_utils, 'find_mineru_file_with_prefix', lambda url: image_path)
+    limiter = ProviderRateLimiter('caption', max_concurrent=2)
+    monkeypatch.setattr(file_parser_service, 'get_rate_limiter', lambda name: limiter)
+
+    inner = _FakeTextProvider(delay=0.05)
+
+    class _Completions:
+        def create(self, **kwargs):
+            message = type('Message', (), {'content': inner.generate_text('caption')})
+            return type('Response', (), {'choices': [type('Choice', (), {'message': message})]})
+
+    parser = FileParserService(mineru_token='t')
+    parser._provider_format = 'openai'
+    parser._openai_client = type('Client', (), {'chat': type('Chat', (), {'completions': _Completions()})})
+
+    captions, failed = parser._generate_captions_parallel([f'/files/mineru/x/{i}.png' for i in range(6)])
+    assert failed == 0 and captions == ['echo:caption'] * 6
+    assert inner.peak == 2
+    assert limiter.get_stats()['calls'] == 6
@@ -0,0 +1,170 @@
+"""Unit tests for reference-file digests, chunking and BM25 retrieval."""
+import pytest
+
+from controllers.project_controller import _get_project_reference_files_content
+from models import db, Project, ReferenceChunk, ReferenceFile
+from services.ai_service import ProjectContext
+from services.prompts import get_outline_generation_prompt, get_page_description_prompt
+import services.reference_index as reference_index
+from services.reference_index import (chunk_markdown, estimate_tokens, index_reference_file,
+                                      load_project_reference_files)
+
+TOPICS = {
+    'solar': 'Solar panels convert sunlight into electricity with photovoltaic cells',
+    'wind': 'Wind turbines capture kinetic energy from moving air masses',
+    'battery': 'Lithium battery storage smooths out renewable supply peaks',
+    '水电': '水电站利用水库落差推动水轮机发电，调峰能力强',
+}
+
+
+IMAGE = '![wind farm](/files/mineru/abc/wind.png)'
+
+
+def _markdown(sections=30):
+    parts = []
+    for i in range(sections):
+        name, text = list(TOPICS.items())[i % len(TOPICS)]
+        parts.append(f'## Section {i}: {name}\n\n' + ' '.join([text] * 20) + (f'\n\n{IMAGE}' if name == 'wind' else ''))
+    return '\n\n'.join(parts)
+
+
+@pytest.fixture
+def reference_project(client):
+    project = Project(idea_prompt='Renewable energy overview', status='DRAFT')
+    db.session.add(project)
+    db.session.flush()
+    reference_file = ReferenceFile(project_id=project.id, filename='energy.pdf', file_path='x/energy.pdf',
+                                   file_size=1, file_type='pdf', parse_status='completed',
+                                   markdown_content=_markdown())
+    db.session.add(reference_file)
+    db.session.flush()
+    index_reference_file(reference_file)
+    db.session.commit()
+    return project, reference_file
+
+
+def test_chunks_respect_size_and_keep_section_heading():
+    markdown = '# Title\n\n' + '\n\n'.join('段落内容' * 60 for _ in range(6))
+    chunks = chunk_markdown(markdown, max_tokens=400)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(c) <= 400 for c in chunks)
+    assert all(c.startswith('# Title') for c in chunks)
+
+
+def test_page_prompt_only_inlines_relevant_chunks(app, reference_project):
+    project, reference_file = reference_project
+    full_tokens = estimate_tokens(reference_file.markdown_content)
+    app.config['REFERENCE_PROMPT_TOKEN_BUDGET'] = 2000
+    try:
+        context = ProjectContext(project, _get_project_reference_files_content(project.id))
+        assert context.reference_retriever is not None
+
+        page_outline = {'title': 'Wind turbines', 'points': ['kinetic energy of moving air']}
+        prompt = get_page_description_prompt(context, [page_outline], page_outline, 2)
+        assert 'energy.pdf' in prompt and 'Wind turbines capture' in prompt
+        assert 'Solar panels' not in prompt and '水电站' not in prompt
+        assert estimate_tokens(prompt) < full_tokens / 3
+
+        cjk_outline = {'title': '水电调峰', 'points': []}
+        prompt = get_page_description_prompt(context, [cjk_outline], cjk_outline, 2)
+        assert '水电站利用水库' in prompt and 'Wind turbines capture' not in prompt
+
+        # 大纲级 prompt 填满预算，并覆盖文档各部分
+        outline_prompt = get_outline_generation_prompt(context)
+        base_tokens = estimate_tokens(get_outline_generation_prompt(ProjectContext(project, [])))
+        assert estimate_tokens(outline_prompt) <= base_tokens + 2000 + 100  # XML 包装与片段分隔符
+        # 与用户输入（Renewable energy overview）相关的片段
+        assert 'Wind turbines capture' in outline_prompt or 'Lithium battery' in outline_prompt
+        assert '## Section 0:' in outline_prompt and '## Section 15:' in outline_prompt  # 均匀覆盖
+    finally:
+        app.config['REFERENCE_PROMPT_TOKEN_BUDGET'] = 12000
+
+
+def test_small_files_are_inlined_in_full(reference_project):
+    project, reference_file = reference_project
+    context = ProjectContext(project, _get_project_reference_files_content(project.id))
+    assert context.reference_retriever is None
+    page_outline = {'title': 'Wind', 'points': []}
+    assert reference_file.markdown_content in get_page_description_prompt(context, [page_outline], page_outline, 2)
+
+
+def test_missing_index_is_backfilled(app, reference_project):
+    project, reference_file = reference_project
+    ReferenceChunk.query.filter_by(reference_file_id=reference_file.id).delete()
+    reference_file.updated_at = reference_file.updated_at.replace(microsecond=1)
+    db.session.commit()
+
+    app.config['REFERENCE_PROMPT_TOKEN_BUDGET'] = 2000
+    try:
+        context = ProjectContext(project, _get_project_reference_files_content(project.id))
+    finally:
+        app.config['REFERENCE_PROMPT_TOKEN_BUDGET'] = 12000
+    assert context.reference_retriever is not None
+    assert ReferenceChunk.query.filter_by(reference_file_id=reference_file.id).count() == len(
+        chunk_markdown(reference_file.markdown_content))
+
+
+def test_concurrent_backfill_uses_the_committed_chunks(app, reference_project, monkeypatch):
+    from sqlalchemy.orm import Session
+    project, reference_file = reference_project
+    file_id = reference_file.id
+    ReferenceChunk.query.filter_by(reference_file_id=file_id).delete()
+    db.session.commit()
+
+    real_chunk_markdown = reference_index.chunk_markdown
+
+    def racing_chunk_markdown(markdown):
+        # 另一个请求在本次切分期间抢先提交了同一文件的片段
+        with Session(db.engine) as other:
+            other.add(ReferenceChunk(reference_file_id=file_id, chunk_index=0, content='stored by the other request',
+                                     token_count=5, term_count=1, terms='{"stored": 1}'))
+            other.commit()
+        return real_chunk_markdown(markdown)
+
+    monkeypatch.setattr(reference_index, 'chunk_markdown', racing_chunk_markdown)
+    index = reference_index._load_file_index(file_id, 'energy.pdf', 'concurrent-backfill')
+
+    assert index.contents == ['stored by the other request']
+    assert ReferenceChunk.query.filter_by(reference_file_id=file_id).count() == 1
+
+
+def test_digest_is_computed_at_parse_time(reference_project):
+    _, reference_file = reference_project
+    assert reference_file.token_count == estimate_tokens(reference_file.markdown_content)
+    assert reference_file.get_headings()[:2] == [[2, 'Section 0: solar'], [2, 'Section 1: wind']]
+    assert IMAGE not in reference_file.clean_content and 'wind farm' in reference_file.clean_content
+    assert len(reference_file.content_hash) == 64
+
+
+def test_outline_prompts_drop_image_links(reference_project):
+    project, _ = reference_project
+    context = ProjectContext(project, _get_project_reference_files_content(project.id))
+    assert context.reference_retriever is None
+    assert IMAGE not in get_outline_generation_prompt(context)
+    page_outline = {'title': 'Wind turbines', 'points': []}
+    assert IMAGE in get_page_description_prompt(context, [page_outline], page_outline, 2)
+
+
+def test_markdown_is_not_loaded_over_budget(app, reference_project):
+    project, reference_file = reference_project
+    app.config['REFERENCE_PROMPT_TOKEN_BUDGET'] = 2000
+    try:
+        entries = load_project_reference_files(project.id)
+        assert 'content' not in entries[0] and entries[0]['token_count'] == reference_file.token_count
+
+        context = ProjectContext(project, entries)
+        outline_prompt = get_outline_generation_prompt(context)
+        assert '文档结构：' in outline_prompt and '\n- Section 10: battery' in outline_prompt
+        assert IMAGE not in outline_prompt
+    finally:
+        app.config['REFERENCE_PROMPT_TOKEN_BUDGET'] = 12000
+
+
+def test_missing_digest_is_backfilled(reference_project):
+    project, reference_file = reference_project
+    reference_file.token_count = reference_file.headings = reference_file.clean_content = None
+    db.session.commit()
+
+    entries = load_project_reference_files(project.id)
+    assert entries[0]['token_count'] == estimate_tokens(reference_file.markdown_content)
+    assert entries[0]['clean_content'] and IMAGE not in entries[0]['clean_content']
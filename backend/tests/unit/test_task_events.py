@@ -0,0 +1,103 @@
+"""Test the task progress pub/sub hub and the SSE endpoint."""
+from services.task_events import TaskEventHub, task_event_hub
+
+
+class TestTaskEventHub:
+
+    def test_subscriber_receives_published_events(self):
+        hub = TaskEventHub()
+        subscriber, backlog, complete = hub.subscribe('t1')
+        assert backlog == [] and complete is False  # 新连接需要一次数据库快照
+
+        hub.publish('t1', {'status': 'PROCESSING'})
+        assert subscriber.get(timeout=1) == (1, {'status': 'PROCESSING'})
+
+    def test_resume_from_last_event_id(self):
+        hub = TaskEventHub(buffer_size=10)
+        for i in range(5):
+            hub.publish('t1', {'n': i})
+
+        _, backlog, complete = hub.subscribe('t1', last_event_id=3)
+        assert complete is True
+        assert [event_id for event_id, _ in backlog] == [4, 5]
+
+    def test_resume_beyond_buffer_requires_snapshot(self):
+        hub = TaskEventHub(buffer_size=2)
+        for i in range(5):
+            hub.publish('t1', {'n': i})
+
+        _, backlog, complete = hub.subscribe('t1', last_event_id=1)
+        assert complete is False
+        # 服务重启后客户端带来的更大 id 同样需要快照
+        _, _, complete = hub.subscribe('t1', last_event_id=99)
+        assert complete is False
+
+    def test_idle_channels_are_dropped(self):
+        hub = TaskEventHub(max_channels=2)
+        for task_id in ('a', 'b', 'c'):
+            hub.publish(task_id, {})
+        assert hub.get_stats()['channels'] == 2
+
+
+def test_task_commit_publishes_snapshot(app):
+    from models import db, Task
+
+    with app.app_context():
+        task = Task(project_id='p', task_type='GENERATE_IMAGES', status='PENDING')
+        db.session.add(task)
+        db.session.commit()
+        subscriber, _, _ = task_event_hub.subscribe(task.id)
+        try:
+            task.status = 'PROCESSING'
+            task.set_progress({'total': 2, 'completed': 1, 'failed': 0})
+            db.session.commit()
+            event_id, data = subscriber.get(timeout=1)
+            assert data['status'] == 'PROCESSING'
+            assert data['progress']['completed'] == 1
+        finally:
+            task_event_hub.unsubscribe(task.id, subscriber)
+
+
+def test_events_endpoint_streams_until_done(client, sample_project):
+    from models import db, Task
+
+    project_id = sample_project['project_id']
+    with client.application.app_context():
+        task = Task(project_id=project_id, task_type='GENERATE_IMAGES', status='COMPLETED')
+        db.session.add(task)
+        db.session.commit()
+        task_id = task.id
+
+    response = client.get(f'/api/projects/{project_id}/tasks/{task_id}/events')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    assert 'event: done' in body
+    assert '"status": "COMPLETED"' in body
+
+    missing = client.get(f'/api/projects/{project_id}/tasks/does-not-exist/events')
+    assert missing.status_code == 404
+
+
+def test_events_endpoint_sees_completion_before_subscribe(client, sample_project, monkeypatch):
+    from models import db, Task
+
+    project_id = sample_project['project_id']
+    with client.application.app_context():
+        task = Task(project_id=project_id, task_type='GENERATE_IMAGES', status='PROCESSING')
+        db.session.add(task)
+        db.session.commit()
+        task_id = task.id
+
+    original_subscribe = task_event_hub.subscribe
+
+    def subscribe_after_completion(*args, **kwargs):
+        # 任务在读取 Task 与订阅之间完成（inline 模式下不会再有事件）
+        with db.engine.begin() as conn:
+            conn.execute(db.update(Task).where(Task.id == task_id).values(status='COMPLETED'))
+        return original_subscribe(*args, **kwargs)
+
+    monkeypatch.setattr(task_event_hub, 'subscribe', subscribe_after_completion)
+    body = client.get(f'/api/projects/{project_id}/tasks/{task_id}/events').get_data(as_text=True)
+    assert 'event: done' in body
+    assert '"status": "COMPLETED"' in body
@@ -0,0 +1,198 @@
+"""Test TaskManager priority lanes, per-project fairness and durable resume."""
+import os
+import sys
+import tempfile
+import threading
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+os.environ.setdefault('TESTING', 'true')
+os.environ.setdefault('GOOGLE_API_KEY', 'mock')
+
+from services.task_manager import (
+    TaskManager, PRIORITY_INTERACTIVE, PRIORITY_BULK, register_task_handler
+)
+
+
+@pytest.fixture(scope='module')
+def queue_app():
+    """Minimal Flask app with an isolated database."""
+    from flask import Flask
+    from models import db
+
+    app = Flask(__name__)
+    tmp = tempfile.mkdtemp()
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{tmp}/test.db'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['TASK_QUEUE_MODE'] = 'inline'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    yield app
+    import shutil
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _blocked_manager(max_workers=1, reserved=0):
+    """Manager whose single worker is busy until the returned event is set."""
+    manager = TaskManager(max_workers=max_workers, reserved_interactive_workers=reserved)
+    gate = threading.Event()
+    started = threading.Event()
+
+    def blocker(task_id):
+        started.set()
+        gate.wait(5)
+
+    manager.submit_task('blocker', blocker, priority=PRIORITY_BULK)
+    assert started.wait(5)
+    return manager, gate
+
+
+class TestScheduling:
+
+    def test_interactive_runs_before_bulk(self):
+        manager, gate = _blocked_manager()
+        order = []
+        record = lambda task_id: order.append(task_id)
+
+        manager.submit_task('bulk-1', record, priority=PRIORITY_BULK, group='p1')
+        manager.submit_task('bulk-2', record, priority=PRIORITY_BULK, group='p1')
+        manager.submit_task('edit', record, priority=PRIORITY_INTERACTIVE, group='p1')
+        gate.set()
+        manager.shutdown(wait=True)
+
+        assert order == ['edit', 'bulk-1', 'bulk-2']
+
+    def test_round_robin_between_projects(self):
+        manager, gate = _blocked_manager()
+        order = []
+        record = lambda task_id: order.append(task_id)
+
+        for i in range(3):
+            manager.submit_task(f'a{i}', record, priority=PRIORITY_BULK, group='project-a')
+        manager.submit_task('b0', record, priority=PRIORITY_BULK, group='project-b')
+        gate.set()
+        manager.shutdown(wait=True)
+
+        assert order == ['a0', 'b0', 'a1', 'a2']
+
+    def test_reserved_slot_is_not_used_by_bulk(self):
+        manager, gate = _blocked_manager(max_workers=2, reserved=1)
+        done = threading.Event()
+        manager.submit_task('bulk', lambda task_id: None, priority=PRIORITY_BULK)
+        manager.submit_task('edit', lambda task_id: done.set(), priority=PRIORITY_INTERACTIVE)
+
+        # 交互任务使用预留槽位立即执行，批量任务仍在排队
+        assert done.wait(5)
+        assert manager.get_stats()['queued'][PRIORITY_BULK] == 1
+        gate.set()
+        manager.shutdown(wait=True)
+
+
+class TestDurableTasks:
+
+    def test_resume_requeues_processing_task(self, queue_app):
+        from models import db, Task, Project
+
+        calls = []
+        finished = threading.Event()
+
+        @register_task_handler('UNIT_TEST_DURABLE')
+        def _handler(task_id, app, value):
+            calls.append((task_id, value))
+            finished.set()
+
+        with queue_app.app_context():
+            db.session.add(Project(id='proj-q', creation_type='idea'))
+            resumable = Task(project_id='proj-q', task_type='UNIT_TEST_DURABLE',
+                             status='PROCESSING', worker_id='old-host:web')
+            resumable.set_payload({'value': 42})
+            legacy = Task(project_id='proj-q', task_type='GENERATE_IMAGES', status='PENDING')
+            db.session.add_all([resumable, legacy])
+            db.session.commit()
+            resumable_id, legacy_id = resumable.id, legacy.id
+
+        manager = TaskManager(max_workers=1)
+        assert manager.resume_pending_tasks(queue_app) == 1
+        assert finished.wait(5)
+        manager.shutdown(wait=True)
+
+        assert calls == [(resumable_id, 42)]
+        with queue_app.app_context():
+            assert Task.query.get(resumable_id).status == 'PROCESSING'
+            legacy = Task.query.get(legacy_id)
+            assert legacy.status == 'FAILED'
+            assert 'restart' in legacy.error_message
+
+    def test_claim_prevents_double_execution(self, queue_app):
+        from models import db, Task
+
+        calls = []
+
+        @register_task_handler('UNIT_TEST_CLAIM')
+        def _handler(task_id, app):
+            calls.append(task_id)
+
+        with queue_app.app_context():
+            task = Task(project_id='proj-q', task_type='UNIT_TEST_CLAIM', status='PENDING')
+            db.session.add(task)
+            db.session.commit()
+            task_manager_a = TaskManager(max_workers=1, worker_id='a')
+            task_manager_b = TaskManager(max_workers=1, worker_id='b')
+            task_manager_a.enqueue_task(task, queue_app, {})
+            task_manager_a.shutdown(wait=True)
+            task_manager_b._dispatch(task.id, task.task_type, {}, None, 'proj-q', queue_app)
+            task_manager_b.shutdown(wait=True)
+
+        assert len(calls) == 1
+
+    def test_handler_exception_marks_task_failed(self, queue_app):
+        from models import db, Task
+
+        @register_task_handler('UNIT_TEST_RAISES')
+        def _handler(task_id, app):
+            raise ValueError('Project proj-q not found')
+
+        with queue_app.app_context():
+            task = Task(project_id='proj-q', task_type='UNIT_TEST_RAISES', status='PENDING')
+            db.session.add(task)
+            db.session.commit()
+            manager = TaskManager(max_workers=1)
+            manager.enqueue_task(task, queue_app, {})
+            manager.shutdown(wait=True)
+            task_id = task.id
+
+        with queue_app.app_context():
+            task = Task.query.get(task_id)
+            assert task.status == 'FAILED'
+            assert task.error_message == 'Project proj-q not found'
+            assert task.completed_at is not None
+
+
+def test_submit_pipelined_releases_first_stage_slot():
+    """A slow second stage must not hold the (single) first-stage worker."""
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from services.task_manager import submit_pipelined
+
+    fetched = []
+    release = threading.Event()
+
+    def fetch(n):
+        fetched.append(n)
+        return n
+
+    def encode(n):
+        release.wait(5)
+        return n * 10
+
+    with ThreadPoolExecutor(max_workers=1) as network, ThreadPoolExecutor(max_workers=1) as encoder:
+        futures = [submit_pipelined(network, encoder, fetch, encode, n) for n in range(3)]
+        deadline = time.time() + 5
+        while len(fetched) < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        # 所有网络阶段都已完成，而编码阶段仍被阻塞
+        assert fetched == [0, 1, 2]
+        assert not any(f.done() for f in futures)
+        release.set()
+        assert [f.result(timeout=5) for f in futures] == [0, 10, 20]
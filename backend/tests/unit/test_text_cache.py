@@ -0,0 +1,81 @@
+"""Unit tests for the persistent text generation cache."""
+import time
+
+from services.ai_service import AIService
+from services.ai_providers.image.base import ImageProvider
+from services.ai_providers.text.base import TextProvider
+from services.text_cache import TextCache
+
+
+class _CountingTextProvider(TextProvider):
+    def __init__(self, response='[{"title": "Intro", "points": []}]'):
+        self.response = response
+        self.calls = 0
+
+    def generate_text(self, prompt, thinking_budget=1000):
+        self.calls += 1
+        return self.response
+
+    def generate_with_image(self, prompt, image_path, thinking_budget=0):
+        return self.response
+
+
+class _NoopImageProvider(ImageProvider):
+    def generate_image(self, prompt, ref_images=None, aspect_ratio="16:9", resolution="2K",
+                       enable_thinking=False, thinking_budget=0):
+        return None
+
+
+def test_key_depends_on_provider_model_prompt_and_budget():
+    base = TextCache.make_key('Gemini', 'm', 'p', 0)
+    assert base == TextCache.make_key('Gemini', 'm', 'p', 0)
+    assert base != TextCache.make_key('OpenAI', 'm', 'p', 0)
+    assert base != TextCache.make_key('Gemini', 'm2', 'p', 0)
+    assert base != TextCache.make_key('Gemini', 'm', 'p2', 0)
+    assert base != TextCache.make_key('Gemini', 'm', 'p', 1024)
+
+
+def test_ttl_expiry(tmp_path):
+    cache = TextCache(str(tmp_path / 'cache.db'), ttl_seconds=0.05)
+    cache.put('k', 'v')
+    assert cache.get('k') == 'v'
+    time.sleep(0.1)
+    assert cache.get('k') is None
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_size_eviction_drops_least_recently_used(tmp_path):
+    cache = TextCache(str(tmp_path / 'cache.db'), max_bytes=250)
+    cache.put('a', 'x' * 100)
+    time.sleep(0.01)
+    cache.put('b', 'x' * 100)
+    time.sleep(0.01)
+    assert cache.get('a') is not None  # a becomes most recently used
+    time.sleep(0.01)
+    cache.put('c', 'x' * 100)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+
+
+def test_generate_json_memoizes_and_honours_bypass(app, tmp_path):
+    app.config['TEXT_CACHE_ENABLED'] = True
+    app.config['TEXT_CACHE_PATH'] = str(tmp_path / 'text_cache.db')
+    import services.text_cache as text_cache_module
+    text_cache_module._text_cache = None
+    try:
+        with app.app_context():
+            provider = _CountingTextProvider()
+            service = AIService(text_provider=provider, image_provider=_NoopImageProvider(),
+                                caption_provider=provider)
+
+            first = service.generate_json('outline prompt')
+            second = service.generate_json('outline prompt')
+            assert first == second == [{"title": "Intro", "points": []}]
+            assert provider.calls == 1
+
+            service.generate_json('outline prompt', use_cache=False)
+            assert provider.calls == 2
+    finally:
+        text_cache_module._text_cache = None
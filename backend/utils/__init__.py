@@ -9,7 +9,13 @@ from .response import (
     rate_limit_error
 )
 from .validators import validate_project_status, validate_page_status, allowed_file
-from .path_utils import convert_mineru_path_to_local, find_mineru_file_with_prefix, find_file_with_prefix
+from .path_utils import (
+    convert_mineru_path_to_local,
+    find_mineru_file_with_prefix,
+    find_file_with_prefix,
+    build_extract_index,
+    find_extract_file,
+)
 from .pptx_builder import PPTXBuilder
 from .page_utils import parse_page_ids_from_query, parse_page_ids_from_body, get_filtered_pages
 
@@ -27,6 +33,8 @@ __all__ = [
     'convert_mineru_path_to_local',
     'find_mineru_file_with_prefix',
     'find_file_with_prefix',
+    'build_extract_index',
+    'find_extract_file',
     'PPTXBuilder',
     'parse_page_ids_from_query',
     'parse_page_ids_from_body',
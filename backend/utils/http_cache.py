@@ -0,0 +1,83 @@
+"""
+HTTP caching helpers for /files static serving
+
+- Strong ETag derived from file size + mtime (one ``os.stat`` per request)
+- Versioned page images / previews (``{page_id}_v{n}.png``, ``{page_id}_v{n}_thumb.jpg``)
+  never change once written, so they are sent with ``Cache-Control: immutable``;
+  everything else is ``no-cache`` and revalidated with If-None-Match (304)
+- Range requests are handled by Werkzeug's conditional ``send_file``
+- Optional offload: with ``USE_X_SENDFILE`` Werkzeug emits ``X-Sendfile``; with
+  ``FILES_X_ACCEL_REDIRECT_PREFIX`` an ``X-Accel-Redirect`` to an nginx
+  ``internal`` location mapped to UPLOAD_FOLDER is returned instead of the bytes
+"""
+import mimetypes
+import os
+import re
+import stat
+from typing import Optional
+from urllib.parse import quote
+
+from flask import Response, current_app, request, send_file
+from werkzeug.security import safe_join
+
+# {page_id}_v3.png / {page_id}_v3_thumb.jpg / {page_id}_1700000000000.png（无版本号时的时间戳命名）
+_IMMUTABLE_NAME_RE = re.compile(r'_(?:v\d+(?:_thumb)?|\d{13})\.[A-Za-z0-9]+$')
+
+
+def is_immutable_file(file_type: str, filename: str) -> bool:
+    """Page images are written once under a versioned name and never modified"""
+    return file_type == 'pages' and bool(_IMMUTABLE_NAME_RE.search(filename))
+
+
+def file_etag(st: os.stat_result) -> str:
+    return f"{st.st_size:x}-{st.st_mtime_ns:x}"
+
+
+def send_cached_file(directory: str, filename: str, immutable: bool = False) -> Optional[Response]:
+    """
+    Send ``directory/filename`` with ETag / Last-Modified / Cache-Control headers.
+
+    Returns None when the file does not exist (or escapes ``directory``) so the
+    caller can produce its usual 404 response.
+    """
+    path = safe_join(directory, filename)
+    if path is None:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+
+    etag = file_etag(st)
+    accel_prefix = current_app.config.get('FILES_X_ACCEL_REDIRECT_PREFIX', '')
+    if accel_prefix:
+        response = _accel_redirect_response(path, st, etag, accel_prefix)
+    else:
+        response = send_file(path, conditional=True, etag=etag, last_modified=st.st_mtime)
+
+    # 用户内容不进入共享缓存（CDN / 代理），仅浏览器缓存
+    cache_control = response.cache_control
+    cache_control.public = None
+    cache_control.private = True
+    if immutable:
+        cache_control.no_cache = None
+        cache_control.max_age = current_app.config.get('FILES_CACHE_MAX_AGE', 31536000)
+        cache_control.immutable = True
+    else:
+        cache_control.no_cache = True
+    return response
+
+
+def _accel_redirect_response(path: str, st: os.stat_result, etag: str, accel_prefix: str) -> Response:
+    """nginx 负责发送文件内容（含 Range），这里只处理条件请求"""
+    relative = os.path.relpath(path, current_app.config['UPLOAD_FOLDER']).replace(os.sep, '/')
+    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    response = Response(mimetype=mimetype)
+    response.set_etag(etag)
+    response.last_modified = st.st_mtime
+    response.make_conditional(request)
+    if response.status_code != 304:
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(relative)
+    return response
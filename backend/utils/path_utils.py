@@ -2,12 +2,24 @@
 Path utilities for handling MinerU file paths and prefix matching
 """
 import os
+import json
 import logging
-from pathlib import Path
-from typing import Optional
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# 每个 MinerU 解压目录下持久化的文件名索引
+PREFIX_INDEX_FILENAME = '.prefix_index.json'
+PREFIX_INDEX_VERSION = 1
+# 进程内缓存的索引数量（按最近使用淘汰）
+PREFIX_INDEX_CACHE_SIZE = 128
+# 前缀匹配要求的最短前缀长度（与 find_file_with_prefix 一致）
+MIN_PREFIX_LENGTH = 5
+
 
 def convert_mineru_path_to_local(mineru_path: str, project_root: Optional[Path] = None) -> Optional[Path]:
     """
@@ -49,7 +61,7 @@ def find_mineru_file_with_prefix(mineru_path: str, project_root: Optional[Path]
     
     首先尝试直接路径匹配，如果失败则尝试前缀匹配。
     前缀匹配逻辑：如果文件名看起来像是一个前缀+扩展名（前缀长度 >= 5），
-    则在目录中查找以该前缀开头的文件。
+    则在目录中查找以该前缀开头的文件。查找通过解压目录的文件名索引完成（见 find_extract_file）。
     
     Args:
         mineru_path: MinerU URL 路径，格式为 /files/mineru/{extract_id}/{rel_path}
@@ -58,18 +70,17 @@ def find_mineru_file_with_prefix(mineru_path: str, project_root: Optional[Path]
     Returns:
         找到的文件路径（Path 对象），如果未找到则返回 None
     """
-    # First try direct path conversion
-    local_path = convert_mineru_path_to_local(mineru_path, project_root)
-    
-    if local_path is None:
+    if not mineru_path.startswith('/files/mineru/'):
+        return None
+    extract_id, _, rel_path = mineru_path[len('/files/mineru/'):].partition('/')
+    if not extract_id or not rel_path:
         return None
     
-    # Direct file matching
-    if local_path.exists() and local_path.is_file():
-        return local_path
-    
-    # Try prefix match using the generic function
-    return find_file_with_prefix(local_path)
+    # 通过该解压目录的文件名索引查找（精确匹配 + 前缀匹配），不扫描目录
+    extract_root = convert_mineru_path_to_local(f'/files/mineru/{extract_id}', project_root)
+    if extract_root is None:
+        return None
+    return find_extract_file(extract_root, rel_path)
 
 
 def find_file_with_prefix(file_path: Path) -> Optional[Path]:
@@ -110,3 +121,136 @@ def find_file_with_prefix(file_path: Path) -> Optional[Path]:
     
     return None
 
+
+
+class PrefixIndex:
+    """
+    MinerU 解压目录的文件名索引：每个子目录一份按 (小写文件名主干, 小写扩展名) 排序的列表，
+    前缀匹配通过二分查找完成，无需 os.listdir
+    """
+
+    def __init__(self, dirs: Dict[str, List[str]]):
+        self.dirs: Dict[str, List[str]] = {}
+        self._stems: Dict[str, List[str]] = {}
+        self._names: Dict[str, set] = {}
+        for rel_dir, names in dirs.items():
+            ordered = sorted(names, key=lambda n: tuple(part.lower() for part in os.path.splitext(n)))
+            self.dirs[rel_dir] = ordered
+            self._stems[rel_dir] = [os.path.splitext(n)[0].lower() for n in ordered]
+            self._names[rel_dir] = set(ordered)
+
+    @classmethod
+    def build(cls, root: Path) -> 'PrefixIndex':
+        dirs: Dict[str, List[str]] = {}
+        for dirpath, _, filenames in os.walk(root):
+            rel_dir = Path(os.path.relpath(dirpath, root)).as_posix()
+            rel_dir = '' if rel_dir == '.' else rel_dir
+            names = [n for n in filenames if not (rel_dir == '' and n == PREFIX_INDEX_FILENAME)]
+            if names:
+                dirs[rel_dir] = names
+        return cls(dirs)
+
+    def lookup(self, rel_path: str) -> Optional[str]:
+        """返回匹配文件相对于解压目录的路径：先精确匹配，再按前缀（>= 5 字符）+ 相同扩展名匹配"""
+        path = PurePosixPath(rel_path)
+        rel_dir = '' if str(path.parent) == '.' else path.parent.as_posix()
+        names = self.dirs.get(rel_dir)
+        if not names:
+            return None
+        if path.name in self._names[rel_dir]:
+            return rel_path
+
+        prefix, ext = os.path.splitext(path.name)
+        if not ext or len(prefix) < MIN_PREFIX_LENGTH:
+            return None
+        prefix, ext = prefix.lower(), ext.lower()
+        stems = self._stems[rel_dir]
+        for i in range(bisect_left(stems, prefix), len(stems)):
+            if not stems[i].startswith(prefix):
+                break
+            if os.path.splitext(names[i])[1].lower() == ext:
+                return f"{rel_dir}/{names[i]}" if rel_dir else names[i]
+        return None
+
+    def to_json(self) -> Dict:
+        return {'version': PREFIX_INDEX_VERSION, 'dirs': self.dirs}
+
+
+_index_cache: "OrderedDict[str, PrefixIndex]" = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def _cache_index(key: str, index: PrefixIndex):
+    with _index_cache_lock:
+        _index_cache[key] = index
+        _index_cache.move_to_end(key)
+        while len(_index_cache) > PREFIX_INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+
+
+def build_extract_index(extract_root: Path) -> PrefixIndex:
+    """
+    为 MinerU 解压目录建立文件名索引，持久化到目录下的 .prefix_index.json 并放入进程内缓存。
+    在解压完成后调用一次；旧的解压目录在首次访问时补建。
+    """
+    extract_root = Path(extract_root)
+    index = PrefixIndex.build(extract_root)
+    index_path = extract_root / PREFIX_INDEX_FILENAME
+    tmp_path = index_path.with_name(f"{PREFIX_INDEX_FILENAME}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index.to_json(), f, ensure_ascii=False)
+        os.replace(tmp_path, index_path)
+    except OSError as e:
+        logger.warning(f"Failed to persist prefix index for {extract_root}: {str(e)}")
+        if tmp_path.exists():
+            tmp_path.unlink()
+    _cache_index(str(extract_root.resolve()), index)
+    return index
+
+
+def get_extract_index(extract_root: Path) -> Optional[PrefixIndex]:
+    """获取解压目录的文件名索引：进程内 LRU -> 磁盘上的索引文件 -> 重新建立"""
+    extract_root = Path(extract_root)
+    key = str(extract_root.resolve())
+    with _index_cache_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+
+    try:
+        with open(extract_root / PREFIX_INDEX_FILENAME, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == PREFIX_INDEX_VERSION:
+            index = PrefixIndex(data['dirs'])
+            _cache_index(key, index)
+            return index
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    if not extract_root.is_dir():
+        return None
+    return build_extract_index(extract_root)
+
+
+def find_extract_file(extract_root: Path, rel_path: str) -> Optional[Path]:
+    """
+    在 MinerU 解压目录中查找文件（支持前缀匹配），通过索引完成，不扫描目录
+
+    Args:
+        extract_root: 解压目录（uploads/mineru_files/{extract_id}）
+        rel_path: 相对于解压目录的文件路径（posix 格式）
+
+    Returns:
+        找到的文件路径（Path 对象），如果未找到则返回 None
+    """
+    index = get_extract_index(extract_root)
+    if index is None:
+        return None
+    matched = index.lookup(rel_path)
+    if matched is None:
+        return None
+    if matched != rel_path:
+        logger.debug(f"Prefix match found: {rel_path} -> {matched}")
+    return Path(extract_root) / matched
@@ -0,0 +1,74 @@
+"""
+Standalone task worker
+
+Runs durable tasks stored in the ``tasks`` table outside of the Flask web
+process, so generation work can use more cores (one worker per process).
+
+Usage:
+    # web process only enqueues
+    TASK_QUEUE_MODE=external python app.py
+    # one or more workers, each with a distinct id
+    TASK_WORKER_ID=worker-1 TASK_WORKERS=4 python worker.py
+
+TASK_WORKER_ID must be unique per worker process and stable across its
+restarts: on startup a worker resets the PROCESSING tasks recorded under
+its own id. Without it the id defaults to ``<hostname>:worker:<pid>``,
+which never collides with a running sibling, but tasks left behind by a
+crashed worker are then not reclaimed automatically.
+"""
+import os
+import logging
+import signal
+import socket
+import threading
+
+from app import app
+from services.task_manager import task_manager
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    worker_id = app.config.get('TASK_WORKER_ID')
+    if not worker_id:
+        # 同一主机上的多个 worker 不能共用默认 id，否则重启时会重置兄弟 worker 正在执行的任务
+        worker_id = f"{socket.gethostname()}:worker:{os.getpid()}"
+        logger.warning(f"TASK_WORKER_ID not set, using {worker_id}; set a stable unique id per worker "
+                       f"so tasks interrupted by a crash are resumed after restart")
+    task_manager.configure(
+        max_workers=app.config.get('TASK_WORKERS', 4),
+        reserved_interactive_workers=app.config.get('TASK_RESERVED_INTERACTIVE_WORKERS', 1),
+        worker_id=worker_id
+    )
+    # 在 worker 进程里任务只能通过数据库认领，不会在请求中直接派发
+    app.config['TASK_QUEUE_MODE'] = 'external'
+    poll_interval = app.config.get('TASK_POLL_INTERVAL', 2.0)
+
+    stop_event = threading.Event()
+
+    def _handle_signal(signum, _frame):
+        logger.info(f"Worker {worker_id} received signal {signum}, finishing running tasks...")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _handle_signal)
+    signal.signal(signal.SIGTERM, _handle_signal)
+
+    # 重置本 worker 上次退出时遗留的 PROCESSING 任务
+    task_manager.resume_pending_tasks(app, fail_unresumable=False)
+    logger.info(f"Task worker {worker_id} started (workers={task_manager.max_workers}, poll={poll_interval}s)")
+
+    while not stop_event.is_set():
+        try:
+            claimed = task_manager.poll_pending_tasks(app)
+            if claimed:
+                logger.info(f"Worker {worker_id} claimed {claimed} task(s)")
+        except Exception as e:
+            logger.error(f"Worker {worker_id} failed to poll tasks: {e}", exc_info=True)
+        stop_event.wait(poll_interval)
+
+    task_manager.shutdown(wait=True)
+    logger.info(f"Task worker {worker_id} stopped")
+
+
+if __name__ == '__main__':
+    main()
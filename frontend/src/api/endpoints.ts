@@ -70,6 +70,31 @@ export const listProjects = async (limit?: number, offset?: number): Promise<Api
   return response.data;
 };
 
+/**
+ * 获取项目摘要列表（历史页使用，不含页面详情）
+ * 顺序翻页时传入上一页返回的 next_cursor，跳页时使用 offset
+ */
+export const listProjectSummaries = async (options: {
+  limit?: number;
+  offset?: number;
+  cursor?: string;
+  includeTotal?: boolean;
+} = {}): Promise<ApiResponse<{ projects: Project[]; total?: number; next_cursor: string | null }>> => {
+  const params = new URLSearchParams({ view: 'summary' });
+  if (options.limit !== undefined) params.append('limit', options.limit.toString());
+  if (options.cursor) {
+    params.append('cursor', options.cursor);
+  } else if (options.offset !== undefined) {
+    params.append('offset', options.offset.toString());
+  }
+  if (options.includeTotal) params.append('include_total', 'true');
+
+  const response = await apiClient.get<ApiResponse<{ projects: Project[]; total?: number; next_cursor: string | null }>>(
+    `/api/projects?${params.toString()}`
+  );
+  return response.data;
+};
+
 /**
  * 获取项目详情
  */
@@ -597,60 +622,56 @@ export const getTaskStatus = async (projectId: string, taskId: string): Promise<
 // ===== 导出 =====
 
 /**
- * Helper function to build query string with page_ids
+ * 导出任务的响应：后台任务 ID（旧版同步接口直接返回 download_url）
  */
-const buildPageIdsQuery = (pageIds?: string[]): string => {
-  if (!pageIds || pageIds.length === 0) return '';
-  const params = new URLSearchParams();
-  params.set('page_ids', pageIds.join(','));
-  return `?${params.toString()}`;
+export interface ExportTaskResponse {
+  task_id?: string;
+  status?: string;
+  deduplicated?: boolean;
+  download_url?: string;
+  download_url_absolute?: string;
+}
+
+const createExportTask = async (
+  projectId: string,
+  format: 'pptx' | 'pdf' | 'images',
+  pageIds?: string[],
+  filename?: string
+): Promise<ApiResponse<ExportTaskResponse>> => {
+  const response = await apiClient.post<ApiResponse<ExportTaskResponse>>(
+    `/api/projects/${projectId}/export/${format}`,
+    { filename, page_ids: pageIds }
+  );
+  return response.data;
 };
 
 /**
- * 导出为PPTX
+ * 导出为PPTX（异步任务，相同的进行中导出会被合并）
  * @param projectId 项目ID
  * @param pageIds 可选的页面ID列表，如果不提供则导出所有页面
  */
 export const exportPPTX = async (
   projectId: string,
   pageIds?: string[]
-): Promise<ApiResponse<{ download_url: string; download_url_absolute?: string }>> => {
-  const url = `/api/projects/${projectId}/export/pptx${buildPageIdsQuery(pageIds)}`;
-  const response = await apiClient.get<
-    ApiResponse<{ download_url: string; download_url_absolute?: string }>
-  >(url);
-  return response.data;
-};
+): Promise<ApiResponse<ExportTaskResponse>> => createExportTask(projectId, 'pptx', pageIds);
 
 /**
- * 导出为PDF
+ * 导出为PDF（异步任务，相同的进行中导出会被合并）
  * @param projectId 项目ID
  * @param pageIds 可选的页面ID列表，如果不提供则导出所有页面
  */
 export const exportPDF = async (
   projectId: string,
   pageIds?: string[]
-): Promise<ApiResponse<{ download_url: string; download_url_absolute?: string }>> => {
-  const url = `/api/projects/${projectId}/export/pdf${buildPageIdsQuery(pageIds)}`;
-  const response = await apiClient.get<
-    ApiResponse<{ download_url: string; download_url_absolute?: string }>
-  >(url);
-  return response.data;
-};
+): Promise<ApiResponse<ExportTaskResponse>> => createExportTask(projectId, 'pdf', pageIds);
 
 /**
- * 导出为图片（单张直接下载，多张打包ZIP）
+ * 导出为图片（异步任务；单张直接复制，多张打包ZIP）
  */
 export const exportImages = async (
   projectId: string,
   pageIds?: string[]
-): Promise<ApiResponse<{ download_url: string; download_url_absolute?: string }>> => {
-  const url = `/api/projects/${projectId}/export/images${buildPageIdsQuery(pageIds)}`;
-  const response = await apiClient.get<
-    ApiResponse<{ download_url: string; download_url_absolute?: string }>
-  >(url);
-  return response.data;
-};
+): Promise<ApiResponse<ExportTaskResponse>> => createExportTask(projectId, 'images', pageIds);
 
 /**
  * 导出为可编辑PPTX（异步任务）
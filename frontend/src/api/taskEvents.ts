@@ -0,0 +1,124 @@
+import type { Task } from '@/types';
+
+const TERMINAL_STATUSES = ['COMPLETED', 'FAILED'];
+
+/**
+ * 订阅任务进度事件流：GET /api/projects/{projectId}/tasks/{taskId}/events（SSE）
+ *
+ * 任务每次变化时服务端推送一次 progress 事件，完成/失败时推送 done 后关闭连接，
+ * 前端不再每 2 秒查询一次任务（以及数据库）。
+ * 使用 fetch 读取事件流而不是 EventSource，因为 EventSource 无法携带 X-Access-Code 请求头。
+ *
+ * - onTask：收到任务快照时调用，串行执行；处理期间到达的多个事件只保留最新一个，
+ *   进行中的快照之间至少间隔 minIntervalMs（处理函数通常会同步一次项目数据）。
+ *   返回 false 表示停止订阅（任务已结束）
+ * - onFallback：事件流不可用或在任务结束前中断时调用一次，由调用方改为轮询 getTaskStatus
+ *
+ * 返回取消订阅的函数。
+ */
+export const watchTaskEvents = (
+  projectId: string,
+  taskId: string,
+  onTask: (task: Task) => boolean | Promise<boolean>,
+  onFallback: () => void,
+  minIntervalMs = 1000,
+): (() => void) => {
+  const controller = new AbortController();
+  let stopped = false;
+  let running = false;
+  let pending: Task | null = null;
+  let lastHandledAt = 0;
+
+  const stop = () => {
+    stopped = true;
+    controller.abort();
+  };
+
+  const deliver = async (task: Task) => {
+    pending = task;
+    if (running) return;
+    running = true;
+    try {
+      while (pending && !stopped) {
+        const wait = lastHandledAt + minIntervalMs - Date.now();
+        if (wait > 0 && !TERMINAL_STATUSES.includes(pending.status)) {
+          // 等待期间到达的新事件会替换 pending
+          await new Promise((resolve) => setTimeout(resolve, wait));
+          continue;
+        }
+        const next: Task = pending;
+        pending = null;
+        lastHandledAt = Date.now();
+        const keepWatching = await onTask(next);
+        if (!keepWatching) stop();
+      }
+    } catch (error) {
+      console.error('[任务事件] 处理任务更新失败:', error);
+    } finally {
+      running = false;
+    }
+  };
+
+  const read = async () => {
+    const accessCode = localStorage.getItem('banana-access-code');
+    const response = await fetch(`/api/projects/${projectId}/tasks/${taskId}/events`, {
+      headers: {
+        Accept: 'text/event-stream',
+        ...(accessCode ? { 'X-Access-Code': accessCode } : {}),
+      },
+      signal: controller.signal,
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let finished = false;
+
+    let readResult = await reader.read();
+    while (!readResult.done) {
+      buffer += decoder.decode(readResult.value, { stream: true });
+
+      const parts = buffer.split('\n\n');
+      buffer = parts.pop() || '';
+
+      for (const part of parts) {
+        let eventType = '';
+        let eventData = '';
+        // 以 ":" 开头的心跳行不含 event/data，直接跳过
+        for (const line of part.split('\n')) {
+          if (line.startsWith('event: ')) eventType = line.slice(7);
+          else if (line.startsWith('data: ')) eventData = line.slice(6);
+        }
+        if ((eventType !== 'progress' && eventType !== 'done') || !eventData) continue;
+
+        try {
+          const task = JSON.parse(eventData) as Task;
+          if (eventType === 'done') finished = true;
+          deliver(task);
+        } catch {
+          // Skip malformed events
+        }
+      }
+
+      if (finished) {
+        reader.cancel().catch(() => undefined);
+        return;
+      }
+      readResult = await reader.read();
+    }
+    throw new Error('Task event stream closed before the task finished');
+  };
+
+  read().catch((error) => {
+    if (stopped) return;
+    console.warn('[任务事件] 事件流不可用，改为轮询:', error);
+    stop();
+    onFallback();
+  });
+
+  return stop;
+};
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useTranslation } from 'react-i18next';
 import { Home, Trash2, Sun, Moon } from 'lucide-react';
@@ -98,18 +98,33 @@ export const History: React.FC = () => {
   const { show, ToastContainer } = useToast();
   const { confirm, ConfirmDialog } = useConfirm();
 
+  // 第 n 页的 keyset 游标（第 n-1 页返回的 next_cursor）：顺序翻页时不使用 offset，也无需重新统计总数
+  const pageCursorsRef = useRef<Map<number, string>>(new Map());
+
   const totalPages = Math.ceil(totalProjects / pageSize);
 
   const loadProjects = useCallback(async (page: number) => {
     setIsLoading(true);
     setError(null);
     try {
-      const offset = (page - 1) * pageSize;
-      const response = await api.listProjects(pageSize, offset);
+      const cursor = pageCursorsRef.current.get(page);
+      const response = await api.listProjectSummaries({
+        limit: pageSize,
+        cursor,
+        offset: (page - 1) * pageSize,
+        includeTotal: !cursor,
+      });
       if (response.data?.projects) {
         const normalizedProjects = response.data.projects.map(normalizeProject);
         setProjects(normalizedProjects);
-        setTotalProjects(response.data.total ?? 0);
+        if (response.data.total !== undefined) {
+          setTotalProjects(response.data.total);
+        }
+        if (response.data.next_cursor) {
+          pageCursorsRef.current.set(page + 1, response.data.next_cursor);
+        } else {
+          pageCursorsRef.current.delete(page + 1);
+        }
       }
     } catch (err: any) {
       console.error('加载历史项目失败:', err);
@@ -130,6 +145,7 @@ export const History: React.FC = () => {
   }, []);
 
   const handlePageSizeChange = useCallback((size: number) => {
+    pageCursorsRef.current.clear();
     localStorage.setItem(PAGE_SIZE_KEY, String(size));
     setPageSize(size);
     setCurrentPage(1);
@@ -226,6 +242,8 @@ export const History: React.FC = () => {
 
       // Reload current page; if all items on this page were deleted, go back one page
       if (successIds.length > 0) {
+        // 删除后各页边界发生变化，之前的游标不再可用
+        pageCursorsRef.current.clear();
         const remainingOnPage = projects.length - successIds.length;
         const newPage = remainingOnPage <= 0 && currentPage > 1 ? currentPage - 1 : currentPage;
         if (newPage !== currentPage) {
@@ -199,6 +199,8 @@ export const SlidePreview: React.FC = () => {
   
   const { addTask, pollTask: pollExportTask, tasks: exportTasks, restoreActiveTasks } = useExportTasksStore();
   const notifiedFailedExportTaskIds = useRef<Set<string>>(new Set());
+  // 本次会话中发起的导出任务：完成后自动打开下载链接（刷新后恢复的任务不自动下载）
+  const autoDownloadExportTaskIds = useRef<Set<string>>(new Set());
 
   // 页面挂载时恢复正在进行的导出任务（页面刷新后）
   useEffect(() => {
@@ -315,6 +317,15 @@ export const SlidePreview: React.FC = () => {
       });
   }, [exportTasks, projectId, show, t]);
 
+  useEffect(() => {
+    exportTasks
+      .filter(task => task.status === 'COMPLETED' && task.downloadUrl && autoDownloadExportTaskIds.current.has(task.id))
+      .forEach(task => {
+        autoDownloadExportTaskIds.current.delete(task.id);
+        window.open(task.downloadUrl, '_blank');
+      });
+  }, [exportTasks]);
+
   // Memoize pages with generated images to avoid re-computing in multiple places
   const pagesWithImages = useMemo(() => {
     return currentProject?.pages.filter(p => p.id && p.generated_image_path) || [];
@@ -994,11 +1005,23 @@ export const SlidePreview: React.FC = () => {
 
     try {
       if (type === 'pptx' || type === 'pdf' || type === 'images') {
-        // Synchronous export - direct download, create completed task directly
+        // Background export - identical in-flight exports are joined on the server
         const exportApi = { pptx: apiExportPPTX, pdf: apiExportPDF, images: apiExportImages };
         const response = await exportApi[type](projectId, pageIds);
+        const taskId = response.data?.task_id;
         const downloadUrl = response.data?.download_url || response.data?.download_url_absolute;
-        if (downloadUrl) {
+        if (taskId) {
+          addTask({
+            id: exportTaskId,
+            taskId,
+            projectId,
+            type: type as ExportTaskType,
+            status: 'PROCESSING',
+            pageIds: pageIds,
+          });
+          autoDownloadExportTaskIds.current.add(exportTaskId);
+          pollExportTask(exportTaskId, projectId, taskId);
+        } else if (downloadUrl) {
           addTask({
             id: exportTaskId,
             taskId: '',
@@ -1,6 +1,8 @@
 import { create } from 'zustand';
 import { persist } from 'zustand/middleware';
 import * as api from '@/api/endpoints';
+import { watchTaskEvents } from '@/api/taskEvents';
+import type { Task } from '@/types';
 import { devLog } from '@/utils/logger';
 import { getT } from '@/utils/i18nHelper';
 
@@ -114,6 +116,49 @@ export const useExportTasksStore = create<ExportTasksState>()(
       },
 
       pollTask: async (id, projectId, taskId) => {
+        // Apply one task snapshot (pushed by the event stream or polled); returns whether it is still running
+        const handleTask = (task: Task): boolean => {
+          const updates: Partial<ExportTask> = {
+            status: task.status as ExportTaskStatus,
+          };
+
+          if (task.progress) {
+            // Parse progress if it's a string (from database JSON field)
+            let progressData = task.progress;
+            if (typeof progressData === 'string') {
+              try {
+                progressData = JSON.parse(progressData);
+              } catch (e) {
+                console.warn('[ExportTasksStore] Failed to parse progress:', e);
+              }
+            }
+            
+            updates.progress = progressData;
+            
+            // Extract download URL if available
+            if (progressData.download_url) {
+              updates.downloadUrl = progressData.download_url;
+            }
+            if (progressData.filename) {
+              updates.filename = progressData.filename;
+            }
+          }
+
+          if (task.status === 'COMPLETED') {
+            updates.completedAt = new Date().toISOString();
+            get().updateTask(id, updates);
+          } else if (task.status === 'FAILED') {
+            updates.errorMessage = task.error_message || task.error || t('exportStore.exportFailed');
+            updates.completedAt = new Date().toISOString();
+            get().updateTask(id, updates);
+          } else if (task.status === 'PENDING' || task.status === 'RUNNING' || task.status === 'PROCESSING') {
+            get().updateTask(id, updates);
+            return true;
+          }
+          return false;
+        };
+
+        // Fallback when the event stream is unavailable: poll every 2 seconds
         const poll = async () => {
           try {
             const response = await api.getTaskStatus(projectId, taskId);
@@ -124,42 +169,7 @@ export const useExportTasksStore = create<ExportTasksState>()(
               return;
             }
 
-            const updates: Partial<ExportTask> = {
-              status: task.status as ExportTaskStatus,
-            };
-
-            if (task.progress) {
-              // Parse progress if it's a string (from database JSON field)
-              let progressData = task.progress;
-              if (typeof progressData === 'string') {
-                try {
-                  progressData = JSON.parse(progressData);
-                } catch (e) {
-                  console.warn('[ExportTasksStore] Failed to parse progress:', e);
-                }
-              }
-              
-              updates.progress = progressData;
-              
-              // Extract download URL if available
-              if (progressData.download_url) {
-                updates.downloadUrl = progressData.download_url;
-              }
-              if (progressData.filename) {
-                updates.filename = progressData.filename;
-              }
-            }
-
-            if (task.status === 'COMPLETED') {
-              updates.completedAt = new Date().toISOString();
-              get().updateTask(id, updates);
-            } else if (task.status === 'FAILED') {
-              updates.errorMessage = task.error_message || task.error || t('exportStore.exportFailed');
-              updates.completedAt = new Date().toISOString();
-              get().updateTask(id, updates);
-            } else if (task.status === 'PENDING' || task.status === 'RUNNING' || task.status === 'PROCESSING') {
-              get().updateTask(id, updates);
-              // Continue polling
+            if (handleTask(task)) {
               setTimeout(poll, 2000);
             }
           } catch (error: any) {
@@ -172,7 +182,7 @@ export const useExportTasksStore = create<ExportTasksState>()(
           }
         };
 
-        await poll();
+        watchTaskEvents(projectId, taskId, handleTask, poll);
       },
 
       restoreActiveTasks: () => {
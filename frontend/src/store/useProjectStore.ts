@@ -1,6 +1,7 @@
 import { create } from 'zustand';
-import type { Project } from '@/types';
+import type { Project, Task } from '@/types';
 import * as api from '@/api/endpoints';
+import { watchTaskEvents } from '@/api/taskEvents';
 import { debounce, normalizeProject, normalizeErrorMessage } from '@/utils';
 import { devLog } from '@/utils/logger';
 import { getT } from '@/utils/i18nHelper';
@@ -73,6 +74,9 @@ const storeI18n = {
 };
 const t = getT(storeI18n);
 
+// 完成后在 progress.download_url 中带有下载链接的任务类型
+const EXPORT_TASK_TYPES = ['EXPORT_EDITABLE_PPTX', 'EXPORT_PPTX', 'EXPORT_PDF', 'EXPORT_IMAGES'];
+
 interface ProjectState {
   // 状态
   currentProject: Project | null;
@@ -488,6 +492,70 @@ const debouncedUpdatePage = debounce(
     }
     const projectId = currentProject.id!;
 
+    // 处理一次任务快照（事件流推送或轮询结果），返回任务是否仍在进行
+    const handleTask = async (task: Task): Promise<boolean> => {
+      // 更新进度
+      if (task.progress) {
+        set({ taskProgress: task.progress });
+      }
+
+      devLog(`[轮询] Task ${taskId} 状态: ${task.status}`, task);
+
+      // 检查任务状态
+      if (task.status === 'COMPLETED') {
+        devLog(`[轮询] Task ${taskId} 已完成，刷新项目数据`);
+        
+        // 如果是导出任务，检查是否有下载链接
+        if (EXPORT_TASK_TYPES.includes(task.task_type) && task.progress) {
+          const progress = typeof task.progress === 'string' 
+            ? JSON.parse(task.progress) 
+            : task.progress;
+          
+          const downloadUrl = progress?.download_url;
+          if (downloadUrl) {
+            devLog('[导出] 从任务响应中获取下载链接:', downloadUrl);
+            // 延迟一下，确保状态更新完成后再打开下载链接
+            setTimeout(() => {
+              window.open(downloadUrl, '_blank');
+            }, 500);
+          } else {
+            console.warn('[导出] 任务完成但没有下载链接');
+          }
+        }
+        
+        set({ 
+          activeTaskId: null, 
+          taskProgress: null, 
+          isGlobalLoading: false 
+        });
+        // 刷新项目数据
+        await get().syncProject();
+        return false;
+      } else if (task.status === 'FAILED') {
+        console.error(`[轮询] Task ${taskId} 失败:`, task.error_message || task.error);
+        set({ 
+          error: normalizeErrorMessage(task.error_message || task.error || t('store.taskFailed')),
+          activeTaskId: null,
+          taskProgress: null,
+          isGlobalLoading: false
+        });
+        return false;
+      } else if (task.status === 'PENDING' || task.status === 'PROCESSING') {
+        return true;
+      } else {
+        // 未知状态，停止轮询
+        console.warn(`[轮询] Task ${taskId} 未知状态: ${task.status}，停止轮询`);
+        set({ 
+          error: `${t('store.unknownTaskStatus', { status: task.status })}`,
+          activeTaskId: null,
+          taskProgress: null,
+          isGlobalLoading: false
+        });
+        return false;
+      }
+    };
+
+    // 事件流不可用时的回退：每 2 秒查询一次任务状态
     const poll = async () => {
       try {
         devLog(`[轮询] 查询任务状态: ${taskId}`);
@@ -499,63 +567,10 @@ const debouncedUpdatePage = debounce(
           return;
         }
 
-        // 更新进度
-        if (task.progress) {
-          set({ taskProgress: task.progress });
-        }
-
-        devLog(`[轮询] Task ${taskId} 状态: ${task.status}`, task);
-
-        // 检查任务状态
-        if (task.status === 'COMPLETED') {
-          devLog(`[轮询] Task ${taskId} 已完成，刷新项目数据`);
-          
-          // 如果是导出可编辑PPTX任务，检查是否有下载链接
-          if (task.task_type === 'EXPORT_EDITABLE_PPTX' && task.progress) {
-            const progress = typeof task.progress === 'string' 
-              ? JSON.parse(task.progress) 
-              : task.progress;
-            
-            const downloadUrl = progress?.download_url;
-            if (downloadUrl) {
-              devLog('[导出可编辑PPTX] 从任务响应中获取下载链接:', downloadUrl);
-              // 延迟一下，确保状态更新完成后再打开下载链接
-              setTimeout(() => {
-                window.open(downloadUrl, '_blank');
-              }, 500);
-            } else {
-              console.warn('[导出可编辑PPTX] 任务完成但没有下载链接');
-            }
-          }
-          
-          set({ 
-            activeTaskId: null, 
-            taskProgress: null, 
-            isGlobalLoading: false 
-          });
-          // 刷新项目数据
-          await get().syncProject();
-        } else if (task.status === 'FAILED') {
-          console.error(`[轮询] Task ${taskId} 失败:`, task.error_message || task.error);
-          set({ 
-            error: normalizeErrorMessage(task.error_message || task.error || t('store.taskFailed')),
-            activeTaskId: null,
-            taskProgress: null,
-            isGlobalLoading: false
-          });
-        } else if (task.status === 'PENDING' || task.status === 'PROCESSING') {
+        if (await handleTask(task)) {
           // 继续轮询（PENDING 或 PROCESSING）
           devLog(`[轮询] Task ${taskId} 处理中，2秒后继续轮询...`);
           setTimeout(poll, 2000);
-        } else {
-          // 未知状态，停止轮询
-          console.warn(`[轮询] Task ${taskId} 未知状态: ${task.status}，停止轮询`);
-          set({ 
-            error: `${t('store.unknownTaskStatus', { status: task.status })}`,
-            activeTaskId: null,
-            taskProgress: null,
-            isGlobalLoading: false
-          });
         }
       } catch (error: any) {
         console.error('任务轮询错误:', error);
@@ -567,7 +582,7 @@ const debouncedUpdatePage = debounce(
       }
     };
 
-    await poll();
+    watchTaskEvents(projectId, taskId, handleTask, poll);
   },
 
   // 生成大纲（同步操作，不需要轮询）
@@ -838,32 +853,39 @@ const debouncedUpdatePage = debounce(
           throw new Error(t('store.noTaskId'));
         }
 
+        // 处理一次任务快照（事件流推送或轮询结果），返回任务是否仍在进行
+        const handleTask = async (task: Task): Promise<boolean> => {
+          if (task.progress) {
+            set({ taskProgress: task.progress });
+          }
+
+          await get().syncProject();
+
+          if (task.status === 'COMPLETED') {
+            set({ taskProgress: null, activeTaskId: null });
+            await get().syncProject();
+            return false;
+          } else if (task.status === 'FAILED') {
+            set({
+              taskProgress: null,
+              activeTaskId: null,
+              error: normalizeErrorMessage(task.error_message || task.error || t('store.generateDescFailed'))
+            });
+            await get().syncProject();
+            return false;
+          }
+          return task.status === 'PENDING' || task.status === 'PROCESSING';
+        };
+
+        // 事件流不可用时的回退：每 2 秒查询一次任务状态
         let pollErrors = 0;
         const pollAndSync = async () => {
           try {
             const taskResponse = await api.getTaskStatus(projectId, taskId);
             const task = taskResponse.data;
 
-            if (task) {
-              if (task.progress) {
-                set({ taskProgress: task.progress });
-              }
-
-              await get().syncProject();
-
-              if (task.status === 'COMPLETED') {
-                set({ taskProgress: null, activeTaskId: null });
-                await get().syncProject();
-              } else if (task.status === 'FAILED') {
-                set({
-                  taskProgress: null,
-                  activeTaskId: null,
-                  error: normalizeErrorMessage(task.error_message || task.error || t('store.generateDescFailed'))
-                });
-                await get().syncProject();
-              } else if (task.status === 'PENDING' || task.status === 'PROCESSING') {
-                setTimeout(pollAndSync, 2000);
-              }
+            if (task && await handleTask(task)) {
+              setTimeout(pollAndSync, 2000);
             }
           } catch (error: any) {
             console.error('[生成描述] 轮询错误:', error);
@@ -883,7 +905,7 @@ const debouncedUpdatePage = debounce(
           }
         };
 
-        setTimeout(pollAndSync, 2000);
+        watchTaskEvents(projectId, taskId, handleTask, pollAndSync);
 
       } catch (error: any) {
         console.error('[生成描述] 启动任务失败:', error);
@@ -1038,127 +1060,138 @@ const debouncedUpdatePage = debounce(
     }
     const projectId = currentProject.id!;
 
-    const poll = async () => {
-      try {
-        const response = await api.getTaskStatus(projectId, taskId);
-        const task = response.data;
+    // 处理一次任务快照（事件流推送或轮询结果），返回任务是否仍在进行
+    const handleTask = async (task: Task): Promise<boolean> => {
+      devLog(`[批量轮询] Task ${taskId} 状态: ${task.status}`, task.progress);
+
+      // 检查任务状态
+      if (task.status === 'COMPLETED') {
+        devLog(`[批量轮询] Task ${taskId} 已完成，清除任务记录`);
+        // 清除所有相关页面的任务记录
+        const { pageGeneratingTasks } = get();
+        const newTasks = { ...pageGeneratingTasks };
+        pageIds.forEach(id => {
+          if (newTasks[id] === taskId) {
+            delete newTasks[id];
+          }
+        });
         
-        if (!task) {
-          console.warn('[批量轮询] 响应中没有任务数据');
-          return;
-        }
+        // 提取警告消息（如果有）
+        const warningMessage = task.progress?.warning_message || null;
+        
+        set({ pageGeneratingTasks: newTasks, warningMessage });
 
-        devLog(`[批量轮询] Task ${taskId} 状态: ${task.status}`, task.progress);
+        // 刷新项目数据，并验证图片路径已更新
+        // 使用重试机制确保数据同步完成
+        let retryCount = 0;
+        const maxRetries = 5;
+        const retryDelay = 1000; // 1秒
 
-        // 检查任务状态
-        if (task.status === 'COMPLETED') {
-          devLog(`[批量轮询] Task ${taskId} 已完成，清除任务记录`);
-          // 清除所有相关页面的任务记录
-          const { pageGeneratingTasks } = get();
-          const newTasks = { ...pageGeneratingTasks };
-          pageIds.forEach(id => {
-            if (newTasks[id] === taskId) {
-              delete newTasks[id];
-            }
-          });
-          
-          // 提取警告消息（如果有）
-          const warningMessage = task.progress?.warning_message || null;
-          
-          set({ pageGeneratingTasks: newTasks, warningMessage });
+        const syncWithRetry = async (): Promise<void> => {
+          await get().syncProject();
 
-          // 刷新项目数据，并验证图片路径已更新
-          // 使用重试机制确保数据同步完成
-          let retryCount = 0;
-          const maxRetries = 5;
-          const retryDelay = 1000; // 1秒
+          // 验证所有页面的图片路径是否已更新
+          const { currentProject: updatedProject } = get();
+          if (updatedProject) {
+            const allImagesReady = pageIds.every(pageId => {
+              const page = updatedProject.pages.find(p => p.id === pageId);
+              return page?.generated_image_path;
+            });
 
-          const syncWithRetry = async (): Promise<void> => {
-            await get().syncProject();
+            if (allImagesReady) {
+              devLog(`[批量轮询] 所有图片路径已同步`);
+              return;
+            }
 
-            // 验证所有页面的图片路径是否已更新
-            const { currentProject: updatedProject } = get();
-            if (updatedProject) {
-              const allImagesReady = pageIds.every(pageId => {
-                const page = updatedProject.pages.find(p => p.id === pageId);
-                return page?.generated_image_path;
-              });
+            if (retryCount < maxRetries) {
+              retryCount++;
+              devLog(`[批量轮询] 图片路径尚未完全同步，${retryDelay}ms 后重试 (${retryCount}/${maxRetries})`);
+              await new Promise(resolve => setTimeout(resolve, retryDelay));
+              return syncWithRetry();
+            } else {
+              console.warn(`[批量轮询] 达到最大重试次数，部分图片路径可能未同步`);
+            }
+          }
+        };
 
-              if (allImagesReady) {
-                devLog(`[批量轮询] 所有图片路径已同步`);
-                return;
-              }
+        await syncWithRetry();
+        return false;
+      } else if (task.status === 'FAILED') {
+        console.error(`[批量轮询] Task ${taskId} 失败:`, task.error_message || task.error);
+        // 清除所有相关页面的任务记录
+        const { pageGeneratingTasks } = get();
+        const newTasks = { ...pageGeneratingTasks };
+        pageIds.forEach(id => {
+          if (newTasks[id] === taskId) {
+            delete newTasks[id];
+          }
+        });
+        set({ 
+          pageGeneratingTasks: newTasks,
+          error: normalizeErrorMessage(task.error_message || task.error || t('store.batchGenerateFailed'))
+        });
+        // 刷新项目数据以更新页面状态
+        await get().syncProject();
+        return false;
+      } else if (task.status === 'PENDING' || task.status === 'PROCESSING') {
+        // 检查警告消息
+        const newWarning = task.progress?.warning_message;
+        if (newWarning && get().warningMessage !== newWarning) {
+          set({ warningMessage: newWarning });
+        }
+        // 任务进行中：同步项目数据以更新页面状态
+        devLog(`[批量轮询] Task ${taskId} 处理中，同步项目数据...`);
+        await get().syncProject();
 
-              if (retryCount < maxRetries) {
-                retryCount++;
-                devLog(`[批量轮询] 图片路径尚未完全同步，${retryDelay}ms 后重试 (${retryCount}/${maxRetries})`);
-                await new Promise(resolve => setTimeout(resolve, retryDelay));
-                return syncWithRetry();
-              } else {
-                console.warn(`[批量轮询] 达到最大重试次数，部分图片路径可能未同步`);
-              }
-            }
-          };
-
-          await syncWithRetry();
-        } else if (task.status === 'FAILED') {
-          console.error(`[批量轮询] Task ${taskId} 失败:`, task.error_message || task.error);
-          // 清除所有相关页面的任务记录
-          const { pageGeneratingTasks } = get();
-          const newTasks = { ...pageGeneratingTasks };
+        // 逐个释放已完成的页面，让缩略图立刻显示
+        const { currentProject: proj, pageGeneratingTasks: pgt } = get();
+        if (proj) {
+          const updated = { ...pgt };
+          let changed = false;
           pageIds.forEach(id => {
-            if (newTasks[id] === taskId) {
-              delete newTasks[id];
+            if (updated[id] === taskId) {
+              const page = proj.pages.find(p => p.id === id);
+              // 只释放已完成或失败的页面，避免误释放尚未被线程池拾取的页面
+              // （未拾取的页面仍为 DESCRIPTION_GENERATED，不应提前释放）
+              if (page && (page.status === 'COMPLETED' || page.status === 'FAILED')) {
+                delete updated[id];
+                changed = true;
+              }
             }
           });
-          set({ 
-            pageGeneratingTasks: newTasks,
-            error: normalizeErrorMessage(task.error_message || task.error || t('store.batchGenerateFailed'))
-          });
-          // 刷新项目数据以更新页面状态
-          await get().syncProject();
-        } else if (task.status === 'PENDING' || task.status === 'PROCESSING') {
-          // 检查警告消息
-          const newWarning = task.progress?.warning_message;
-          if (newWarning && get().warningMessage !== newWarning) {
-            set({ warningMessage: newWarning });
-          }
-          // 继续轮询，同时同步项目数据以更新页面状态
-          devLog(`[批量轮询] Task ${taskId} 处理中，同步项目数据...`);
-          await get().syncProject();
+          if (changed) set({ pageGeneratingTasks: updated });
+        }
 
-          // 逐个释放已完成的页面，让缩略图立刻显示
-          const { currentProject: proj, pageGeneratingTasks: pgt } = get();
-          if (proj) {
-            const updated = { ...pgt };
-            let changed = false;
-            pageIds.forEach(id => {
-              if (updated[id] === taskId) {
-                const page = proj.pages.find(p => p.id === id);
-                // 只释放已完成或失败的页面，避免误释放尚未被线程池拾取的页面
-                // （未拾取的页面仍为 DESCRIPTION_GENERATED，不应提前释放）
-                if (page && (page.status === 'COMPLETED' || page.status === 'FAILED')) {
-                  delete updated[id];
-                  changed = true;
-                }
-              }
-            });
-            if (changed) set({ pageGeneratingTasks: updated });
+        return true;
+      } else {
+        // 未知状态，停止轮询
+        console.warn(`[批量轮询] Task ${taskId} 未知状态: ${task.status}，停止轮询`);
+        const { pageGeneratingTasks } = get();
+        const newTasks = { ...pageGeneratingTasks };
+        pageIds.forEach(id => {
+          if (newTasks[id] === taskId) {
+            delete newTasks[id];
           }
+        });
+        set({ pageGeneratingTasks: newTasks });
+        return false;
+      }
+    };
 
+    // 事件流不可用时的回退：每 2 秒查询一次任务状态
+    const poll = async () => {
+      try {
+        const response = await api.getTaskStatus(projectId, taskId);
+        const task = response.data;
+        
+        if (!task) {
+          console.warn('[批量轮询] 响应中没有任务数据');
+          return;
+        }
+
+        if (await handleTask(task)) {
           devLog(`[批量轮询] Task ${taskId} 处理中，2秒后继续轮询...`);
           setTimeout(poll, 2000);
-        } else {
-          // 未知状态，停止轮询
-          console.warn(`[批量轮询] Task ${taskId} 未知状态: ${task.status}，停止轮询`);
-          const { pageGeneratingTasks } = get();
-          const newTasks = { ...pageGeneratingTasks };
-          pageIds.forEach(id => {
-            if (newTasks[id] === taskId) {
-              delete newTasks[id];
-            }
-          });
-          set({ pageGeneratingTasks: newTasks });
         }
       } catch (error: any) {
         console.error('[批量轮询] 轮询错误:', error);
@@ -1174,8 +1207,8 @@ const debouncedUpdatePage = debounce(
       }
     };
 
-    // 开始轮询（不 await，立即返回让 UI 继续响应）
-    poll();
+    // 订阅任务事件（不 await，立即返回让 UI 继续响应），事件流不可用时回退为轮询
+    watchTaskEvents(projectId, taskId, handleTask, poll);
   },
 
   // 编辑页面图片（异步）
@@ -1219,53 +1252,27 @@ const debouncedUpdatePage = debounce(
     }
   },
 
-  // 导出PPTX
+  // 导出PPTX（异步任务，完成后 pollTask 自动打开下载链接）
   exportPPTX: async (pageIds?: string[]) => {
-    const { currentProject } = get();
+    const { currentProject, startAsyncTask } = get();
     if (!currentProject) return;
 
-    set({ isGlobalLoading: true, error: null });
     try {
-      const response = await api.exportPPTX(currentProject.id, pageIds);
-      // 优先使用相对路径，避免 Docker 环境下的端口问题
-      const downloadUrl =
-        response.data?.download_url || response.data?.download_url_absolute;
-
-      if (!downloadUrl) {
-        throw new Error(t('store.exportLinkFailed'));
-      }
-
-      // 使用浏览器直接下载链接，避免 axios 受带宽和超时影响
-      window.open(downloadUrl, '_blank');
+      await startAsyncTask(() => api.exportPPTX(currentProject.id, pageIds));
     } catch (error: any) {
       set({ error: error.message || t('store.exportFailed') });
-    } finally {
-      set({ isGlobalLoading: false });
     }
   },
 
-  // 导出PDF
+  // 导出PDF（异步任务，完成后 pollTask 自动打开下载链接）
   exportPDF: async (pageIds?: string[]) => {
-    const { currentProject } = get();
+    const { currentProject, startAsyncTask } = get();
     if (!currentProject) return;
 
-    set({ isGlobalLoading: true, error: null });
     try {
-      const response = await api.exportPDF(currentProject.id, pageIds);
-      // 优先使用相对路径，避免 Docker 环境下的端口问题
-      const downloadUrl =
-        response.data?.download_url || response.data?.download_url_absolute;
-
-      if (!downloadUrl) {
-        throw new Error(t('store.exportLinkFailed'));
-      }
-
-      // 使用浏览器直接下载链接，避免 axios 受带宽和超时影响
-      window.open(downloadUrl, '_blank');
+      await startAsyncTask(() => api.exportPDF(currentProject.id, pageIds));
     } catch (error: any) {
       set({ error: error.message || t('store.exportFailed') });
-    } finally {
-      set({ isGlobalLoading: false });
     }
   },
 
@@ -0,0 +1,67 @@
+/**
+ * watchTaskEvents 测试：任务进度事件流与轮询回退
+ */
+
+import { describe, it, expect, afterEach, vi } from 'vitest'
+import { watchTaskEvents } from '@/api/taskEvents'
+
+const sseBody = (chunks: string[]) => {
+  const encoder = new TextEncoder()
+  let index = 0
+  return {
+    getReader: () => ({
+      read: async () =>
+        index < chunks.length
+          ? { done: false, value: encoder.encode(chunks[index++]) }
+          : { done: true, value: undefined },
+      cancel: async () => undefined,
+    }),
+  }
+}
+
+const event = (name: string, data: object, id: number) =>
+  `id: ${id}\nevent: ${name}\ndata: ${JSON.stringify(data)}\n\n`
+
+describe('watchTaskEvents', () => {
+  afterEach(() => {
+    vi.unstubAllGlobals()
+  })
+
+  it('delivers pushed snapshots until the done event without polling', async () => {
+    const fetchMock = vi.fn().mockResolvedValue({
+      ok: true,
+      body: sseBody([
+        event('progress', { task_id: 't1', status: 'PROCESSING', progress: { total: 2, completed: 1 } }, 1),
+        ': heartbeat\n\n',
+        event('done', { task_id: 't1', status: 'COMPLETED', progress: { total: 2, completed: 2 } }, 2),
+      ]),
+    })
+    vi.stubGlobal('fetch', fetchMock)
+    const seen: string[] = []
+    const onFallback = vi.fn()
+
+    await new Promise<void>((resolve) => {
+      watchTaskEvents('p1', 't1', (task) => {
+        seen.push(task.status)
+        const running = task.status !== 'COMPLETED'
+        if (!running) resolve()
+        return running
+      }, onFallback, 0)
+    })
+
+    expect(fetchMock.mock.calls[0][0]).toBe('/api/projects/p1/tasks/t1/events')
+    expect(seen[seen.length - 1]).toBe('COMPLETED')
+    expect(onFallback).not.toHaveBeenCalled()
+  })
+
+  it('falls back to polling when the stream is unavailable', async () => {
+    vi.stubGlobal('fetch', vi.fn().mockResolvedValue({ ok: false, status: 404, body: null }))
+    const onTask = vi.fn()
+
+    await new Promise<void>((resolve) => {
+      watchTaskEvents('p1', 't1', onTask, resolve, 0)
+    })
+
+    expect(onTask).not.toHaveBeenCalled()
+  })
+})
@@ -82,6 +82,13 @@ export interface Project {
   pages: Page[];
   created_at: string;
   updated_at: string;
+  // 历史列表轻量视图（view=summary）返回的汇总字段，此时 pages 为空
+  title?: string | null;
+  page_count?: number;
+  has_images?: boolean;
+  has_descriptions?: boolean;
+  cover_image_url?: string | null;
+  cover_updated_at?: string | null;
 }
 
 // 任务状态
@@ -63,6 +63,9 @@ export const getProjectTitle = (project: Project): string => {
     if (title) {
       return title;
     }
+  } else if (project.title) {
+    // 摘要视图：标题由后端给出
+    return project.title;
   }
 
   return t('projectUtils.untitled');
@@ -73,7 +76,9 @@ export const getProjectTitle = (project: Project): string => {
  */
 export const getFirstPageImage = (project: Project): string | null => {
   if (!project.pages || project.pages.length === 0) {
-    return null;
+    return project.cover_image_url
+      ? getImageUrl(project.cover_image_url, project.cover_updated_at || undefined)
+      : null;
   }
 
   // 找到第一页有图片的页面，优先使用 generated_image_url（已包含缩略图逻辑）
@@ -102,13 +107,28 @@ export const formatDate = (dateString: string): string => {
 
 type StatusKey = 'notStarted' | 'completed' | 'pendingImages' | 'pendingDesc';
 
+/**
+ * 获取项目页数（完整项目或摘要视图）
+ */
+export const getPageCount = (project: Project): number => {
+  if (project.pages && project.pages.length > 0) return project.pages.length;
+  return project.page_count || 0;
+};
+
+const hasImages = (project: Project): boolean =>
+  project.pages?.length ? project.pages.some(p => p.generated_image_path) : !!project.has_images;
+
+const hasDescriptions = (project: Project): boolean =>
+  project.pages?.length ? project.pages.some(p => p.description_content) : !!project.has_descriptions;
+
 const getStatusKey = (project: Project): StatusKey => {
-  if (!project.pages || project.pages.length === 0) return 'notStarted';
-  if (project.pages.some(p => p.generated_image_path)) return 'completed';
-  if (project.pages.some(p => p.description_content)) return 'pendingImages';
+  if (getPageCount(project) === 0) return 'notStarted';
+  if (hasImages(project)) return 'completed';
+  if (hasDescriptions(project)) return 'pendingImages';
   return 'pendingDesc';
 };
 
+
 /**
  * 获取项目状态文本
  */
@@ -137,13 +157,11 @@ export const getProjectRoute = (project: Project): string => {
   const projectId = project.id || project.project_id;
   if (!projectId) return '/';
   
-  if (project.pages && project.pages.length > 0) {
-    const hasImages = project.pages.some(p => p.generated_image_path);
-    if (hasImages) {
+  if (getPageCount(project) > 0) {
+    if (hasImages(project)) {
       return `/project/${projectId}/preview`;
     }
-    const hasDescriptions = project.pages.some(p => p.description_content);
-    if (hasDescriptions) {
+    if (hasDescriptions(project)) {
       return `/project/${projectId}/detail`;
     }
     return `/project/${projectId}/outline`;
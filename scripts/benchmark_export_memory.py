@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+导出内存基准：页数 vs 峰值 RSS / 耗时
+
+每个 (导出方式, 页数) 组合在独立子进程中运行，读取子进程的 ru_maxrss，
+因此各次测量互不影响。图片为随机噪声 PNG（压缩率接近真实生成图），
+只生成一次并在各轮之间复用。
+
+使用方法:
+    python scripts/benchmark_export_memory.py
+    python scripts/benchmark_export_memory.py --pages 10 30 60 --width 3840 --height 2160
+    python scripts/benchmark_export_memory.py --modes pptx-stream pptx-python-pptx
+    python scripts/benchmark_export_memory.py --modes pdf-stream pdf-img2pdf
+
+示例输出 (1920x1080, 约 6MB/页；约 150MB 为导入 Flask/PIL/PyMuPDF 等的基线):
+    mode                 pages   peak RSS (MB)   time (s)   output (MB)
+    pptx-stream              5           151.0       0.15          29.7
+    pptx-stream             60           151.4       1.45         356.2
+    pptx-python-pptx         5           191.1       1.37          29.7
+    pptx-python-pptx        60           518.5      16.72         356.3
+    pdf-stream               5           149.1       0.03          29.7
+    pdf-stream              60           148.9       0.31         356.1
+    pdf-img2pdf              5           226.7       0.64          29.7
+    pdf-img2pdf             60           885.3       5.06         356.1
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+BACKEND_DIR = PROJECT_ROOT / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def _export_pptx_stream(image_paths, output):
+    from services.export_service import ExportService
+    ExportService.create_pptx_from_images(image_paths, output_file=output)
+
+
+def _export_pptx_python_pptx(image_paths, output):
+    from services.export_service import ExportService
+    ExportService.create_pptx_from_images(image_paths, output_file=output, streaming=False)
+
+
+def _export_pdf_stream(image_paths, output):
+    from services.export_service import ExportService
+    ExportService.create_pdf_from_images(image_paths, output_file=output)
+
+
+def _export_pdf_img2pdf(image_paths, output):
+    from services.export_service import ExportService
+    ExportService.create_pdf_from_images(image_paths, output_file=output, streaming=False)
+
+
+MODES = {
+    'pptx-stream': ('pptx', _export_pptx_stream),
+    'pptx-python-pptx': ('pptx', _export_pptx_python_pptx),
+    'pdf-stream': ('pdf', _export_pdf_stream),
+    'pdf-img2pdf': ('pdf', _export_pdf_img2pdf),
+}
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 计，macOS 以字节计
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_child(mode: str, image_paths, output_dir: str):
+    extension, export = MODES[mode]
+    # 先导入依赖，使基线 RSS 不计入导出本身
+    import services.export_service  # noqa: F401
+    baseline = _peak_rss_mb()
+    output = os.path.join(output_dir, f'{mode}_{len(image_paths)}.{extension}')
+    start = time.perf_counter()
+    export(image_paths, output)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        'baseline_mb': baseline,
+        'peak_mb': _peak_rss_mb(),
+        'seconds': elapsed,
+        'output_mb': os.path.getsize(output) / (1024 * 1024),
+    }))
+
+
+def make_images(directory: str, count: int, width: int, height: int):
+    from PIL import Image
+
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f'page_{i:03d}.png')
+        if not os.path.exists(path):
+            Image.frombytes('RGB', (width, height), os.urandom(width * height * 3)).save(path, compress_level=1)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark export memory usage vs page count')
+    parser.add_argument('--pages', type=int, nargs='+', default=[5, 20, 60])
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES))
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--image-dir', help='Reuse generated images across runs')
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'PAGES'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    image_dir = args.image_dir or os.path.join(tempfile.gettempdir(), f'bench_export_{args.width}x{args.height}')
+    os.makedirs(image_dir, exist_ok=True)
+
+    if args.child:
+        mode, pages = args.child[0], int(args.child[1])
+        with tempfile.TemporaryDirectory() as output_dir:
+            run_child(mode, make_images(image_dir, pages, args.width, args.height), output_dir)
+        return
+
+    print(f"Generating {max(args.pages)} images ({args.width}x{args.height}) in {image_dir} ...")
+    make_images(image_dir, max(args.pages), args.width, args.height)
+
+    print(f"{'mode':<20} {'pages':>5} {'peak RSS (MB)':>15} {'time (s)':>10} {'output (MB)':>13}")
+    for mode in args.modes:
+        for pages in args.pages:
+            result = subprocess.run(
+                [sys.executable, __file__, '--child', mode, str(pages), '--image-dir', image_dir,
+                 '--width', str(args.width), '--height', str(args.height)],
+                capture_output=True, text=True, check=True,
+            )
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            print(f"{mode:<20} {pages:>5} {stats['peak_mb']:>15.1f} {stats['seconds']:>10.2f} "
+                  f"{stats['output_mb']:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+参考文件检索基准：全文内联 vs BM25 片段检索的 prompt 大小 / 构建耗时
+
+为 N 页 PPT 构建单页描述 prompt（get_page_description_prompt），比较：
+  - full:      每个 prompt 内联所有参考文件全文（原行为）
+  - retrieval: 每个 prompt 只内联与该页大纲相关的片段（REFERENCE_PROMPT_TOKEN_BUDGET 以内）
+
+默认使用合成的中英文混合文档（每个文件若干章节，每页大纲对应其中一个章节）；
+也可以用 --markdown 指定真实的解析结果（.md 文件，可多个）。
+模型端耗时（首 token 延迟、费用）与输入 token 数近似成正比，因此以 token 数作为主要指标。
+
+使用方法:
+    python scripts/benchmark_reference_retrieval.py
+    python scripts/benchmark_reference_retrieval.py --files 3 --sections 100 --pages 30 --budget 12000
+    python scripts/benchmark_reference_retrieval.py --markdown a.md b.md --pages 20
+
+示例输出 (默认参数：3 个文件 × 100 章节，约 30 万 token；30 页；预算 12000):
+    3 files, 900 chunks, ~306259 tokens; 30 pages
+    mode         index (ms)   prompts (ms)   tokens / prompt   total tokens   hit rate
+    full                  -           46.2            303807        9114214      100%
+    retrieval         247.7           21.6              6187         185631      100%
+
+hit rate 表示该页对应章节的关键词出现在 prompt 中的比例。
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+BACKEND_DIR = PROJECT_ROOT / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+_WORDS = ('market growth revenue margin customer retention pipeline forecast region channel pricing '
+          'supply chain logistics inventory compliance audit risk model training inference latency').split()
+_ZH = '市场增长收入利润客户留存渠道定价供应链物流库存合规审计风险模型训练推理延迟'
+
+
+def _synthetic_files(files: int, sections: int, seed: int = 7):
+    """Return ([(filename, markdown)], [(section title, key phrase)])"""
+    rng = random.Random(seed)
+    docs, topics = [], []
+    for f in range(files):
+        parts = []
+        for s in range(sections):
+            key = f'topic{f}x{s}'
+            title = f'{rng.choice(_WORDS)} {key}'
+            body = []
+            for _ in range(12):
+                words = ' '.join(rng.choice(_WORDS) for _ in range(25))
+                zh = ''.join(rng.choice(_ZH) for _ in range(30))
+                body.append(f'{words} {key}. {zh}。')
+            parts.append(f'## {title}\n\n' + '\n\n'.join(body))
+            topics.append((title, key))
+        docs.append((f'report_{f}.pdf', '\n\n'.join(parts)))
+    return docs, topics
+
+
+class _Context:
+    """Minimal stand-in for ProjectContext (no database needed)"""
+
+    def __init__(self, reference_files_content, retriever=None):
+        self.idea_prompt = 'Quarterly business review'
+        self.outline_text = None
+        self.description_text = None
+        self.creation_type = 'idea'
+        self.outline_requirements = None
+        self.description_requirements = None
+        self.reference_files_content = reference_files_content
+        self.reference_retriever = retriever
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=3)
+    parser.add_argument('--sections', type=int, default=100, help='sections per synthetic file')
+    parser.add_argument('--markdown', nargs='*', help='use these markdown files instead of synthetic ones')
+    parser.add_argument('--pages', type=int, default=30)
+    parser.add_argument('--budget', type=int, default=12000)
+    parser.add_argument('--top-k', type=int, default=16)
+    args = parser.parse_args()
+
+    from collections import Counter
+    from services.prompts import get_page_description_prompt
+    from services.reference_index import (FileIndex, ReferenceRetriever, chunk_markdown,
+                                          estimate_tokens, tokenize)
+
+    if args.markdown:
+        docs = [(Path(p).name, Path(p).read_text(encoding='utf-8')) for p in args.markdown]
+        topics = [(line.lstrip('#').strip(), None) for _, md in docs
+                  for line in md.splitlines() if line.startswith('#')]
+    else:
+        docs, topics = _synthetic_files(args.files, args.sections)
+    rng = random.Random(1)
+    pages = [rng.choice(topics) for _ in range(args.pages)]
+    files_content = [{'filename': name, 'content': md} for name, md in docs]
+    outline = [{'title': title, 'points': []} for title, _ in pages]
+
+    def run(context):
+        start = time.perf_counter()
+        prompts = [get_page_description_prompt(context, outline, outline[i], i + 1) for i in range(len(pages))]
+        elapsed = (time.perf_counter() - start) * 1000
+        tokens = [estimate_tokens(p) for p in prompts]
+        hits = sum(1 for (_, key), p in zip(pages, prompts) if key is None or key in p)
+        return elapsed, tokens, hits
+
+    start = time.perf_counter()
+    indexes = []
+    for name, md in docs:
+        rows = []
+        for text in chunk_markdown(md):
+            terms = Counter(tokenize(text))
+            rows.append((text, estimate_tokens(text), sum(terms.values()), terms))
+        indexes.append(FileIndex(name, rows))
+    index_ms = (time.perf_counter() - start) * 1000
+    retriever = ReferenceRetriever(indexes, args.budget, args.top_k)
+
+    print(f"{len(docs)} files, {retriever.chunk_count} chunks, ~{retriever.total_tokens} tokens; {len(pages)} pages")
+    print(f"{'mode':<12}{'index (ms)':>11}{'prompts (ms)':>15}{'tokens / prompt':>18}{'total tokens':>15}{'hit rate':>11}")
+    for mode, context, build_ms in (('full', _Context(files_content), None),
+                                    ('retrieval', _Context(files_content, retriever), index_ms)):
+        elapsed, tokens, hits = run(context)
+        index_col = f'{build_ms:.1f}' if build_ms is not None else '-'
+        print(f"{mode:<12}{index_col:>11}{elapsed:>15.1f}{sum(tokens) // len(tokens):>18}"
+              f"{sum(tokens):>15}{hits / len(pages):>10.0%}")
+
+
+if __name__ == '__main__':
+    main()